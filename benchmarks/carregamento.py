@@ -0,0 +1,179 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Compara a formatação dos registros para o COPY com e sem o Arrow.
+
+Sorteia, com reposição, linhas das tabelas transformadas de exemplo usadas
+nos testes e mede o tempo e o acréscimo no pico de memória residente (RSS)
+necessários para formatá-las em CSV, como enviadas ao PostgreSQL pelo
+comando COPY:
+
+- da forma padrão de [`carregar_dataframe()`][], em que o pandas converte
+  cada valor em um objeto do Python e o módulo `csv` os formata linha a
+  linha (ver [`postgresql_copiar_dados()`][]);
+- com a opção `arrow` de [`carregar_dataframe()`][], em que os dados são
+  convertidos em uma tabela Arrow e formatados pelo próprio Arrow (ver
+  [`postgresql_copiar_arrow()`][]).
+
+Cada medida é feita em um processo separado, já que a memória liberada
+por uma formatação nem sempre é devolvida ao sistema operacional antes da
+seguinte. A memória é consultada periodicamente em `/proc/self/statm`,
+disponível apenas no Linux. O envio ao banco de dados não é medido; o
+conteúdo formatado é apenas descartado.
+
+Requer o pacote `pyarrow`.
+
+Uso:
+    python benchmarks/carregamento.py --linhas 100000
+
+[`carregar_dataframe()`]: impulsoetl.utilitarios.bd.carregar_dataframe
+[`postgresql_copiar_dados()`]: impulsoetl.utilitarios.bd.postgresql_copiar_dados
+[`postgresql_copiar_arrow()`]: impulsoetl.utilitarios.bd.postgresql_copiar_arrow
+"""
+
+
+import argparse
+import csv
+import multiprocessing
+import resource
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import StringIO
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+import sqlalchemy as sa
+from pandas.io.sql import SQLDatabase, SQLTable
+
+from impulsoetl.utilitarios.bd import (
+    _FluxoCSV,
+    _gerar_csv,
+    converter_para_arrow,
+)
+
+DIRETORIO_TESTES = Path(__file__).parent.parent / "tests"
+
+EXEMPLOS: list[str] = [
+    "siasus/pa_transformada.parquet",
+    "siasus/bpa_i_transformada.parquet",
+    "siasus/raas_ps_transformada.parquet",
+    "sihsus/aih_rd_transformada.parquet",
+    "sim/do_transformada.parquet",
+    "sinan/violbr19_transformada.parquet",
+    "scnes/vinculos_transformado.parquet",
+    "scnes/habilitacoes_transformado.parquet",
+]
+
+
+def _formatar_padrao(df: pd.DataFrame, passo: int) -> int:
+    df = df.copy()
+    colunas_data = df.select_dtypes(include="datetime").columns
+    df[colunas_data] = df[colunas_data].applymap(
+        lambda dt: dt.isoformat() if pd.notna(dt) else None
+    )
+    with sa.create_engine("sqlite://").connect() as conexao:
+        tabela = SQLTable("t", SQLDatabase(conexao), frame=df, index=False)
+        _, dados = tabela.insert_data()
+    tamanho = 0
+    for inicio in range(0, len(df), passo):
+        buffer = StringIO()
+        csv.writer(buffer).writerows(
+            zip(*(coluna[inicio : inicio + passo] for coluna in dados)),
+        )
+        tamanho += len(buffer.getvalue())
+    return tamanho
+
+
+def _formatar_arrow(df: pd.DataFrame, passo: int) -> int:
+    conteudo = _FluxoCSV(_gerar_csv(converter_para_arrow(df), passo))
+    tamanho = 0
+    while parte := conteudo.read(2**16):
+        tamanho += len(parte)
+    return tamanho
+
+
+FORMATACOES: dict[str, Callable[[pd.DataFrame, int], int]] = {
+    "padrao": _formatar_padrao,
+    "arrow": _formatar_arrow,
+}
+
+
+def _memoria_atual() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * resource.getpagesize()
+
+
+def medir(
+    formatacao: str,
+    exemplo: str,
+    linhas: int,
+    passo: int,
+    semente: int,
+) -> tuple[float, float]:
+    """Mede a duração e o acréscimo no pico de memória de uma formatação."""
+    tabela = pd.read_parquet(DIRETORIO_TESTES / exemplo)
+    gerador = np.random.default_rng(semente)
+    df = tabela.iloc[gerador.integers(len(tabela), size=linhas)]
+    df = df.reset_index(drop=True)
+    del tabela
+    # carrega os módulos usados na formatação antes da medida
+    FORMATACOES[formatacao](df.head(10), passo)
+
+    inicial = _memoria_atual()
+    pico = inicial
+    encerrar = threading.Event()
+
+    def acompanhar_memoria() -> None:
+        nonlocal pico
+        while not encerrar.wait(0.005):
+            pico = max(pico, _memoria_atual())
+
+    linha_execucao = threading.Thread(target=acompanhar_memoria, daemon=True)
+    linha_execucao.start()
+    inicio = time.perf_counter()
+    FORMATACOES[formatacao](df, passo)
+    duracao = time.perf_counter() - inicio
+    encerrar.set()
+    linha_execucao.join()
+    pico = max(pico, _memoria_atual())
+    return duracao, (pico - inicial) / 1e6
+
+
+def main() -> None:
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    argumentos.add_argument("--linhas", type=int, default=100000)
+    argumentos.add_argument("--passo", type=int, default=10000)
+    argumentos.add_argument("--semente", type=int, default=0)
+    parametros = argumentos.parse_args()
+
+    contexto = multiprocessing.get_context("spawn")
+    for exemplo in EXEMPLOS:
+        for formatacao in FORMATACOES:
+            with ProcessPoolExecutor(1, mp_context=contexto) as processo:
+                duracao, pico = processo.submit(
+                    medir,
+                    formatacao,
+                    exemplo,
+                    parametros.linhas,
+                    parametros.passo,
+                    parametros.semente,
+                ).result()
+            print(
+                "{:<40} {:<7} {:>8.2f} s {:>12.0f} linhas/s {:>10.1f} MB RSS"
+                .format(
+                    exemplo,
+                    formatacao,
+                    duracao,
+                    parametros.linhas / duracao,
+                    pico,
+                ),
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Gera arquivos DBF e DBC sintéticos, de qualquer tamanho, para testes.
+
+As tabelas de exemplo usadas nos testes têm apenas alguns milhares de
+registros. Para medir a extração, a transformação e a carga na escala dos
+arquivos dos estados maiores (dezenas de milhões de registros), este módulo
+gera arquivos com a mesma estrutura de campos das tabelas de exemplo e com
+valores sorteados a partir delas.
+
+Cada coluna é sorteada de forma independente, com reposição, a partir dos
+valores observados na coluna correspondente da tabela de exemplo. A
+distribuição de cada coluna - incluindo a proporção de valores vazios - é
+preservada, mas as relações entre colunas (por exemplo, entre um
+procedimento e o valor aprovado) não são.
+
+Para que arquivos de dezenas de milhões de registros sejam gerados em
+poucos minutos, o sorteio é feito diretamente sobre os bytes de cada campo
+dos registros da tabela de exemplo, já formatados por `escrever_dbf()`, sem
+formatar novamente cada valor sorteado. Os registros são gerados e gravados
+em lotes, de modo que a memória ocupada não depende do número de registros
+do arquivo. O arquivo DBC é comprimido a partir do DBF com `dbf2dbc()`,
+do módulo `tests/utilitarios/compactador_dbc.py`.
+
+Uso:
+    python benchmarks/dados_sinteticos.py PA 30000000 --destino /tmp/dados
+"""
+
+
+import argparse
+import struct
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from impulsoetl.utilitarios.dbf import CabecalhoDBF, escrever_dbf
+
+DIRETORIO_TESTES = Path(__file__).parent.parent / "tests"
+
+# o compactador de arquivos DBC faz parte dos utilitários dos testes
+sys.path.insert(0, str(DIRETORIO_TESTES.parent))
+from tests.utilitarios.compactador_dbc import dbf2dbc  # noqa: E402
+
+# tabela de exemplo de cada tipo de arquivo, relativa ao diretório `tests`
+TABELAS_EXEMPLO = {
+    "PA": "siasus/SIA_PASE2108_.parquet",
+    "BI": "siasus/SIA_BISE2108_.parquet",
+    "PS": "siasus/SIA_PSSE2108_.parquet",
+    "RD": "sihsus/SIH_RDSE2108_.parquet",
+    "DO": "sim/SIM_DOAC2002_.parquet",
+    "PF": "scnes/CNES_PFSE2111_.parquet",
+    "HB": "scnes/CNES_HBSE2111_.parquet",
+    "VIOLBR": "sinan/SINAN_VIOLBR19_.parquet",
+}
+
+
+class GeradorSintetico(object):
+    """Sorteia registros com a distribuição de uma tabela de exemplo."""
+
+    def __init__(
+        self,
+        exemplo: pd.DataFrame,
+        semente: int | None = None,
+        encoding: str = "iso-8859-1",
+    ) -> None:
+        """Instancia um gerador de registros sintéticos.
+
+        Argumentos:
+            exemplo: Tabela cujos campos e valores são reproduzidos.
+            semente: Semente do gerador de números aleatórios, para que os
+                arquivos gerados sejam reprodutíveis.
+            encoding: Codificação dos campos de texto.
+        """
+        with TemporaryDirectory() as diretorio_temporario:
+            arquivo_exemplo = Path(diretorio_temporario, "exemplo.dbf")
+            self.cabecalho = escrever_dbf(
+                arquivo_exemplo,
+                exemplo,
+                encoding=encoding,
+            )
+            conteudo = arquivo_exemplo.read_bytes()
+        self._cabecalho_bytes = conteudo[: self.cabecalho.cabecalho_tamanho]
+        self._registros = np.frombuffer(
+            conteudo,
+            dtype=np.uint8,
+            count=self.cabecalho.registros_num
+            * self.cabecalho.registro_tamanho,
+            offset=self.cabecalho.cabecalho_tamanho,
+        ).reshape(self.cabecalho.registros_num, -1)
+        self._aleatorio = np.random.default_rng(semente)
+
+    @classmethod
+    def do_tipo(
+        cls,
+        tipo: str,
+        semente: int | None = None,
+    ) -> "GeradorSintetico":
+        """Instancia um gerador a partir da tabela de exemplo de um tipo.
+
+        Argumentos:
+            tipo: Tipo de arquivo, entre as chaves de `TABELAS_EXEMPLO`.
+            semente: Semente do gerador de números aleatórios.
+        """
+        exemplo = pd.read_parquet(DIRETORIO_TESTES / TABELAS_EXEMPLO[tipo])
+        return cls(exemplo, semente=semente)
+
+    def registros(
+        self,
+        linhas: int,
+        passo: int = 100000,
+    ) -> Iterator[np.ndarray]:
+        """Gera lotes de registros sintéticos, já formatados.
+
+        Argumentos:
+            linhas: Número total de registros.
+            passo: Número máximo de registros em cada lote.
+
+        Gera:
+            Matrizes de bytes em que cada linha é um registro DBF, com os
+            campos da tabela de exemplo.
+        """
+        exemplos_num = len(self._registros)
+        for inicio in range(0, linhas, passo):
+            tamanho = min(passo, linhas - inicio)
+            lote = np.empty(
+                (tamanho, self.cabecalho.registro_tamanho),
+                dtype=np.uint8,
+            )
+            # marcador de registro não excluído
+            lote[:, 0] = ord(" ")
+            for campo in self.cabecalho.campos:
+                bytes_campo = slice(
+                    campo.deslocamento,
+                    campo.deslocamento + campo.tamanho,
+                )
+                sorteados = self._aleatorio.integers(
+                    exemplos_num,
+                    size=tamanho,
+                )
+                lote[:, bytes_campo] = self._registros[sorteados, bytes_campo]
+            yield lote
+
+    def escrever_dbf(
+        self,
+        arquivo_dbf: Path,
+        linhas: int,
+        passo: int = 100000,
+    ) -> CabecalhoDBF:
+        """Escreve um arquivo DBF com registros sintéticos.
+
+        Argumentos:
+            arquivo_dbf: Caminho do arquivo a ser criado.
+            linhas: Número de registros do arquivo.
+            passo: Número de registros gerados e gravados de cada vez.
+
+        Retorna:
+            O cabeçalho do arquivo escrito.
+        """
+        with open(arquivo_dbf, "wb") as arquivo:
+            arquivo.write(self._cabecalho_bytes[:4])
+            arquivo.write(struct.pack("<I", linhas))
+            arquivo.write(self._cabecalho_bytes[8:])
+            for lote in self.registros(linhas, passo=passo):
+                arquivo.write(lote.tobytes())
+            arquivo.write(b"\x1a")
+        return self.cabecalho._replace(registros_num=linhas)
+
+
+def gerar_dbf(
+    arquivo_dbf: Path,
+    tipo: str,
+    linhas: int,
+    semente: int | None = None,
+    passo: int = 100000,
+) -> CabecalhoDBF:
+    """Gera um arquivo DBF sintético.
+
+    Argumentos:
+        arquivo_dbf: Caminho do arquivo a ser criado.
+        tipo: Tipo de arquivo, entre as chaves de `TABELAS_EXEMPLO`.
+        linhas: Número de registros do arquivo.
+        semente: Semente do gerador de números aleatórios.
+        passo: Número de registros gerados e gravados de cada vez.
+
+    Retorna:
+        O cabeçalho do arquivo escrito.
+    """
+    gerador = GeradorSintetico.do_tipo(tipo, semente=semente)
+    return gerador.escrever_dbf(arquivo_dbf, linhas, passo=passo)
+
+
+def gerar_dbc(
+    arquivo_dbc: Path,
+    tipo: str,
+    linhas: int,
+    semente: int | None = None,
+    passo: int = 100000,
+    manter_dbf: bool = False,
+) -> CabecalhoDBF:
+    """Gera um arquivo DBC sintético, comprimido a partir de um DBF.
+
+    Argumentos:
+        arquivo_dbc: Caminho do arquivo a ser criado. O arquivo DBF
+            intermediário é criado no mesmo diretório, com a extensão
+            `.dbf`.
+        tipo: Tipo de arquivo, entre as chaves de `TABELAS_EXEMPLO`.
+        linhas: Número de registros do arquivo.
+        semente: Semente do gerador de números aleatórios.
+        passo: Número de registros gerados e gravados de cada vez.
+        manter_dbf: Se verdadeiro, mantém o arquivo DBF intermediário.
+
+    Retorna:
+        O cabeçalho do arquivo DBF compactado.
+    """
+    arquivo_dbf = arquivo_dbc.with_suffix(".dbf")
+    cabecalho = gerar_dbf(
+        arquivo_dbf,
+        tipo,
+        linhas,
+        semente=semente,
+        passo=passo,
+    )
+    dbf2dbc(arquivo_dbf, arquivo_dbc)
+    if not manter_dbf:
+        arquivo_dbf.unlink()
+    return cabecalho
+
+
+def main() -> None:
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    argumentos.add_argument("tipo", choices=list(TABELAS_EXEMPLO))
+    argumentos.add_argument("linhas", type=int)
+    argumentos.add_argument("--destino", type=Path, default=Path("."))
+    argumentos.add_argument("--semente", type=int, default=None)
+    argumentos.add_argument("--passo", type=int, default=100000)
+    argumentos.add_argument(
+        "--dbf",
+        action="store_true",
+        help="Mantém o arquivo DBF, além do DBC.",
+    )
+    parametros = argumentos.parse_args()
+
+    parametros.destino.mkdir(parents=True, exist_ok=True)
+    arquivo_dbc = parametros.destino / "{}SINTETICO.dbc".format(
+        parametros.tipo,
+    )
+    cabecalho = gerar_dbc(
+        arquivo_dbc,
+        parametros.tipo,
+        parametros.linhas,
+        semente=parametros.semente,
+        passo=parametros.passo,
+        manter_dbf=parametros.dbf,
+    )
+    print(
+        "{}: {:n} registros de {} bytes, {:.1f} MB (DBC)".format(
+            arquivo_dbc,
+            cabecalho.registros_num,
+            cabecalho.registro_tamanho,
+            arquivo_dbc.stat().st_size / 10**6,
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Compara o desempenho da conversão de datas célula a célula e vetorizada.
+
+Gera colunas de datas nos formatos usados nos arquivos do DataSUS, sorteando
+valores das colunas correspondentes nas tabelas de exemplo usadas nos testes,
+e mede o tempo necessário para convertê-las da forma como as transformações
+faziam anteriormente (aplicando uma função a cada célula ou a cada linha) e
+com as funções [`de_texto_para_datas()`][] e [`de_ano_mes_para_datas()`][].
+
+Os resultados das duas formas de conversão são comparados, e uma diferença
+interrompe a execução.
+
+Requer acesso ao banco de dados configurado no ambiente, já que o módulo
+[`impulsoetl.comum.datas`][] espelha a tabela de períodos ao ser importado.
+
+Uso:
+    python benchmarks/datas.py --linhas 200000
+
+[`de_texto_para_datas()`]: impulsoetl.comum.datas.de_texto_para_datas
+[`de_ano_mes_para_datas()`]: impulsoetl.comum.datas.de_ano_mes_para_datas
+[`impulsoetl.comum.datas`]: impulsoetl.comum.datas
+"""
+
+
+import argparse
+import time
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from impulsoetl.comum.datas import (
+    de_aaaammdd_para_timestamp,
+    de_ano_mes_para_datas,
+    de_texto_para_datas,
+)
+
+DIRETORIO_TESTES = Path(__file__).parent.parent / "tests"
+
+
+class Caso(NamedTuple):
+    """Colunas de exemplo e as duas formas de convertê-las em datas."""
+
+    nome: str
+    exemplo: str
+    colunas: list[str]
+    celula_a_celula: Callable[[pd.DataFrame], pd.DataFrame]
+    vetorizada: Callable[[pd.DataFrame], pd.DataFrame]
+
+
+def _aaaammdd_celulas(dados: pd.DataFrame) -> pd.DataFrame:
+    return dados.applymap(
+        lambda dt: de_aaaammdd_para_timestamp(dt, erros="coerce"),
+    )
+
+
+def _aaaamm_celulas(dados: pd.DataFrame) -> pd.DataFrame:
+    return dados.applymap(
+        lambda dt: pd.to_datetime(dt, format="%Y%m", errors="coerce"),
+    )
+
+
+def _ddmmaaaa_celulas(dados: pd.DataFrame) -> pd.DataFrame:
+    return dados.applymap(
+        lambda dt: pd.to_datetime(
+            dt.replace(" ", "0"),
+            format="%d%m%Y",  # noqa: WPS323
+            errors="coerce",
+        ),
+    )
+
+
+def _ano_mes_linhas(dados: pd.DataFrame) -> pd.DataFrame:
+    return dados.apply(
+        lambda i: pd.Timestamp(int(i["ANO_CMPT"]), int(i["MES_CMPT"]), 1),
+        axis=1,
+    ).to_frame("periodo_data_inicio")
+
+
+def _vetorizada(formato: str) -> Callable[[pd.DataFrame], pd.DataFrame]:
+    def converter(dados: pd.DataFrame) -> pd.DataFrame:
+        return dados.apply(
+            lambda coluna: de_texto_para_datas(
+                coluna.str.replace(" ", "0", regex=False)
+                if formato == "%d%m%Y"  # noqa: WPS323
+                else coluna,
+                formato=formato,
+                erros="coerce",
+            ),
+        )
+
+    return converter
+
+
+def _ano_mes_vetorizada(dados: pd.DataFrame) -> pd.DataFrame:
+    return de_ano_mes_para_datas(
+        dados["ANO_CMPT"],
+        dados["MES_CMPT"],
+    ).to_frame("periodo_data_inicio")
+
+
+CASOS: list[Caso] = [
+    Caso(
+        "AAAAMMDD",
+        "sihsus/SIH_RDSE2108_.parquet",
+        ["NASC", "DT_INTER", "DT_SAIDA"],
+        _aaaammdd_celulas,
+        _vetorizada("%Y%m%d"),
+    ),
+    Caso(
+        "AAAAMM",
+        "siasus/SIA_PASE2108_.parquet",
+        ["PA_MVM", "PA_CMP"],
+        _aaaamm_celulas,
+        _vetorizada("%Y%m"),
+    ),
+    Caso(
+        "DDMMAAAA",
+        "sim/SIM_DOAL2008_.parquet",
+        ["DTOBITO", "DTNASC", "DTATESTADO", "DTCADASTRO"],
+        _ddmmaaaa_celulas,
+        _vetorizada("%d%m%Y"),  # noqa: WPS323
+    ),
+    Caso(
+        "ano e mês",
+        "sihsus/SIH_RDSE2108_.parquet",
+        ["ANO_CMPT", "MES_CMPT"],
+        _ano_mes_linhas,
+        _ano_mes_vetorizada,
+    ),
+]
+
+
+def sortear_colunas(caso: Caso, linhas: int, semente: int) -> pd.DataFrame:
+    """Sorteia, com reposição, valores das colunas da tabela de exemplo."""
+    exemplo = pd.read_parquet(
+        DIRETORIO_TESTES / caso.exemplo,
+        columns=caso.colunas,
+    )
+    gerador = np.random.default_rng(semente)
+    return pd.DataFrame(
+        {
+            coluna: gerador.choice(exemplo[coluna].to_numpy(), size=linhas)
+            for coluna in caso.colunas
+        },
+    )
+
+
+def main() -> None:
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    argumentos.add_argument("--linhas", type=int, default=200000)
+    argumentos.add_argument("--semente", type=int, default=0)
+    parametros = argumentos.parse_args()
+
+    for caso in CASOS:
+        dados = sortear_colunas(caso, parametros.linhas, parametros.semente)
+        celulas = len(dados) * len(dados.columns)
+        resultados = {}
+        duracoes = {}
+        for nome, funcao in (
+            ("celula_a_celula", caso.celula_a_celula),
+            ("vetorizada", caso.vetorizada),
+        ):
+            inicio = time.perf_counter()
+            resultados[nome] = funcao(dados)
+            duracoes[nome] = time.perf_counter() - inicio
+            print(
+                "{:<10} {:<16} {:>8.2f} s {:>12.0f} valores/s".format(
+                    caso.nome,
+                    nome,
+                    duracoes[nome],
+                    celulas / duracoes[nome],
+                ),
+            )
+        pd.testing.assert_frame_equal(
+            resultados["celula_a_celula"],
+            resultados["vetorizada"],
+        )
+        print(
+            "{:<10} {:<16} {:>8.1f} x".format(
+                caso.nome,
+                "aceleracao",
+                duracoes["celula_a_celula"] / duracoes["vetorizada"],
+            ),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Mede o desempenho da extração de dados do DataSUS, de ponta a ponta.
+
+Gera arquivos sintéticos de procedimentos ambulatoriais (SIASUS), de
+autorizações de internação hospitalar (SIHSUS) e de declarações de óbito
+(SIM) a partir das tabelas de exemplo usadas nos testes (veja
+`dados_sinteticos.py`), disponibiliza-os em um servidor FTP local com a
+estrutura de diretórios do DataSUS (veja `ftp_datasus.py`) e executa as
+funções `extrair_pa()`, `extrair_aih_rd()` e `extrair_do()` contra esse
+servidor, com as mesmas colunas usadas nas capturas.
+
+Para cada arquivo, são medidas três etapas:
+
+- `download`: transferência do arquivo DBC pelo *pool* de conexões FTP;
+- `leitura`: descompactação e decodificação do arquivo DBC já baixado;
+- `extracao`: a função de extração completa, incluindo a listagem do
+  diretório, o download, a descompactação e a decodificação.
+
+Para cada etapa, são informados a duração, a vazão em megabytes por segundo
+(do arquivo DBC, no download e na extração; do arquivo DBF descompactado,
+na leitura), a vazão em registros por segundo e o pico de memória residente
+(RSS) do processo durante a etapa.
+
+Requer o pacote `pyftpdlib`, instalado com as dependências de
+desenvolvimento do projeto, e acesso ao banco de dados configurado no
+ambiente, já que os módulos de captura espelham tabelas auxiliares ao serem
+importados.
+
+Uso:
+    python benchmarks/extracao.py --linhas 1000000 --passo 100000
+"""
+
+
+import argparse
+import importlib
+import os
+import resource
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Callable, Iterable, NamedTuple
+
+from ftp_datasus import (
+    ARQUIVOS_EXEMPLO,
+    ArquivoGerado,
+    ServidorFTPLocal,
+    gerar_arquivos,
+)
+
+
+class Captura(NamedTuple):
+    """Função de extração medida e arquivo que ela deve ler."""
+
+    nome: str
+    modulo: str
+    funcao: str
+    colunas: tuple[str, ...]
+    caminho: str
+    uf_sigla: str
+    periodo_data_inicio: date
+
+
+CAPTURAS = (
+    Captura(
+        nome="pa",
+        modulo="impulsoetl.siasus.procedimentos",
+        funcao="extrair_pa",
+        colunas=("DE_PARA_PA",),
+        caminho="/dissemin/publicos/SIASUS/200801_/Dados/PASE2108.dbc",
+        uf_sigla="SE",
+        periodo_data_inicio=date(2021, 8, 1),
+    ),
+    Captura(
+        nome="aih_rd",
+        modulo="impulsoetl.sihsus.aih_rd",
+        funcao="extrair_aih_rd",
+        colunas=("DE_PARA_AIH_RD", "DE_PARA_AIH_RD_ADICIONAIS"),
+        caminho="/dissemin/publicos/SIHSUS/200801_/Dados/RDSE2108.dbc",
+        uf_sigla="SE",
+        periodo_data_inicio=date(2021, 8, 1),
+    ),
+    Captura(
+        nome="do",
+        modulo="impulsoetl.sim.do",
+        funcao="extrair_do",
+        colunas=("DE_PARA_DO", "DE_PARA_DO_ADICIONAIS"),
+        caminho="/dissemin/publicos/SIM/CID10/DORES/DOAC2002.dbc",
+        uf_sigla="AC",
+        periodo_data_inicio=date(2002, 1, 1),
+    ),
+)
+
+
+class MedidorMemoria(object):
+    """Registra o pico de memória residente do processo em um intervalo.
+
+    A memória é consultada periodicamente em `/proc/self/statm`. Em sistemas
+    sem esse arquivo, informa o pico de memória desde o início do processo.
+    """
+
+    def __init__(self, intervalo: float = 0.005) -> None:
+        self.intervalo = intervalo
+        self.pico = 0
+        self._encerrar = threading.Event()
+        self._linha_execucao = threading.Thread(
+            target=self._medir,
+            daemon=True,
+        )
+
+    @staticmethod
+    def _memoria_atual() -> int:
+        try:
+            with open("/proc/self/statm") as statm:
+                paginas = int(statm.read().split()[1])
+        except OSError:
+            # pico desde o início do processo, em kilobytes no Linux
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        return paginas * resource.getpagesize()
+
+    def _medir(self) -> None:
+        while not self._encerrar.is_set():
+            self.pico = max(self.pico, self._memoria_atual())
+            self._encerrar.wait(self.intervalo)
+
+    def __enter__(self) -> "MedidorMemoria":
+        self.pico = self._memoria_atual()
+        self._linha_execucao.start()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self._encerrar.set()
+        self._linha_execucao.join()
+        self.pico = max(self.pico, self._memoria_atual())
+
+
+def medir(
+    captura: str,
+    etapa: str,
+    executar: Callable[[], int],
+    megabytes: float,
+) -> None:
+    """Executa uma etapa e imprime as medidas de desempenho."""
+    with MedidorMemoria() as memoria:
+        inicio = time.perf_counter()
+        linhas = executar()
+        duracao = time.perf_counter() - inicio
+    print(
+        "{:<8} {:<10} {:>8.2f} s {:>8.1f} MB/s {:>10.0f} linhas/s "
+        "{:>8.1f} MB RSS".format(
+            captura,
+            etapa,
+            duracao,
+            megabytes / duracao,
+            linhas / duracao,
+            memoria.pico / 10**6,
+        ),
+    )
+
+
+def contar_linhas(lotes: Iterable) -> int:
+    return sum(len(lote) for lote in lotes)
+
+
+def medir_captura(
+    captura: Captura,
+    arquivo: ArquivoGerado,
+    endereco: str,
+    passo: int,
+) -> None:
+    """Mede as etapas de extração de um arquivo do servidor local."""
+    # importados só depois de configurado o endereço do servidor local, que
+    # é lido do ambiente na importação dos módulos
+    from impulsoetl.utilitarios.conexoes_ftp import obter_pool_ftp
+    from impulsoetl.utilitarios.dbc import descompactar_dbc
+    from impulsoetl.utilitarios.dbf import LeitorFluxoDBF
+
+    modulo = importlib.import_module(captura.modulo)
+    colunas = [
+        coluna
+        for de_para in captura.colunas
+        for coluna in getattr(modulo, de_para).keys()
+    ]
+    caminho_diretorio, _, arquivo_nome = captura.caminho.rpartition("/")
+
+    with TemporaryDirectory() as diretorio_temporario:
+        arquivo_dbc = Path(diretorio_temporario, arquivo_nome)
+
+        def baixar() -> int:
+            pool = obter_pool_ftp(endereco)
+            with pool.conexao(caminho_diretorio) as cliente_ftp:
+                with open(arquivo_dbc, "wb") as destino:
+                    cliente_ftp.retrbinary(
+                        "RETR " + arquivo_nome,
+                        destino.write,
+                    )
+            return arquivo.linhas
+
+        def ler() -> int:
+            with open(arquivo_dbc, "rb") as origem:
+                return contar_linhas(
+                    LeitorFluxoDBF(
+                        descompactar_dbc(origem),
+                        encoding="iso-8859-1",
+                        nome=arquivo_nome,
+                    ).lotes(passo=passo, colunas=colunas),
+                )
+
+        medir(captura.nome, "download", baixar, arquivo.dbc_tamanho / 10**6)
+        medir(captura.nome, "leitura", ler, arquivo.dbf_tamanho / 10**6)
+
+    def extrair() -> int:
+        return contar_linhas(
+            getattr(modulo, captura.funcao)(
+                uf_sigla=captura.uf_sigla,
+                periodo_data_inicio=captura.periodo_data_inicio,
+                passo=passo,
+                colunas=colunas,
+            ),
+        )
+
+    medir(captura.nome, "extracao", extrair, arquivo.dbc_tamanho / 10**6)
+
+
+def main() -> None:
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    argumentos.add_argument("--linhas", type=int, default=200000)
+    argumentos.add_argument("--passo", type=int, default=100000)
+    argumentos.add_argument(
+        "--capturas",
+        nargs="+",
+        choices=[captura.nome for captura in CAPTURAS],
+        default=[captura.nome for captura in CAPTURAS],
+    )
+    parametros = argumentos.parse_args()
+
+    capturas = [
+        captura for captura in CAPTURAS if captura.nome in parametros.capturas
+    ]
+    with TemporaryDirectory() as diretorio_temporario:
+        arquivos = gerar_arquivos(
+            Path(diretorio_temporario),
+            parametros.linhas,
+            {
+                captura.caminho: ARQUIVOS_EXEMPLO[captura.caminho]
+                for captura in capturas
+            },
+        )
+        with ServidorFTPLocal(Path(diretorio_temporario)) as servidor:
+            os.environ["IMPULSOETL_DATASUS_FTP"] = servidor.endereco
+            # mede sempre o download e a decodificação, sem reaproveitar
+            # arquivos guardados de execuções anteriores
+            os.environ["IMPULSOETL_CACHE_CAMINHO"] = ""
+            os.environ["IMPULSOETL_LAGO_DADOS_CAMINHO"] = ""
+            for captura in capturas:
+                arquivo = arquivos[captura.caminho]
+                print(
+                    "{}: {:n} linhas, {:.1f} MB (DBC), {:.1f} MB (DBF)".format(
+                        captura.caminho,
+                        arquivo.linhas,
+                        arquivo.dbc_tamanho / 10**6,
+                        arquivo.dbf_tamanho / 10**6,
+                    ),
+                )
+                medir_captura(
+                    captura,
+                    arquivo,
+                    servidor.endereco,
+                    parametros.passo,
+                )
+
+
+if __name__ == "__main__":
+    main()
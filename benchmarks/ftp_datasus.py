@@ -0,0 +1,175 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Servidor FTP local que substitui o FTP público do DataSUS.
+
+Gera arquivos DBC sintéticos a partir das tabelas de exemplo usadas nos
+testes, com o número desejado de linhas (veja `dados_sinteticos.py`), e os
+disponibiliza por meio de um servidor FTP local (`pyftpdlib`), na mesma
+estrutura de diretórios do FTP do DataSUS. Basta apontar a variável de
+ambiente `IMPULSOETL_DATASUS_FTP` para o endereço do servidor local para que
+as funções de extração o usem no lugar de `ftp.datasus.gov.br`.
+
+Como as colunas dos arquivos sintéticos são sorteadas de forma
+independente, eles se comprimem um pouco menos que os arquivos reais do
+DataSUS, de modo que as taxas de download medidas localmente não são
+exatamente comparáveis às do servidor real.
+
+Requer o pacote `pyftpdlib`, instalado com as dependências de
+desenvolvimento do projeto.
+
+Uso:
+    python benchmarks/ftp_datasus.py --linhas 1000000 --porta 2121
+"""
+
+
+import argparse
+import threading
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import NamedTuple
+
+from dados_sinteticos import gerar_dbc
+from pyftpdlib.authorizers import DummyAuthorizer
+from pyftpdlib.handlers import FTPHandler
+from pyftpdlib.servers import ThreadedFTPServer
+
+# caminho de cada arquivo no FTP do DataSUS e tipo de arquivo sintético
+# gerado em seu lugar (veja `dados_sinteticos.TABELAS_EXEMPLO`)
+ARQUIVOS_EXEMPLO = {
+    "/dissemin/publicos/SIASUS/200801_/Dados/PASE2108.dbc": "PA",
+    "/dissemin/publicos/SIHSUS/200801_/Dados/RDSE2108.dbc": "RD",
+    "/dissemin/publicos/SIM/CID10/DORES/DOAC2002.dbc": "DO",
+}
+
+
+class ArquivoGerado(NamedTuple):
+    """Arquivo DBC disponibilizado pelo servidor local."""
+
+    caminho: str
+    linhas: int
+    dbf_tamanho: int
+    dbc_tamanho: int
+
+
+def gerar_arquivos(
+    diretorio: Path,
+    linhas: int,
+    arquivos: dict[str, str] = ARQUIVOS_EXEMPLO,
+) -> dict[str, ArquivoGerado]:
+    """Gera arquivos DBC com a estrutura de diretórios do DataSUS.
+
+    Argumentos:
+        diretorio: Diretório que corresponde à raiz do servidor FTP.
+        linhas: Número de registros de cada arquivo gerado.
+        arquivos: Caminhos dos arquivos no servidor FTP, associados aos
+            tipos de arquivo sintético gerados em seu lugar.
+
+    Retorna:
+        Um dicionário com a descrição de cada arquivo gerado, indexado pelo
+        caminho do arquivo no servidor.
+    """
+    gerados = {}
+    for caminho, tipo in arquivos.items():
+        arquivo_dbc = diretorio / caminho.lstrip("/")
+        arquivo_dbc.parent.mkdir(parents=True, exist_ok=True)
+        cabecalho = gerar_dbc(arquivo_dbc, tipo, linhas, semente=0)
+        gerados[caminho] = ArquivoGerado(
+            caminho=caminho,
+            linhas=cabecalho.registros_num,
+            dbf_tamanho=(
+                cabecalho.cabecalho_tamanho
+                + cabecalho.registros_num * cabecalho.registro_tamanho
+                + 1
+            ),
+            dbc_tamanho=arquivo_dbc.stat().st_size,
+        )
+    return gerados
+
+
+class ServidorFTPLocal(object):
+    """Servidor FTP anônimo e somente leitura, executado em segundo plano."""
+
+    def __init__(self, diretorio: Path, porta: int = 0) -> None:
+        """Instancia um servidor FTP local.
+
+        Argumentos:
+            diretorio: Diretório que corresponde à raiz do servidor.
+            porta: Porta em que o servidor aguarda conexões. Se for `0`,
+                usa qualquer porta disponível.
+        """
+        autorizador = DummyAuthorizer()
+        autorizador.add_anonymous(str(diretorio))
+        manipulador = type("ManipuladorFTP", (FTPHandler,), {})
+        manipulador.authorizer = autorizador
+        manipulador.banner = "Servidor FTP local do ImpulsoETL."
+        self._servidor = ThreadedFTPServer(("127.0.0.1", porta), manipulador)
+        self._encerrar = threading.Event()
+        self._linha_execucao = threading.Thread(
+            target=self._servir,
+            name="servidor_ftp_local",
+            daemon=True,
+        )
+
+    def _servir(self) -> None:
+        # atende as conexões em ciclos curtos, para que o servidor possa ser
+        # encerrado pela própria linha de execução que o executa
+        while not self._encerrar.is_set():
+            self._servidor.serve_forever(
+                timeout=0.1,
+                blocking=False,
+                handle_exit=False,
+            )
+        self._servidor.close_all()
+
+    @property
+    def endereco(self) -> str:
+        """Endereço do servidor, no formato `servidor:porta`."""
+        servidor, porta = self._servidor.address
+        return "{}:{}".format(servidor, porta)
+
+    def __enter__(self) -> "ServidorFTPLocal":
+        self._linha_execucao.start()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self._encerrar.set()
+        self._linha_execucao.join()
+
+
+def main() -> None:
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    argumentos.add_argument("--linhas", type=int, default=200000)
+    argumentos.add_argument("--porta", type=int, default=2121)
+    argumentos.add_argument(
+        "--diretorio",
+        type=Path,
+        help="Diretório onde gerar os arquivos (por padrão, temporário).",
+    )
+    parametros = argumentos.parse_args()
+
+    with TemporaryDirectory() as diretorio_temporario:
+        diretorio = parametros.diretorio or Path(diretorio_temporario)
+        for arquivo in gerar_arquivos(diretorio, parametros.linhas).values():
+            print(
+                "{}: {:n} linhas, {:.1f} MB".format(
+                    arquivo.caminho,
+                    arquivo.linhas,
+                    arquivo.dbc_tamanho / 10**6,
+                ),
+            )
+        with ServidorFTPLocal(diretorio, porta=parametros.porta) as servidor:
+            print(
+                "Servidor disponível; defina IMPULSOETL_DATASUS_FTP={} "
+                "(Ctrl+C para encerrar).".format(servidor.endereco),
+            )
+            try:
+                threading.Event().wait()
+            except KeyboardInterrupt:
+                pass
+
+
+if __name__ == "__main__":
+    main()
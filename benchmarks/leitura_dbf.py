@@ -0,0 +1,100 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Compara o desempenho da leitura de arquivos DBF com e sem vetorização.
+
+Gera um arquivo DBF a partir de uma das tabelas de exemplo usadas nos testes,
+replicando seus registros até atingir o número desejado de linhas, e mede o
+tempo necessário para convertê-lo em lotes de DataFrames usando o pacote
+`dbfread` (método original de `extrair_dbc_lotes()`) e o leitor vetorizado
+`LeitorDBF`.
+
+Uso:
+    python benchmarks/leitura_dbf.py --linhas 1000000 --passo 100000
+"""
+
+
+import argparse
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pandas as pd
+from dbfread import DBF
+from more_itertools import ichunked
+
+from impulsoetl.utilitarios.datasus_ftp import LeitorCamposDBF
+from impulsoetl.utilitarios.dbf import LeitorDBF, escrever_dbf
+
+DIRETORIO_TESTES = Path(__file__).parent.parent / "tests"
+
+
+def ler_dbfread(caminho: Path, passo: int) -> int:
+    arquivo_dbf = DBF(
+        caminho,
+        encoding="iso-8859-1",
+        load=False,
+        parserclass=LeitorCamposDBF,
+    )
+    linhas = 0
+    for fatia in ichunked(arquivo_dbf, passo):
+        linhas += len(pd.DataFrame(fatia))
+    return linhas
+
+
+def ler_vetorizado(caminho: Path, passo: int) -> int:
+    linhas = 0
+    for lote in LeitorDBF(caminho).lotes(passo=passo):
+        linhas += len(lote)
+    return linhas
+
+
+def main() -> None:
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    argumentos.add_argument(
+        "--exemplo",
+        default="siasus/SIA_PASE2108_.parquet",
+        help="Tabela de exemplo, relativa ao diretório `tests`.",
+    )
+    argumentos.add_argument("--linhas", type=int, default=500000)
+    argumentos.add_argument("--passo", type=int, default=100000)
+    parametros = argumentos.parse_args()
+
+    exemplo = pd.read_parquet(DIRETORIO_TESTES / parametros.exemplo)
+    repeticoes = -(-parametros.linhas // len(exemplo))
+    dados = pd.concat([exemplo] * repeticoes, ignore_index=True).iloc[
+        : parametros.linhas
+    ]
+
+    with TemporaryDirectory() as diretorio_temporario:
+        caminho = Path(diretorio_temporario, "exemplo.dbf")
+        escrever_dbf(caminho, dados)
+        tamanho_mb = caminho.stat().st_size / 10**6
+        print(
+            "Arquivo de teste: {:n} linhas, {:.1f} MB".format(
+                len(dados),
+                tamanho_mb,
+            ),
+        )
+
+        for nome, funcao in (
+            ("dbfread", ler_dbfread),
+            ("LeitorDBF", ler_vetorizado),
+        ):
+            inicio = time.perf_counter()
+            linhas = funcao(caminho, parametros.passo)
+            duracao = time.perf_counter() - inicio
+            print(
+                "{:<10} {:>8.2f} s {:>10.0f} linhas/s {:>8.1f} MB/s".format(
+                    nome,
+                    duracao,
+                    linhas / duracao,
+                    tamanho_mb / duracao,
+                ),
+            )
+
+
+if __name__ == "__main__":
+    main()
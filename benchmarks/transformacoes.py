@@ -0,0 +1,156 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Mede o desempenho das transformações dos dados do DataSUS.
+
+Sorteia, com reposição, linhas das tabelas de exemplo usadas nos testes e
+executa sobre elas as funções de transformação de cada fonte, que aplicam
+as respectivas especificações com [`aplicar_especificacao()`][].
+
+Para cada transformação, são informados a duração, a vazão em registros por
+segundo, o pico de memória alocada pelo Python durante a execução (medido
+com o módulo `tracemalloc`, o que torna a execução um pouco mais lenta) e a
+memória ocupada pelo `DataFrame` transformado. As tabelas de dimensões são
+carregadas antes da medição, com uma primeira execução sobre poucas linhas.
+
+Para medir o modo compacto, em que as colunas de códigos são mantidas como
+categorias, defina a variável de ambiente
+`IMPULSOETL_TRANSFORMACAO_COMPACTA=1`.
+
+Requer acesso ao banco de dados configurado no ambiente, de onde são lidas
+as tabelas de períodos e de unidades geográficas.
+
+Uso:
+    python benchmarks/transformacoes.py --linhas 100000
+
+[`aplicar_especificacao()`]: impulsoetl.comum.transformacoes.aplicar_especificacao
+"""
+
+
+import argparse
+import importlib
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from impulsoetl.bd import Sessao
+
+DIRETORIO_TESTES = Path(__file__).parent.parent / "tests"
+
+
+class Caso(NamedTuple):
+    """Função de transformação medida e tabela de exemplo correspondente."""
+
+    modulo: str
+    funcao: str
+    exemplo: str
+    argumentos: dict[str, Any]
+
+
+CASOS: list[Caso] = [
+    Caso(
+        "impulsoetl.siasus.procedimentos",
+        "transformar_pa",
+        "siasus/SIA_PASE2108_.parquet",
+        {},
+    ),
+    Caso(
+        "impulsoetl.siasus.bpa_i",
+        "transformar_bpa_i",
+        "siasus/SIA_BISE2108_.parquet",
+        {},
+    ),
+    Caso(
+        "impulsoetl.siasus.raas_ps",
+        "transformar_raas_ps",
+        "siasus/SIA_PSSE2108_.parquet",
+        {},
+    ),
+    Caso(
+        "impulsoetl.sihsus.aih_rd",
+        "transformar_aih_rd",
+        "sihsus/SIH_RDSE2108_.parquet",
+        {},
+    ),
+    Caso(
+        "impulsoetl.sim.do",
+        "transformar_do",
+        "sim/SIM_DORR2020_.parquet",
+        {"periodo_id": "00000000-0000-0000-0000-000000000000"},
+    ),
+    Caso(
+        "impulsoetl.sinan.violencia",
+        "transformar_agravos_violencia",
+        "sinan/SINAN_VIOLBR19_.parquet",
+        {"periodo_id": "00000000-0000-0000-0000-000000000000"},
+    ),
+    Caso(
+        "impulsoetl.scnes.vinculos",
+        "transformar_vinculos",
+        "scnes/CNES_PFSE2111_.parquet",
+        {},
+    ),
+    Caso(
+        "impulsoetl.scnes.habilitacoes",
+        "transformar_habilitacoes",
+        "scnes/CNES_HBSE2111_.parquet",
+        {},
+    ),
+]
+
+
+def sortear_linhas(caso: Caso, linhas: int, semente: int) -> pd.DataFrame:
+    """Sorteia, com reposição, linhas da tabela de exemplo."""
+    exemplo = pd.read_parquet(DIRETORIO_TESTES / caso.exemplo)
+    gerador = np.random.default_rng(semente)
+    return exemplo.iloc[
+        gerador.integers(len(exemplo), size=linhas)
+    ].reset_index(drop=True)
+
+
+def main() -> None:
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    argumentos.add_argument("--linhas", type=int, default=100000)
+    argumentos.add_argument("--semente", type=int, default=0)
+    parametros = argumentos.parse_args()
+
+    with Sessao() as sessao:
+        for caso in CASOS:
+            # a função original, sem o encapsulamento como tarefa do Prefect
+            transformar = getattr(
+                importlib.import_module(caso.modulo),
+                caso.funcao,
+            ).fn
+            dados = sortear_linhas(
+                caso,
+                parametros.linhas,
+                parametros.semente,
+            )
+            transformar(sessao, dados.head(100), **caso.argumentos)
+
+            tracemalloc.start()
+            inicio = time.perf_counter()
+            transformados = transformar(sessao, dados, **caso.argumentos)
+            duracao = time.perf_counter() - inicio
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(
+                "{:<30} {:>8.2f} s {:>12.0f} linhas/s {:>10.1f} MB pico "
+                "{:>10.1f} MB transformados".format(
+                    caso.funcao,
+                    duracao,
+                    len(dados) / duracao,
+                    pico / 1e6,
+                    transformados.memory_usage(deep=True).sum() / 1e6,
+                ),
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Compara o desempenho da busca de códigos célula a célula e compilada.
+
+Gera colunas de códigos CID-10 e SIGTAP sorteando valores das tabelas de
+exemplo usadas nos testes, e mede o tempo necessário para verificar a
+ocorrência de listas de códigos-alvo de diferentes tamanhos:
+
+- da forma como `checar_codigos()` fazia anteriormente, percorrendo os
+  códigos-alvo em Python para cada célula (com `str.startswith()` ou com uma
+  chamada a `re.search()` por código);
+- com a função [`checar_codigos()`][], que compila uma única expressão
+  regular por lista de códigos.
+
+Os resultados das duas formas de busca são comparados, e uma diferença
+interrompe a execução. A busca célula a célula com uma chamada a
+`re.search()` por código é muito lenta para listas longas: com a lista de
+4.000 subcategorias da CID-10, leva alguns minutos mesmo com o número de
+linhas padrão.
+
+Uso:
+    python benchmarks/variaveis_codificadas.py --linhas 2000
+
+[`checar_codigos()`]: impulsoetl.utilitarios.variaveis_codificadas.checar_codigos
+"""
+
+
+import argparse
+import re
+import string
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from impulsoetl.comum.saude_mental import CID10_SAUDE_MENTAL
+from impulsoetl.utilitarios.variaveis_codificadas import checar_codigos
+
+DIRETORIO_TESTES = Path(__file__).parent.parent / "tests"
+
+# todas as subcategorias dos capítulos de transtornos mentais e de causas
+# externas e fatores que influenciam o estado de saúde
+CID10_EXTENSA: list[str] = [
+    "{}{:02d}{}".format(letra, categoria, subcategoria)
+    for letra in "FXYZ"
+    for categoria in range(100)
+    for subcategoria in range(10)
+]
+
+
+class Caso(NamedTuple):
+    """Coluna de exemplo e lista de códigos a serem procurados nela."""
+
+    nome: str
+    exemplo: str
+    coluna: str
+    codigos_alvo: list[str]
+    varios_codigos_por_celula: bool
+
+
+def _codigos_sigtap(quantidade: int, semente: int) -> list[str]:
+    """Sorteia códigos de procedimentos, além dos do arquivo de exemplo."""
+    exemplo = pd.read_parquet(
+        DIRETORIO_TESTES / "siasus/SIA_PASE2108_.parquet",
+        columns=["PA_PROC_ID"],
+    )
+    codigos = set(exemplo["PA_PROC_ID"].unique()[: quantidade // 2])
+    gerador = np.random.default_rng(semente)
+    while len(codigos) < quantidade:
+        codigos.add(
+            "".join(gerador.choice(list(string.digits), size=10)),
+        )
+    return sorted(codigos)
+
+
+def _celula_a_celula(
+    serie: pd.Series,
+    codigos_alvo: list[str],
+    varios_codigos_por_celula: bool,
+) -> pd.Series:
+    if not varios_codigos_por_celula:
+        return serie.apply(
+            lambda elemento: any(
+                [elemento.startswith(cod) for cod in codigos_alvo],
+            ),
+        )
+    return serie.apply(
+        lambda elemento: any(
+            [
+                re.search(r"(?:^|\W){}".format(cod), elemento, re.ASCII)
+                for cod in codigos_alvo
+            ],
+        ),
+    )
+
+
+def main() -> None:
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    argumentos.add_argument("--linhas", type=int, default=2000)
+    argumentos.add_argument("--semente", type=int, default=0)
+    parametros = argumentos.parse_args()
+
+    sigtap = _codigos_sigtap(2000, parametros.semente)
+    casos = [
+        Caso(
+            "CID prefixo",
+            "siasus/SIA_PASE2108_.parquet",
+            "PA_CIDPRI",
+            list(CID10_SAUDE_MENTAL),
+            False,
+        ),
+        Caso(
+            "CID prefixo",
+            "siasus/SIA_PASE2108_.parquet",
+            "PA_CIDPRI",
+            CID10_EXTENSA,
+            False,
+        ),
+        Caso(
+            "SIGTAP prefixo",
+            "siasus/SIA_PASE2108_.parquet",
+            "PA_PROC_ID",
+            sigtap,
+            False,
+        ),
+        Caso(
+            "CID embutido",
+            "sim/SIM_DORR2020_.parquet",
+            "ATESTADO",
+            list(CID10_SAUDE_MENTAL),
+            True,
+        ),
+        Caso(
+            "CID embutido",
+            "sim/SIM_DORR2020_.parquet",
+            "ATESTADO",
+            CID10_EXTENSA,
+            True,
+        ),
+    ]
+
+    gerador = np.random.default_rng(parametros.semente)
+    for caso in casos:
+        exemplo = pd.read_parquet(
+            DIRETORIO_TESTES / caso.exemplo,
+            columns=[caso.coluna],
+        )
+        serie = pd.Series(
+            gerador.choice(
+                exemplo[caso.coluna].fillna("").to_numpy(),
+                size=parametros.linhas,
+            ),
+        )
+        resultados = {}
+        duracoes = {}
+        for nome, funcao in (
+            ("celula_a_celula", _celula_a_celula),
+            ("compilada", checar_codigos),
+        ):
+            inicio = time.perf_counter()
+            resultados[nome] = funcao(
+                serie,
+                caso.codigos_alvo,
+                caso.varios_codigos_por_celula,
+            )
+            duracoes[nome] = time.perf_counter() - inicio
+            print(
+                "{:<15} {:>5} códigos {:<16} {:>8.3f} s {:>12.0f} linhas/s"
+                .format(
+                    caso.nome,
+                    len(caso.codigos_alvo),
+                    nome,
+                    duracoes[nome],
+                    len(serie) / duracoes[nome],
+                ),
+            )
+        pd.testing.assert_series_equal(
+            resultados["celula_a_celula"],
+            resultados["compilada"],
+        )
+        print(
+            "{:<15} {:>5} códigos {:<16} {:>8.1f} x".format(
+                caso.nome,
+                len(caso.codigos_alvo),
+                "aceleracao",
+                duracoes["celula_a_celula"] / duracoes["compilada"],
+            ),
+        )
+
+
+if __name__ == "__main__":
+    main()
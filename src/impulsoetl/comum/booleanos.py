@@ -0,0 +1,142 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Converte em valores lógicos os códigos usados nos arquivos do DataSUS.
+
+Os arquivos disponibilizados pelo DataSUS representam informações do tipo
+"sim ou não" por meio de códigos de texto, que variam de um sistema para
+outro - por exemplo, `"1"` e `"0"`, `"1"` e `"2"`, `"S"` e `"N"`, ou `"M"`
+para estabelecimentos mantidos por outra entidade.
+"""
+
+
+from typing import Collection, Iterable
+
+import numpy as np
+import pandas as pd
+
+
+def decodificar_codigos(
+    valores: pd.Series,
+    verdadeiros: Collection[str],
+    falsos: Collection[str] | None = None,
+    indefinidos: bool | None = None,
+    contem: bool = False,
+) -> pd.arrays.BooleanArray:
+    """Converte os códigos de uma coluna em um vetor de valores lógicos.
+
+    Os argumentos `verdadeiros`, `falsos`, `indefinidos` e `contem` têm o
+    mesmo significado que em [`decodificar_booleanos()`][].
+
+    Argumentos:
+        valores: Objeto [`pandas.Series`][] com os códigos a serem
+            convertidos.
+
+    Retorna:
+        Um vetor de valores lógicos do tipo `boolean`, que admite nulos.
+
+    [`decodificar_booleanos()`]: impulsoetl.comum.booleanos.decodificar_booleanos
+    [`pandas.Series`]: https://pandas.pydata.org/docs/reference/api/pandas.Series.html
+    """
+    # os códigos costumam se repetir muito; basta verificar cada valor
+    # distinto uma única vez. Valores ausentes recebem o código -1.
+    codigos_valores, distintos = pd.factorize(valores)
+    distintos = list(distintos)
+    if contem:
+        verdadeiro = [
+            any(codigo in valor for codigo in verdadeiros)
+            for valor in distintos
+        ]
+    else:
+        verdadeiro = [valor in verdadeiros for valor in distintos]
+    # o último elemento corresponde aos valores ausentes (código -1)
+    verdadeiro = np.array(verdadeiro + [False], dtype=bool)
+    if falsos is None:
+        return pd.array(verdadeiro[codigos_valores], dtype="boolean")
+    falso = np.array(
+        [valor in falsos for valor in distintos] + [False],
+        dtype=bool,
+    )
+    indefinido = ~(verdadeiro | falso)
+    if indefinidos is not None:
+        verdadeiro = verdadeiro | (indefinido & indefinidos)
+        indefinido[:] = False
+    return pd.arrays.BooleanArray(
+        verdadeiro[codigos_valores],
+        indefinido[codigos_valores],
+    )
+
+
+def decodificar_booleanos(
+    dados: pd.DataFrame,
+    colunas: Iterable[str],
+    verdadeiros: Collection[str],
+    falsos: Collection[str] | None = None,
+    indefinidos: bool | None = None,
+    contem: bool = False,
+) -> pd.DataFrame:
+    """Converte códigos de texto em valores lógicos, em várias colunas.
+
+    Cada valor distinto de cada coluna é verificado uma única vez, e o
+    resultado é distribuído para todos os registros com o mesmo valor, sem
+    percorrer os registros um a um em Python.
+
+    Argumentos:
+        dados: Objeto [`pandas.DataFrame`][] com os dados a serem tratados.
+        colunas: Nomes das colunas a serem convertidas.
+        verdadeiros: Códigos que representam o valor verdadeiro.
+        falsos: Códigos que representam o valor falso. Se não forem
+            informados, todos os valores que não estão em `verdadeiros` -
+            inclusive os ausentes - são convertidos em falso.
+        indefinidos: Valor atribuído aos códigos que não estão em
+            `verdadeiros` nem em `falsos`, inclusive os ausentes. Por padrão,
+            esses códigos são convertidos em valores nulos ([`pandas.NA`][]).
+            Não tem efeito se `falsos` não for informado.
+        contem: Se verdadeiro, considera verdadeiros os valores que contêm
+            algum dos códigos em `verdadeiros`, em vez dos que são iguais a
+            eles.
+
+    Retorna:
+        Uma cópia de `dados` em que as colunas indicadas foram convertidas
+        em vetores de valores lógicos do tipo `boolean`, que admitem nulos.
+
+    Exemplo:
+        ```py
+        >>> dados = pd.DataFrame({"obito": ["1", "0", "9", None]})
+        >>> decodificar_booleanos(
+        ...     dados,
+        ...     colunas=["obito"],
+        ...     verdadeiros=["1"],
+        ...     falsos=["0"],
+        ... )
+           obito
+        0   True
+        1  False
+        2   <NA>
+        3   <NA>
+        ```
+
+    [`pandas.DataFrame`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.html
+    [`pandas.NA`]: https://pandas.pydata.org/pandas-docs/stable/user_guide/missing_data.html#missing-data-na
+    """
+    convertidas = {
+        coluna: decodificar_codigos(
+            dados[coluna],
+            verdadeiros=verdadeiros,
+            falsos=falsos,
+            indefinidos=indefinidos,
+            contem=contem,
+        )
+        for coluna in colunas
+    }
+    # monta um novo DataFrame de uma vez, em vez de substituir as colunas
+    # uma a uma no original
+    return pd.DataFrame(
+        {
+            coluna: convertidas.get(coluna, dados[coluna])
+            for coluna in dados.columns
+        },
+        index=dados.index,
+    )
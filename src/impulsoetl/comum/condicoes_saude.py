@@ -10,11 +10,24 @@
 import re
 from typing import Final
 
+import numpy as np
+import pandas as pd
+
 CID10: Final[re.Pattern] = re.compile(
     r"[A-Z][0-9]{2}\.?[0-9X]{,4}",
     re.IGNORECASE,
 )
 
+# ponto após o 3º dígito de um código CID-10
+CID10_PONTO: Final[re.Pattern] = re.compile(r"([A-Z][0-9]{2})\.?([0-9X]{,4})")
+
+# trechos alfanuméricos com 3 a 7 caracteres que começam como um código
+# CID-10 - o mesmo que separar o texto nos caracteres não alfanuméricos e
+# manter apenas os trechos aceitos por `e_cid10()`
+CID10_LISTA: Final[re.Pattern] = re.compile(
+    r"(?<![a-zA-Z0-9])([a-zA-Z][0-9]{2}[a-zA-Z0-9]{,4})(?![a-zA-Z0-9])",
+)
+
 
 def e_cid10(texto: str) -> bool:
     """Indica se um texto fornecido é compatível com o padrão da CID-10."""
@@ -23,4 +36,54 @@ def e_cid10(texto: str) -> bool:
 
 def remover_ponto_cid10(texto: str) -> bool:
     """Remove caractere de ponto após o 3º dígito de um código CID-10."""
-    return re.sub(r"([A-Z][0-9]{2})\.?([0-9X]{,4})", r"\1\2", texto)
+    return CID10_PONTO.sub(r"\1\2", texto)
+
+
+def listar_cids10(textos: pd.Series) -> pd.Series:
+    """Converte textos com vários códigos CID-10 em listas do PostgreSQL.
+
+    Para cada texto, remove os caracteres `*`, `/` e espaços das
+    extremidades e os pontos após o 3º dígito de cada código, e lista os
+    trechos compatíveis com o padrão da CID-10 - descartando os demais - no
+    formato literal de vetores do PostgreSQL. Os códigos são extraídos de
+    todos os textos distintos de uma só vez, com expressões regulares
+    compiladas.
+
+    Argumentos:
+        textos: Objeto [`pandas.Series`][] com os textos a serem
+            convertidos, como os das colunas `LINHAA` a `LINHAII` das
+            Declarações de Óbito.
+
+    Retorna:
+        Um objeto [`pandas.Series`][] com o mesmo índice de `textos`, em que
+        cada valor é uma lista de códigos CID-10 como `"{A01,B02}"`. Textos
+        sem nenhum código válido resultam em uma lista vazia (`"{}"`), e
+        valores ausentes são mantidos.
+
+    Exemplo:
+        ```py
+        >>> listar_cids10(pd.Series(["*A419/J12.9*", "/ /", "K09.2 foo"]))
+        0    {A419,J129}
+        1             {}
+        2         {K092}
+        dtype: object
+        ```
+
+    [`pandas.Series`]: https://pandas.pydata.org/docs/reference/api/pandas.Series.html
+    """
+    # valores ausentes recebem o código -1
+    codigos, distintos = pd.factorize(textos)
+    distintos = pd.Series(distintos, dtype=object)
+    listas = (
+        "{"
+        + distintos.str.strip("*/ ")
+        .str.replace(CID10_PONTO, r"\1\2", regex=True)
+        .str.findall(CID10_LISTA)
+        .str.join(",")
+        + "}"
+    )
+    return pd.Series(
+        np.append(listas.to_numpy(dtype=object), np.nan)[codigos],
+        index=textos.index,
+        name=textos.name,
+    )
@@ -9,7 +9,9 @@
 
 from datetime import datetime, timedelta, timezone
 from functools import lru_cache
+from typing import Final, Iterable
 
+import numpy as np
 import pandas as pd
 from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
@@ -19,6 +21,14 @@ from impulsoetl.tipos import DatetimeLike
 
 periodos = tabelas["listas_de_codigos.periodos"]
 
+# posições do ano, do mês e do dia nos formatos de largura fixa usados pelo
+# DataSUS, que podem ser interpretados sem recorrer ao `strptime`
+_POSICOES_FORMATOS: Final[dict[str, dict[str, slice]]] = {
+    "%Y%m%d": {"year": slice(0, 4), "month": slice(4, 6), "day": slice(6, 8)},
+    "%d%m%Y": {"day": slice(0, 2), "month": slice(2, 4), "year": slice(4, 8)},
+    "%Y%m": {"year": slice(0, 4), "month": slice(4, 6)},
+}
+
 
 def agora_gmt_menos3():
     """Retorna o valor de data e hora atuais no fuso GMT-03:00."""
@@ -62,6 +72,191 @@ def de_aaaammdd_para_timestamp(
             raise
 
 
+def _interpretar_posicoes(
+    textos: pd.Series,
+    posicoes: dict[str, slice],
+) -> pd.Series:
+    """Monta datas a partir de trechos de posição fixa de cada texto."""
+    componentes = {}
+    for componente, trecho in posicoes.items():
+        # assim como `int()`, tolera espaços em torno de cada componente
+        numeros = textos.str.slice(trecho.start, trecho.stop).str.strip()
+        validos = numeros.str.isdecimal().fillna(False).astype(bool)
+        componentes[componente] = pd.to_numeric(
+            numeros.where(validos),
+            errors="coerce",
+        )
+    componentes.setdefault("day", 1)
+    componentes = pd.DataFrame(componentes, index=textos.index).dropna()
+    return pd.to_datetime(
+        componentes.astype("int64"),
+        errors="coerce",
+    ).reindex(textos.index)
+
+
+def de_texto_para_datas(
+    textos: pd.Series,
+    formato: str = "%Y%m%d",
+    erros: str = "raise",
+) -> pd.Series:
+    """Converte uma coluna de textos em datas, de uma só vez.
+
+    Cada valor distinto da coluna é interpretado uma única vez. Nos formatos
+    de largura fixa usados nos arquivos do DataSUS (`"%Y%m%d"`, `"%d%m%Y"` e
+    `"%Y%m"`), o ano, o mês e o dia são lidos diretamente de suas posições
+    e montados em datas de forma vetorizada, tolerando - como em
+    [`de_aaaammdd_para_timestamp()`][] - espaços no lugar de zeros em torno
+    de cada componente. Os valores que não seguem a largura fixa, assim como
+    os demais formatos, são repassados a [`pandas.to_datetime()`][].
+
+    Argumentos:
+        textos: Objeto [`pandas.Series`][] com as datas em formato de texto.
+        formato: Formato das datas, nos moldes aceitos por
+            [`datetime.strptime()`][]. Por padrão, `"%Y%m%d"`.
+        erros: Define a atitude a ser tomada caso algum valor não possa ser
+            interpretado como data. Por compatibilidade com o pandas, aceita
+            as categorias `'raise'` (levanta um erro; padrão), `'ignore'`
+            (mantém o texto original) ou `'coerce'` (devolve um objeto
+            [`pandas.NaT`][]).
+
+    Retorna:
+        Um objeto [`pandas.Series`][] com o mesmo índice de `textos`, em que
+        os valores ausentes são representados por [`pandas.NaT`][].
+
+    Exceções:
+        Levanta um erro `ValueError` se `erros` for `'raise'` e algum valor
+        não puder ser interpretado como data.
+
+    Exemplo:
+        ```py
+        >>> de_texto_para_datas(
+        ...     pd.Series(["20201005", "2020 1 7", "", None]),
+        ...     erros="coerce",
+        ... )
+        0   2020-10-05
+        1   2020-01-07
+        2          NaT
+        3          NaT
+        dtype: datetime64[ns]
+        ```
+
+    [`de_aaaammdd_para_timestamp()`]: impulsoetl.comum.datas.de_aaaammdd_para_timestamp
+    [`pandas.to_datetime()`]: https://pandas.pydata.org/docs/reference/api/pandas.to_datetime.html
+    [`pandas.Series`]: https://pandas.pydata.org/docs/reference/api/pandas.Series.html
+    [`datetime.strptime()`]: https://docs.python.org/3/library/datetime.html#datetime.datetime.strptime
+    [`pandas.NaT`]: https://pandas.pydata.org/docs/reference/api/pandas.NaT.html
+    """
+    # valores ausentes recebem o código -1
+    codigos, distintos = pd.factorize(textos)
+    distintos = pd.Series(distintos, dtype=object)
+    if formato in _POSICOES_FORMATOS:
+        datas = _interpretar_posicoes(distintos, _POSICOES_FORMATOS[formato])
+        # textos fora do padrão de largura fixa (como `"111996"`, no formato
+        # `"%d%m%Y"`) ainda podem ser válidos para o `strptime`
+        pendentes = datas.isna()
+        if pendentes.any():
+            datas[pendentes] = pd.to_datetime(
+                distintos[pendentes],
+                format=formato,
+                errors="coerce",
+            )
+    else:
+        datas = pd.to_datetime(distintos, format=formato, errors="coerce")
+    invalidos = datas.isna().to_numpy()
+    if erros == "raise" and invalidos.any():
+        raise ValueError(
+            "Valores incompatíveis com o formato de data `{}`: {}".format(
+                formato,
+                ", ".join(repr(texto) for texto in distintos[invalidos]),
+            ),
+        )
+    if erros == "ignore" and invalidos.any():
+        valores = np.append(
+            np.where(invalidos, distintos, datas.astype(object)),
+            pd.NaT,
+        )
+    else:
+        valores = np.append(
+            datas.to_numpy(dtype="datetime64[ns]"),
+            np.datetime64("NaT", "ns"),
+        )
+    return pd.Series(valores[codigos], index=textos.index, name=textos.name)
+
+
+def converter_datas(
+    dados: pd.DataFrame,
+    colunas: Iterable[str],
+    formato: str = "%Y%m%d",
+    erros: str = "raise",
+) -> pd.DataFrame:
+    """Converte textos em datas, em várias colunas.
+
+    Aplica [`de_texto_para_datas()`][] a cada uma das colunas indicadas.
+
+    Argumentos:
+        dados: Objeto [`pandas.DataFrame`][] com os dados a serem tratados.
+        colunas: Nomes das colunas a serem convertidas.
+        formato: Formato das datas, nos moldes aceitos por
+            [`datetime.strptime()`][]. Por padrão, `"%Y%m%d"`.
+        erros: Define a atitude a ser tomada caso algum valor não possa ser
+            interpretado como data (`'raise'`, `'ignore'` ou `'coerce'`).
+
+    Retorna:
+        Uma cópia de `dados` em que as colunas indicadas foram convertidas
+        em datas.
+
+    [`de_texto_para_datas()`]: impulsoetl.comum.datas.de_texto_para_datas
+    [`pandas.DataFrame`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.html
+    [`datetime.strptime()`]: https://docs.python.org/3/library/datetime.html#datetime.datetime.strptime
+    """
+    convertidas = {
+        coluna: de_texto_para_datas(
+            dados[coluna],
+            formato=formato,
+            erros=erros,
+        )
+        for coluna in colunas
+    }
+    # monta um novo DataFrame de uma vez, em vez de substituir as colunas
+    # uma a uma no original
+    return pd.DataFrame(
+        {
+            coluna: convertidas.get(coluna, dados[coluna])
+            for coluna in dados.columns
+        },
+        index=dados.index,
+    )
+
+
+def de_ano_mes_para_datas(
+    anos: pd.Series,
+    meses: pd.Series,
+    erros: str = "raise",
+) -> pd.Series:
+    """Monta as datas do primeiro dia de cada mês, a partir do ano e do mês.
+
+    Argumentos:
+        anos: Objeto [`pandas.Series`][] com os anos, como números ou textos.
+        meses: Objeto [`pandas.Series`][] com os meses, como números ou
+            textos, com o mesmo índice de `anos`.
+        erros: Define a atitude a ser tomada caso algum par de ano e mês não
+            possa ser interpretado como data: `'raise'` (levanta um erro;
+            padrão) ou `'coerce'` (devolve um objeto [`pandas.NaT`][]).
+
+    Retorna:
+        Um objeto [`pandas.Series`][] com o primeiro dia de cada mês.
+
+    Exceções:
+        Levanta um erro `ValueError` se `erros` for `'raise'` e algum par de
+        ano e mês não puder ser interpretado como data.
+
+    [`pandas.Series`]: https://pandas.pydata.org/docs/reference/api/pandas.Series.html
+    [`pandas.NaT`]: https://pandas.pydata.org/docs/reference/api/pandas.NaT.html
+    """
+    textos = anos.astype(str).str.zfill(4) + meses.astype(str).str.zfill(2)
+    return de_texto_para_datas(textos, formato="%Y%m", erros=erros)
+
+
 @lru_cache(365)
 def periodo_por_data(  # noqa: WPS122 - permite argumento `data`
     sessao: Session,
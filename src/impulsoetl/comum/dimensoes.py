@@ -0,0 +1,229 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Associa registros a períodos e unidades geográficas, em lote.
+
+As funções dos módulos [`impulsoetl.comum.datas`][] e
+[`impulsoetl.comum.geografias`][] que convertem datas e códigos de
+municípios nos identificadores usados no banco de dados da ImpulsoGov fazem
+uma consulta ao banco para cada valor distinto, e guardam o resultado apenas
+enquanto durar a mesma sessão.
+
+Este módulo, em vez disso, carrega uma única vez por processo as tabelas de
+períodos, unidades geográficas e unidades federativas, e associa os
+identificadores a todos os registros de um lote de uma só vez.
+
+[`impulsoetl.comum.datas`]: impulsoetl.comum.datas
+[`impulsoetl.comum.geografias`]: impulsoetl.comum.geografias
+"""
+
+
+import threading
+from typing import Final
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.exc import MultipleResultsFound, NoResultFound
+from sqlalchemy.orm import Session
+
+from impulsoetl.bd import tabelas
+from impulsoetl.loggers import logger
+
+_TABELAS_DIMENSOES: Final[dict[str, str]] = {
+    "periodos": "listas_de_codigos.periodos",
+    "unidades_geograficas": "listas_de_codigos.unidades_geograficas",
+    "ufs": "listas_de_codigos.ufs",
+}
+
+_trava = threading.Lock()
+_dimensoes: dict[tuple[str, str], pd.DataFrame] = {}
+
+
+def obter_dimensao(sessao: Session, nome: str) -> pd.DataFrame:
+    """Obtém o conteúdo de uma tabela de dimensão, carregada uma única vez.
+
+    A tabela é lida do banco de dados na primeira vez em que é solicitada e
+    mantida em memória enquanto durar o processo, independentemente da
+    sessão usada nas consultas seguintes.
+
+    Argumentos:
+        sessao: objeto [`sqlalchemy.orm.session.Session`][] que permite
+            acessar a base de dados da ImpulsoGov.
+        nome: Nome da dimensão: `"periodos"`, `"unidades_geograficas"` ou
+            `"ufs"`.
+
+    Retorna:
+        Um objeto [`pandas.DataFrame`][] com todas as linhas e colunas da
+        tabela correspondente.
+
+    [`sqlalchemy.orm.session.Session`]: https://docs.sqlalchemy.org/en/14/orm/session_api.html#sqlalchemy.orm.Session
+    [`pandas.DataFrame`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.html
+    """
+    # o endereço do banco faz parte da chave, para o caso de um mesmo
+    # processo acessar mais de um banco de dados (como em testes)
+    chave = (str(sessao.get_bind().url), nome)
+    with _trava:
+        if chave not in _dimensoes:
+            tabela = tabelas[_TABELAS_DIMENSOES[nome]]
+            logger.debug(
+                "Carregando a tabela `{}` em memória...",
+                _TABELAS_DIMENSOES[nome],
+            )
+            _dimensoes[chave] = pd.DataFrame(
+                sessao.query(tabela).all(),
+                columns=[coluna.name for coluna in tabela.columns],
+            )
+    return _dimensoes[chave]
+
+
+def limpar_dimensoes() -> None:
+    """Descarta as tabelas de dimensão mantidas em memória."""
+    with _trava:
+        _dimensoes.clear()
+
+
+def adicionar_periodo_id(
+    dados: pd.DataFrame,
+    sessao: Session,
+    coluna_data: str,
+    tipo_periodo: str = "mensal",
+    coluna_destino: str = "periodo_id",
+) -> pd.DataFrame:
+    """Adiciona o identificador do período que contém a data dos registros.
+
+    Equivale a aplicar [`periodo_por_data()`][] a cada valor da coluna de
+    datas, mas procura todas as datas de uma vez, em um índice ordenado dos
+    períodos.
+
+    Argumentos:
+        dados: Objeto [`pandas.DataFrame`][] com os registros.
+        sessao: objeto [`sqlalchemy.orm.session.Session`][] que permite
+            acessar a base de dados da ImpulsoGov.
+        coluna_data: Nome da coluna com as datas de referência.
+        tipo_periodo: O nível de agregação do período desejado, como
+            `"mensal"` ou `"quadrimestral"`.
+        coluna_destino: Nome da coluna a ser criada.
+
+    Retorna:
+        Uma cópia de `dados`, acrescida da coluna `coluna_destino`.
+
+    Exceções:
+        Levanta um erro [`sqlalchemy.exc.NoResultFound`][] se alguma data for
+        nula ou não estiver contida em nenhum período do tipo indicado.
+
+    [`periodo_por_data()`]: impulsoetl.comum.datas.periodo_por_data
+    [`pandas.DataFrame`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.html
+    [`sqlalchemy.orm.session.Session`]: https://docs.sqlalchemy.org/en/14/orm/session_api.html#sqlalchemy.orm.Session
+    [`sqlalchemy.exc.NoResultFound`]: https://docs.sqlalchemy.org/en/14/core/exceptions.html#sqlalchemy.exc.NoResultFound
+    """
+    periodos = obter_dimensao(sessao, "periodos")
+    periodos = periodos.loc[
+        periodos["tipo"] == tipo_periodo.title()
+    ].sort_values("data_inicio")
+    inicios = pd.to_datetime(periodos["data_inicio"]).to_numpy()
+    fins = pd.to_datetime(periodos["data_fim"]).to_numpy()
+
+    datas = pd.to_datetime(dados[coluna_data])
+    # cada data distinta é procurada uma única vez
+    codigos_datas, datas_distintas = pd.factorize(datas)
+    datas_distintas = datas_distintas.to_numpy(dtype="datetime64[ns]")
+    posicoes = np.searchsorted(inicios, datas_distintas, side="right") - 1
+    encontradas = posicoes >= 0
+    encontradas[encontradas] = (
+        datas_distintas[encontradas] <= fins[posicoes[encontradas]]
+    )
+    nao_encontradas = [str(data) for data in datas_distintas[~encontradas]]
+    if (codigos_datas == -1).any():
+        nao_encontradas.append(str(pd.NaT))
+    if nao_encontradas:
+        raise NoResultFound(
+            "Nenhum período {} contém as datas: {}".format(
+                tipo_periodo,
+                ", ".join(nao_encontradas),
+            ),
+        )
+    identificadores = periodos["id"].to_numpy(dtype=object)[posicoes]
+    return dados.assign(**{coluna_destino: identificadores[codigos_datas]})
+
+
+def adicionar_unidade_geografica_id(
+    dados: pd.DataFrame,
+    sessao: Session,
+    coluna_municipio: str,
+    sistema: str = "sus",
+    coluna_destino: str = "unidade_geografica_id",
+) -> pd.DataFrame:
+    """Adiciona o identificador da unidade geográfica de cada registro.
+
+    Equivale a aplicar [`id_sus_para_id_impulso()`][] ou
+    [`id_sim_para_id_impulso()`][] a cada valor da coluna de municípios,
+    mas associa todos os registros de uma vez, por meio de uma junção com a
+    tabela de unidades geográficas.
+
+    Argumentos:
+        dados: Objeto [`pandas.DataFrame`][] com os registros.
+        sessao: objeto [`sqlalchemy.orm.session.Session`][] que permite
+            acessar a base de dados da ImpulsoGov.
+        coluna_municipio: Nome da coluna com os códigos dos municípios.
+        sistema: Sistema a que pertencem os códigos dos municípios: `"sus"`
+            (códigos de seis dígitos usados nos sistemas do SUS) ou `"sim"`
+            (códigos usados no Sistema de Informação sobre Mortalidade).
+        coluna_destino: Nome da coluna a ser criada.
+
+    Retorna:
+        Uma cópia de `dados`, acrescida da coluna `coluna_destino`.
+
+    Exceções:
+        Levanta um erro [`sqlalchemy.exc.NoResultFound`][] se algum código
+        for nulo ou não corresponder a nenhuma unidade geográfica, ou um erro
+        [`sqlalchemy.exc.MultipleResultsFound`][] se algum código
+        corresponder a mais de uma unidade geográfica.
+
+    [`id_sus_para_id_impulso()`]: impulsoetl.comum.geografias.id_sus_para_id_impulso
+    [`id_sim_para_id_impulso()`]: impulsoetl.comum.geografias.id_sim_para_id_impulso
+    [`pandas.DataFrame`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.html
+    [`sqlalchemy.orm.session.Session`]: https://docs.sqlalchemy.org/en/14/orm/session_api.html#sqlalchemy.orm.Session
+    [`sqlalchemy.exc.NoResultFound`]: https://docs.sqlalchemy.org/en/14/core/exceptions.html#sqlalchemy.exc.NoResultFound
+    [`sqlalchemy.exc.MultipleResultsFound`]: https://docs.sqlalchemy.org/en/14/core/exceptions.html#sqlalchemy.exc.MultipleResultsFound
+    """
+    coluna_codigo = "id_" + sistema
+    unidades = (
+        obter_dimensao(sessao, "unidades_geograficas")
+        .loc[:, [coluna_codigo, "id"]]
+        .dropna(subset=[coluna_codigo])
+        .rename(columns={"id": coluna_destino})
+    )
+    # como nas consultas individuais, os códigos nulos são convertidos em
+    # textos ("None", "nan") que não correspondem a nenhuma unidade
+    codigos = dados[coluna_municipio].astype(str)
+    repetidos = unidades[coluna_codigo].duplicated(keep=False).to_numpy()
+    if repetidos.any():
+        ambiguos = unidades.loc[repetidos, coluna_codigo]
+        ambiguos = ambiguos[ambiguos.isin(codigos)].unique()
+        if len(ambiguos):
+            raise MultipleResultsFound(
+                "Mais de uma unidade geográfica corresponde aos códigos: "
+                + ", ".join(ambiguos),
+            )
+        # códigos repetidos que não constam nos registros são ignorados
+        unidades = unidades.loc[~repetidos]
+    associados = pd.merge(
+        codigos.rename(coluna_codigo).to_frame(),
+        unidades,
+        how="left",
+        on=coluna_codigo,
+        validate="many_to_one",
+    )
+    nao_encontrados = associados[coluna_destino].isna().to_numpy()
+    if nao_encontrados.any():
+        raise NoResultFound(
+            "Nenhuma unidade geográfica corresponde aos códigos: {}".format(
+                ", ".join(
+                    associados.loc[nao_encontrados, coluna_codigo].unique(),
+                ),
+            ),
+        )
+    identificadores = associados[coluna_destino].to_numpy(dtype=object)
+    return dados.assign(**{coluna_destino: identificadores})
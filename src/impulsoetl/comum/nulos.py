@@ -0,0 +1,100 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Trata códigos que representam valores ausentes nos arquivos do DataSUS.
+
+Em muitos campos dos arquivos disponibilizados pelo DataSUS, a ausência de
+informação não é representada por um campo vazio, mas por um código
+composto apenas por zeros (como `"0000"` ou `"00000000000000"`) ou apenas
+por noves (como `"99"` ou `"999"`).
+"""
+
+
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+
+def identificar_nulos_codificados(
+    valores: pd.Series,
+    digito: str = "0",
+) -> np.ndarray:
+    """Indica os valores de texto compostos apenas por um mesmo dígito.
+
+    Argumentos:
+        valores: Objeto [`pandas.Series`][] com os textos a serem verificados.
+        digito: Caractere cuja repetição representa um valor ausente.
+
+    Retorna:
+        Um vetor de valores lógicos, verdadeiros para os textos vazios ou
+        formados apenas pela repetição de `digito`. Valores ausentes
+        resultam em falso.
+
+    [`pandas.Series`]: https://pandas.pydata.org/docs/reference/api/pandas.Series.html
+    """
+    # os códigos costumam se repetir muito; basta verificar cada valor
+    # distinto uma única vez. Valores ausentes recebem o código -1.
+    codigos_valores, distintos = pd.factorize(valores)
+    texto = distintos.to_numpy(dtype=str)
+    if not len(texto):
+        return np.zeros(len(valores), dtype=bool)
+    if texto.dtype.itemsize == 0:
+        # todos os textos são vazios
+        return codigos_valores >= 0
+    # cada texto é representado por uma linha de códigos de caracteres, com
+    # caracteres nulos à direita dos textos mais curtos que o mais longo
+    caracteres = texto.view(np.uint32).reshape(len(texto), -1)
+    sentinelas_distintos = (
+        (caracteres == ord(digito)) | (caracteres == 0)
+    ).all(axis=1)
+    return (codigos_valores >= 0) & sentinelas_distintos[codigos_valores]
+
+
+def substituir_nulos_codificados(
+    dados: pd.DataFrame,
+    colunas: Iterable[str],
+    digito: str = "0",
+) -> pd.DataFrame:
+    """Substitui por valores ausentes os códigos compostos por um só dígito.
+
+    Valores de texto vazios ou formados apenas pela repetição de `digito`
+    (por exemplo, `"0"`, `"000"` ou `"0000000"`) são substituídos por
+    `numpy.nan`. A verificação é feita uma única vez para cada valor
+    distinto de cada coluna, sem percorrer os valores um a um em Python.
+
+    Argumentos:
+        dados: Objeto [`pandas.DataFrame`][] com os dados a serem tratados.
+        colunas: Nomes das colunas, com valores de texto, a serem tratadas.
+        digito: Caractere cuja repetição representa um valor ausente.
+
+    Retorna:
+        Uma cópia de `dados` em que os códigos compostos apenas por `digito`
+        nas colunas indicadas foram substituídos por `numpy.nan`.
+
+    Exemplo:
+        ```py
+        >>> dados = pd.DataFrame({"cnpj": ["00000000000000", "123", None]})
+        >>> substituir_nulos_codificados(dados, ["cnpj"])
+          cnpj
+        0  NaN
+        1  123
+        2  None
+        ```
+
+    [`pandas.DataFrame`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.html
+    """
+    sentinelas = pd.DataFrame(
+        {
+            coluna: identificar_nulos_codificados(dados[coluna], digito)
+            for coluna in dict.fromkeys(colunas)
+        },
+        index=dados.index,
+    )
+    # substitui todas as colunas de uma vez, em vez de uma a uma
+    return dados.mask(
+        sentinelas.reindex(columns=dados.columns, fill_value=False),
+        np.nan,
+    )
@@ -0,0 +1,364 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Transforma dados do DataSUS a partir de especificações declarativas.
+
+As transformações dos arquivos de disseminação do DataSUS seguem quase
+sempre as mesmas etapas: renomear as colunas, converter datas, tratar
+valores ausentes, decodificar valores lógicos, adicionar identificadores e
+garantir os tipos de destino. Em vez de encadear uma chamada a um método
+do [`pandas.DataFrame`][] para cada etapa - o que copia a tabela inteira a
+cada passo -, cada módulo descreve essas etapas em uma
+[`EspecificacaoTransformacao`][], e a função [`aplicar_especificacao()`][]
+as executa coluna a coluna, montando o `DataFrame` transformado uma única
+vez, ao final.
+
+Atributos:
+    TRANSFORMACAO_COMPACTA: Indica se as colunas de códigos com poucos
+        valores distintos devem ser mantidas como categorias nos
+        `DataFrame`s transformados, em vez de um objeto de texto por
+        registro. Lido da variável de ambiente
+        `IMPULSOETL_TRANSFORMACAO_COMPACTA` (por padrão, `0`, desativado).
+
+[`pandas.DataFrame`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.html
+[`EspecificacaoTransformacao`]: impulsoetl.comum.transformacoes.EspecificacaoTransformacao
+[`aplicar_especificacao()`]: impulsoetl.comum.transformacoes.aplicar_especificacao
+"""
+
+
+import os
+from typing import Any, Callable, Final, Iterable, Mapping, NamedTuple
+
+import numpy as np
+import pandas as pd
+from frozendict import frozendict
+from sqlalchemy.orm import Session
+
+from impulsoetl.comum.booleanos import decodificar_codigos
+from impulsoetl.comum.datas import agora_gmt_menos3, de_texto_para_datas
+from impulsoetl.comum.dimensoes import (
+    adicionar_periodo_id,
+    adicionar_unidade_geografica_id,
+)
+from impulsoetl.comum.nulos import identificar_nulos_codificados
+from impulsoetl.utilitarios.identificadores import gerar_uuid7
+
+TRANSFORMACAO_COMPACTA: Final[bool] = bool(
+    int(os.getenv("IMPULSOETL_TRANSFORMACAO_COMPACTA", 0)),
+)
+
+# fração máxima de valores distintos para que uma coluna de textos seja
+# mantida como categoria no modo compacto
+_CATEGORIAS_FRACAO_MAX: Final[float] = 0.5
+
+Tratamento = Callable[[pd.Series], pd.Series]
+Derivacao = Callable[[Mapping[str, pd.Series]], pd.Series]
+
+
+class DecodificacaoBooleanos(NamedTuple):
+    """Regra de conversão de códigos de texto em valores lógicos.
+
+    Os campos correspondem aos argumentos de mesmo nome da função
+    [`decodificar_booleanos()`][].
+
+    [`decodificar_booleanos()`]: impulsoetl.comum.booleanos.decodificar_booleanos
+    """
+
+    colunas: Iterable[str]
+    verdadeiros: Iterable[str]
+    falsos: Iterable[str] | None = None
+    indefinidos: bool | None = None
+    contem: bool = False
+
+
+class EspecificacaoTransformacao(NamedTuple):
+    """Descreve a transformação de um arquivo de disseminação do DataSUS.
+
+    As etapas são sempre executadas na ordem em que os campos aparecem
+    abaixo, independentemente da ordem em que forem informados.
+
+    Atributos:
+        de_para: Nomes das colunas no arquivo de origem e nomes
+            correspondentes na tabela de destino. As colunas que não
+            constarem no dicionário mantêm o nome original, sem espaços nas
+            extremidades.
+        tipos: Tipos de dados de cada uma das colunas da tabela de destino,
+            aplicados ao final.
+        colunas_adicionais: Nomes de colunas, como aparecem no arquivo de
+            origem, a serem adicionadas com textos vazios caso não existam.
+        tratamentos: Funções que recebem uma coluna de textos, como lida do
+            arquivo de origem, e retornam a coluna tratada.
+        datas: Formatos de datas, nos moldes aceitos por
+            [`datetime.strptime()`][], e as colunas de textos a serem
+            convertidas segundo cada formato. Os textos que não
+            correspondem ao formato são convertidos em valores nulos.
+        nulos_codificados: Dígitos cuja repetição representa valores
+            ausentes, e as colunas em que esses códigos devem ser
+            substituídos por valores nulos. Antes disso, os textos vazios de
+            todas as colunas são sempre substituídos por valores nulos.
+        derivadas: Funções que recebem todas as colunas obtidas até então,
+            depois do tratamento de valores nulos, e retornam uma nova
+            coluna ou uma versão modificada de uma coluna existente. São
+            executadas na ordem em que aparecem.
+        booleanos: Regras de conversão de códigos de texto em valores
+            lógicos.
+        descartar: Nomes de colunas a serem removidas.
+        coluna_periodo: Nome da coluna com as datas a partir das quais o
+            identificador do período de cada registro é obtido. Se for
+            `None`, o identificador deve ser informado ao aplicar a
+            especificação.
+        coluna_municipio: Nome da coluna com os códigos dos municípios a
+            partir dos quais o identificador da unidade geográfica de cada
+            registro é obtido.
+        sistema_municipio: Sistema dos códigos de municípios, conforme
+            aceito pela função [`adicionar_unidade_geografica_id()`][].
+        colunas_numericas: Colunas convertidas em números de ponto
+            flutuante antes da conversão para os tipos de destino (ver
+            https://github.com/pandas-dev/pandas/issues/25472).
+
+    [`datetime.strptime()`]: https://docs.python.org/3/library/datetime.html#datetime.datetime.strptime
+    [`adicionar_unidade_geografica_id()`]: impulsoetl.comum.dimensoes.adicionar_unidade_geografica_id
+    """
+
+    de_para: Mapping[str, str]
+    tipos: Mapping[str, str]
+    colunas_adicionais: Iterable[str] = ()
+    tratamentos: Mapping[str, Tratamento] = frozendict()
+    datas: Mapping[str, Iterable[str]] = frozendict()
+    nulos_codificados: Mapping[str, Iterable[str]] = frozendict()
+    derivadas: Mapping[str, Derivacao] = frozendict()
+    booleanos: Iterable[DecodificacaoBooleanos] = ()
+    descartar: Iterable[str] = ()
+    coluna_periodo: str | None = None
+    coluna_municipio: str = "unidade_geografica_id_sus"
+    sistema_municipio: str = "sus"
+    colunas_numericas: Iterable[str] = ()
+
+
+def por_valor_distinto(funcao: Callable[[Any], Any]) -> Tratamento:
+    """Adapta uma função de valores individuais para tratar colunas inteiras.
+
+    A função é chamada uma única vez para cada valor distinto da coluna
+    (inclusive para o valor ausente, se houver), e o resultado é distribuído
+    para todos os registros com o mesmo valor. Como os códigos nos arquivos
+    do DataSUS se repetem muito, isso evita a maior parte das chamadas que
+    seriam feitas ao aplicar a função registro a registro.
+
+    Argumentos:
+        funcao: Função que recebe um valor e retorna o valor tratado.
+
+    Retorna:
+        Uma função que recebe um objeto [`pandas.Series`][] e retorna um
+        novo objeto com o mesmo índice e os valores tratados, como
+        faria o método [`pandas.Series.apply()`][].
+
+    Exemplo:
+        ```py
+        >>> completar = por_valor_distinto(lambda texto: texto.zfill(4))
+        >>> completar(pd.Series(["12", "3", "12"]))
+        0    0012
+        1    0003
+        2    0012
+        dtype: object
+        ```
+
+    [`pandas.Series`]: https://pandas.pydata.org/docs/reference/api/pandas.Series.html
+    [`pandas.Series.apply()`]: https://pandas.pydata.org/docs/reference/api/pandas.Series.apply.html
+    """
+
+    def aplicar(valores: pd.Series) -> pd.Series:
+        codigos, distintos = pd.factorize(valores)  # nulos recebem -1
+        distintos = pd.Series(distintos, dtype=valores.dtype)
+        nulos = codigos == -1
+        if nulos.any():
+            # o último elemento é o selecionado pelo código -1
+            distintos = pd.concat(
+                [distintos, valores[nulos].iloc[:1]],
+                ignore_index=True,
+            )
+        resultados = distintos.map(funcao)
+        return pd.Series(
+            resultados.to_numpy()[codigos],
+            index=valores.index,
+            name=valores.name,
+        )
+
+    return aplicar
+
+
+def _substituir_vazios(valores: pd.Series) -> pd.Series:
+    """Substitui textos vazios por valores nulos, como `Series.replace()`."""
+    texto = valores.to_numpy()
+    vazios = texto == ""
+    if not vazios.any():
+        return valores
+    texto = texto.copy()
+    texto[vazios] = np.nan
+    substituida = pd.Series(texto, index=valores.index, name=valores.name)
+    # como `Series.replace()`, converte para outro tipo as colunas em que não
+    # resta nenhum texto - por exemplo, as que ficaram só com valores nulos
+    for posicao in np.flatnonzero(~vazios):
+        if isinstance(texto[posicao], str):
+            return substituida
+        if pd.notna(texto[posicao]):
+            break
+    else:
+        return substituida.astype(float)
+    return substituida.infer_objects()
+
+
+def _compactar(valores: pd.Series) -> pd.Series:
+    """Converte uma coluna de textos repetitivos em uma coluna categórica."""
+    # colunas com listas ou outros objetos são mantidas como estão; as que
+    # têm apenas valores nulos passam a ocupar um byte por registro
+    if pd.api.types.infer_dtype(valores, skipna=True) not in {
+        "string",
+        "empty",
+    }:
+        return valores
+    codigos, categorias = pd.factorize(valores)
+    if len(categorias) > len(valores) * _CATEGORIAS_FRACAO_MAX:
+        return valores
+    return pd.Series(
+        pd.Categorical.from_codes(codigos, categories=categorias),
+        index=valores.index,
+        name=valores.name,
+    )
+
+
+def aplicar_especificacao(
+    dados: pd.DataFrame,
+    especificacao: EspecificacaoTransformacao,
+    sessao: Session,
+    periodo_id: str | None = None,
+    compacta: bool = TRANSFORMACAO_COMPACTA,
+) -> pd.DataFrame:
+    """Transforma um `DataFrame` conforme uma especificação declarativa.
+
+    Cada etapa da especificação é aplicada apenas às colunas a que se
+    refere, sem copiar as demais. As colunas são mantidas separadamente
+    durante toda a transformação, e o `DataFrame` transformado é montado de
+    uma só vez, depois da conversão para os tipos de destino.
+
+    Além das colunas descritas na especificação, são adicionadas ao final
+    as colunas `id`, com identificadores únicos de cada registro;
+    `periodo_id`; `unidade_geografica_id`; e as datas de inserção e de
+    atualização (`criacao_data` e `atualizacao_data`).
+
+    Argumentos:
+        dados: Objeto [`pandas.DataFrame`][] com os dados de um arquivo de
+            disseminação, como lidos da fonte.
+        especificacao: Objeto [`EspecificacaoTransformacao`][] com as
+            etapas da transformação.
+        sessao: objeto [`sqlalchemy.orm.session.Session`][] que permite
+            acessar a base de dados da ImpulsoGov.
+        periodo_id: Identificador do período de todos os registros. Usado
+            apenas se a especificação não indicar uma coluna de datas a
+            partir da qual os períodos sejam obtidos.
+        compacta: Se verdadeiro, as colunas de textos que tenham no máximo
+            um valor distinto para cada dois registros - como as de códigos
+            do SIGTAP, do SCNES ou de municípios - são convertidas em
+            colunas categóricas, que guardam cada texto distinto uma única
+            vez. Os textos são reconstituídos apenas ao copiar os registros
+            para o banco de dados. Por padrão, segue a variável de ambiente
+            `IMPULSOETL_TRANSFORMACAO_COMPACTA`.
+
+    Retorna:
+        Um novo objeto [`pandas.DataFrame`][] com os dados transformados.
+
+    [`pandas.DataFrame`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.html
+    [`EspecificacaoTransformacao`]: impulsoetl.comum.transformacoes.EspecificacaoTransformacao
+    [`sqlalchemy.orm.session.Session`]: https://docs.sqlalchemy.org/en/14/orm/session_api.html#sqlalchemy.orm.Session
+    """
+    # as colunas originais são apenas referenciadas, sem cópias
+    colunas: dict[str, pd.Series] = {}
+    for coluna in dados.columns:
+        destino = especificacao.de_para.get(coluna.strip(), coluna.strip())
+        colunas[destino] = dados[coluna].rename(destino)
+    for coluna in especificacao.colunas_adicionais:
+        destino = especificacao.de_para.get(coluna, coluna)
+        if coluna not in dados.columns:
+            colunas[destino] = pd.Series("", index=dados.index, name=destino)
+
+    for coluna, tratamento in especificacao.tratamentos.items():
+        colunas[coluna] = tratamento(colunas[coluna])
+
+    for formato, colunas_data in especificacao.datas.items():
+        for coluna in colunas_data:
+            colunas[coluna] = de_texto_para_datas(
+                colunas[coluna],
+                formato=formato,
+                erros="coerce",
+            )
+
+    # tratar como nulos os textos vazios e os códigos de valores ausentes
+    for coluna, valores in colunas.items():
+        if valores.dtype == object:
+            colunas[coluna] = _substituir_vazios(valores)
+    for digito, colunas_nulos in especificacao.nulos_codificados.items():
+        for coluna in dict.fromkeys(colunas_nulos):
+            colunas[coluna] = colunas[coluna].mask(
+                identificar_nulos_codificados(colunas[coluna], digito),
+                np.nan,
+            )
+
+    for coluna, derivacao in especificacao.derivadas.items():
+        colunas[coluna] = derivacao(colunas).rename(coluna)
+
+    for regra in especificacao.booleanos:
+        for coluna in regra.colunas:
+            colunas[coluna] = pd.Series(
+                decodificar_codigos(
+                    colunas[coluna],
+                    verdadeiros=regra.verdadeiros,
+                    falsos=regra.falsos,
+                    indefinidos=regra.indefinidos,
+                    contem=regra.contem,
+                ),
+                index=dados.index,
+                name=coluna,
+            )
+
+    for coluna in especificacao.descartar:
+        del colunas[coluna]
+
+    # adicionar identificadores e datas de inserção e atualização
+    colunas["id"] = pd.Series(
+        gerar_uuid7(len(dados)),
+        index=dados.index,
+        name="id",
+    )
+    if especificacao.coluna_periodo is None:
+        colunas["periodo_id"] = pd.Series(
+            periodo_id,
+            index=dados.index,
+            name="periodo_id",
+            dtype=object,
+        )
+    else:
+        colunas["periodo_id"] = adicionar_periodo_id(
+            colunas[especificacao.coluna_periodo].to_frame(),
+            sessao=sessao,
+            coluna_data=especificacao.coluna_periodo,
+        )["periodo_id"]
+    colunas["unidade_geografica_id"] = adicionar_unidade_geografica_id(
+        colunas[especificacao.coluna_municipio].to_frame(),
+        sessao=sessao,
+        coluna_municipio=especificacao.coluna_municipio,
+        sistema=especificacao.sistema_municipio,
+    )["unidade_geografica_id"]
+    agora = agora_gmt_menos3()
+    for coluna in ("criacao_data", "atualizacao_data"):
+        colunas[coluna] = pd.Series(agora, index=dados.index, name=coluna)
+
+    # garantir tipos
+    for coluna in especificacao.colunas_numericas:
+        colunas[coluna] = colunas[coluna].astype("float")
+    for coluna, tipo in especificacao.tipos.items():
+        colunas[coluna] = colunas[coluna].astype(tipo)
+        if compacta and colunas[coluna].dtype == object:
+            colunas[coluna] = _compactar(colunas[coluna])
+
+    return pd.DataFrame(colunas, index=dados.index)
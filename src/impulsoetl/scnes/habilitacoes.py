@@ -6,26 +6,36 @@
 """Ferramentas para obter habilitações dos estabelecimentos no SCNES."""
 
 
-import os
 import re
 from datetime import date
-from typing import Final, Generator
+from functools import partial
+from typing import Final, Generator, Iterable
 
-import janitor  # noqa: F401  # nopycln: import
 import numpy as np
 import pandas as pd
 import roman
 from frozendict import frozendict
 from prefect import flow, task
 from sqlalchemy.orm import Session
-from uuid6 import uuid7
 
 from impulsoetl import __VERSION__
-from impulsoetl.comum.datas import agora_gmt_menos3, periodo_por_data
-from impulsoetl.comum.geografias import id_sus_para_id_impulso
+from impulsoetl.comum.transformacoes import (
+    DecodificacaoBooleanos,
+    EspecificacaoTransformacao,
+    aplicar_especificacao,
+    por_valor_distinto,
+)
 from impulsoetl.loggers import habilitar_suporte_loguru, logger
 from impulsoetl.utilitarios.bd import carregar_dataframe
-from impulsoetl.utilitarios.datasus_ftp import extrair_dbc_lotes
+from impulsoetl.utilitarios.datasus_ftp import (
+    DATASUS_FTP,
+    extrair_dbc_lotes,
+)
+from impulsoetl.utilitarios.esteira import (
+    ESTEIRA_LOTES_SIMULTANEOS,
+    processar_em_esteira,
+)
+from impulsoetl.utilitarios.lotes import DimensionadorLotes
 
 DE_PARA_HABILITACOES: Final[frozendict] = frozendict(
     {
@@ -122,16 +132,6 @@ COLUNAS_NUMERICAS: Final[list[str]] = [
 ]
 
 
-def _para_booleano(valor: str) -> bool | float:
-    """Transforma um valor binário '0' ou '1' em booleano. Suporta NaNs."""
-    if valor == "0":
-        return False
-    elif valor == "1":
-        return True
-    else:
-        return np.nan
-
-
 def _romano_para_inteiro(texto: str) -> str | float:
     if pd.isna(texto):
         return np.nan
@@ -141,10 +141,76 @@ def _romano_para_inteiro(texto: str) -> str | float:
         return texto
 
 
+def _limpar_regiao_saude(id_sus: str) -> str | float:
+    id_sus = _romano_para_inteiro(id_sus)
+    if pd.isna(id_sus):
+        return np.nan
+    return re.sub("[^0-9]", "", id_sus).zfill(4)
+
+
+def _completar_com_zeros(id_sus: str, largura: int) -> str | float:
+    return id_sus.zfill(largura) if pd.notna(id_sus) else np.nan
+
+
+ESPECIFICACAO_HABILITACOES: Final[EspecificacaoTransformacao] = (
+    EspecificacaoTransformacao(
+        de_para=DE_PARA_HABILITACOES,
+        tipos=TIPOS_HABILITACOES,
+        # limpar e completar códigos de região e distrito de saúde
+        tratamentos={
+            "estabelecimento_regiao_saude_id_sus": por_valor_distinto(
+                _limpar_regiao_saude,
+            ),
+            "estabelecimento_distrito_sanitario_id_sus": por_valor_distinto(
+                partial(_completar_com_zeros, largura=4),
+            ),
+            "estabelecimento_distrito_administrativo_id_sus": (
+                por_valor_distinto(partial(_completar_com_zeros, largura=4))
+            ),
+            "estabelecimento_microrregiao_saude_id_sus": por_valor_distinto(
+                partial(_completar_com_zeros, largura=6),
+            ),
+        },
+        datas={
+            "%Y%m": COLUNAS_DATA_AAAAMM,
+            "%d/%m/%Y": COLUNAS_DATA_AAAAMMDD,  # noqa: WPS323
+        },
+        nulos_codificados={
+            "0": [
+                "estabelecimento_regiao_saude_id_sus",
+                "estabelecimento_microrregiao_saude_id_sus",
+                "estabelecimento_distrito_sanitario_id_sus",
+                "estabelecimento_distrito_administrativo_id_sus",
+                "estabelecimento_id_cpf_cnpj",
+                "estabelecimento_mantenedora_id_cnpj",
+            ],
+        },
+        booleanos=[
+            DecodificacaoBooleanos(
+                colunas=["estabelecimento_mantido"],
+                verdadeiros=["1"],
+            ),
+            DecodificacaoBooleanos(
+                colunas=[
+                    "estabelecimento_terceiro",
+                    "atendimento_sus",
+                ],
+                verdadeiros=["1"],
+                falsos=["0"],
+            ),
+        ],
+        coluna_periodo="periodo_data_inicio",
+        coluna_municipio="estabelecimento_municipio_id_sus",
+        colunas_numericas=COLUNAS_NUMERICAS,
+    )
+)
+
+
 def extrair_habilitacoes(
     uf_sigla: str,
     periodo_data_inicio: date,
-    passo: int = 10000,
+    passo: int | DimensionadorLotes = 10000,
+    colunas: Iterable[str] | None = None,
 ) -> Generator[pd.DataFrame, None, None]:
     """Extrai registros de habilitações de estabelecimentos do FTP do DataSUS.
 
@@ -154,7 +220,11 @@ def extrair_habilitacoes(
         periodo_data_inicio: Dia de início da competência desejada,
             representado como um objeto [`datetime.date`][].
         passo: Número de registros que devem ser convertidos em DataFrame a
-            cada iteração.
+            cada iteração; ou instância de `DimensionadorLotes`, que ajusta o
+            tamanho de cada lote à memória disponível.
+        colunas: Nomes das colunas a serem lidas do arquivo de disseminação.
+            As demais colunas não são decodificadas. Por padrão, todas as
+            colunas são lidas.
 
     Gera:
         A cada iteração, devolve um objeto [`pandas.DataFrames`][] com um
@@ -165,13 +235,14 @@ def extrair_habilitacoes(
     """
 
     return extrair_dbc_lotes(
-        ftp="ftp.datasus.gov.br",
+        ftp=DATASUS_FTP,
         caminho_diretorio="/dissemin/publicos/CNES/200508_/Dados/HB",
         arquivo_nome="HB{uf_sigla}{periodo_data_inicio:%y%m}.dbc".format(
             uf_sigla=uf_sigla,
             periodo_data_inicio=periodo_data_inicio,
         ),
         passo=passo,
+        colunas=colunas,
     )
 
 
@@ -214,117 +285,20 @@ def transformar_habilitacoes(
         + "de estabelecimentos do SCNES.",
         num_registros=len(habilitacoes),
     )
-    logger.debug(
+    logger.opt(lazy=True).debug(
         "Memória ocupada pelo DataFrame original:  {memoria_usada:.2f} mB.",
-        memoria_usada=habilitacoes.memory_usage(deep=True).sum() / 10**6,
+        memoria_usada=lambda: (
+            habilitacoes.memory_usage(deep=True).sum() / 10**6
+        ),
     )
-    habilitacoes_transformado = (
-        habilitacoes  # noqa: WPS221  # ignorar linha complexa no pipeline
-        # renomear colunas
-        .rename_columns(function=lambda col: col.strip())
-        .rename_columns(DE_PARA_HABILITACOES)
-        # adicionar datas de inserção e atualização
-        .add_column("criacao_data", agora_gmt_menos3())
-        .add_column("atualizacao_data", agora_gmt_menos3())
-        # processar colunas com datas
-        .transform_columns(
-            COLUNAS_DATA_AAAAMM,
-            function=lambda dt: pd.to_datetime(
-                dt,
-                format="%Y%m",
-                errors="coerce",
-            ),
-        )
-        .transform_columns(
-            COLUNAS_DATA_AAAAMMDD,
-            function=lambda dt: pd.to_datetime(
-                dt,
-                format="%d/%m/%Y",
-                errors="coerce",
-            ),
-        )
-        # limpar e completar códigos de região e distrito de saúde
-        .transform_column(
-            "estabelecimento_regiao_saude_id_sus",
-            _romano_para_inteiro,
-        )
-        .transform_column(
-            "estabelecimento_regiao_saude_id_sus",
-            lambda id_sus: (
-                re.sub("[^0-9]", "", id_sus) if pd.notna(id_sus) else np.nan
-            ),
-        )
-        .transform_columns(
-            [
-                "estabelecimento_regiao_saude_id_sus",
-                "estabelecimento_distrito_sanitario_id_sus",
-                "estabelecimento_distrito_administrativo_id_sus",
-            ],
-            lambda id_sus: (id_sus.zfill(4) if pd.notna(id_sus) else np.nan),
-        )
-        .transform_column(
-            "estabelecimento_microrregiao_saude_id_sus",
-            lambda id_sus: (id_sus.zfill(6) if pd.notna(id_sus) else np.nan),
-        )
-        # tratar como NA colunas com valores nulos
-        .replace("", np.nan)
-        .transform_columns(
-            [
-                "estabelecimento_regiao_saude_id_sus",
-                "estabelecimento_microrregiao_saude_id_sus",
-                "estabelecimento_distrito_sanitario_id_sus",
-                "estabelecimento_distrito_administrativo_id_sus",
-                "estabelecimento_id_cpf_cnpj",
-                "estabelecimento_mantenedora_id_cnpj",
-            ],
-            function=lambda elemento: (
-                np.nan
-                if pd.notna(elemento)
-                and all(digito == "0" for digito in elemento)
-                else elemento
-            ),
-        )
-        # processar colunas lógicas
-        .transform_column(
-            "estabelecimento_mantido",
-            function=lambda elemento: True if elemento == "1" else False,
-        )
-        .transform_columns(
-            [
-                "estabelecimento_terceiro",
-                "atendimento_sus",
-            ],
-            function=_para_booleano,
-        )
-        # adicionar id
-        .add_column("id", str())
-        .transform_column("id", function=lambda _: uuid7().hex)
-        # adicionar id do periodo
-        .transform_column(
-            "periodo_data_inicio",
-            function=lambda dt: periodo_por_data(sessao=sessao, data=dt).id,
-            dest_column_name="periodo_id",
-        )
-        # adicionar id da unidade geografica
-        .transform_column(
-            "estabelecimento_municipio_id_sus",
-            function=lambda id_sus: id_sus_para_id_impulso(
-                sessao=sessao,
-                id_sus=id_sus,
-            ),
-            dest_column_name="unidade_geografica_id",
-        )
-        # garantir tipos
-        .change_type(
-            # HACK: ver https://github.com/pandas-dev/pandas/issues/25472
-            COLUNAS_NUMERICAS,
-            "float",
-        )
-        .astype(TIPOS_HABILITACOES)
+    habilitacoes_transformado = aplicar_especificacao(
+        habilitacoes,
+        especificacao=ESPECIFICACAO_HABILITACOES,
+        sessao=sessao,
     )
-    logger.debug(
+    logger.opt(lazy=True).debug(
         "Memória ocupada pelo DataFrame transformado: {memoria_usada:.2f} mB.",
-        memoria_usada=(
+        memoria_usada=lambda: (
             habilitacoes_transformado.memory_usage(deep=True).sum() / 10**6
         ),
     )
@@ -368,10 +342,16 @@ def obter_habilitacoes(
             adicionadas à uma transação, e podem ser revertidas com uma chamada
             posterior ao método [`Session.rollback()`][] da sessão gerada com o
             SQLAlchemy.
+        \\*\\*kwargs: Parâmetros adicionais definidos no agendamento da
+            captura. Atualmente, apenas o parâmetro `arrow` (do tipo `bool`),
+            repassado à função [`carregar_dataframe()`][], que indica se os
+            registros devem ser convertidos em tabelas Arrow antes do
+            carregamento.
 
     [`sqlalchemy.orm.session.Session`]: https://docs.sqlalchemy.org/en/14/orm/session_api.html#sqlalchemy.orm.Session
     [`sqlalchemy.engine.Row`]: https://docs.sqlalchemy.org/en/14/core/connections.html#sqlalchemy.engine.Row
     [`datetime.date`]: https://docs.python.org/3/library/datetime.html#date-objects
+    [`carregar_dataframe()`]: impulsoetl.utilitarios.bd.carregar_dataframe
     """
     habilitar_suporte_loguru()
     logger.info(
@@ -382,27 +362,31 @@ def obter_habilitacoes(
     )
 
     # obter tamanho do lote de processamento
-    passo = int(os.getenv("IMPULSOETL_LOTE_TAMANHO", 100000))
+    passo = DimensionadorLotes.do_ambiente(
+        lotes_simultaneos=ESTEIRA_LOTES_SIMULTANEOS,
+    )
 
     habilitacoes_lotes = extrair_habilitacoes(
         uf_sigla=uf_sigla,
         periodo_data_inicio=periodo_data_inicio,
         passo=passo,
+        colunas=DE_PARA_HABILITACOES.keys(),
     )
 
     contador = 0
-    for habilitacoes_lote in habilitacoes_lotes:
-        habilitacoes_transformada = transformar_habilitacoes(
-            sessao=sessao,
-            habilitacoes=habilitacoes_lote,
-        )
-
+    for habilitacoes_lote, habilitacoes_transformada in processar_em_esteira(
+        sessao=sessao,
+        lotes=habilitacoes_lotes,
+        transformar=transformar_habilitacoes,
+        dimensionador=passo,
+    ):
         carregamento_status = carregar_dataframe(
             sessao=sessao,
             df=habilitacoes_transformada,
             tabela_destino=tabela_destino,
             passo=None,
             teste=teste,
+            arrow=kwargs.get("arrow", False),
         )
         if carregamento_status != 0:
             raise RuntimeError(
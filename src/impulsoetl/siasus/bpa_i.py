@@ -7,28 +7,31 @@
 """
 
 
-import os
 from datetime import date
-from typing import Final, Generator
+from typing import Final, Generator, Iterable
 
-import janitor  # noqa: F401  # nopycln: import
-import numpy as np
 import pandas as pd
 from frozendict import frozendict
 from prefect import flow, task
 from sqlalchemy.orm import Session
-from uuid6 import uuid7
 
 from impulsoetl import __VERSION__
-from impulsoetl.comum.datas import (
-    agora_gmt_menos3,
-    de_aaaammdd_para_timestamp,
-    periodo_por_data,
+from impulsoetl.comum.transformacoes import (
+    DecodificacaoBooleanos,
+    EspecificacaoTransformacao,
+    aplicar_especificacao,
 )
-from impulsoetl.comum.geografias import id_sus_para_id_impulso
 from impulsoetl.loggers import habilitar_suporte_loguru, logger
 from impulsoetl.utilitarios.bd import carregar_dataframe
-from impulsoetl.utilitarios.datasus_ftp import extrair_dbc_lotes
+from impulsoetl.utilitarios.datasus_ftp import (
+    DATASUS_FTP,
+    extrair_dbc_lotes,
+)
+from impulsoetl.utilitarios.esteira import (
+    ESTEIRA_LOTES_SIMULTANEOS,
+    processar_em_esteira,
+)
+from impulsoetl.utilitarios.lotes import DimensionadorLotes
 
 DE_PARA_BPA_I: Final[frozendict] = frozendict(
     {
@@ -132,11 +135,49 @@ COLUNAS_NUMERICAS: Final[list[str]] = [
     if tipo_coluna.lower() == "int64" or tipo_coluna.lower() == "float64"
 ]
 
+ESPECIFICACAO_BPA_I: Final[EspecificacaoTransformacao] = (
+    EspecificacaoTransformacao(
+        de_para=DE_PARA_BPA_I,
+        tipos=TIPOS_BPA_I,
+        datas={
+            "%Y%m": COLUNAS_DATA_AAAAMM,
+            "%Y%m%d": COLUNAS_DATA_AAAAMMDD,
+        },
+        nulos_codificados={
+            "0": [
+                "mantenedora_id_cnpj",
+                "receptor_credito_id_cnpj",
+                "financiamento_subtipo_id_sigtap",
+                "condicao_principal_id_cid10",
+                "autorizacao_id_siasus",
+            ],
+        },
+        booleanos=[
+            DecodificacaoBooleanos(
+                colunas=["estabelecimento_mantido"],
+                verdadeiros=["M"],
+            ),
+            DecodificacaoBooleanos(
+                colunas=[
+                    "atendimento_residencia_ufs_distintas",
+                    "atendimento_residencia_municipios_distintos",
+                ],
+                verdadeiros=["1"],
+            ),
+        ],
+        coluna_periodo="realizacao_periodo_data_inicio",
+        coluna_municipio="unidade_geografica_id_sus",
+        colunas_numericas=COLUNAS_NUMERICAS,
+    )
+)
+
 
 def extrair_bpa_i(
     uf_sigla: str,
     periodo_data_inicio: date,
-    passo: int = 10000,
+    passo: int | DimensionadorLotes = 10000,
+    colunas: Iterable[str] | None = None,
+    condicoes: str | None = None,
 ) -> Generator[pd.DataFrame, None, None]:
     """Extrai registros de Boletins de Produção Ambulatorial do FTP do DataSUS.
 
@@ -146,24 +187,40 @@ def extrair_bpa_i(
         periodo_data_inicio: Dia de início da competência desejada,
             representado como um objeto [`datetime.date`][].
         passo: Número de registros que devem ser convertidos em DataFrame a
-            cada iteração.
+            cada iteração; ou instância de `DimensionadorLotes`, que ajusta o
+            tamanho de cada lote à memória disponível.
+        colunas: Nomes das colunas a serem lidas do arquivo de disseminação.
+            As demais colunas não são decodificadas. Por padrão, todas as
+            colunas são lidas.
+        condicoes: conjunto opcional de condições a serem aplicadas para
+            filtrar os registros obtidos da fonte, com a sintaxe utilizada pelo
+            método [`pandas.DataFrame.query()`][]. As condições são avaliadas
+            durante a leitura do arquivo, de modo que os registros descartados
+            nunca chegam a ser convertidos em DataFrame. Os nomes, os tipos e
+            os valores dos campos devem ser considerados exatamente como
+            registrados no arquivo de disseminação. Verifique o [Informe
+            Técnico][it-siasus] para mais informações.
 
     Gera:
         A cada iteração, devolve um objeto [`pandas.DataFrames`][] com um
         trecho do arquivo de procedimentos ambulatoriais lido e convertido.
 
     [`pandas.DataFrame`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.html
+    [`pandas.DataFrame.query()`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.query.html
     [`datetime.date`]: https://docs.python.org/3/library/datetime.html#date-objects
+    [it-siasus]: https://drive.google.com/file/d/1DC5093njSQIhMHydYptlj2rMbrMF36y6
     """
 
     yield from extrair_dbc_lotes(
-        ftp="ftp.datasus.gov.br",
+        ftp=DATASUS_FTP,
         caminho_diretorio="/dissemin/publicos/SIASUS/200801_/Dados",
         arquivo_nome="BI{uf_sigla}{periodo_data_inicio:%y%m}.dbc".format(
             uf_sigla=uf_sigla,
             periodo_data_inicio=periodo_data_inicio,
         ),
         passo=passo,
+        colunas=colunas,
+        condicoes=condicoes,
     )
 
 
@@ -181,7 +238,6 @@ def extrair_bpa_i(
 def transformar_bpa_i(
     sessao: Session,
     bpa_i: pd.DataFrame,
-    condicoes: str | None = None,
 ) -> pd.DataFrame:
     """Transforma um `DataFrame` de BPA-i obtido do FTP público do DataSUS.
 
@@ -192,122 +248,29 @@ def transformar_bpa_i(
             disseminação de Boletins de Produção Ambulatorial -
             individualizados, conforme extraídos para uma unidade federativa e
             competência (mês) pela função [`extrair_bpa_i()`][].
-        condicoes: conjunto opcional de condições a serem aplicadas para
-            filtrar os registros obtidos da fonte. O valor informado deve ser
-            uma *string* com a sintaxe utilizada pelo método
-            [`pandas.DataFrame.query()`][]. Por padrão, o valor do argumento é
-            `None`, o que equivale a não aplicar filtro algum.
-
-    Note:
-        Para otimizar a performance, os filtros são aplicados antes de qualquer
-        outra transformação nos dados, de forma que as condições fornecidas
-        devem considerar que o nome, os tipos e os valores aparecem exatamente
-        como registrados no arquivo de disseminação disponibilizado no FTP
-        público do DataSUS. Verifique o [Informe Técnico][it-siasus] para mais
-        informações.
 
     [`sqlalchemy.orm.session.Session`]: https://docs.sqlalchemy.org/en/14/orm/session_api.html#sqlalchemy.orm.Session
     [`pandas.DataFrame`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.html
     [`extrair_bpa_i()`]: impulsoetl.siasus.bpa_i.extrair_bpa_i
-    [`pandas.DataFrame.query()`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.query.html
-    [it-siasus]: https://drive.google.com/file/d/1DC5093njSQIhMHydYptlj2rMbrMF36y6
     """
     habilitar_suporte_loguru()
     logger.info(
         "Transformando DataFrame com {num_registros_bpa_i} registros de BPAi.",
         num_registros_bpa_i=len(bpa_i),
     )
-    logger.debug(
+    logger.opt(lazy=True).debug(
         "Memória ocupada pelo DataFrame original:  {memoria_usada:.2f} mB.",
-        memoria_usada=bpa_i.memory_usage(deep=True).sum() / 10**6,
+        memoria_usada=lambda: bpa_i.memory_usage(deep=True).sum() / 10**6,
     )
 
-    # aplica condições de filtragem dos registros
-    if condicoes:
-        bpa_i = bpa_i.query(condicoes, engine="python")
-        logger.info(
-            "Registros após aplicar condições de filtragem: {num_registros}.",
-            num_registros=len(bpa_i),
-        )
-
-    bpa_i_transformada = (
-        bpa_i  # noqa: WPS221  # ignorar linha complexa no pipeline
-        # renomear colunas
-        .rename_columns(function=lambda col: col.strip())
-        .rename_columns(DE_PARA_BPA_I)
-        # processar colunas com datas
-        .transform_columns(
-            COLUNAS_DATA_AAAAMM,
-            function=lambda dt: pd.to_datetime(
-                dt,
-                format="%Y%m",
-                errors="coerce",
-            ),
-        )
-        .transform_columns(
-            COLUNAS_DATA_AAAAMMDD,
-            function=lambda dt: de_aaaammdd_para_timestamp(dt, erros="coerce"),
-        )
-        # processar colunas lógicas
-        .transform_column(
-            "estabelecimento_mantido",
-            function=lambda elemento: True if elemento == "M" else False,
-        )
-        .transform_columns(
-            [
-                "atendimento_residencia_ufs_distintas",
-                "atendimento_residencia_municipios_distintos",
-            ],
-            function=lambda elemento: True if elemento == "1" else False,
-        )
-        # tratar como NA colunas com valores nulos
-        .replace("", np.nan)
-        .transform_columns(
-            [
-                "mantenedora_id_cnpj",
-                "receptor_credito_id_cnpj",
-                "financiamento_subtipo_id_sigtap",
-                "condicao_principal_id_cid10",
-                "autorizacao_id_siasus",
-            ],
-            function=lambda elemento: (
-                np.nan
-                if all(digito == "0" for digito in elemento)
-                else elemento
-            ),
-        )
-        # adicionar id
-        .add_column("id", str())
-        .transform_column("id", function=lambda _: uuid7().hex)
-        # adicionar id do periodo
-        .transform_column(
-            "realizacao_periodo_data_inicio",
-            function=lambda dt: periodo_por_data(sessao=sessao, data=dt).id,
-            dest_column_name="periodo_id",
-        )
-        # adicionar id da unidade geografica
-        .transform_column(
-            "unidade_geografica_id_sus",
-            function=lambda id_sus: id_sus_para_id_impulso(
-                sessao=sessao,
-                id_sus=id_sus,
-            ),
-            dest_column_name="unidade_geografica_id",
-        )
-        # adicionar datas de inserção e atualização
-        .add_column("criacao_data", agora_gmt_menos3())
-        .add_column("atualizacao_data", agora_gmt_menos3())
-        # garantir tipos
-        .change_type(
-            # HACK: ver https://github.com/pandas-dev/pandas/issues/25472
-            COLUNAS_NUMERICAS,
-            "float",
-        )
-        .astype(TIPOS_BPA_I)
+    bpa_i_transformada = aplicar_especificacao(
+        bpa_i,
+        especificacao=ESPECIFICACAO_BPA_I,
+        sessao=sessao,
     )
-    logger.debug(
+    logger.opt(lazy=True).debug(
         "Memória ocupada pelo DataFrame transformado: {memoria_usada:.2f} mB.",
-        memoria_usada=(
+        memoria_usada=lambda: (
             bpa_i_transformada.memory_usage(deep=True).sum() / 10**6
         ),
     )
@@ -351,14 +314,18 @@ def obter_bpa_i(
             posterior ao método [`Session.rollback()`][] da sessão gerada com o
             SQLAlchemy.
         \\*\\*kwargs: Parâmetros adicionais definidos no agendamento da
-            captura. Atualmente, apenas o parâmetro `condicoes` (do tipo `str`)
-            é aceito, e repassado como argumento na função
-            [`transformar_bpa_i()`][].
+            captura. São aceitos o parâmetro `condicoes` (do tipo `str`),
+            repassado como argumento na função [`extrair_bpa_i()`][], que
+            aplica as condições durante a leitura do arquivo; e o parâmetro
+            `arrow` (do tipo `bool`), repassado à função
+            [`carregar_dataframe()`][], que indica se os registros devem ser
+            convertidos em tabelas Arrow antes do carregamento.
 
     [`sqlalchemy.orm.session.Session`]: https://docs.sqlalchemy.org/en/14/orm/session_api.html#sqlalchemy.orm.Session
     [`sqlalchemy.engine.Row`]: https://docs.sqlalchemy.org/en/14/core/connections.html#sqlalchemy.engine.Row
     [`datetime.date`]: https://docs.python.org/3/library/datetime.html#date-objects
-    [`transformar_bpa_i()`]: impulsoetl.siasus.bpa_i.transformar_bpa_i
+    [`extrair_bpa_i()`]: impulsoetl.siasus.bpa_i.extrair_bpa_i
+    [`carregar_dataframe()`]: impulsoetl.utilitarios.bd.carregar_dataframe
     """
     habilitar_suporte_loguru()
     logger.info(
@@ -369,28 +336,32 @@ def obter_bpa_i(
     )
 
     # obter tamanho do lote de processamento
-    passo = int(os.getenv("IMPULSOETL_LOTE_TAMANHO", 100000))
+    passo = DimensionadorLotes.do_ambiente(
+        lotes_simultaneos=ESTEIRA_LOTES_SIMULTANEOS,
+    )
 
     bpa_i_lotes = extrair_bpa_i(
         uf_sigla=uf_sigla,
         periodo_data_inicio=periodo_data_inicio,
         passo=passo,
+        colunas=DE_PARA_BPA_I.keys(),
+        condicoes=kwargs.get("condicoes"),
     )
 
     contador = 0
-    for bpa_i_lote in bpa_i_lotes:
-        bpa_i_transformada = transformar_bpa_i(
-            sessao=sessao,
-            bpa_i=bpa_i_lote,
-            condicoes=kwargs.get("condicoes"),
-        )
-
+    for bpa_i_lote, bpa_i_transformada in processar_em_esteira(
+        sessao=sessao,
+        lotes=bpa_i_lotes,
+        transformar=transformar_bpa_i,
+        dimensionador=passo,
+    ):
         carregamento_status = carregar_dataframe(
             sessao=sessao,
             df=bpa_i_transformada,
             tabela_destino=tabela_destino,
             passo=None,
             teste=teste,
+            arrow=kwargs.get("arrow", False),
         )
         if carregamento_status != 0:
             raise RuntimeError(
@@ -6,25 +6,35 @@
 """Obtém dados de procedimentos ambulatoriais registrados no SIASUS."""
 
 
-import os
 import re
 from datetime import date
-from typing import Final, Generator
+from functools import partial
+from typing import Final, Generator, Iterable, Mapping
 
-import janitor  # noqa: F401  # nopycln: import
 import numpy as np
 import pandas as pd
 from frozendict import frozendict
 from prefect import flow, task
 from sqlalchemy.orm import Session
-from uuid6 import uuid7
 
 from impulsoetl import __VERSION__
-from impulsoetl.comum.datas import agora_gmt_menos3, periodo_por_data
-from impulsoetl.comum.geografias import id_sus_para_id_impulso
+from impulsoetl.comum.transformacoes import (
+    DecodificacaoBooleanos,
+    EspecificacaoTransformacao,
+    aplicar_especificacao,
+    por_valor_distinto,
+)
 from impulsoetl.loggers import habilitar_suporte_loguru, logger
 from impulsoetl.utilitarios.bd import carregar_dataframe
-from impulsoetl.utilitarios.datasus_ftp import extrair_dbc_lotes
+from impulsoetl.utilitarios.datasus_ftp import (
+    DATASUS_FTP,
+    extrair_dbc_lotes,
+)
+from impulsoetl.utilitarios.esteira import (
+    ESTEIRA_LOTES_SIMULTANEOS,
+    processar_em_esteira,
+)
+from impulsoetl.utilitarios.lotes import DimensionadorLotes
 
 DE_PARA_PA: Final[frozendict] = frozendict(
     {
@@ -173,21 +183,113 @@ COLUNAS_NUMERICAS: Final[list[str]] = [
     if tipo_coluna.lower() == "int64" or tipo_coluna.lower() == "float64"
 ]
 
+COLUNAS_DESFECHO: Final[list[str]] = [
+    "obito",
+    "encerramento",
+    "permanencia",
+    "alta",
+    "transferencia",
+]
+
+
+def _anular_idade_desconhecida(colunas: Mapping[str, pd.Series]) -> pd.Series:
+    return colunas["usuario_idade"].mask(colunas["usuario_idade"] == "999")
 
-def _para_booleano(valor: str) -> bool | float:
-    """Transforma um valor binário '0' ou '1' em booleano. Suporta NaNs."""
-    if valor == "0":
-        return False
-    elif valor == "1":
-        return True
-    else:
-        return np.nan
+
+def _anular_sem_desfecho(
+    colunas: Mapping[str, pd.Series],
+    coluna: str,
+) -> pd.Series:
+    return colunas[coluna].mask(colunas["desfecho_motivo_id_siasus"].isna())
+
+
+# separar código do serviço e código da classificação do serviço
+def _servico_id_sigtap(colunas: Mapping[str, pd.Series]) -> pd.Series:
+    return por_valor_distinto(
+        lambda cod: cod[:3] if pd.notna(cod) else np.nan,
+    )(colunas["servico_especializado_id_scnes"])
+
+
+def _servico_classificacao_id_sigtap(
+    colunas: Mapping[str, pd.Series],
+) -> pd.Series:
+    return por_valor_distinto(
+        lambda cod: cod[3:] if pd.notna(cod) else np.nan,
+    )(colunas["servico_especializado_id_scnes"])
+
+
+ESPECIFICACAO_PA: Final[EspecificacaoTransformacao] = (
+    EspecificacaoTransformacao(
+        de_para=DE_PARA_PA,
+        tipos=TIPOS_PA,
+        datas={"%Y%m": COLUNAS_DATA_AAAAMM},
+        nulos_codificados={
+            "0": [
+                "regra_contratual_id_scnes",
+                "incremento_outros_id_sigtap",
+                "incremento_urgencia_id_sigtap",
+                "mantenedora_id_cnpj",
+                "receptor_credito_id_cnpj",
+                "financiamento_subtipo_id_sigtap",
+                "condicao_principal_id_cid10",
+                "autorizacao_id_siasus",
+                "profissional_id_cns",
+                "condicao_secundaria_id_cid10",
+                "condicao_associada_id_cid10",
+                "desfecho_motivo_id_siasus",
+                "usuario_sexo_id_sigtap",
+                "usuario_raca_cor_id_siasus",
+            ],
+            "9": [
+                "carater_atendimento_id_siasus",
+                "usuario_residencia_municipio_id_sus",
+                "atendimento_residencia_ufs_distintas",
+                "atendimento_residencia_municipios_distintos",
+            ],
+        },
+        derivadas={
+            "usuario_idade": _anular_idade_desconhecida,
+            **{
+                coluna: partial(_anular_sem_desfecho, coluna=coluna)
+                for coluna in COLUNAS_DESFECHO
+            },
+            "servico_id_sigtap": _servico_id_sigtap,
+            "servico_classificacao_id_sigtap": (
+                _servico_classificacao_id_sigtap
+            ),
+        },
+        booleanos=[
+            DecodificacaoBooleanos(
+                colunas=["estabelecimento_mantido"],
+                verdadeiros=["M"],
+            ),
+            DecodificacaoBooleanos(
+                colunas=COLUNAS_DESFECHO
+                + [
+                    "atendimento_residencia_ufs_distintas",
+                    "atendimento_residencia_municipios_distintos",
+                ],
+                verdadeiros=["1"],
+                falsos=["0"],
+                # valores ausentes ou desconhecidos eram convertidos em
+                # verdadeiros na conversão para o tipo `bool` das colunas
+                indefinidos=True,
+            ),
+        ],
+        descartar=["servico_especializado_id_scnes"],
+        coluna_periodo="realizacao_periodo_data_inicio",
+        coluna_municipio="unidade_geografica_id_sus",
+        colunas_numericas=COLUNAS_NUMERICAS,
+    )
+)
 
 
 def extrair_pa(
     uf_sigla: str,
     periodo_data_inicio: date,
-    passo: int = 10000,
+    passo: int | DimensionadorLotes = 10000,
+    colunas: Iterable[str] | None = None,
+    condicoes: str | None = None,
 ) -> Generator[pd.DataFrame, None, None]:
     """Extrai registros de procedimentos ambulatoriais do FTP do DataSUS.
 
@@ -197,14 +299,28 @@ def extrair_pa(
         periodo_data_inicio: Dia de início da competência desejada,
             representado como um objeto [`datetime.date`][].
         passo: Número de registros que devem ser convertidos em DataFrame a
-            cada iteração.
+            cada iteração; ou instância de `DimensionadorLotes`, que ajusta o
+            tamanho de cada lote à memória disponível.
+        colunas: Nomes das colunas a serem lidas do arquivo de disseminação.
+            As demais colunas não são decodificadas. Por padrão, todas as
+            colunas são lidas.
+        condicoes: conjunto opcional de condições a serem aplicadas para
+            filtrar os registros obtidos da fonte, com a sintaxe utilizada pelo
+            método [`pandas.DataFrame.query()`][]. As condições são avaliadas
+            durante a leitura do arquivo, de modo que os registros descartados
+            nunca chegam a ser convertidos em DataFrame. Os nomes, os tipos e
+            os valores dos campos devem ser considerados exatamente como
+            registrados no arquivo de disseminação. Verifique o [Informe
+            Técnico][it-siasus] para mais informações.
 
     Gera:
         A cada iteração, devolve um objeto [`pandas.DataFrames`][] com um
         trecho do arquivo de procedimentos ambulatoriais lido e convertido.
 
     [`pandas.DataFrame`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.html
+    [`pandas.DataFrame.query()`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.query.html
     [`datetime.date`]: https://docs.python.org/3/library/datetime.html#date-objects
+    [it-siasus]: https://drive.google.com/file/d/1DC5093njSQIhMHydYptlj2rMbrMF36y6
     """
 
     arquivo_padrao = "PA{uf_sigla}{periodo_data_inicio:%y%m}[a-z]?.dbc".format(
@@ -213,10 +329,12 @@ def extrair_pa(
     )
 
     return extrair_dbc_lotes(
-        ftp="ftp.datasus.gov.br",
+        ftp=DATASUS_FTP,
         caminho_diretorio="/dissemin/publicos/SIASUS/200801_/Dados",
         arquivo_nome=re.compile(arquivo_padrao, re.IGNORECASE),
         passo=passo,
+        colunas=colunas,
+        condicoes=condicoes,
     )
 
 
@@ -234,7 +352,6 @@ def extrair_pa(
 def transformar_pa(
     sessao: Session,
     pa: pd.DataFrame,
-    condicoes: str | None = None,
 ) -> pd.DataFrame:
     """Transforma um `DataFrame` de procedimentos ambulatoriais do SIASUS.
 
@@ -245,25 +362,10 @@ def transformar_pa(
             disseminação de procedimentos ambulatoriais do SIASUS, conforme
             extraídos para uma unidade federativa e competência (mês) pela
             função [`extrair_pa()`][].
-        condicoes: conjunto opcional de condições a serem aplicadas para
-            filtrar os registros obtidos da fonte. O valor informado deve ser
-            uma *string* com a sintaxe utilizada pelo método
-            [`pandas.DataFrame.query()`][]. Por padrão, o valor do argumento é
-            `None`, o que equivale a não aplicar filtro algum.
-
-    Note:
-        Para otimizar a performance, os filtros são aplicados antes de qualquer
-        outra transformação nos dados, de forma que as condições fornecidas
-        devem considerar que o nome, os tipos e os valores aparecem exatamente
-        como registrados no arquivo de disseminação disponibilizado no FTP
-        público do DataSUS. Verifique o [Informe Técnico][it-siasus] para mais
-        informações.
 
     [`sqlalchemy.orm.session.Session`]: https://docs.sqlalchemy.org/en/14/orm/session_api.html#sqlalchemy.orm.Session
     [`pandas.DataFrame`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.html
     [`extrair_pa()`]: impulsoetl.siasus.procedimentos.extrair_pa
-    [`pandas.DataFrame.query()`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.query.html
-    [it-siasus]: https://drive.google.com/file/d/1DC5093njSQIhMHydYptlj2rMbrMF36y6
     """
     habilitar_suporte_loguru()
     logger.info(
@@ -271,151 +373,19 @@ def transformar_pa(
         + "ambulatoriais.",
         num_registros_pa=len(pa),
     )
-    logger.debug(
+    logger.opt(lazy=True).debug(
         "Memória ocupada pelo DataFrame original:  {memoria_usada:.2f} mB.",
-        memoria_usada=pa.memory_usage(deep=True).sum() / 10**6,
+        memoria_usada=lambda: pa.memory_usage(deep=True).sum() / 10**6,
     )
 
-    # aplica condições de filtragem dos registros
-    if condicoes:
-        pa = pa.query(condicoes, engine="python")
-        logger.info(
-            "Registros após aplicar condições de filtragem: {num_registros}.",
-            num_registros=len(pa),
-        )
-
-    pa_transformada = (
-        pa  # noqa: WPS221  # ignorar linha complexa no pipeline
-        # renomear colunas
-        .rename_columns(function=lambda col: col.strip())
-        .rename_columns(DE_PARA_PA)
-        # processar colunas com datas
-        .transform_columns(
-            COLUNAS_DATA_AAAAMM,
-            function=lambda dt: pd.to_datetime(
-                dt,
-                format="%Y%m",
-                errors="coerce",
-            ),
-        )
-        # tratar como NA colunas com valores nulos
-        .replace("", np.nan)
-        .transform_columns(
-            [
-                "regra_contratual_id_scnes",
-                "incremento_outros_id_sigtap",
-                "incremento_urgencia_id_sigtap",
-                "mantenedora_id_cnpj",
-                "receptor_credito_id_cnpj",
-                "financiamento_subtipo_id_sigtap",
-                "condicao_principal_id_cid10",
-                "autorizacao_id_siasus",
-                "profissional_id_cns",
-                "condicao_principal_id_cid10",
-                "condicao_secundaria_id_cid10",
-                "condicao_associada_id_cid10",
-                "desfecho_motivo_id_siasus",
-                "usuario_sexo_id_sigtap",
-                "usuario_raca_cor_id_siasus",
-            ],
-            function=lambda elemento: (
-                np.nan
-                if pd.notna(elemento)
-                and all(digito == "0" for digito in elemento)
-                else elemento
-            ),
-        )
-        .transform_columns(
-            [
-                "carater_atendimento_id_siasus",
-                "usuario_residencia_municipio_id_sus",
-                "atendimento_residencia_ufs_distintas",
-                "atendimento_residencia_municipios_distintos",
-            ],
-            function=lambda elemento: (
-                np.nan
-                if pd.isna(elemento)
-                or all(digito == "9" for digito in elemento)
-                else elemento
-            ),
-        )
-        .update_where(
-            "usuario_idade == '999'",
-            target_column_name="usuario_idade",
-            target_val=np.nan,
-        )
-        # processar colunas lógicas
-        .transform_column(
-            "estabelecimento_mantido",
-            function=lambda elemento: True if elemento == "M" else False,
-        )
-        .transform_columns(
-            [
-                "obito",
-                "encerramento",
-                "permanencia",
-                "alta",
-                "transferencia",
-                "atendimento_residencia_ufs_distintas",
-                "atendimento_residencia_municipios_distintos",
-            ],
-            function=_para_booleano,
-        )
-        .update_where(
-            "@pd.isna(desfecho_motivo_id_siasus)",
-            target_column_name=[
-                "obito",
-                "encerramento",
-                "permanencia",
-                "alta",
-                "transferencia",
-            ],
-            target_val=np.nan,
-        )
-        # separar código do serviço e código da classificação do serviço
-        .transform_column(
-            "servico_especializado_id_scnes",
-            function=lambda cod: cod[:3] if pd.notna(cod) else np.nan,
-            dest_column_name="servico_id_sigtap",
-        )
-        .transform_column(
-            "servico_especializado_id_scnes",
-            function=lambda cod: cod[3:] if pd.notna(cod) else np.nan,
-            dest_column_name="servico_classificacao_id_sigtap",
-        )
-        .remove_columns("servico_especializado_id_scnes")
-        # adicionar id
-        .add_column("id", str())
-        .transform_column("id", function=lambda _: uuid7().hex)
-        # adicionar id do periodo
-        .transform_column(
-            "realizacao_periodo_data_inicio",
-            function=lambda dt: periodo_por_data(sessao=sessao, data=dt).id,
-            dest_column_name="periodo_id",
-        )
-        # adicionar id da unidade geografica
-        .transform_column(
-            "unidade_geografica_id_sus",
-            function=lambda id_sus: id_sus_para_id_impulso(
-                sessao=sessao,
-                id_sus=id_sus,
-            ),
-            dest_column_name="unidade_geografica_id",
-        )
-        # adicionar datas de inserção e atualização
-        .add_column("criacao_data", agora_gmt_menos3())
-        .add_column("atualizacao_data", agora_gmt_menos3())
-        # garantir tipos
-        .change_type(
-            # HACK: ver https://github.com/pandas-dev/pandas/issues/25472
-            COLUNAS_NUMERICAS,
-            "float",
-        )
-        .astype(TIPOS_PA)
+    pa_transformada = aplicar_especificacao(
+        pa,
+        especificacao=ESPECIFICACAO_PA,
+        sessao=sessao,
     )
-    logger.debug(
+    logger.opt(lazy=True).debug(
         "Memória ocupada pelo DataFrame transformado: {memoria_usada:.2f} mB.",
-        memoria_usada=(
+        memoria_usada=lambda: (
             pa_transformada.memory_usage(deep=True).sum() / 10**6
         ),
     )
@@ -486,14 +456,18 @@ def obter_pa(
             posterior ao método [`Session.rollback()`][] da sessão gerada com o
             SQLAlchemy.
         \\*\\*kwargs: Parâmetros adicionais definidos no agendamento da
-            captura. Atualmente, apenas o parâmetro `condicoes` (do tipo `str`)
-            é aceito, e repassado como argumento na função
-            [`transformar_pa()`][].
+            captura. São aceitos o parâmetro `condicoes` (do tipo `str`),
+            repassado como argumento na função [`extrair_pa()`][], que aplica
+            as condições durante a leitura do arquivo; e o parâmetro `arrow`
+            (do tipo `bool`), repassado à função [`carregar_dataframe()`][],
+            que indica se os registros devem ser convertidos em tabelas Arrow
+            antes do carregamento.
 
     [`sqlalchemy.orm.session.Session`]: https://docs.sqlalchemy.org/en/14/orm/session_api.html#sqlalchemy.orm.Session
     [`sqlalchemy.engine.Row`]: https://docs.sqlalchemy.org/en/14/core/connections.html#sqlalchemy.engine.Row
     [`datetime.date`]: https://docs.python.org/3/library/datetime.html#date-objects
-    [`transformar_pa()`]: impulsoetl.siasus.procedimentos.transformar_pa
+    [`extrair_pa()`]: impulsoetl.siasus.procedimentos.extrair_pa
+    [`carregar_dataframe()`]: impulsoetl.utilitarios.bd.carregar_dataframe
     """
     habilitar_suporte_loguru()
     logger.info(
@@ -504,21 +478,25 @@ def obter_pa(
     )
 
     # obter tamanho do lote de processamento
-    passo = int(os.getenv("IMPULSOETL_LOTE_TAMANHO", 100000))
+    passo = DimensionadorLotes.do_ambiente(
+        lotes_simultaneos=ESTEIRA_LOTES_SIMULTANEOS,
+    )
 
     pa_lotes = extrair_pa(
         uf_sigla=uf_sigla,
         periodo_data_inicio=periodo_data_inicio,
         passo=passo,
+        colunas=DE_PARA_PA.keys(),
+        condicoes=kwargs.get("condicoes"),
     )
 
     contador = 0
-    for pa_lote in pa_lotes:
-        pa_transformada = transformar_pa(
-            sessao=sessao,
-            pa=pa_lote,
-            condicoes=kwargs.get("condicoes"),
-        )
+    for pa_lote, pa_transformada in processar_em_esteira(
+        sessao=sessao,
+        lotes=pa_lotes,
+        transformar=transformar_pa,
+        dimensionador=passo,
+    ):
         try:
             validar_pa(pa_transformada)
         except AssertionError as mensagem:
@@ -534,6 +512,7 @@ def obter_pa(
             tabela_destino=tabela_destino,
             passo=None,
             teste=teste,
+            arrow=kwargs.get("arrow", False),
         )
         if carregamento_status != 0:
             sessao.rollback()
@@ -5,28 +5,34 @@
 
 """Obtém dados dos Registros de Ações Ambulatoriais em Saúde (RAAS)."""
 
-import os
 from datetime import date
-from typing import Final, Generator
+from operator import itemgetter
+from typing import Final, Generator, Iterable, Mapping
 
-import janitor  # noqa: F401  # nopycln: import
 import numpy as np
 import pandas as pd
 from frozendict import frozendict
 from prefect import flow, task
 from sqlalchemy.orm import Session
-from uuid6 import uuid7
 
 from impulsoetl import __VERSION__
-from impulsoetl.comum.datas import (
-    agora_gmt_menos3,
-    de_aaaammdd_para_timestamp,
-    periodo_por_data,
+from impulsoetl.comum.transformacoes import (
+    DecodificacaoBooleanos,
+    EspecificacaoTransformacao,
+    aplicar_especificacao,
+    por_valor_distinto,
 )
-from impulsoetl.comum.geografias import id_sus_para_id_impulso
 from impulsoetl.loggers import habilitar_suporte_loguru, logger
 from impulsoetl.utilitarios.bd import carregar_dataframe
-from impulsoetl.utilitarios.datasus_ftp import extrair_dbc_lotes
+from impulsoetl.utilitarios.datasus_ftp import (
+    DATASUS_FTP,
+    extrair_dbc_lotes,
+)
+from impulsoetl.utilitarios.esteira import (
+    ESTEIRA_LOTES_SIMULTANEOS,
+    processar_em_esteira,
+)
+from impulsoetl.utilitarios.lotes import DimensionadorLotes
 
 DE_PARA_RAAS_PS: Final[frozendict] = frozendict(
     {
@@ -160,10 +166,80 @@ COLUNAS_NUMERICAS: Final[list[str]] = [
 ]
 
 
+def _transformar_duracao(elemento: str) -> str | float:
+    return "{} days".format(elemento) if elemento else np.nan
+
+
+def _informou_abuso_substancias(
+    colunas: Mapping[str, pd.Series],
+) -> pd.Series:
+    # textos vazios já foram substituídos por valores nulos
+    return colunas["usuario_abuso_substancias"].notna()
+
+
+ESPECIFICACAO_RAAS_PS: Final[EspecificacaoTransformacao] = (
+    EspecificacaoTransformacao(
+        de_para=DE_PARA_RAAS_PS,
+        tipos=TIPOS_RAAS_PS,
+        # transformar coluna de duração
+        tratamentos={
+            "permanencia_duracao": por_valor_distinto(_transformar_duracao),
+        },
+        datas={
+            "%Y%m": COLUNAS_DATA_AAAAMM,
+            "%Y%m%d": COLUNAS_DATA_AAAAMMDD,
+        },
+        # processar coluna de uso de substâncias
+        derivadas={
+            "usuario_abuso_substancias_alcool": itemgetter(
+                "usuario_abuso_substancias",
+            ),
+            "usuario_abuso_substancias_crack": itemgetter(
+                "usuario_abuso_substancias",
+            ),
+            "usuario_abuso_substancias_outras": itemgetter(
+                "usuario_abuso_substancias",
+            ),
+            "usuario_abuso_substancias": _informou_abuso_substancias,
+        },
+        booleanos=[
+            DecodificacaoBooleanos(
+                colunas=["estabelecimento_mantido"],
+                verdadeiros=["M"],
+            ),
+            DecodificacaoBooleanos(
+                colunas=["usuario_situacao_rua", "esf_cobertura"],
+                verdadeiros=["S"],
+            ),
+            DecodificacaoBooleanos(
+                colunas=["usuario_abuso_substancias_alcool"],
+                verdadeiros=["A"],
+                contem=True,
+            ),
+            DecodificacaoBooleanos(
+                colunas=["usuario_abuso_substancias_crack"],
+                verdadeiros=["C"],
+                contem=True,
+            ),
+            DecodificacaoBooleanos(
+                colunas=["usuario_abuso_substancias_outras"],
+                verdadeiros=["O"],
+                contem=True,
+            ),
+        ],
+        coluna_periodo="realizacao_periodo_data_inicio",
+        coluna_municipio="unidade_geografica_id_sus",
+        colunas_numericas=COLUNAS_NUMERICAS,
+    )
+)
+
+
 def extrair_raas_ps(
     uf_sigla: str,
     periodo_data_inicio: date,
-    passo: int = 100000,
+    passo: int | DimensionadorLotes = 100000,
+    colunas: Iterable[str] | None = None,
+    condicoes: str | None = None,
 ) -> Generator[pd.DataFrame, None, None]:
     """Extrai registros de RAAS Psicossociais do FTP do DataSUS.
 
@@ -173,24 +249,40 @@ def extrair_raas_ps(
         periodo_data_inicio: Dia de início da competência desejada,
             representado como um objeto [`datetime.date`][].
         passo: Número de registros que devem ser convertidos em DataFrame a
-            cada iteração.
+            cada iteração; ou instância de `DimensionadorLotes`, que ajusta o
+            tamanho de cada lote à memória disponível.
+        colunas: Nomes das colunas a serem lidas do arquivo de disseminação.
+            As demais colunas não são decodificadas. Por padrão, todas as
+            colunas são lidas.
+        condicoes: conjunto opcional de condições a serem aplicadas para
+            filtrar os registros obtidos da fonte, com a sintaxe utilizada pelo
+            método [`pandas.DataFrame.query()`][]. As condições são avaliadas
+            durante a leitura do arquivo, de modo que os registros descartados
+            nunca chegam a ser convertidos em DataFrame. Os nomes, os tipos e
+            os valores dos campos devem ser considerados exatamente como
+            registrados no arquivo de disseminação. Verifique o [Informe
+            Técnico][it-siasus] para mais informações.
 
     Gera:
         A cada iteração, devolve um objeto [`pandas.DataFrames`][] com um
         trecho do arquivo de procedimentos ambulatoriais lido e convertido.
 
     [`pandas.DataFrame`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.html
+    [`pandas.DataFrame.query()`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.query.html
     [`datetime.date`]: https://docs.python.org/3/library/datetime.html#date-objects
+    [it-siasus]: https://drive.google.com/file/d/1DC5093njSQIhMHydYptlj2rMbrMF36y6
     """
 
     return extrair_dbc_lotes(
-        ftp="ftp.datasus.gov.br",
+        ftp=DATASUS_FTP,
         caminho_diretorio="/dissemin/publicos/SIASUS/200801_/Dados",
         arquivo_nome="PS{uf_sigla}{periodo_data_inicio:%y%m}.dbc".format(
             uf_sigla=uf_sigla,
             periodo_data_inicio=periodo_data_inicio,
         ),
         passo=passo,
+        colunas=colunas,
+        condicoes=condicoes,
     )
 
 
@@ -208,7 +300,6 @@ def extrair_raas_ps(
 def transformar_raas_ps(
     sessao: Session,
     raas_ps: pd.DataFrame,
-    condicoes: str | None = None,
 ) -> pd.DataFrame:
     """Transforma um `DataFrame` de RAAS obtido do FTP público do DataSUS.
 
@@ -219,25 +310,10 @@ def transformar_raas_ps(
             de disseminação de Registros de Ações Ambulatoriais em Saúde -
             RAAS, conforme extraídos para uma unidade federativa e competência
             (mês) pela função [`extrair_raas()`][].
-        condicoes: conjunto opcional de condições a serem aplicadas para
-            filtrar os registros obtidos da fonte. O valor informado deve ser
-            uma *string* com a sintaxe utilizada pelo método
-            [`pandas.DataFrame.query()`][]. Por padrão, o valor do argumento é
-            `None`, o que equivale a não aplicar filtro algum.
-
-    Note:
-        Para otimizar a performance, os filtros são aplicados antes de qualquer
-        outra transformação nos dados, de forma que as condições fornecidas
-        devem considerar que o nome, os tipos e os valores aparecem exatamente
-        como registrados no arquivo de disseminação disponibilizado no FTP
-        público do DataSUS. Verifique o [Informe Técnico][it-siasus] para mais
-        informações.
 
     [`sqlalchemy.orm.session.Session`]: https://docs.sqlalchemy.org/en/14/orm/session_api.html#sqlalchemy.orm.Session
     [`pandas.DataFrame`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.html
     [`extrair_bpa_i()`]: impulsoetl.siasus.raas.extrair_raas
-    [`pandas.DataFrame.query()`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.query.html
-    [it-siasus]: https://drive.google.com/file/d/1DC5093njSQIhMHydYptlj2rMbrMF36y6
     """
     habilitar_suporte_loguru()
     logger.info(
@@ -245,98 +321,10 @@ def transformar_raas_ps(
         num_registros_raas=len(raas_ps),
     )
 
-    # aplica condições de filtragem dos registros
-    if condicoes:
-        raas_ps = raas_ps.query(condicoes, engine="python")
-        logger.info(
-            "Registros após aplicar condições de filtragem: {num_registros}.",
-            num_registros=len(raas_ps),
-        )
-
-    return (
-        raas_ps  # noqa: WPS221  # ignorar linha complexa no pipeline
-        # renomear colunas
-        .rename_columns(function=lambda col: col.strip())
-        .rename_columns(DE_PARA_RAAS_PS)
-        # processar colunas com datas
-        .transform_columns(
-            COLUNAS_DATA_AAAAMM,
-            function=lambda dt: pd.to_datetime(
-                dt,
-                format="%Y%m",
-                errors="coerce",
-            ),
-        )
-        .transform_columns(
-            COLUNAS_DATA_AAAAMMDD,
-            function=lambda dt: de_aaaammdd_para_timestamp(dt, erros="coerce"),
-        )
-        # processar colunas lógicas
-        .transform_column(
-            "estabelecimento_mantido",
-            function=lambda elemento: True if elemento == "M" else False,
-        )
-        .transform_columns(
-            ["usuario_situacao_rua", "esf_cobertura"],
-            function=lambda elemento: True if elemento == "S" else False,
-        )
-        # processar coluna de uso de substâncias
-        .transform_column(
-            "usuario_abuso_substancias",
-            function=lambda elemento: bool("A" in elemento),
-            dest_column_name="usuario_abuso_substancias_alcool",
-        )
-        .transform_column(
-            "usuario_abuso_substancias",
-            function=lambda elemento: bool("C" in elemento),
-            dest_column_name="usuario_abuso_substancias_crack",
-        )
-        .transform_column(
-            "usuario_abuso_substancias",
-            function=lambda elemento: bool("O" in elemento),
-            dest_column_name="usuario_abuso_substancias_outras",
-        )
-        .transform_column(
-            "usuario_abuso_substancias",
-            function=lambda elemento: bool(len(elemento)),
-        )
-        # transformar coluna de duração
-        .transform_column(
-            "permanencia_duracao",
-            function=lambda elemento: (
-                "{} days".format(elemento) if elemento else np.nan
-            ),
-        )
-        # tratar como NA colunas com valores nulos
-        .replace("", np.nan)
-        # adicionar id
-        .add_column("id", str())
-        .transform_column("id", function=lambda _: uuid7().hex)
-        # adicionar id do periodo
-        .transform_column(
-            "realizacao_periodo_data_inicio",
-            function=lambda dt: periodo_por_data(sessao=sessao, data=dt).id,
-            dest_column_name="periodo_id",
-        )
-        # adicionar id da unidade geografica
-        .transform_column(
-            "unidade_geografica_id_sus",
-            function=lambda id_sus: id_sus_para_id_impulso(
-                sessao=sessao,
-                id_sus=id_sus,
-            ),
-            dest_column_name="unidade_geografica_id",
-        )
-        # adicionar datas de inserção e atualização
-        .add_column("criacao_data", agora_gmt_menos3())
-        .add_column("atualizacao_data", agora_gmt_menos3())
-        # garantir tipos
-        .change_type(
-            # HACK: ver https://github.com/pandas-dev/pandas/issues/25472
-            COLUNAS_NUMERICAS,
-            "float",
-        )
-        .astype(TIPOS_RAAS_PS)
+    return aplicar_especificacao(
+        raas_ps,
+        especificacao=ESPECIFICACAO_RAAS_PS,
+        sessao=sessao,
     )
 
 
@@ -377,13 +365,17 @@ def obter_raas_ps(
             posterior ao método [`Session.rollback()`][] da sessão gerada com o
             SQLAlchemy.
         \\*\\*kwargs: Parâmetros adicionais definidos no agendamento da
-            captura. Atualmente, apenas o parâmetro `condicoes` (do tipo `str`)
-            é aceito, e repassado como argumento na função
-            [`transformar_raas_ps()`][].
+            captura. São aceitos o parâmetro `condicoes` (do tipo `str`),
+            repassado como argumento na função [`extrair_raas_ps()`][], que
+            aplica as condições durante a leitura do arquivo; e o parâmetro
+            `arrow` (do tipo `bool`), repassado à função
+            [`carregar_dataframe()`][], que indica se os registros devem ser
+            convertidos em tabelas Arrow antes do carregamento.
 
     [`sqlalchemy.orm.session.Session`]: https://docs.sqlalchemy.org/en/14/orm/session_api.html#sqlalchemy.orm.Session
     [`sqlalchemy.engine.Row`]: https://docs.sqlalchemy.org/en/14/core/connections.html#sqlalchemy.engine.Row
-    [`transformar_raas_ps()`]: impulsoetl.siasus.bpa_i.transformar_raas_ps
+    [`extrair_raas_ps()`]: impulsoetl.siasus.raas_ps.extrair_raas_ps
+    [`carregar_dataframe()`]: impulsoetl.utilitarios.bd.carregar_dataframe
     """
     habilitar_suporte_loguru()
     logger.info(
@@ -394,28 +386,32 @@ def obter_raas_ps(
     )
 
     # obter tamanho do lote de processamento
-    passo = int(os.getenv("IMPULSOETL_LOTE_TAMANHO", 100000))
+    passo = DimensionadorLotes.do_ambiente(
+        lotes_simultaneos=ESTEIRA_LOTES_SIMULTANEOS,
+    )
 
     raas_ps_lotes = extrair_raas_ps(
         uf_sigla=uf_sigla,
         periodo_data_inicio=periodo_data_inicio,
         passo=passo,
+        colunas=DE_PARA_RAAS_PS.keys(),
+        condicoes=kwargs.get("condicoes"),
     )
 
     contador = 0
-    for raas_ps_lote in raas_ps_lotes:
-        raas_ps_transformada = transformar_raas_ps(
-            sessao=sessao,
-            raas_ps=raas_ps_lote,
-            condicoes=kwargs.get("condicoes"),
-        )
-
+    for raas_ps_lote, raas_ps_transformada in processar_em_esteira(
+        sessao=sessao,
+        lotes=raas_ps_lotes,
+        transformar=transformar_raas_ps,
+        dimensionador=passo,
+    ):
         carregamento_status = carregar_dataframe(
             sessao=sessao,
             df=raas_ps_transformada,
             tabela_destino=tabela_destino,
             passo=None,
             teste=teste,
+            arrow=kwargs.get("arrow", False),
         )
         if carregamento_status != 0:
             raise RuntimeError(
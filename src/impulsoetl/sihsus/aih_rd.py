@@ -6,28 +6,33 @@
 """Obtém dados de procedimentos ambulatoriais registrados no SIASUS."""
 
 
-import os
 from datetime import date
-from typing import Final, Generator
+from operator import methodcaller
+from typing import Final, Generator, Iterable, Mapping
 
-import janitor  # noqa: F401  # nopycln: import
-import numpy as np
 import pandas as pd
 from frozendict import frozendict
 from prefect import flow, task
 from sqlalchemy.orm import Session
-from uuid6 import uuid7
 
 from impulsoetl import __VERSION__
-from impulsoetl.comum.datas import (
-    agora_gmt_menos3,
-    de_aaaammdd_para_timestamp,
-    periodo_por_data,
+from impulsoetl.comum.datas import de_ano_mes_para_datas
+from impulsoetl.comum.transformacoes import (
+    DecodificacaoBooleanos,
+    EspecificacaoTransformacao,
+    aplicar_especificacao,
 )
-from impulsoetl.comum.geografias import id_sus_para_id_impulso
 from impulsoetl.loggers import habilitar_suporte_loguru, logger
 from impulsoetl.utilitarios.bd import carregar_dataframe
-from impulsoetl.utilitarios.datasus_ftp import extrair_dbc_lotes
+from impulsoetl.utilitarios.datasus_ftp import (
+    DATASUS_FTP,
+    extrair_dbc_lotes,
+)
+from impulsoetl.utilitarios.esteira import (
+    ESTEIRA_LOTES_SIMULTANEOS,
+    processar_em_esteira,
+)
+from impulsoetl.utilitarios.lotes import DimensionadorLotes
 
 DE_PARA_AIH_RD: Final[frozendict] = frozendict(
     {
@@ -288,20 +293,87 @@ COLUNAS_NUMERICAS: Final[list[str]] = [
 ]
 
 
-def _para_booleano(valor: str) -> bool | float:
-    """Transforma um valor binário '0' ou '1' em booleano. Suporta NaNs."""
-    if valor == "0":
-        return False
-    elif valor == "1":
-        return True
-    else:
-        return np.nan
+def _periodo_data_inicio(colunas: Mapping[str, pd.Series]) -> pd.Series:
+    return de_ano_mes_para_datas(
+        anos=colunas["processamento_periodo_ano_inicio"],
+        meses=colunas["processamento_periodo_mes_inicio"],
+    )
+
+
+ESPECIFICACAO_AIH_RD: Final[EspecificacaoTransformacao] = (
+    EspecificacaoTransformacao(
+        # junta nomes de colunas adicionais aos obrigatórios
+        de_para=dict(DE_PARA_AIH_RD, **DE_PARA_AIH_RD_ADICIONAIS),
+        tipos=TIPOS_AIH_RD,
+        # adicionar colunas faltantes, com valores vazios
+        colunas_adicionais=DE_PARA_AIH_RD_ADICIONAIS.keys(),
+        tratamentos={"usuario_filhos_quantidade": methodcaller("astype", str)},
+        datas={"%Y%m%d": COLUNAS_DATA_AAAAMMDD},
+        nulos_codificados={
+            "0": [
+                "uti_tipo_id_sihsus",
+                "condicao_secundaria_id_cid10",
+                "estabelecimento_natureza_id_scnes",
+                "estabelecimento_natureza_juridica_id_scnes",
+                "usuario_instrucao_id_sihsus",
+                "condicao_notificacao_id_cid10",
+                "usuario_contraceptivo_principal_id_sihsus",
+                "usuario_contraceptivo_secundario_id_sihsus",
+                "usuario_filhos_quantidade",
+                "usuario_id_pre_natal",
+                "usuario_ocupacao_id_cbo2002",
+                "usuario_atividade_id_cnae",
+                "usuario_vinculo_previdencia_id_sihsus",
+                "autorizacao_gestor_motivo_id_sihsus",
+                "autorizacao_gestor_tipo_id_sihsus",
+                "autorizacao_gestor_id_cpf",
+                "condicao_associada_id_cid10",
+                "condicao_obito_id_cid10",
+                "regra_contratual_id_scnes",
+                "usuario_etnia_id_sus",
+                "condicao_secundaria_1_tipo_id_sihsus",
+                "condicao_secundaria_2_tipo_id_sihsus",
+                "condicao_secundaria_3_tipo_id_sihsus",
+                "condicao_secundaria_4_tipo_id_sihsus",
+                "condicao_secundaria_5_tipo_id_sihsus",
+                "condicao_secundaria_6_tipo_id_sihsus",
+                "condicao_secundaria_7_tipo_id_sihsus",
+                "condicao_secundaria_8_tipo_id_sihsus",
+                "condicao_secundaria_9_tipo_id_sihsus",
+            ],
+        },
+        derivadas={"periodo_data_inicio": _periodo_data_inicio},
+        booleanos=[
+            DecodificacaoBooleanos(
+                colunas=[
+                    "obito",
+                    "exame_vdrl",
+                    "usuario_homonimo",
+                    "gestacao_risco",
+                ],
+                verdadeiros=["1"],
+                falsos=["0"],
+                # valores ausentes ou desconhecidos eram convertidos em
+                # verdadeiros na conversão para o tipo `bool` das colunas
+                indefinidos=True,
+            ),
+        ],
+        descartar=[
+            "processamento_periodo_ano_inicio",
+            "processamento_periodo_mes_inicio",
+        ],
+        coluna_periodo="periodo_data_inicio",
+        coluna_municipio="unidade_geografica_id_sus",
+        colunas_numericas=COLUNAS_NUMERICAS,
+    )
+)
 
 
 def extrair_aih_rd(
     uf_sigla: str,
     periodo_data_inicio: date,
-    passo: int = 10000,
+    passo: int | DimensionadorLotes = 10000,
+    colunas: Iterable[str] | None = None,
 ) -> Generator[pd.DataFrame, None, None]:
     """Extrai autorizações de internações hospitalares do FTP do DataSUS.
 
@@ -310,7 +382,11 @@ def extrair_aih_rd(
         periodo_data_inicio: Dia de início da competência desejada,
             representado como um objeto [`datetime.date`][].
         passo: Número de registros que devem ser convertidos em DataFrame a
-            cada iteração.
+            cada iteração; ou instância de `DimensionadorLotes`, que ajusta o
+            tamanho de cada lote à memória disponível.
+        colunas: Nomes das colunas a serem lidas do arquivo de disseminação.
+            As demais colunas não são decodificadas. Por padrão, todas as
+            colunas são lidas.
 
     Gera:
         A cada iteração, devolve um objeto [`pandas.DataFrames`][] com um
@@ -322,13 +398,14 @@ def extrair_aih_rd(
     """
 
     return extrair_dbc_lotes(
-        ftp="ftp.datasus.gov.br",
+        ftp=DATASUS_FTP,
         caminho_diretorio="/dissemin/publicos/SIHSUS/200801_/Dados",
         arquivo_nome="RD{uf_sigla}{periodo_data_inicio:%y%m}.dbc".format(
             uf_sigla=uf_sigla,
             periodo_data_inicio=periodo_data_inicio,
         ),
         passo=passo,
+        colunas=colunas,
     )
 
 
@@ -354,128 +431,22 @@ def transformar_aih_rd(
         + "ambulatoriais.",
         num_registros_aih_rd=len(aih_rd),
     )
-    logger.debug(
+    logger.opt(lazy=True).debug(
         "Memória ocupada pelo DataFrame original:  {memoria_usada:.2f} mB.",
-        memoria_usada=aih_rd.memory_usage(deep=True).sum() / 10**6,
+        memoria_usada=lambda: aih_rd.memory_usage(deep=True).sum() / 10**6,
     )
 
-    # Junta nomes de colunas e tipos adicionais aos obrigatórios
-    de_para = dict(DE_PARA_AIH_RD, **DE_PARA_AIH_RD_ADICIONAIS)
-
     # corrigir nomes de colunas mal formatados
-    aih_rd = aih_rd.rename_columns(function=lambda col: col.strip().upper())
+    aih_rd = aih_rd.rename(columns=lambda col: col.strip().upper())
 
-    aih_rd_transformada = (
-        aih_rd  # noqa: WPS221  # ignorar linha complexa no pipeline
-        # adicionar colunas faltantes, com valores vazios
-        .add_columns(
-            **{
-                coluna: ""
-                for coluna in DE_PARA_AIH_RD_ADICIONAIS.keys()
-                if not (coluna in aih_rd.columns)
-            }
-        )
-        .rename_columns(de_para)
-        # processar colunas com datas
-        .join_apply(
-            lambda i: pd.Timestamp(
-                int(i["processamento_periodo_ano_inicio"]),
-                int(i["processamento_periodo_mes_inicio"]),
-                1,
-            ),
-            new_column_name="periodo_data_inicio",
-        )
-        .remove_columns(
-            [
-                "processamento_periodo_ano_inicio",
-                "processamento_periodo_mes_inicio",
-            ]
-        )
-        .transform_columns(
-            COLUNAS_DATA_AAAAMMDD,
-            function=lambda dt: de_aaaammdd_para_timestamp(dt, erros="coerce"),
-        )
-        # tratar como NA colunas com valores nulos
-        .replace("", np.nan)
-        .change_type("usuario_filhos_quantidade", str)
-        .transform_columns(
-            [
-                "uti_tipo_id_sihsus",
-                "condicao_secundaria_id_cid10",
-                "estabelecimento_natureza_id_scnes",
-                "estabelecimento_natureza_juridica_id_scnes",
-                "usuario_instrucao_id_sihsus",
-                "condicao_notificacao_id_cid10",
-                "usuario_contraceptivo_principal_id_sihsus",
-                "usuario_contraceptivo_secundario_id_sihsus",
-                "usuario_filhos_quantidade",
-                "usuario_id_pre_natal",
-                "usuario_ocupacao_id_cbo2002",
-                "usuario_atividade_id_cnae",
-                "usuario_vinculo_previdencia_id_sihsus",
-                "autorizacao_gestor_motivo_id_sihsus",
-                "autorizacao_gestor_tipo_id_sihsus",
-                "autorizacao_gestor_id_cpf",
-                "condicao_associada_id_cid10",
-                "condicao_obito_id_cid10",
-                "regra_contratual_id_scnes",
-                "usuario_etnia_id_sus",
-                "condicao_secundaria_1_tipo_id_sihsus",
-                "condicao_secundaria_2_tipo_id_sihsus",
-                "condicao_secundaria_3_tipo_id_sihsus",
-                "condicao_secundaria_4_tipo_id_sihsus",
-                "condicao_secundaria_5_tipo_id_sihsus",
-                "condicao_secundaria_6_tipo_id_sihsus",
-                "condicao_secundaria_7_tipo_id_sihsus",
-                "condicao_secundaria_8_tipo_id_sihsus",
-                "condicao_secundaria_9_tipo_id_sihsus",
-            ],
-            function=lambda elemento: (
-                np.nan
-                if pd.notna(elemento)
-                and all(digito == "0" for digito in elemento)
-                else elemento
-            ),
-        )
-        # processar colunas lógicas
-        .transform_columns(
-            [
-                "obito",
-                "exame_vdrl",
-                "usuario_homonimo",
-                "gestacao_risco",
-            ],
-            function=_para_booleano,
-        )
-        # adicionar id
-        .add_column("id", str())
-        .transform_column("id", function=lambda _: uuid7().hex)
-        # adicionar id do periodo
-        .transform_column(
-            "periodo_data_inicio",
-            function=lambda dt: periodo_por_data(sessao=sessao, data=dt).id,
-            dest_column_name="periodo_id",
-        )
-        # adicionar id da unidade geografica
-        .transform_column(
-            "unidade_geografica_id_sus",
-            function=lambda id_sus: id_sus_para_id_impulso(
-                sessao=sessao,
-                id_sus=id_sus,
-            ),
-            dest_column_name="unidade_geografica_id",
-        )
-        # adicionar datas de inserção e atualização
-        .add_column("criacao_data", agora_gmt_menos3())
-        .add_column("atualizacao_data", agora_gmt_menos3())
-        # garantir tipos
-        # HACK: ver https://github.com/pandas-dev/pandas/issues/25472
-        .astype({col: "float" for col in COLUNAS_NUMERICAS})
-        .astype(TIPOS_AIH_RD)
+    aih_rd_transformada = aplicar_especificacao(
+        aih_rd,
+        especificacao=ESPECIFICACAO_AIH_RD,
+        sessao=sessao,
     )
-    logger.debug(
+    logger.opt(lazy=True).debug(
         "Memória ocupada pelo DataFrame transformado: {memoria_usada:.2f} mB.",
-        memoria_usada=(
+        memoria_usada=lambda: (
             aih_rd_transformada.memory_usage(deep=True).sum() / 10**6
         ),
     )
@@ -517,9 +488,15 @@ def obter_aih_rd(
             adicionadas à uma transação, e podem ser revertidas com uma chamada
             posterior ao método [`Session.rollback()`][] da sessão gerada com o
             SQLAlchemy.
+        \\*\\*kwargs: Parâmetros adicionais definidos no agendamento da
+            captura. Atualmente, apenas o parâmetro `arrow` (do tipo `bool`),
+            repassado à função [`carregar_dataframe()`][], que indica se os
+            registros devem ser convertidos em tabelas Arrow antes do
+            carregamento.
 
     [`sqlalchemy.orm.session.Session`]: https://docs.sqlalchemy.org/en/14/orm/session_api.html#sqlalchemy.orm.Session
     [`sqlalchemy.engine.Row`]: https://docs.sqlalchemy.org/en/14/core/connections.html#sqlalchemy.engine.Row
+    [`carregar_dataframe()`]: impulsoetl.utilitarios.bd.carregar_dataframe
     """
     habilitar_suporte_loguru()
     logger.info(
@@ -530,27 +507,31 @@ def obter_aih_rd(
     )
 
     # obter tamanho do lote de processamento
-    passo = int(os.getenv("IMPULSOETL_LOTE_TAMANHO", 100000))
+    passo = DimensionadorLotes.do_ambiente(
+        lotes_simultaneos=ESTEIRA_LOTES_SIMULTANEOS,
+    )
 
     aih_rd_lotes = extrair_aih_rd(
         uf_sigla=uf_sigla,
         periodo_data_inicio=periodo_data_inicio,
         passo=passo,
+        colunas=[*DE_PARA_AIH_RD.keys(), *DE_PARA_AIH_RD_ADICIONAIS.keys()],
     )
 
     contador = 0
-    for aih_rd_lote in aih_rd_lotes:
-        aih_rd_transformada = transformar_aih_rd(
-            sessao=sessao,
-            aih_rd=aih_rd_lote,
-        )
-
+    for aih_rd_lote, aih_rd_transformada in processar_em_esteira(
+        sessao=sessao,
+        lotes=aih_rd_lotes,
+        transformar=transformar_aih_rd,
+        dimensionador=passo,
+    ):
         carregamento_status = carregar_dataframe(
             sessao=sessao,
             df=aih_rd_transformada,
             tabela_destino=tabela_destino,
             passo=None,
             teste=teste,
+            arrow=kwargs.get("arrow", False),
         )
         if carregamento_status != 0:
             raise RuntimeError(
@@ -6,26 +6,36 @@
 """Obtém dados dos arquivos de disseminação das Declarações de Óbito (DOs)."""
 
 
-import os
 import re
 from datetime import date
-from typing import Final, Generator
+from functools import partial
+from typing import Final, Generator, Iterable
 
-import janitor  # noqa: F401  # nopycln: import
 import numpy as np
 import pandas as pd
 from frozendict import frozendict
 from prefect import flow, task
 from sqlalchemy.orm import Session
-from uuid6 import uuid7
 
 from impulsoetl import __VERSION__
-from impulsoetl.comum.condicoes_saude import e_cid10, remover_ponto_cid10
-from impulsoetl.comum.datas import agora_gmt_menos3
-from impulsoetl.comum.geografias import id_sim_para_id_impulso
+from impulsoetl.comum.condicoes_saude import listar_cids10
+from impulsoetl.comum.transformacoes import (
+    DecodificacaoBooleanos,
+    EspecificacaoTransformacao,
+    aplicar_especificacao,
+    por_valor_distinto,
+)
 from impulsoetl.loggers import habilitar_suporte_loguru, logger
 from impulsoetl.utilitarios.bd import carregar_dataframe
-from impulsoetl.utilitarios.datasus_ftp import extrair_dbc_lotes
+from impulsoetl.utilitarios.datasus_ftp import (
+    DATASUS_FTP,
+    extrair_dbc_lotes,
+)
+from impulsoetl.utilitarios.esteira import (
+    ESTEIRA_LOTES_SIMULTANEOS,
+    processar_em_esteira,
+)
+from impulsoetl.utilitarios.lotes import DimensionadorLotes
 
 DE_PARA_DO: Final[frozendict] = frozendict(
     {
@@ -276,20 +286,174 @@ COLUNAS_INTERVALOS: Final[list[str]] = [
 ]
 
 
-def _para_booleano(valor: str) -> bool | float:
-    """Transforma um valor binário '0' ou '1' em booleano. Suporta NaNs."""
-    if valor == "1":
-        return True
-    elif valor == "2":
-        return False
-    else:
-        return np.nan
+def _corrigir_espacos(texto: str) -> str | float:
+    # corrigir datas e horas com dígito 0 substituído por espaço
+    return texto.replace(" ", "0") if pd.notna(texto) else texto
+
+
+def _formatar_hora(hora: str) -> str | float:
+    hora = _corrigir_espacos(hora)
+    # TODO: Corrigir hora > 24
+    if re.match(r"([01][0-9]|2[0-3])[0-5][0-9]", hora):
+        return hora[:2] + ":" + hora[2:4]
+    return np.nan
+
+
+def _transformar_intervalo(intervalo: str) -> str | float:
+    return str(int(intervalo)) + " days" if intervalo else np.nan
+
+
+def _remover_marcadores(cids: str) -> str | float:
+    return cids.strip("*/ ") if pd.notna(cids) else cids
+
+
+def _truncar_municipio(id_ibge_ou_sus: str) -> str | float:
+    # antes de 2008, alguns campos utilizavam identificadores de municípios
+    # do IBGE (7 dígitos); depois passaram a usar identificadores SUS (6
+    # dígitos)
+    if id_ibge_ou_sus:
+        return id_ibge_ou_sus[0 : min(6, len(id_ibge_ou_sus))]
+    return np.nan
+
+
+ESPECIFICACAO_DO: Final[EspecificacaoTransformacao] = (
+    EspecificacaoTransformacao(
+        # junta nomes de colunas e tipos adicionais aos obrigatórios
+        de_para=dict(DE_PARA_DO, **DE_PARA_DO_ADICIONAIS),
+        tipos=dict(TIPOS_DO, **TIPOS_DO_ADICIONAIS),
+        # adicionar colunas faltantes, com valores vazios
+        colunas_adicionais=DE_PARA_DO_ADICIONAIS.keys(),
+        tratamentos={
+            **{
+                coluna: por_valor_distinto(_corrigir_espacos)
+                for coluna in COLUNAS_DATA_DDMMAAAA
+            },
+            "ocorrencia_hora": por_valor_distinto(_formatar_hora),
+            # processar colunas com intervalos
+            **{
+                coluna: por_valor_distinto(_transformar_intervalo)
+                for coluna in COLUNAS_INTERVALOS
+            },
+            # processar colunas com CIDs
+            **{
+                coluna: por_valor_distinto(_remover_marcadores)
+                for coluna in (
+                    "causa_basica_resselecao_apos_id_cid10",
+                    "causa_basica_resselecao_antes_localidade_id_cid10",
+                    "causa_externa_id_cid10",
+                )
+            },
+            **{
+                coluna: listar_cids10
+                for coluna in (
+                    "condicoes_terminais_ids_cid10",
+                    "condicoes_antecedentes_consequenciais_1_ids_cid10",
+                    "condicoes_antecedentes_consequenciais_2_ids_cid10",
+                    "condicoes_basicas_ids_cid10",
+                    "condicoes_contribuintes_ids_cid10",
+                )
+            },
+            # processar identificadores que podem ser IBGE ou SUS
+            **{
+                coluna: por_valor_distinto(_truncar_municipio)
+                for coluna in (
+                    "svo_iml_municipio_id_sim",
+                    "unidade_geografica_id_sim",
+                    "usuario_nascimento_municipio_id_sim",
+                    "usuario_residencia_municipio_id_sim",
+                    "cartorio_municipio_id_sim",
+                )
+            },
+        },
+        datas={"%d%m%Y": COLUNAS_DATA_DDMMAAAA},  # noqa: WPS323
+        nulos_codificados={
+            "0": [
+                "origem_id_sim",
+                "tipo_id_sim",
+                "ocorrencia_hora",
+                "usuario_nascimento_pais_uf_id_sus",
+                "usuario_nascimento_municipio_id_sim",
+                "usuario_sexo_id_sim",
+                "usuario_raca_cor_id_sim",
+                "usuario_estado_civil_id_sim",
+                "usuario_escolaridade_id_sim1996",
+                "usuario_escolaridade_serie",
+                "usuario_ocupacao_id_cbo2002",
+                "usuario_residencia_municipio_id_sim",
+                "local_ocorrencia_id_sim",
+                "estabelecimento_id_scnes",
+                "_nao_documentado_estabdescr",
+                "unidade_geografica_id_sim",
+                "mae_escolaridade_id_sim1996",
+                "mae_escolaridade_serie",
+                "mae_ocupacao_id_cbo2002",
+                "gestacao_tipo_id_sim",
+                "gestacao_semanas_id_sim",
+                "parto_tipo_id_sim",
+                "parto_relacao_id_sim",
+                "gestacao_situacao_id_sim2012",
+                "causa_basica_resselecao_apos_id_cid10",
+                "causa_basica_resselecao_antes_localidade_id_cid10",
+                "svo_iml_municipio_id_sim",
+                "circunstancia_id_sim",
+                "circunstancia_fonte_id_sim",
+                "lote_id_sim",
+                "causa_basica_resselecao_antes_id_cid10",
+                "atestado_atestante_tipo_id_sim",
+                "sistema_versao",
+                "causa_basica_seletor_versao",
+                "investigacao_fonte_id_sim",
+                "atestado_condicoes_ids_cid10",
+                "causa_externa_id_cid10",
+                "gestacao_situacao_id_sim2009",
+                "fontes_combinacao_id_sim",
+                "investigacao_desfecho_id_sim",
+                "investigacao_esfera_id_sim",
+                "cartorio_municipio_id_sim",
+            ],
+        },
+        booleanos=[
+            DecodificacaoBooleanos(
+                colunas=["sistema_instalacao_codificadora"],
+                verdadeiros=["S"],
+            ),
+            DecodificacaoBooleanos(
+                colunas=[
+                    "declaracao_modelo_epidemiologica",
+                    "declaracao_modelo_novo",
+                ],
+                verdadeiros=["1"],
+            ),
+            DecodificacaoBooleanos(
+                colunas=[
+                    "gestacao_relacao",
+                    "puerperio_relacao",
+                    "assistencia_medica_recebeu",
+                    "exame_realizou",
+                    "cirurgia_realizou",
+                    "necropsia_realizou",
+                    "acidente_trabalho",
+                    "investigacao_houve",
+                    "declaracao_codificada",
+                    "investigacao_gerou_alteracao",
+                ],
+                verdadeiros=["1"],
+                falsos=["2"],
+            ),
+        ],
+        coluna_municipio="unidade_geografica_id_sim",
+        sistema_municipio="sim",
+        colunas_numericas=COLUNAS_NUMERICAS,
+    )
+)
 
 
 def extrair_do(
     uf_sigla: str,
     periodo_data_inicio: date,
-    passo: int = 10000,
+    passo: int | DimensionadorLotes = 10000,
+    colunas: Iterable[str] | None = None,
+    condicoes: str | None = None,
 ) -> Generator[pd.DataFrame, None, None]:
     """Extrai registros de Declarações de Óbito do FTP do DataSUS.
 
@@ -299,24 +463,40 @@ def extrair_do(
         periodo_data_inicio: Dia de início da competência desejada,
             representado como um objeto [`datetime.date`][].
         passo: Número de registros que devem ser convertidos em DataFrame a
-            cada iteração.
+            cada iteração; ou instância de `DimensionadorLotes`, que ajusta o
+            tamanho de cada lote à memória disponível.
+        colunas: Nomes das colunas a serem lidas do arquivo de disseminação.
+            As demais colunas não são decodificadas. Por padrão, todas as
+            colunas são lidas.
+        condicoes: conjunto opcional de condições a serem aplicadas para
+            filtrar os registros obtidos da fonte, com a sintaxe utilizada pelo
+            método [`pandas.DataFrame.query()`][]. As condições são avaliadas
+            durante a leitura do arquivo, de modo que os registros descartados
+            nunca chegam a ser convertidos em DataFrame. Os nomes, os tipos e
+            os valores dos campos devem ser considerados exatamente como
+            registrados no arquivo de disseminação. Verifique a [estrutura dos
+            arquivos][estrutura-sim] para mais informações.
 
     Gera:
         A cada iteração, devolve um objeto [`pandas.DataFrames`][] com um
         trecho do arquivo de procedimentos ambulatoriais lido e convertido.
 
     [`pandas.DataFrame`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.html
+    [`pandas.DataFrame.query()`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.query.html
     [`datetime.date`]: https://docs.python.org/3/library/datetime.html#date-objects
+    [estrutura-sim]: https://drive.google.com/file/d/1CoRX_l-h7weaRv16RHDa_4wenrZW6jD5/view?usp=sharing
     """
 
     return extrair_dbc_lotes(
-        ftp="ftp.datasus.gov.br",
+        ftp=DATASUS_FTP,
         caminho_diretorio="/dissemin/publicos/SIM/CID10/DORES/",
         arquivo_nome="DO{uf_sigla}{periodo_data_inicio:%Y}.dbc".format(
             uf_sigla=uf_sigla,
             periodo_data_inicio=periodo_data_inicio,
         ),
         passo=passo,
+        colunas=colunas,
+        condicoes=condicoes,
     )
 
 
@@ -335,7 +515,6 @@ def transformar_do(
     sessao: Session,
     do: pd.DataFrame,
     periodo_id: str,
-    condicoes: str | None = None,
 ) -> pd.DataFrame:
     """Transforma um `DataFrame` de Declarações de Óbito obtidos do DataSUS.
 
@@ -345,269 +524,34 @@ def transformar_do(
         do: objeto [`pandas.DataFrame`][] contendo os dados de um arquivo de
             disseminação de Declarações de Óbito, conforme extraídos para uma
             unidade federativa e competência (mês) pela função [`extrair_do()`][].
-        condicoes: conjunto opcional de condições a serem aplicadas para
-            filtrar os registros obtidos da fonte. O valor informado deve ser
-            uma *string* com a sintaxe utilizada pelo método
-            [`pandas.DataFrame.query()`][]. Por padrão, o valor do argumento é
-            `None`, o que equivale a não aplicar filtro algum.
-
-    Note:
-        Para otimizar a performance, os filtros são aplicados antes de qualquer
-        outra transformação nos dados, de forma que as condições fornecidas
-        devem considerar que o nome, os tipos e os valores aparecem exatamente
-        como registrados no arquivo de disseminação disponibilizado no FTP
-        público do DataSUS. Verifique o [Informe Técnico][it-sim] para mais
-        informações.
 
     [`sqlalchemy.orm.session.Session`]: https://docs.sqlalchemy.org/en/14/orm/session_api.html#sqlalchemy.orm.Session
     [`pandas.DataFrame`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.html
     [`extrair_do()`]: impulsoetl.sim.do.extrair_do
-    [`pandas.DataFrame.query()`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.query.html
-    [estrutura-sim]: https://drive.google.com/file/d/1CoRX_l-h7weaRv16RHDa_4wenrZW6jD5/view?usp=sharing
     """
     habilitar_suporte_loguru()
     logger.info(
         "Transformando DataFrame com {num_registros_do} Declarações de Óbito.",
         num_registros_do=len(do),
     )
-    logger.debug(
+    logger.opt(lazy=True).debug(
         "Memória ocupada pelo DataFrame original:  {memoria_usada:.2f} mB.",
-        memoria_usada=do.memory_usage(deep=True).sum() / 10**6,
+        memoria_usada=lambda: do.memory_usage(deep=True).sum() / 10**6,
     )
 
-    # aplica condições de filtragem dos registros
-    if condicoes:
-        do = do.query(condicoes, engine="python")
-        logger.info(
-            "Registros após aplicar condições de filtragem: {num_registros}.",
-            num_registros=len(do),
-        )
-
-    # Junta nomes de colunas e tipos adicionais aos obrigatórios
-    de_para = dict(DE_PARA_DO, **DE_PARA_DO_ADICIONAIS)
-    tipos = dict(TIPOS_DO, **TIPOS_DO_ADICIONAIS)
-
     # corrigir nomes de colunas mal formatados
-    do = do.rename_columns(function=lambda col: col.strip().upper())
+    do = do.rename(columns=lambda col: col.strip().upper())
 
-    do_transformada = (
-        do  # noqa: WPS221  # ignorar linha complexa no pipeline
-        # adicionar colunas faltantes, com valores vazios
-        .add_columns(
-            **{
-                coluna: ""
-                for coluna in DE_PARA_DO_ADICIONAIS.keys()
-                if not (coluna in do.columns)
-            }
-        )
-        # renomear colunas
-        .rename_columns(de_para)
-        # processar colunas com datas
-        .transform_columns(
-            # corrigir datas com dígito 0 substituído por espaço
-            COLUNAS_DATA_DDMMAAAA + ["ocorrencia_hora"],
-            function=lambda dt: dt.replace(" ", "0"),
-        )
-        .transform_columns(
-            COLUNAS_DATA_DDMMAAAA,
-            function=lambda dt: pd.to_datetime(
-                dt,
-                format="%d%m%Y",  # noqa: WPS323
-                errors="coerce",
-            ),
-        )
-        .transform_column(
-            "ocorrencia_hora",
-            function=lambda hora: (
-                # TODO: Corrigir hora > 24
-                hora[:2] + ":" + hora[2:4]
-                if re.match(r"([01][0-9]|2[0-3])[0-5][0-9]", hora)
-                else np.nan
-            ),
-        )
-        # processar colunas com intervalos
-        .transform_columns(
-            COLUNAS_INTERVALOS,
-            function=lambda intervalo: (
-                str(int(intervalo)) + " days" if intervalo else np.nan
-            ),
-        )
-        # processar colunas lógicas
-        .transform_column(
-            "sistema_instalacao_codificadora",
-            function=lambda elemento: True if elemento == "S" else False,
-        )
-        .transform_columns(
-            [
-                "declaracao_modelo_epidemiologica",
-                "declaracao_modelo_novo",
-            ],
-            function=lambda elemento: True if elemento == "1" else False,
-        )
-        .transform_columns(
-            [
-                "gestacao_relacao",
-                "puerperio_relacao",
-                "assistencia_medica_recebeu",
-                "exame_realizou",
-                "cirurgia_realizou",
-                "necropsia_realizou",
-                "acidente_trabalho",
-                "investigacao_houve",
-                "declaracao_codificada",
-                "investigacao_gerou_alteracao",
-            ],
-            function=_para_booleano,
-        )
-        # processar colunas com CIDs
-        .transform_columns(
-            [
-                "condicoes_terminais_ids_cid10",
-                "condicoes_antecedentes_consequenciais_1_ids_cid10",
-                "condicoes_antecedentes_consequenciais_2_ids_cid10",
-                "condicoes_basicas_ids_cid10",
-                "condicoes_contribuintes_ids_cid10",
-                "causa_basica_resselecao_apos_id_cid10",
-                "causa_basica_resselecao_antes_localidade_id_cid10",
-                "causa_externa_id_cid10",
-            ],
-            function=lambda cids: cids.strip("*/ "),
-        )
-        .transform_columns(
-            [
-                "condicoes_terminais_ids_cid10",
-                "condicoes_antecedentes_consequenciais_1_ids_cid10",
-                "condicoes_antecedentes_consequenciais_2_ids_cid10",
-                "condicoes_basicas_ids_cid10",
-                "condicoes_contribuintes_ids_cid10",
-            ],
-            function=remover_ponto_cid10,
-        )
-        .transform_columns(
-            [
-                "condicoes_terminais_ids_cid10",
-                "condicoes_antecedentes_consequenciais_1_ids_cid10",
-                "condicoes_antecedentes_consequenciais_2_ids_cid10",
-                "condicoes_basicas_ids_cid10",
-                "condicoes_contribuintes_ids_cid10",
-            ],
-            function=lambda cids: (
-                "{"
-                + ",".join(
-                    [
-                        cid
-                        for cid in re.split("[^a-zA-Z0-9]", cids)
-                        if e_cid10(
-                            cid
-                        )  # remove texto que não é um CID10 válido
-                    ]
-                )
-                + "}"
-            ),
-        )
-        # Processar identificadores que podem ser IBGE ou SUS - antes de 2008,
-        # alguns desses campos utilizavam identificadores de municípios do
-        # IBGE (7 dígitos); depois passaram a usar identificadores SUS (6
-        # dígitos).
-        .transform_columns(
-            [
-                "svo_iml_municipio_id_sim",
-                "unidade_geografica_id_sim",
-                "usuario_nascimento_municipio_id_sim",
-                "usuario_residencia_municipio_id_sim",
-                "cartorio_municipio_id_sim",
-            ],
-            function=lambda id_ibge_ou_sus: (
-                id_ibge_ou_sus[0 : min(6, len(id_ibge_ou_sus))]
-                if id_ibge_ou_sus
-                else np.nan
-            ),
-        )
-        # tratar como NA colunas com valores nulos
-        .replace("", np.nan)
-        .transform_columns(
-            [
-                "origem_id_sim",
-                "tipo_id_sim",
-                "ocorrencia_hora",
-                "usuario_nascimento_pais_uf_id_sus",
-                "usuario_nascimento_municipio_id_sim",
-                "usuario_sexo_id_sim",
-                "usuario_raca_cor_id_sim",
-                "usuario_estado_civil_id_sim",
-                "usuario_escolaridade_id_sim1996",
-                "usuario_escolaridade_serie",
-                "usuario_ocupacao_id_cbo2002",
-                "usuario_residencia_municipio_id_sim",
-                "local_ocorrencia_id_sim",
-                "estabelecimento_id_scnes",
-                "_nao_documentado_estabdescr",
-                "unidade_geografica_id_sim",
-                "mae_escolaridade_id_sim1996",
-                "mae_escolaridade_serie",
-                "mae_ocupacao_id_cbo2002",
-                "gestacao_tipo_id_sim",
-                "gestacao_semanas_id_sim",
-                "parto_tipo_id_sim",
-                "parto_relacao_id_sim",
-                "gestacao_situacao_id_sim2012",
-                "causa_basica_resselecao_apos_id_cid10",
-                "causa_basica_resselecao_antes_localidade_id_cid10",
-                "svo_iml_municipio_id_sim",
-                "circunstancia_id_sim",
-                "circunstancia_fonte_id_sim",
-                "lote_id_sim",
-                "causa_basica_resselecao_antes_id_cid10",
-                "atestado_atestante_tipo_id_sim",
-                "sistema_versao",
-                "causa_basica_seletor_versao",
-                "investigacao_fonte_id_sim",
-                "atestado_condicoes_ids_cid10",
-                "causa_externa_id_cid10",
-                "gestacao_situacao_id_sim2009",
-                "fontes_combinacao_id_sim",
-                "investigacao_desfecho_id_sim",
-                "investigacao_esfera_id_sim",
-                "cartorio_municipio_id_sim",
-            ],
-            function=lambda elemento: (
-                np.nan
-                if (
-                    pd.notna(elemento)
-                    and all(digito == "0" for digito in elemento)
-                )
-                else elemento
-            ),
-        )
-        # adicionar id
-        .add_column("id", str())
-        .transform_column("id", function=lambda _: uuid7().hex)
-        # adicionar id do periodo
-        .assign(periodo_id=periodo_id)
-        # adicionar id da unidade geografica
-        .transform_column(
-            "unidade_geografica_id_sim",
-            function=lambda id_sim: id_sim_para_id_impulso(
-                sessao=sessao,
-                id_sim=id_sim,
-            ),
-            dest_column_name="unidade_geografica_id",
-        )
-        # adicionar datas de inserção e atualização
-        .add_column("criacao_data", agora_gmt_menos3())
-        .add_column("atualizacao_data", agora_gmt_menos3())
-        # garantir tipos
-        .change_type(
-            # HACK: ver https://github.com/pandas-dev/pandas/issues/25472
-            COLUNAS_NUMERICAS,
-            "float",
-        )
-        .astype(tipos)
+    do_transformada = aplicar_especificacao(
+        do,
+        especificacao=ESPECIFICACAO_DO,
+        sessao=sessao,
+        periodo_id=periodo_id,
     )
 
-    logger.debug(
+    logger.opt(lazy=True).debug(
         "Memória ocupada pelo DataFrame transformado: {memoria_usada:.2f} mB.",
-        memoria_usada=(
+        memoria_usada=lambda: (
             do_transformada.memory_usage(deep=True).sum() / 10**6
         ),
     )
@@ -654,14 +598,18 @@ def obter_do(
             posterior ao método [`Session.rollback()`][] da sessão gerada com o
             SQLAlchemy.
         \\*\\*kwargs: Parâmetros adicionais definidos no agendamento da
-            captura. Atualmente, apenas o parâmetro `condicoes` (do tipo `str`)
-            é aceito, e repassado como argumento na função
-            [`transformar_do()`][].
+            captura. São aceitos o parâmetro `condicoes` (do tipo `str`),
+            repassado como argumento na função [`extrair_do()`][], que aplica
+            as condições durante a leitura do arquivo; e o parâmetro `arrow`
+            (do tipo `bool`), repassado à função [`carregar_dataframe()`][],
+            que indica se os registros devem ser convertidos em tabelas Arrow
+            antes do carregamento.
 
     [`sqlalchemy.orm.session.Session`]: https://docs.sqlalchemy.org/en/14/orm/session_api.html#sqlalchemy.orm.Session
     [`sqlalchemy.engine.Row`]: https://docs.sqlalchemy.org/en/14/core/connections.html#sqlalchemy.engine.Row
     [`datetime.date`]: https://docs.python.org/3/library/datetime.html#date-objects
-    [`transformar_do()`]: impulsoetl.sim.do.transformar_do
+    [`extrair_do()`]: impulsoetl.sim.do.extrair_do
+    [`carregar_dataframe()`]: impulsoetl.utilitarios.bd.carregar_dataframe
     """
     habilitar_suporte_loguru()
     logger.info(
@@ -672,29 +620,32 @@ def obter_do(
     )
 
     # obter tamanho do lote de processamento
-    passo = int(os.getenv("IMPULSOETL_LOTE_TAMANHO", 100000))
+    passo = DimensionadorLotes.do_ambiente(
+        lotes_simultaneos=ESTEIRA_LOTES_SIMULTANEOS,
+    )
 
     do_lotes = extrair_do(
         uf_sigla=uf_sigla,
         periodo_data_inicio=periodo_data_inicio,
         passo=passo,
+        colunas=[*DE_PARA_DO.keys(), *DE_PARA_DO_ADICIONAIS.keys()],
+        condicoes=kwargs.get("condicoes"),
     )
 
     contador = 0
-    for do_lote in do_lotes:
-        do_transformada = transformar_do(
-            sessao=sessao,
-            do=do_lote,
-            periodo_id=periodo_id,
-            condicoes=kwargs.get("condicoes"),
-        )
-
+    for do_lote, do_transformada in processar_em_esteira(
+        sessao=sessao,
+        lotes=do_lotes,
+        transformar=partial(transformar_do, periodo_id=periodo_id),
+        dimensionador=passo,
+    ):
         carregamento_status = carregar_dataframe(
             sessao=sessao,
             df=do_transformada,
             tabela_destino=tabela_destino,
             passo=None,
             teste=teste,
+            arrow=kwargs.get("arrow", False),
         )
         if carregamento_status != 0:
             raise RuntimeError(
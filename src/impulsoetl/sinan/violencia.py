@@ -6,28 +6,38 @@
 """Obtém notificações de agravos de violência interpessoal ou autoprovocada."""
 
 
-import os
 import re
 from datetime import date
+from functools import partial
 from ftplib import error_perm
-from typing import Final, Generator
+from typing import Final, Generator, Iterable, Mapping
 from urllib.error import URLError
 
-import janitor  # noqa: F401  # nopycln: import
 import numpy as np
 import pandas as pd
 from frozendict import frozendict
 from prefect import flow, task
 from sqlalchemy.orm import Session
-from uuid6 import uuid7
 
 from impulsoetl import __VERSION__
 from impulsoetl.comum.condicoes_saude import remover_ponto_cid10
-from impulsoetl.comum.datas import agora_gmt_menos3
-from impulsoetl.comum.geografias import id_sim_para_id_impulso
+from impulsoetl.comum.transformacoes import (
+    DecodificacaoBooleanos,
+    EspecificacaoTransformacao,
+    aplicar_especificacao,
+    por_valor_distinto,
+)
 from impulsoetl.loggers import habilitar_suporte_loguru, logger
 from impulsoetl.utilitarios.bd import carregar_dataframe
-from impulsoetl.utilitarios.datasus_ftp import extrair_dbc_lotes
+from impulsoetl.utilitarios.datasus_ftp import (
+    DATASUS_FTP,
+    extrair_dbc_lotes,
+)
+from impulsoetl.utilitarios.esteira import (
+    ESTEIRA_LOTES_SIMULTANEOS,
+    processar_em_esteira,
+)
+from impulsoetl.utilitarios.lotes import DimensionadorLotes
 
 DE_PARA_AGRAVOS_VIOLENCIA: Final[frozendict] = frozendict(
     {
@@ -411,19 +421,62 @@ COLUNAS_BOOLEANAS: Final[list[str]] = [
 ]
 
 
-def _para_booleano(valor: str) -> bool | float:
-    """Transforma um valor binário '1' ou '2' em booleano. Suporta NaNs."""
-    if valor == "1":
-        return True
-    elif valor == "2":
-        return False
-    else:
-        return np.nan
+def _formatar_hora(hora: str) -> str | float:
+    # TODO: Corrigir hora > 24
+    if re.match(r"([01][0-9]|2[0-3])[0-5][0-9]", hora):
+        return hora[:2] + ":" + hora[2:4]
+    return np.nan
+
+
+def _completar_idade(colunas: Mapping[str, pd.Series]) -> pd.Series:
+    # corrigir leitura de coluna de códigos de idade
+    return por_valor_distinto(
+        lambda cod: str(int(cod)).zfill(4) if pd.notna(cod) else pd.NA,
+    )(colunas["usuario_idade_id_sinan"])
+
+
+ESPECIFICACAO_AGRAVOS_VIOLENCIA: Final[EspecificacaoTransformacao] = (
+    EspecificacaoTransformacao(
+        # junta nomes de colunas adicionais aos obrigatórios
+        de_para=dict(
+            DE_PARA_AGRAVOS_VIOLENCIA,
+            **DE_PARA_AGRAVOS_VIOLENCIA_ADICIONAIS,
+        ),
+        tipos=TIPOS_AGRAVOS_VIOLENCIA,
+        # adicionar colunas faltantes, com valores vazios
+        colunas_adicionais=DE_PARA_AGRAVOS_VIOLENCIA_ADICIONAIS.keys(),
+        tratamentos={
+            "ocorrencia_hora": por_valor_distinto(_formatar_hora),
+            # processar colunas com CIDs
+            "condicao_principal_id_cid10": por_valor_distinto(
+                remover_ponto_cid10,
+            ),
+            "circunstancia_id_cid10": por_valor_distinto(remover_ponto_cid10),
+        },
+        datas={"%Y-%m-%d": COLUNAS_DATA},  # noqa: WPS323
+        derivadas={"usuario_idade_id_sinan": _completar_idade},
+        booleanos=[
+            DecodificacaoBooleanos(
+                colunas=COLUNAS_BOOLEANAS,
+                verdadeiros=["1"],
+                falsos=["2"],
+                # valores ausentes ou desconhecidos eram convertidos em
+                # verdadeiros na conversão para o tipo `bool` das colunas
+                indefinidos=True,
+            ),
+        ],
+        coluna_municipio="notificacao_municipio_id_sus",
+        sistema_municipio="sim",
+        colunas_numericas=COLUNAS_NUMERICAS,
+    )
+)
 
 
 def extrair_agravos_violencia(
     periodo_data_inicio: date,
-    passo: int = 100000,
+    passo: int | DimensionadorLotes = 100000,
+    colunas: Iterable[str] | None = None,
+    condicoes: str | None = None,
 ) -> Generator[pd.DataFrame, None, None]:
     """Extrai registros de notificações de agravo de violências do SINAN.
 
@@ -431,34 +484,52 @@ def extrair_agravos_violencia(
         periodo_data_inicio: Dia de início da competência desejada,
             representado como um objeto [`datetime.date`][].
         passo: Número de registros que devem ser convertidos em DataFrame a
-            cada iteração.
+            cada iteração; ou instância de `DimensionadorLotes`, que ajusta o
+            tamanho de cada lote à memória disponível.
+        colunas: Nomes das colunas a serem lidas do arquivo de disseminação.
+            As demais colunas não são decodificadas. Por padrão, todas as
+            colunas são lidas.
+        condicoes: conjunto opcional de condições a serem aplicadas para
+            filtrar os registros obtidos da fonte, com a sintaxe utilizada pelo
+            método [`pandas.DataFrame.query()`][]. As condições são avaliadas
+            durante a leitura do arquivo, de modo que os registros descartados
+            nunca chegam a ser convertidos em DataFrame. Os nomes, os tipos e
+            os valores dos campos devem ser considerados exatamente como
+            registrados no arquivo de disseminação. Verifique a [estrutura dos
+            arquivos][estrutura-sinan] para mais informações.
 
     Gera:
         A cada iteração, devolve um objeto [`pandas.DataFrames`][] com um
         trecho do arquivo de procedimentos ambulatoriais lido e convertido.
 
     [`pandas.DataFrame`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.html
+    [`pandas.DataFrame.query()`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.query.html
     [`datetime.date`]: https://docs.python.org/3/library/datetime.html#date-objects
+    [estrutura-sinan]: https://drive.google.com/file/d/18El-e7gTYa5iBpWIRiSSRiyCq0r-xgDN/view?usp=sharing
     """
 
     try:
         yield from extrair_dbc_lotes(
-            ftp="ftp.datasus.gov.br",
+            ftp=DATASUS_FTP,
             caminho_diretorio="/dissemin/publicos/SINAN/DADOS/FINAIS/",
             arquivo_nome="VIOLBR{periodo_data_inicio:%y}.dbc".format(
                 periodo_data_inicio=periodo_data_inicio,
             ),
             passo=passo,
+            colunas=colunas,
+            condicoes=condicoes,
         )
     except (error_perm, URLError):
         logger.info("Buscando no diretório de arquivos preliminares...")
         yield from extrair_dbc_lotes(
-            ftp="ftp.datasus.gov.br",
+            ftp=DATASUS_FTP,
             caminho_diretorio="/dissemin/publicos/SINAN/DADOS/PRELIM/",
             arquivo_nome="VIOLBR{periodo_data_inicio:%y}.dbc".format(
                 periodo_data_inicio=periodo_data_inicio,
             ),
             passo=passo,
+            colunas=colunas,
+            condicoes=condicoes,
         )
 
 
@@ -477,7 +548,6 @@ def transformar_agravos_violencia(
     sessao: Session,
     agravos_violencia: pd.DataFrame,
     periodo_id: str,
-    condicoes: str | None = None,
 ) -> pd.DataFrame:
     """Transforma um `DataFrame` de notificações de violência do SINAN.
 
@@ -491,25 +561,10 @@ def transformar_agravos_violencia(
         periodo_id: Identificador único do período de referência do arquivo
             de disseminação no banco de dados da Impulso Gov, a ser
             acrescentado no DataFrame transformado.
-        condicoes: conjunto opcional de condições a serem aplicadas para
-            filtrar os registros obtidos da fonte. O valor informado deve ser
-            uma *string* com a sintaxe utilizada pelo método
-            [`pandas.DataFrame.query()`][]. Por padrão, o valor do argumento é
-            `None`, o que equivale a não aplicar filtro algum.
-
-    Note:
-        Para otimizar a performance, os filtros são aplicados antes de qualquer
-        outra transformação nos dados, de forma que as condições fornecidas
-        devem considerar que o nome, os tipos e os valores aparecem exatamente
-        como registrados no arquivo de disseminação disponibilizado no FTP
-        público do DataSUS. Verifique o [Informe Técnico][it-sim] para mais
-        informações.
 
     [`sqlalchemy.orm.session.Session`]: https://docs.sqlalchemy.org/en/14/orm/session_api.html#sqlalchemy.orm.Session
     [`pandas.DataFrame`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.html
     [`extrair_agravas_violencia()`]: impulsoetl.sinan.violencia.extrair_agravas_violencia
-    [`pandas.DataFrame.query()`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.query.html
-    [estrutura-sinan]: https://drive.google.com/file/d/18El-e7gTYa5iBpWIRiSSRiyCq0r-xgDN/view?usp=sharing
     """
     habilitar_suporte_loguru()
     logger.info(
@@ -517,110 +572,28 @@ def transformar_agravos_violencia(
         + "agravos.",
         num_registros_do=len(agravos_violencia),
     )
-    logger.debug(
+    logger.opt(lazy=True).debug(
         "Memória ocupada pelo DataFrame original: {memoria_usada:.2f} mB.",
-        memoria_usada=(
+        memoria_usada=lambda: (
             agravos_violencia.memory_usage(deep=True).sum() / 10**6
         ),
     )
 
-    # aplica condições de filtragem dos registros
-    if condicoes:
-        agravos_violencia = agravos_violencia.query(condicoes, engine="python")
-        logger.info(
-            "Registros após aplicar condições de filtragem: {num_registros}.",
-            num_registros=len(agravos_violencia),
-        )
-
-    # Junta nomes de colunas e tipos adicionais aos obrigatórios
-    de_para = dict(
-        DE_PARA_AGRAVOS_VIOLENCIA, **DE_PARA_AGRAVOS_VIOLENCIA_ADICIONAIS
-    )
-
     # corrigir nomes de colunas mal formatados
-    agravos_violencia = agravos_violencia.rename_columns(
-        function=lambda col: col.strip().upper(),
+    agravos_violencia = agravos_violencia.rename(
+        columns=lambda col: col.strip().upper(),
     )
 
-    agravos_violencia_transformada = (
-        agravos_violencia  # noqa: WPS221  # ignorar linha complexa no pipeline
-        # adicionar colunas faltantes, com valores vazios
-        .add_columns(
-            **{
-                coluna: ""
-                for coluna in DE_PARA_AGRAVOS_VIOLENCIA_ADICIONAIS.keys()
-                if not (coluna in agravos_violencia.columns)
-            }
-        )
-        # renomear colunas
-        .rename_columns(de_para)
-        # processar colunas com datas
-        .transform_columns(
-            COLUNAS_DATA,
-            function=lambda dt: pd.to_datetime(
-                dt,
-                format="%Y-%m-%d",  # noqa: WPS323
-                errors="coerce",
-            ),
-        )
-        .transform_column(
-            "ocorrencia_hora",
-            function=lambda hora: (
-                # TODO: Corrigir hora > 24
-                hora[:2] + ":" + hora[2:4]
-                if re.match(r"([01][0-9]|2[0-3])[0-5][0-9]", hora)
-                else np.nan
-            ),
-        )
-        # processar colunas lógicas
-        .transform_columns(
-            COLUNAS_BOOLEANAS,
-            function=_para_booleano,
-        )
-        # processar colunas com CIDs
-        .transform_columns(
-            [
-                "condicao_principal_id_cid10",
-                "circunstancia_id_cid10",
-            ],
-            function=remover_ponto_cid10,
-        )
-        # tratar como NA colunas com valores nulos
-        .replace("", np.nan)
-        # corrigir leitura de coluna de códigos de idade
-        .transform_column(
-            "usuario_idade_id_sinan",
-            lambda cod: str(int(cod)).zfill(4) if pd.notna(cod) else pd.NA,
-        )
-        # adicionar id
-        .add_column("id", str())
-        .transform_column("id", function=lambda _: uuid7().hex)
-        # adicionar id do periodo
-        .assign(periodo_id=periodo_id)
-        # adicionar id da unidade geografica
-        .transform_column(
-            "notificacao_municipio_id_sus",
-            function=lambda id_sim: id_sim_para_id_impulso(
-                sessao=sessao,
-                id_sim=id_sim,
-            ),
-            dest_column_name="unidade_geografica_id",
-        )
-        # adicionar datas de inserção e atualização
-        .add_column("criacao_data", agora_gmt_menos3())
-        .add_column("atualizacao_data", agora_gmt_menos3())
-        # garantir tipos
-        .change_type(
-            # HACK: ver https://github.com/pandas-dev/pandas/issues/25472
-            COLUNAS_NUMERICAS,
-            "float",
-        )
-        .astype(TIPOS_AGRAVOS_VIOLENCIA)
+    agravos_violencia_transformada = aplicar_especificacao(
+        agravos_violencia,
+        especificacao=ESPECIFICACAO_AGRAVOS_VIOLENCIA,
+        sessao=sessao,
+        periodo_id=periodo_id,
     )
 
-    logger.debug(
+    logger.opt(lazy=True).debug(
         "Memória ocupada pelo DataFrame transformado: {memoria_usada:.2f} mB.",
-        memoria_usada=(
+        memoria_usada=lambda: (
             agravos_violencia_transformada.memory_usage(deep=True).sum()
             / 10**6
         ),
@@ -666,14 +639,19 @@ def obter_agravos_violencia(
             posterior ao método [`Session.rollback()`][] da sessão gerada com o
             SQLAlchemy.
         \\*\\*kwargs: Parâmetros adicionais definidos no agendamento da
-            captura. Atualmente, apenas o parâmetro `condicoes` (do tipo `str`)
-            é aceito, e repassado como argumento na função
-            [`transformar_do()`][].
+            captura. São aceitos o parâmetro `condicoes` (do tipo `str`),
+            repassado como argumento na função
+            [`extrair_agravos_violencia()`][], que aplica as condições durante
+            a leitura do arquivo; e o parâmetro `arrow` (do tipo `bool`),
+            repassado à função [`carregar_dataframe()`][], que indica se os
+            registros devem ser convertidos em tabelas Arrow antes do
+            carregamento.
 
     [`sqlalchemy.orm.session.Session`]: https://docs.sqlalchemy.org/en/14/orm/session_api.html#sqlalchemy.orm.Session
     [`sqlalchemy.engine.Row`]: https://docs.sqlalchemy.org/en/14/core/connections.html#sqlalchemy.engine.Row
     [`datetime.date`]: https://docs.python.org/3/library/datetime.html#date-objects
-    [`transformar_do()`]: impulsoetl.sim.do.transformar_do
+    [`extrair_agravos_violencia()`]: impulsoetl.sinan.violencia.extrair_agravos_violencia
+    [`carregar_dataframe()`]: impulsoetl.utilitarios.bd.carregar_dataframe
     """
     habilitar_suporte_loguru()
     logger.info(
@@ -683,30 +661,39 @@ def obter_agravos_violencia(
 
     # obter tamanho do lote de processamento
     if teste:
-        passo = 1000
+        passo = DimensionadorLotes.fixo(1000)
     else:
-        passo = int(os.getenv("IMPULSOETL_LOTE_TAMANHO", 100000))
+        passo = DimensionadorLotes.do_ambiente(
+            lotes_simultaneos=ESTEIRA_LOTES_SIMULTANEOS,
+        )
 
     agravos_violencia_lotes = extrair_agravos_violencia(
         periodo_data_inicio=periodo_data_inicio,
         passo=passo,
+        colunas=[*DE_PARA_AGRAVOS_VIOLENCIA.keys(), *DE_PARA_AGRAVOS_VIOLENCIA_ADICIONAIS.keys()],
+        condicoes=kwargs.get("condicoes"),
     )
 
     contador = 0
-    for agravos_violencia_lote in agravos_violencia_lotes:
-        agravos_violencia_transformada = transformar_agravos_violencia(
-            sessao=sessao,
-            agravos_violencia=agravos_violencia_lote,
+    for (
+        agravos_violencia_lote,
+        agravos_violencia_transformada,
+    ) in processar_em_esteira(
+        sessao=sessao,
+        lotes=agravos_violencia_lotes,
+        transformar=partial(
+            transformar_agravos_violencia,
             periodo_id=periodo_id,
-            condicoes=kwargs.get("condicoes"),
-        )
-
+        ),
+        dimensionador=passo,
+    ):
         carregamento_status = carregar_dataframe(
             sessao=sessao,
             df=agravos_violencia_transformada,
             tabela_destino=tabela_destino,
             passo=None,
             teste=teste,
+            arrow=kwargs.get("arrow", False),
         )
         if carregamento_status != 0:
             raise RuntimeError(
@@ -7,8 +7,8 @@
 
 
 import csv
-from io import StringIO
-from typing import Iterable, cast
+from io import RawIOBase, StringIO
+from typing import TYPE_CHECKING, Generator, Iterable, cast
 
 import pandas as pd
 from pandas.io.sql import SQLTable
@@ -21,6 +21,9 @@ from sqlalchemy.schema import MetaData, Table
 
 from impulsoetl.loggers import habilitar_suporte_loguru, logger
 
+if TYPE_CHECKING:
+    import pyarrow as pa
+
 
 class TabelasRefletidasDicionario(dict):
     """Representa um dicionário de tabelas refletidas de um banco de dados."""
@@ -149,6 +152,177 @@ def postgresql_copiar_dados(
     return None
 
 
+def converter_para_arrow(df: pd.DataFrame) -> "pa.Table":
+    """Converte um `DataFrame` em uma tabela Arrow a ser formatada em CSV.
+
+    As colunas de textos, inclusive as categóricas, são convertidas em
+    colunas de textos do Arrow, sem um objeto do Python por registro. Os
+    textos vazios são convertidos em valores nulos e as datas são reduzidas
+    à precisão de microssegundos do PostgreSQL, de modo que o banco de dados
+    receba os mesmos valores que receberia pelo método
+    [`postgresql_copiar_dados()`][].
+
+    Requer o pacote [`pyarrow`][].
+
+    Argumentos:
+        df: [`DataFrame`][] com os dados a serem carregados.
+
+    Retorna:
+        Um objeto [`pyarrow.Table`][] com as mesmas colunas de `df`.
+
+    Exceções:
+        Levanta uma subclasse de [`pyarrow.ArrowException`][] (que também
+        herda de `ValueError` ou de `TypeError`) caso alguma coluna tenha
+        valores de tipos incompatíveis entre si.
+
+    [`postgresql_copiar_dados()`]: impulsoetl.utilitarios.bd.postgresql_copiar_dados
+    [`pyarrow`]: https://arrow.apache.org/docs/python/
+    [`DataFrame`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.html
+    [`pyarrow.Table`]: https://arrow.apache.org/docs/python/generated/pyarrow.Table.html
+    [`pyarrow.ArrowException`]: https://arrow.apache.org/docs/python/api/misc.html#pyarrow.ArrowException
+    """
+    # importados aqui porque o pyarrow é necessário apenas neste modo de
+    # carregamento
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    for indice, coluna in enumerate(tabela.columns):
+        tipo = coluna.type
+        if pa.types.is_dictionary(tipo):
+            tipo = tipo.value_type
+            coluna = coluna.cast(tipo)
+        if pa.types.is_string(tipo) or pa.types.is_large_string(tipo):
+            coluna = pc.if_else(
+                pc.equal(coluna, ""),
+                pa.scalar(None, tipo),
+                coluna,
+            )
+        elif pa.types.is_timestamp(tipo):
+            coluna = coluna.cast(pa.timestamp("us", tipo.tz), safe=False)
+        else:
+            continue
+        tabela = tabela.set_column(indice, tabela.field(indice).name, coluna)
+    return tabela
+
+
+def _tentar_converter_para_arrow(df: pd.DataFrame) -> "pa.Table | None":
+    """Converte um `DataFrame` para o Arrow, ou retorna `None` se falhar."""
+    try:
+        return converter_para_arrow(df)
+    except ImportError as erro:
+        logger.warning(
+            "O pacote `pyarrow` não está disponível ({}); carregando da "
+            + "forma padrão.",
+            erro,
+        )
+    except (TypeError, ValueError) as erro:
+        logger.warning(
+            "Não foi possível converter os registros para o formato "
+            + "Arrow ({}); carregando da forma padrão.",
+            erro,
+        )
+    return None
+
+
+def _gerar_csv(
+    tabela: "pa.Table",
+    passo: int | None,
+) -> Generator[bytes, None, None]:
+    """Gera o conteúdo de uma tabela Arrow em CSV, um lote por vez."""
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    opcoes = pa_csv.WriteOptions(include_header=False)
+    for lote in tabela.to_batches(max_chunksize=passo):
+        destino = pa.BufferOutputStream()
+        pa_csv.write_csv(lote, destino, write_options=opcoes)
+        yield destino.getvalue().to_pybytes()
+
+
+class _FluxoCSV(RawIOBase):
+    """Arquivo somente de leitura com o conteúdo gerado em CSV sob demanda."""
+
+    def __init__(self, partes: Iterable[bytes]) -> None:
+        self._partes = iter(partes)
+        self._pendente = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, destino) -> int:
+        while not self._pendente:
+            try:
+                self._pendente = memoryview(next(self._partes))
+            except StopIteration:
+                return 0
+        tamanho = min(len(destino), len(self._pendente))
+        destino[:tamanho] = self._pendente[:tamanho]
+        self._pendente = self._pendente[tamanho:]
+        return tamanho
+
+
+def postgresql_copiar_arrow(
+    conexao: Connection | Engine,
+    tabela: "pa.Table",
+    tabela_destino: str,
+    passo: int | None = None,
+) -> None:
+    """Insere uma tabela Arrow no banco de dados com o comando COPY, em CSV.
+
+    Os registros são formatados em CSV pelo próprio Arrow, um lote de cada
+    vez, e enviados ao banco de dados à medida que são formatados, em um
+    único comando COPY. Diferentemente de [`postgresql_copiar_dados()`][],
+    nenhum valor é convertido em um objeto do Python.
+
+    O COPY é feito no formato de texto CSV, e não no formato binário do
+    PostgreSQL, que exigiria converter cada coluna exatamente para o tipo
+    da coluna correspondente na tabela de destino. Cabe ao banco de dados
+    interpretar os textos recebidos, como no carregamento padrão.
+
+    Argumentos:
+        conexao: objeto [`sqlalchemy.engine.Engine`][] ou
+            [`sqlalchemy.engine.Connection`][] contendo a conexão de alto nível
+            com o banco de dados gerenciada pelo SQLAlchemy.
+        tabela: objeto [`pyarrow.Table`][] com os dados a serem inseridos,
+            como gerado pela função [`converter_para_arrow()`][].
+        tabela_destino: nome da tabela de destino, qualificado com o nome do
+            schema (formato `nome_do_schema.nome_da_tabela`).
+        passo: Quantidade de registros formatados de cada vez. Se for
+            `None`, os registros são formatados nos lotes em que já estão
+            divididos na tabela.
+
+    Exceções:
+        Levanta uma subclasse da exceção [`psycopg2.Error`][] caso algum erro
+        seja retornado pelo backend.
+
+    [`postgresql_copiar_dados()`]: impulsoetl.utilitarios.bd.postgresql_copiar_dados
+    [`sqlalchemy.engine.Engine`]: https://docs.sqlalchemy.org/en/14/core/connections.html#sqlalchemy.engine.Engine
+    [`sqlalchemy.engine.Connection`]: https://docs.sqlalchemy.org/en/14/core/connections.html#sqlalchemy.engine.Connection
+    [`pyarrow.Table`]: https://arrow.apache.org/docs/python/generated/pyarrow.Table.html
+    [`converter_para_arrow()`]: impulsoetl.utilitarios.bd.converter_para_arrow
+    [`psycopg2.Error`]: https://www.psycopg.org/docs/module.html#psycopg2.Error
+    """
+    # obter conexão de DBAPI, como em `postgresql_copiar_dados()`
+    try:
+        conector_dbapi = conexao.connection  # type: ignore
+    except AttributeError:
+        conector_dbapi = conexao.raw_connection()  # type: ignore
+
+    with conector_dbapi.cursor() as cursor:  # type: ignore
+        enumeracao_colunas = ", ".join(
+            '"{}"'.format(coluna) for coluna in tabela.column_names
+        )
+        expressao_sql = "COPY {} ({}) FROM STDIN WITH CSV".format(
+            tabela_destino,
+            enumeracao_colunas,
+        )
+        cursor.copy_expert(  # type: ignore
+            sql=expressao_sql,
+            file=_FluxoCSV(_gerar_csv(tabela, passo)),
+        )
+
+
 @task(
     name="Carregar Pandas DataFrame",
     description=(
@@ -168,6 +342,7 @@ def carregar_dataframe(
     tabela_destino: str,
     passo: int | None = 10000,
     teste: bool = False,
+    arrow: bool = False,
 ) -> int:
     """Carrega dados públicos para o banco de dados analítico da ImpulsoGov.
 
@@ -185,6 +360,15 @@ def carregar_dataframe(
         teste: Indica se o carregamento deve ser executado em modo teste. Se
             verdadeiro, faz *rollback* de todas as operações; se falso, libera
             o ponto de recuperação criado.
+        arrow: Indica se os dados devem ser convertidos em uma tabela Arrow e
+            formatados em CSV para o comando COPY pelo próprio Arrow (ver
+            [`postgresql_copiar_arrow()`][]), em vez de convertidos valor a
+            valor em objetos do Python. Apenas a formatação para o COPY muda;
+            `df` continua sendo um DataFrame do pandas, gerado pelas mesmas
+            extrações e transformações. Requer o pacote `pyarrow`. Caso
+            ele não esteja instalado ou alguma coluna não possa ser
+            convertida, um aviso é registrado e os dados são carregados da
+            forma padrão. Por padrão, é falso.
 
     Retorna:
         Código de saída do processo de carregamento. Se o carregamento
@@ -200,6 +384,7 @@ def carregar_dataframe(
     [`sqlalchemy.orm.session.Session`]: https://docs.sqlalchemy.org/en/14/orm/session_api.html#sqlalchemy.orm.Session
     [`DataFrame`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.html
     [`transformar_pa()`]: impulsoetl.siasus.procedimentos.transformar_pa
+    [`postgresql_copiar_arrow()`]: impulsoetl.utilitarios.bd.postgresql_copiar_arrow
     """
     habilitar_suporte_loguru()
 
@@ -213,26 +398,39 @@ def carregar_dataframe(
         tabela_destino=tabela_destino,
     )
 
-    logger.debug("Formatando colunas de data...")
-    colunas_data = df.select_dtypes(include="datetime").columns
-    df[colunas_data] = df[colunas_data].applymap(
-        lambda dt: dt.isoformat() if pd.notna(dt) else None
-    )
+    tabela_arrow = None
+    if arrow:
+        logger.debug("Convertendo registros para o formato Arrow...")
+        tabela_arrow = _tentar_converter_para_arrow(df)
+    if tabela_arrow is None:
+        logger.debug("Formatando colunas de data...")
+        colunas_data = df.select_dtypes(include="datetime").columns
+        df[colunas_data] = df[colunas_data].applymap(
+            lambda dt: dt.isoformat() if pd.notna(dt) else None
+        )
 
     logger.info("Copiando registros...")
 
     ponto_de_recuperacao = sessao.begin_nested()
     conexao = sessao.connection()
     try:
-        df.to_sql(
-            name=tabela_nome,
-            con=conexao,
-            schema=schema_nome,
-            if_exists="append",
-            index=False,
-            chunksize=passo,
-            method=postgresql_copiar_dados,
-        )
+        if tabela_arrow is not None:
+            postgresql_copiar_arrow(
+                conexao,
+                tabela_arrow,
+                tabela_destino=tabela_destino,
+                passo=passo,
+            )
+        else:
+            df.to_sql(
+                name=tabela_nome,
+                con=conexao,
+                schema=schema_nome,
+                if_exists="append",
+                index=False,
+                chunksize=passo,
+                method=postgresql_copiar_dados,
+            )
     # trata exceções levantadas pelo backend
     except (DBAPIError, Psycopg2Error) as erro:
         ponto_de_recuperacao.rollback()
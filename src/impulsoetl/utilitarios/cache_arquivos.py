@@ -0,0 +1,223 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Armazena em disco arquivos baixados de fontes remotas para reutilização.
+
+Atributos:
+    CACHE_CAMINHO: Caminho do diretório onde são guardados os arquivos, lido
+        da variável de ambiente `IMPULSOETL_CACHE_CAMINHO`. Se a variável não
+        estiver definida, o cache fica desabilitado por padrão.
+    CACHE_TAMANHO_MAX: Espaço máximo em disco ocupado pelo cache, em
+        megabytes, lido da variável de ambiente `IMPULSOETL_CACHE_TAMANHO_MAX`
+        (por padrão, 10.240 MB).
+"""
+
+
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Final
+
+from impulsoetl.loggers import logger
+
+CACHE_CAMINHO: Final[str | None] = os.getenv("IMPULSOETL_CACHE_CAMINHO")
+CACHE_TAMANHO_MAX: Final[int] = int(
+    os.getenv("IMPULSOETL_CACHE_TAMANHO_MAX", 10240),
+)
+
+
+class CacheArquivos(object):
+    """Cache em disco de arquivos, endereçado pelo conteúdo esperado.
+
+    Cada arquivo é guardado sob uma chave derivada do endereço de origem e dos
+    metadados declarados pelo servidor (tamanho e data de modificação), de
+    modo que uma nova versão publicada na fonte gera uma chave diferente e
+    nunca é confundida com uma cópia antiga.
+
+    Quando o espaço ocupado ultrapassa o limite configurado, os arquivos
+    acessados há mais tempo são removidos primeiro (política LRU). O último
+    acesso de cada arquivo é registrado na sua data de modificação no sistema
+    de arquivos, o que dispensa um índice separado e permite que vários
+    processos compartilhem o mesmo diretório.
+    """
+
+    def __init__(
+        self,
+        diretorio: str | Path,
+        tamanho_maximo: int = CACHE_TAMANHO_MAX * 10**6,
+    ) -> None:
+        """Instancia um cache de arquivos em disco.
+
+        Argumentos:
+            diretorio: Caminho do diretório onde os arquivos serão guardados.
+                É criado, se ainda não existir.
+            tamanho_maximo: Espaço máximo, em bytes, que os arquivos do cache
+                podem ocupar em disco.
+        """
+        self.diretorio = Path(diretorio)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        self.tamanho_maximo = tamanho_maximo
+
+    @classmethod
+    def do_ambiente(cls) -> "CacheArquivos | None":
+        """Instancia o cache configurado nas variáveis de ambiente, se houver.
+
+        Retorna:
+            Uma instância de `CacheArquivos` no diretório indicado pela
+            variável `IMPULSOETL_CACHE_CAMINHO`, ou `None` caso ela não esteja
+            definida.
+        """
+        if not CACHE_CAMINHO:
+            return None
+        return cls(
+            diretorio=CACHE_CAMINHO,
+            tamanho_maximo=CACHE_TAMANHO_MAX * 10**6,
+        )
+
+    @staticmethod
+    def gerar_chave(endereco: str, tamanho: int, modificacao: str) -> str:
+        """Gera a chave de um arquivo a partir da origem e dos metadados.
+
+        Argumentos:
+            endereco: Endereço completo do arquivo na fonte (por exemplo,
+                `ftp://ftp.datasus.gov.br/caminho/ARQUIVO.dbc`).
+            tamanho: Tamanho do arquivo declarado pela fonte, em bytes.
+            modificacao: Data de modificação declarada pela fonte, no formato
+                em que foi informada (por exemplo, a resposta ao comando
+                `MDTM` de um servidor FTP).
+
+        Retorna:
+            Uma sequência hexadecimal que identifica unicamente a versão do
+            arquivo.
+        """
+        identificador = "{}|{}|{}".format(endereco, tamanho, modificacao)
+        return hashlib.sha256(identificador.encode("utf-8")).hexdigest()
+
+    def _caminho(self, chave: str) -> Path:
+        return self.diretorio / chave[:2] / chave
+
+    def obter(
+        self,
+        chave: str,
+        destino: str | Path | None = None,
+    ) -> Path | None:
+        """Busca um arquivo no cache, registrando o acesso em caso de acerto.
+
+        Como outros processos que compartilham o diretório podem remover o
+        arquivo do cache a qualquer momento para liberar espaço, quem for
+        lê-lo deve informar um `destino`. O arquivo encontrado é então
+        vinculado a esse caminho por meio de um *hard link* (ou copiado,
+        caso o sistema de arquivos não permita o vínculo), que continua
+        legível mesmo que a entrada do cache seja removida durante a
+        leitura.
+
+        Argumentos:
+            chave: Chave do arquivo, conforme gerada pelo método
+                [`gerar_chave()`][].
+            destino: Caminho opcional onde disponibilizar o arquivo
+                encontrado. Se não for informado, é retornado o caminho do
+                próprio arquivo no cache.
+
+        Retorna:
+            O caminho de `destino` ou, se ele não for informado, do arquivo
+            em cache; ou `None` se não houver uma cópia guardada sob a chave
+            informada.
+
+        [`gerar_chave()`]: impulsoetl.utilitarios.cache_arquivos.CacheArquivos.gerar_chave
+        """
+        caminho = self._caminho(chave)
+        try:
+            os.utime(caminho)
+            if destino is not None:
+                destino = Path(destino)
+                destino.unlink(missing_ok=True)
+                try:
+                    os.link(caminho, destino)
+                except FileNotFoundError:
+                    raise
+                except OSError:
+                    # por exemplo, se o destino estiver em outro dispositivo
+                    shutil.copyfile(caminho, destino)
+        except FileNotFoundError:
+            logger.debug("Arquivo `{}` não encontrado no cache.", chave)
+            return None
+        logger.info("Arquivo encontrado no cache local: `{}`.", caminho)
+        return destino or caminho
+
+    def adicionar(self, chave: str, arquivo: str | Path) -> Path:
+        """Copia um arquivo para o cache e libera espaço, se necessário.
+
+        A cópia é feita para um arquivo temporário no próprio diretório do
+        cache e depois renomeada, de modo que outros processos nunca
+        encontrem uma cópia incompleta.
+
+        Argumentos:
+            chave: Chave sob a qual o arquivo deve ser guardado, conforme
+                gerada pelo método [`gerar_chave()`][].
+            arquivo: Caminho do arquivo a ser copiado para o cache.
+
+        Retorna:
+            O caminho da cópia guardada no cache.
+
+        [`gerar_chave()`]: impulsoetl.utilitarios.cache_arquivos.CacheArquivos.gerar_chave
+        """
+        caminho = self._caminho(chave)
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        with NamedTemporaryFile(
+            dir=caminho.parent,
+            prefix=".",
+            delete=False,
+        ) as arquivo_temporario:
+            with open(arquivo, "rb") as arquivo_origem:
+                shutil.copyfileobj(arquivo_origem, arquivo_temporario)
+        os.replace(arquivo_temporario.name, caminho)
+        logger.info("Arquivo guardado no cache local: `{}`.", caminho)
+        self.liberar_espaco(protegido=caminho)
+        return caminho
+
+    def liberar_espaco(self, protegido: Path | None = None) -> int:
+        """Remove os arquivos usados há mais tempo até respeitar o limite.
+
+        Argumentos:
+            protegido: Caminho opcional de um arquivo que não deve ser
+                removido, mesmo que seja o único capaz de liberar o espaço
+                necessário (por exemplo, um arquivo recém-adicionado).
+
+        Retorna:
+            O número de bytes liberados.
+        """
+        arquivos = []
+        for caminho in self.diretorio.glob("??/*"):
+            if caminho.name.startswith("."):
+                # cópia ainda em andamento
+                continue
+            try:
+                estatisticas = caminho.stat()
+            except FileNotFoundError:
+                # removido por outro processo durante a listagem
+                continue
+            arquivos.append(
+                (estatisticas.st_mtime, estatisticas.st_size, caminho),
+            )
+
+        tamanho_total = sum(tamanho for _, tamanho, _ in arquivos)
+        bytes_liberados = 0
+        for _, tamanho, caminho in sorted(arquivos):
+            if tamanho_total - bytes_liberados <= self.tamanho_maximo:
+                break
+            if caminho == protegido:
+                continue
+            logger.debug("Removendo `{}` do cache local...", caminho)
+            caminho.unlink(missing_ok=True)
+            bytes_liberados += tamanho
+
+        if bytes_liberados:
+            logger.info(
+                "Liberados {:n} bytes do cache local.",
+                bytes_liberados,
+            )
+        return bytes_liberados
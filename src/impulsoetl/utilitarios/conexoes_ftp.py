@@ -0,0 +1,372 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Mantém conexões reutilizáveis com servidores FTP.
+
+Abrir uma conexão com o FTP do DataSUS exige conectar-se ao servidor,
+autenticar-se e navegar até o diretório desejado - o que, em um servidor
+lento, pode levar mais tempo que o próprio download de arquivos pequenos.
+Como uma mesma execução costuma capturar dezenas de arquivos do mesmo
+servidor (por exemplo, um arquivo de procedimentos ambulatoriais para cada
+unidade federativa), a classe [`PoolConexoesFTP`][] mantém as conexões
+abertas entre uma captura e outra, e guarda a listagem de cada diretório
+já consultado (veja [`CacheListagensFTP`][]).
+
+Enquanto aguardam para ser reutilizadas, as conexões ociosas recebem
+periodicamente o comando `NOOP`, para que não sejam encerradas pelo
+servidor. Conexões que deixem de responder são descartadas e substituídas
+por novas, de maneira transparente.
+
+A função [`obter_pool_ftp()`][] devolve sempre o mesmo *pool* para um mesmo
+servidor, de modo que todas as capturas executadas em um mesmo processo
+compartilhem as conexões.
+
+Atributos:
+    FTP_CONEXOES_MAX: Número máximo de conexões simultâneas com cada
+        servidor FTP, lido da variável de ambiente
+        `IMPULSOETL_FTP_CONEXOES_MAX` (por padrão, 4 conexões).
+    FTP_MANTER_ATIVA_INTERVALO: Intervalo, em segundos, entre os comandos
+        `NOOP` enviados às conexões ociosas, lido da variável de ambiente
+        `IMPULSOETL_FTP_MANTER_ATIVA_INTERVALO` (por padrão, 60 segundos).
+    FTP_ESPERA_MAX: Tempo máximo, em segundos, de espera por uma resposta
+        do servidor FTP, lido da variável de ambiente
+        `IMPULSOETL_ESPERA_MAX` (por padrão, 300 segundos).
+
+[`PoolConexoesFTP`]: impulsoetl.utilitarios.conexoes_ftp.PoolConexoesFTP
+[`obter_pool_ftp()`]: impulsoetl.utilitarios.conexoes_ftp.obter_pool_ftp
+[`CacheListagensFTP`]: impulsoetl.utilitarios.listagens_ftp.CacheListagensFTP
+"""
+
+
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from ftplib import FTP, all_errors  # noqa: B402  # nosec: B402
+from typing import Final, Generator
+
+from impulsoetl.loggers import logger
+from impulsoetl.utilitarios.listagens_ftp import (
+    ArquivoFTP,
+    CacheListagensFTP,
+    listar_diretorio,
+)
+
+FTP_CONEXOES_MAX: Final[int] = int(os.getenv("IMPULSOETL_FTP_CONEXOES_MAX", 4))
+FTP_MANTER_ATIVA_INTERVALO: Final[float] = float(
+    os.getenv("IMPULSOETL_FTP_MANTER_ATIVA_INTERVALO", 60),
+)
+FTP_ESPERA_MAX: Final[float] = float(os.getenv("IMPULSOETL_ESPERA_MAX", 300))
+
+
+@dataclass
+class _ConexaoFTP:
+    """Conexão com um servidor FTP e o estado conhecido dela."""
+
+    cliente: FTP
+    diretorio: str | None = None
+    ultimo_uso: float = 0.0
+
+
+class PoolConexoesFTP(object):
+    """Conjunto de conexões reutilizáveis com um servidor FTP.
+
+    Argumentos:
+        endereco: Endereço do servidor FTP (por exemplo,
+            `ftp.datasus.gov.br`), opcionalmente seguido da porta, no
+            formato `servidor:porta`.
+        conexoes_max: Número máximo de conexões abertas simultaneamente com
+            o servidor. Quando todas estão em uso, novas requisições
+            aguardam até que alguma seja devolvida ao *pool*.
+        manter_ativa_intervalo: Intervalo, em segundos, entre os comandos
+            `NOOP` enviados às conexões ociosas.
+        espera_max: Tempo máximo, em segundos, de espera por uma resposta do
+            servidor.
+        listagens: Instância opcional de [`CacheListagensFTP`][] onde
+            guardar as listagens de diretórios. Por padrão, usa o cache
+            configurado nas variáveis de ambiente.
+
+    [`CacheListagensFTP`]: impulsoetl.utilitarios.listagens_ftp.CacheListagensFTP
+    """
+
+    def __init__(
+        self,
+        endereco: str,
+        conexoes_max: int = FTP_CONEXOES_MAX,
+        manter_ativa_intervalo: float = FTP_MANTER_ATIVA_INTERVALO,
+        espera_max: float = FTP_ESPERA_MAX,
+        listagens: CacheListagensFTP | None = None,
+    ) -> None:
+        self.endereco = endereco
+        self.conexoes_max = max(1, conexoes_max)
+        self.manter_ativa_intervalo = manter_ativa_intervalo
+        self.espera_max = espera_max
+        self._vagas = threading.BoundedSemaphore(self.conexoes_max)
+        self._trava = threading.Lock()
+        self._ociosas: list[_ConexaoFTP] = []
+        self.listagens = listagens or CacheListagensFTP.do_ambiente()
+        self._encerrar = threading.Event()
+        self._manter_ativas: threading.Thread | None = None
+
+    def __repr__(self) -> str:
+        return "{}(endereco={!r}, conexoes_max={})".format(
+            self.__class__.__name__,
+            self.endereco,
+            self.conexoes_max,
+        )
+
+    def _conectar(self) -> _ConexaoFTP:
+        logger.info("Conectando-se ao servidor FTP `{}`...", self.endereco)
+        servidor, _, porta = self.endereco.partition(":")
+        if porta:
+            # servidores fora da porta padrão, como o substituto local do FTP
+            # do DataSUS usado nas medidas de desempenho
+            cliente = FTP(timeout=self.espera_max)
+            cliente.connect(servidor, int(porta))
+        else:
+            cliente = FTP(self.endereco, timeout=self.espera_max)
+        try:
+            cliente.login()
+        except BaseException:
+            cliente.close()
+            raise
+        logger.info("Conexão estabelecida com sucesso!")
+        return _ConexaoFTP(cliente=cliente)
+
+    @staticmethod
+    def _descartar(conexao: _ConexaoFTP) -> None:
+        try:
+            conexao.cliente.quit()
+        except all_errors:
+            conexao.cliente.close()
+
+    @staticmethod
+    def _responde(conexao: _ConexaoFTP) -> bool:
+        try:
+            conexao.cliente.voidcmd("NOOP")
+        except all_errors:
+            return False
+        conexao.ultimo_uso = time.monotonic()
+        return True
+
+    def _retirar(self) -> _ConexaoFTP:
+        """Retira uma conexão ociosa que ainda responda, ou abre uma nova."""
+        while True:
+            with self._trava:
+                if not self._ociosas:
+                    break
+                conexao = self._ociosas.pop()
+            if self._responde(conexao):
+                return conexao
+            logger.debug(
+                "Conexão ociosa com o servidor FTP `{}` não responde; "
+                + "descartando.",
+                self.endereco,
+            )
+            self._descartar(conexao)
+        return self._conectar()
+
+    def _devolver(self, conexao: _ConexaoFTP) -> None:
+        conexao.ultimo_uso = time.monotonic()
+        with self._trava:
+            self._ociosas.append(conexao)
+            if self._manter_ativas is None and self.manter_ativa_intervalo > 0:
+                self._manter_ativas = threading.Thread(
+                    target=self._manter_ociosas_ativas,
+                    name="manter_ftp_ativo",
+                    daemon=True,
+                )
+                self._manter_ativas.start()
+
+    def _manter_ociosas_ativas(self) -> None:
+        """Envia periodicamente o comando `NOOP` às conexões ociosas."""
+        while not self._encerrar.wait(self.manter_ativa_intervalo / 2):
+            limite = time.monotonic() - self.manter_ativa_intervalo
+            with self._trava:
+                inativas = [
+                    conexao
+                    for conexao in self._ociosas
+                    if conexao.ultimo_uso <= limite
+                ]
+                for conexao in inativas:
+                    self._ociosas.remove(conexao)
+            for conexao in inativas:
+                if self._responde(conexao):
+                    with self._trava:
+                        self._ociosas.append(conexao)
+                else:
+                    self._descartar(conexao)
+
+    @contextmanager
+    def conexao(
+        self,
+        caminho_diretorio: str | None = None,
+    ) -> Generator[FTP, None, None]:
+        """Empresta uma conexão com o servidor, já no diretório informado.
+
+        A conexão é devolvida ao *pool* ao final do bloco `with`. Se um erro
+        de comunicação com o servidor ocorrer dentro do bloco, a conexão é
+        descartada em vez de devolvida, já que seu estado é desconhecido.
+
+        Argumentos:
+            caminho_diretorio: Caminho absoluto do diretório onde a conexão
+                deve estar ao ser emprestada. Se não for informado, o
+                diretório de trabalho da conexão é indeterminado.
+
+        Gera:
+            Uma instância de [`ftplib.FTP`][] autenticada no servidor.
+
+        [`ftplib.FTP`]: https://docs.python.org/3/library/ftplib.html#ftplib.FTP
+        """
+        self._vagas.acquire()
+        try:
+            conexao = self._retirar()
+            try:
+                if (
+                    caminho_diretorio is not None
+                    and conexao.diretorio != caminho_diretorio
+                ):
+                    logger.info(
+                        "Buscando diretório `{}`...",
+                        caminho_diretorio,
+                    )
+                    conexao.diretorio = None
+                    conexao.cliente.cwd(caminho_diretorio)
+                    conexao.diretorio = caminho_diretorio
+                    logger.info("OK!")
+                yield conexao.cliente
+            except all_errors:
+                self._descartar(conexao)
+                raise
+            except BaseException:
+                # o erro não é de comunicação, mas uma transferência pode ter
+                # sido interrompida no meio
+                if self._responde(conexao):
+                    self._devolver(conexao)
+                else:
+                    self._descartar(conexao)
+                raise
+            else:
+                self._devolver(conexao)
+        finally:
+            self._vagas.release()
+
+    def listar_metadados(self, caminho_diretorio: str) -> list[ArquivoFTP]:
+        """Lista os arquivos de um diretório do servidor, com seus metadados.
+
+        Enquanto houver uma listagem do diretório dentro do prazo de
+        validade do cache de listagens, ela é usada sem consultar o
+        servidor.
+
+        Argumentos:
+            caminho_diretorio: Caminho absoluto do diretório a ser listado.
+
+        Retorna:
+            Uma lista de instâncias de [`ArquivoFTP`][], em ordem alfabética
+            dos nomes dos arquivos.
+
+        [`ArquivoFTP`]: impulsoetl.utilitarios.listagens_ftp.ArquivoFTP
+        """
+        arquivos = self.listagens.obter(self.endereco, caminho_diretorio)
+        if arquivos is not None:
+            logger.debug(
+                "Usando listagem já obtida do diretório `{}`.",
+                caminho_diretorio,
+            )
+            return arquivos
+        logger.info("Listando diretório `{}`...", caminho_diretorio)
+        with self.conexao(caminho_diretorio) as cliente_ftp:
+            arquivos = listar_diretorio(cliente_ftp)
+        self.listagens.guardar(self.endereco, caminho_diretorio, arquivos)
+        return arquivos
+
+    def listar(self, caminho_diretorio: str) -> list[str]:
+        """Lista os nomes dos arquivos de um diretório do servidor.
+
+        Argumentos:
+            caminho_diretorio: Caminho absoluto do diretório a ser listado.
+
+        Retorna:
+            Uma lista com os nomes dos arquivos do diretório, em ordem
+            alfabética.
+        """
+        arquivos = self.listar_metadados(caminho_diretorio)
+        return [arquivo.nome for arquivo in arquivos]
+
+    def obter_metadados(
+        self,
+        caminho_diretorio: str,
+        arquivo_nome: str,
+    ) -> ArquivoFTP | None:
+        """Busca os metadados de um arquivo na listagem de seu diretório.
+
+        Argumentos:
+            caminho_diretorio: Caminho absoluto do diretório do arquivo.
+            arquivo_nome: Nome do arquivo, incluindo a extensão.
+
+        Retorna:
+            Uma instância de [`ArquivoFTP`][], ou `None` se o arquivo não
+            constar na listagem do diretório.
+
+        [`ArquivoFTP`]: impulsoetl.utilitarios.listagens_ftp.ArquivoFTP
+        """
+        for arquivo in self.listar_metadados(caminho_diretorio):
+            if arquivo.nome == arquivo_nome:
+                return arquivo
+        return None
+
+    def esquecer_listagens(self) -> None:
+        """Descarta as listagens de diretórios guardadas."""
+        self.listagens.esquecer()
+
+    def fechar(self) -> None:
+        """Encerra as conexões ociosas e a manutenção delas."""
+        self._encerrar.set()
+        if self._manter_ativas is not None:
+            self._manter_ativas.join()
+            self._manter_ativas = None
+        with self._trava:
+            ociosas, self._ociosas = self._ociosas, []
+        for conexao in ociosas:
+            self._descartar(conexao)
+        logger.debug(
+            "Conexões com o servidor FTP `{}` encerradas.",
+            self.endereco,
+        )
+        self._encerrar.clear()
+
+
+_pools: dict[str, PoolConexoesFTP] = {}
+_pools_trava = threading.Lock()
+
+
+def obter_pool_ftp(endereco: str) -> PoolConexoesFTP:
+    """Obtém o *pool* de conexões compartilhado com um servidor FTP.
+
+    Argumentos:
+        endereco: Endereço do servidor FTP.
+
+    Retorna:
+        Uma instância de [`PoolConexoesFTP`][], criada na primeira chamada
+        para cada servidor e reutilizada nas chamadas seguintes.
+
+    [`PoolConexoesFTP`]: impulsoetl.utilitarios.conexoes_ftp.PoolConexoesFTP
+    """
+    with _pools_trava:
+        if endereco not in _pools:
+            _pools[endereco] = PoolConexoesFTP(endereco)
+        return _pools[endereco]
+
+
+@atexit.register
+def fechar_pools_ftp() -> None:
+    """Encerra as conexões ociosas de todos os *pools* compartilhados."""
+    with _pools_trava:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.fechar()
@@ -3,39 +3,60 @@
 # SPDX-License-Identifier: MIT
 
 
-"""Funções e classes úteis para interagir com os repositórios do DataSUS."""
+"""Funções e classes úteis para interagir com os repositórios do DataSUS.
 
+Atributos:
+    DATASUS_FTP: Endereço do FTP público do DataSUS, lido da variável de
+        ambiente `IMPULSOETL_DATASUS_FTP` (por padrão,
+        `ftp.datasus.gov.br`). Pode incluir a porta, no formato
+        `servidor:porta` - por exemplo, para apontar as capturas para um
+        servidor local com a mesma estrutura de diretórios.
+"""
 
+
+import os
 import re
-import shutil
-from contextlib import closing
-from ftplib import FTP, error_perm  # noqa: B402  # nosec: B402
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from ftplib import FTP, all_errors, error_perm  # noqa: B402  # nosec: B402
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from typing import Generator, cast
-from urllib.request import urlopen
-import os
+from typing import BinaryIO, Final, Generator, Iterable, Literal, cast
+
 import pandas as pd
 from dbfread import DBF, FieldParser
 from more_itertools import ichunked
-from pyreaddbc import ffi, lib
 
 from impulsoetl.loggers import logger
+from impulsoetl.utilitarios.cache_arquivos import CacheArquivos
+from impulsoetl.utilitarios.conexoes_ftp import (
+    FTP_CONEXOES_MAX,
+    PoolConexoesFTP,
+    obter_pool_ftp,
+)
+from impulsoetl.utilitarios.dbc import dbc2dbf, descompactar_dbc
+from impulsoetl.utilitarios.dbf import LeitorDBF, LeitorFluxoDBF
+from impulsoetl.utilitarios.lago_dados import LagoDados
+from impulsoetl.utilitarios.listagens_ftp import ArquivoFTP
+from impulsoetl.utilitarios.lotes import DimensionadorLotes, passo_atual
+
+DATASUS_FTP: Final[str] = os.getenv(
+    "IMPULSOETL_DATASUS_FTP",
+    "ftp.datasus.gov.br",
+)
+FTP_TENTATIVAS_MAX: Final[int] = int(
+    os.getenv("IMPULSOETL_FTP_TENTATIVAS_MAX", 5),
+)
+FTP_TENTATIVAS_ESPERA: Final[float] = float(
+    os.getenv("IMPULSOETL_FTP_TENTATIVAS_ESPERA", 5),
+)
+DBF_PROCESSOS: Final[int] = int(os.getenv("IMPULSOETL_DBF_PROCESSOS", 1))
+
+
+class _TransferenciaCancelada(Exception):
+    """Transferência abortada porque seu resultado não é mais necessário."""
 
-def dbc2dbf(infile, outfile):
-    """
-    Converts a DATASUS dbc file to a DBF database saving it to `outfile`.
-    :param infile: .dbc file name
-    :param outfile: name of the .dbf file to be created.
-    """
-    if isinstance(infile, str):
-        infile = infile.encode()
-    if isinstance(outfile, str):
-        outfile = outfile.encode()
-    p = ffi.new("char[]", os.path.abspath(infile))
-    q = ffi.new("char[]", os.path.abspath(outfile))
-
-    lib.dbc2dbf([p], [q])
 
 class LeitorCamposDBF(FieldParser):
     def parseD(self, field, data):
@@ -75,6 +96,39 @@ def _checar_arquivo_corrompido(
         return False
 
 
+def _obter_metadados_arquivo(
+    cliente_ftp: FTP,
+    arquivo_nome: str,
+) -> tuple[int, str]:
+    """Obtém o tamanho e a data de modificação declarados de um arquivo FTP.
+
+    Argumentos:
+        cliente_ftp: Instância de conexão com o servidor FTP, já no diretório
+            onde se encontra o arquivo.
+        arquivo_nome: Nome do arquivo, incluindo a extensão.
+
+    Retorna:
+        Uma tupla com o tamanho do arquivo em bytes, conforme a resposta ao
+        comando `SIZE`, e a data de modificação informada pelo servidor em
+        resposta ao comando `MDTM` (no formato `AAAAMMDDhhmmss`). Se o
+        servidor não suportar o comando `MDTM`, a data é devolvida como uma
+        string vazia.
+    """
+    # o comando SIZE só é confiável no modo de transferência binário
+    cliente_ftp.voidcmd("TYPE I")
+    tamanho = cast(int, cliente_ftp.size(arquivo_nome))
+    try:
+        resposta = cliente_ftp.sendcmd("MDTM " + arquivo_nome)
+        modificacao = resposta.split(maxsplit=1)[1].strip()
+    except (error_perm, IndexError):
+        logger.warning(
+            "Não foi possível obter a data de modificação do arquivo `{}`.",
+            arquivo_nome,
+        )
+        modificacao = ""
+    return tamanho, modificacao
+
+
 def _listar_arquivos(
     cliente_ftp: FTP,
     arquivo_nome_ou_padrao: str | re.Pattern,
@@ -100,8 +154,24 @@ def _listar_arquivos(
     """
 
     logger.info("Listando arquivos compatíveis...")
-    arquivos_todos = cliente_ftp.nlst()
+    return _filtrar_arquivos(
+        arquivos_todos=cliente_ftp.nlst(),
+        arquivo_nome_ou_padrao=arquivo_nome_ou_padrao,
+    )
+
 
+def _filtrar_arquivos(
+    arquivos_todos: Iterable[str],
+    arquivo_nome_ou_padrao: str | re.Pattern,
+) -> list[str]:
+    """Seleciona os nomes de arquivos compatíveis com um nome ou padrão.
+
+    Exceções:
+        Levanta um erro [`ftplib.error_perm`][] se nenhum arquivo
+        correspondente for encontrado.
+
+    [`ftplib.error_perm`]: https://docs.python.org/3/library/ftplib.html#ftplib.error_perm
+    """
     if isinstance(arquivo_nome_ou_padrao, re.Pattern):
         arquivos_compativeis = [
             arquivo
@@ -130,19 +200,419 @@ def _listar_arquivos(
         raise error_perm
 
 
+def _listar_arquivos_servidor(
+    ftp: str,
+    caminho_diretorio: str,
+    arquivo_nome_ou_padrao: str | re.Pattern,
+) -> list[str]:
+    """Lista os arquivos compatíveis em um diretório do FTP do DataSUS.
+
+    A listagem é feita por meio do *pool* de conexões compartilhado com o
+    servidor (veja [`obter_pool_ftp()`][]), e a listagem completa de cada
+    diretório é obtida do servidor apenas quando não houver uma listagem
+    guardada dentro do prazo de validade configurado.
+
+    Argumentos:
+        ftp: Endereço do repositório FTP público do DataSUS.
+        caminho_diretorio: Caminho absoluto do diretório onde se deseja
+            buscar os arquivos.
+        arquivo_nome_ou_padrao: Nome do arquivo desejado, incluindo a
+            extensão; ou expressão regular a ser comparada com os nomes de
+            arquivos disponíveis no servidor FTP.
+
+    Retorna:
+        Uma lista de nomes de arquivos compatíveis com o nome ou padrão
+        informados no diretório FTP.
+
+    [`obter_pool_ftp()`]: impulsoetl.utilitarios.conexoes_ftp.obter_pool_ftp
+    """
+    logger.info("Listando arquivos compatíveis...")
+    return _filtrar_arquivos(
+        arquivos_todos=obter_pool_ftp(ftp).listar(caminho_diretorio),
+        arquivo_nome_ou_padrao=arquivo_nome_ou_padrao,
+    )
+
+
+def _filtrar_registros(
+    df: pd.DataFrame,
+    condicoes: str | None,
+) -> pd.DataFrame:
+    if not condicoes:
+        return df
+    return df.query(condicoes, engine="python").reset_index(drop=True)
+
+
+def _selecionar_colunas(
+    df: pd.DataFrame,
+    colunas: Iterable[str] | None,
+) -> pd.DataFrame:
+    if colunas is None:
+        return df
+    nomes = {coluna.strip().upper() for coluna in colunas}
+    return df.loc[
+        :,
+        [coluna for coluna in df.columns if coluna.strip().upper() in nomes],
+    ]
+
+
+def _buscar_no_cache(
+    cache: CacheArquivos,
+    url: str,
+    tamanho: int,
+    modificacao: str,
+    destino: Path,
+) -> Path | None:
+    """Vincula a `destino` a versão em cache de um arquivo, se houver."""
+    arquivo_em_cache = cache.obter(
+        cache.gerar_chave(
+            endereco=url,
+            tamanho=tamanho,
+            modificacao=modificacao,
+        ),
+        destino=destino,
+    )
+    if arquivo_em_cache:
+        logger.info(
+            "Usando cópia local do arquivo `{}`; download ignorado.",
+            url.rsplit("/", 1)[-1],
+        )
+    return arquivo_em_cache
+
+
+def _transferir_arquivo(
+    pool: PoolConexoesFTP,
+    caminho_diretorio: str,
+    arquivo_nome: str,
+    arquivo_destino: Path,
+    tentativas_max: int = FTP_TENTATIVAS_MAX,
+    espera: float = FTP_TENTATIVAS_ESPERA,
+    cancelar: threading.Event | None = None,
+) -> tuple[int, str]:
+    """Transfere um arquivo do servidor FTP, retomando-o em caso de falha.
+
+    Se a conexão cair no meio da transferência, uma nova conexão é obtida do
+    *pool* e a transferência é retomada a partir do último byte recebido,
+    por meio do comando `REST` - ou desde o início, se o servidor não
+    aceitar o comando ou se o arquivo tiver sido modificado no servidor
+    nesse meio tempo. Entre as tentativas, aguarda um intervalo que dobra a
+    cada nova falha. A recusa do comando `REST` não conta como uma tentativa
+    fracassada: a transferência é apenas reiniciada, sem o comando.
+
+    Ao final de cada tentativa, o tamanho do arquivo baixado é comparado com
+    o declarado pelo servidor em resposta ao comando `SIZE`. Se faltarem
+    bytes, apenas os bytes restantes são pedidos na tentativa seguinte.
+
+    Argumentos:
+        pool: *Pool* de conexões com o servidor FTP.
+        caminho_diretorio: Caminho absoluto do diretório onde se encontra o
+            arquivo no servidor.
+        arquivo_nome: Nome do arquivo desejado, incluindo a extensão.
+        arquivo_destino: Caminho local onde o arquivo deve ser salvo.
+        tentativas_max: Número máximo de tentativas de transferência.
+        espera: Intervalo, em segundos, antes da segunda tentativa.
+        cancelar: Sinal opcional, consultado a cada bloco recebido e durante
+            os intervalos entre as tentativas, que interrompe a
+            transferência quando acionado.
+
+    Retorna:
+        Uma tupla com o tamanho e a data de modificação do arquivo
+        transferido, conforme declarados pelo servidor.
+
+    Exceções:
+        Levanta o último erro de comunicação com o servidor se nenhuma das
+        tentativas for bem-sucedida, ou um erro [`RuntimeError`][] se o
+        arquivo baixado continuar incompleto ou corrompido. Se a
+        transferência for cancelada, levanta `_TransferenciaCancelada`.
+
+    [`RuntimeError`]: https://docs.python.org/3/library/exceptions.html#RuntimeError
+    """
+    if cancelar is None:
+        cancelar = threading.Event()
+
+    def gravar(arquivo: BinaryIO, dados: bytes) -> None:
+        if cancelar.is_set():  # type: ignore[union-attr]
+            raise _TransferenciaCancelada(arquivo_nome)
+        arquivo.write(dados)
+
+    arquivo_destino.write_bytes(b"")
+    metadados_inicio: tuple[int, str] | None = None
+    retomar = True
+    tentativa = 1
+    while tentativa <= tentativas_max:
+        if cancelar.is_set():
+            raise _TransferenciaCancelada(arquivo_nome)
+        inicio = 0
+        try:
+            with pool.conexao(caminho_diretorio) as cliente_ftp:
+                metadados = _obter_metadados_arquivo(
+                    cliente_ftp=cliente_ftp,
+                    arquivo_nome=arquivo_nome,
+                )
+                inicio = arquivo_destino.stat().st_size
+                if inicio and metadados != metadados_inicio:
+                    logger.warning(
+                        "O arquivo `{}` foi modificado no servidor durante "
+                        + "o download; reiniciando a transferência.",
+                        arquivo_nome,
+                    )
+                    inicio = 0
+                elif not retomar:
+                    inicio = 0
+                metadados_inicio = metadados
+                with open(arquivo_destino, "r+b") as arquivo:
+                    arquivo.truncate(inicio)
+                    arquivo.seek(inicio)
+                    if inicio:
+                        logger.info(
+                            "Retomando download do arquivo `{}` a partir do "
+                            + "byte {:n}...",
+                            arquivo_nome,
+                            inicio,
+                        )
+                    else:
+                        logger.info(
+                            "Iniciando download do arquivo `{}`...",
+                            arquivo_nome,
+                        )
+                    if inicio < metadados[0]:
+                        cliente_ftp.retrbinary(
+                            "RETR " + arquivo_nome,
+                            partial(gravar, arquivo),
+                            rest=inicio or None,
+                        )
+        except error_perm:
+            if not inicio:
+                raise
+            logger.warning(
+                "O servidor recusou retomar o download do arquivo `{}`; "
+                + "transferindo-o novamente desde o início.",
+                arquivo_nome,
+            )
+            retomar = False
+            # a recusa não é uma falha de comunicação; recomeçar do início
+            # não consome uma das tentativas
+            continue
+        except all_errors as erro:
+            if tentativa == tentativas_max:
+                raise
+            logger.warning(
+                "Falha na transferência do arquivo `{}` ({}); nova "
+                + "tentativa em {:n} segundos ({} de {}).",
+                arquivo_nome,
+                erro,
+                espera * 2 ** (tentativa - 1),
+                tentativa + 1,
+                tentativas_max,
+            )
+            cancelar.wait(espera * 2 ** (tentativa - 1))
+            tentativa += 1
+            continue
+
+        if not _checar_arquivo_corrompido(
+            tamanho_arquivo_ftp=metadados[0],
+            tamanho_arquivo_local=arquivo_destino.stat().st_size,
+        ):
+            logger.info("Download do arquivo `{}` concluído.", arquivo_nome)
+            return metadados
+        if arquivo_destino.stat().st_size > metadados[0]:
+            # não há como saber quais bytes estão sobrando; recomeça do zero
+            arquivo_destino.write_bytes(b"")
+        tentativa += 1
+
+    raise RuntimeError(
+        "O download do arquivo `{}{}/{}` falhou ".format(
+            pool.endereco,
+            caminho_diretorio,
+            arquivo_nome,
+        )
+        + "porque o arquivo baixado está incompleto ou corrompido.",
+    )
+
+
+def _baixar_arquivo(
+    ftp: str,
+    caminho_diretorio: str,
+    arquivo_nome: str,
+    diretorio_destino: str | Path,
+    cache: CacheArquivos | None = None,
+    cancelar: threading.Event | None = None,
+) -> Path:
+    """Baixa um arquivo do FTP do DataSUS usando uma conexão do *pool*.
+
+    Cada chamada toma emprestada uma conexão do *pool* compartilhado com o
+    servidor (veja [`obter_pool_ftp()`][]), de modo que vários arquivos podem
+    ser baixados simultaneamente em linhas de execução (*threads*)
+    diferentes, sem que seja preciso se conectar e se autenticar novamente
+    a cada arquivo. Transferências interrompidas são retomadas de onde
+    pararam, e o tamanho do arquivo baixado é conferido ao final (veja
+    [`_transferir_arquivo()`][]).
+
+    Argumentos:
+        ftp: Endereço do repositório FTP público do DataSUS.
+        caminho_diretorio: Caminho absoluto do diretório onde se encontra o
+            arquivo no repositório.
+        arquivo_nome: Nome do arquivo desejado, incluindo a extensão.
+        diretorio_destino: Diretório local onde o arquivo deve ser salvo.
+        cache: Instância opcional de [`CacheArquivos`][] a ser consultada
+            antes do download e onde o arquivo baixado deve ser guardado. Em
+            caso de acerto, o arquivo em cache é vinculado ao diretório de
+            destino, de modo que continua legível mesmo que outro processo o
+            remova do cache.
+        cancelar: Sinal opcional que interrompe a transferência quando
+            acionado (veja [`_transferir_arquivo()`][]).
+
+    Retorna:
+        O caminho do arquivo no diretório de destino, baixado ou vinculado à
+        cópia no cache, caso já estivesse disponível.
+
+    [`CacheArquivos`]: impulsoetl.utilitarios.cache_arquivos.CacheArquivos
+    [`obter_pool_ftp()`]: impulsoetl.utilitarios.conexoes_ftp.obter_pool_ftp
+    [`_transferir_arquivo()`]: impulsoetl.utilitarios.datasus_ftp._transferir_arquivo
+    """
+    url = "ftp://{}{}/{}".format(ftp, caminho_diretorio, arquivo_nome)
+    pool = obter_pool_ftp(ftp)
+    arquivo_destino = Path(diretorio_destino, arquivo_nome)
+    if cache:
+        # usa os metadados da listagem do diretório, se estiverem completos,
+        # para consultar o cache sem nem precisar de uma conexão
+        metadados = pool.obter_metadados(caminho_diretorio, arquivo_nome)
+        if not (metadados and metadados.completo):
+            with pool.conexao(caminho_diretorio) as cliente_ftp:
+                metadados = ArquivoFTP(
+                    arquivo_nome,
+                    *_obter_metadados_arquivo(
+                        cliente_ftp=cliente_ftp,
+                        arquivo_nome=arquivo_nome,
+                    ),
+                )
+        arquivo_em_cache = _buscar_no_cache(
+            cache=cache,
+            url=url,
+            tamanho=cast(int, metadados.tamanho),
+            modificacao=metadados.modificacao,
+            destino=arquivo_destino,
+        )
+        if arquivo_em_cache:
+            return arquivo_em_cache
+
+    arquivo_tamanho, arquivo_modificacao = _transferir_arquivo(
+        pool=pool,
+        caminho_diretorio=caminho_diretorio,
+        arquivo_nome=arquivo_nome,
+        arquivo_destino=arquivo_destino,
+        cancelar=cancelar,
+    )
+
+    if cache:
+        # a chave usa os metadados conferidos durante a transferência, que
+        # podem ser mais recentes que os da listagem
+        chave_cache = cache.gerar_chave(
+            endereco=url,
+            tamanho=arquivo_tamanho,
+            modificacao=arquivo_modificacao,
+        )
+        cache.adicionar(chave=chave_cache, arquivo=arquivo_destino)
+    return arquivo_destino
+
+
+def _ler_arquivo_dbc(
+    arquivo_dbc: Path,
+    passo: int | DimensionadorLotes,
+    colunas: Iterable[str] | None = None,
+    condicoes: str | None = None,
+    processos: int = 1,
+    **kwargs,
+) -> Generator[pd.DataFrame, None, None]:
+    """Descompacta e lê um arquivo DBC local em lotes de registros.
+
+    Sem argumentos adicionais, o arquivo é descompactado em memória, em
+    fatias, à medida que os registros são lidos pelo leitor vetorizado
+    [`LeitorFluxoDBF`][]: a descompactação e a conversão dos registros em
+    DataFrames ocorrem simultaneamente, e o arquivo DBF descompactado nunca
+    chega a ser gravado em disco.
+
+    Se for pedido mais de um processo (ou `0`, para usar todos os núcleos de
+    processamento), o arquivo é descompactado para um arquivo DBF
+    temporário, cujos intervalos de registros são decodificados
+    simultaneamente por vários processos, com o leitor [`LeitorDBF`][].
+
+    Se forem informados argumentos adicionais para a classe `dbfread.DBF`,
+    o arquivo é descompactado para um arquivo DBF temporário e lido pelo
+    `dbfread`, em um único processo.
+
+    Em todo caso, o arquivo DBF temporário é removido ao final da leitura.
+
+    [`LeitorFluxoDBF`]: impulsoetl.utilitarios.dbf.LeitorFluxoDBF
+    [`LeitorDBF`]: impulsoetl.utilitarios.dbf.LeitorDBF
+    """
+    if not kwargs and processos == 1:
+        logger.info("Descompactando e lendo arquivo DBC...")
+        with open(arquivo_dbc, "rb") as arquivo:
+            yield from LeitorFluxoDBF(
+                descompactar_dbc(arquivo),
+                encoding="iso-8859-1",
+                nome=arquivo_dbc.name,
+            ).lotes(passo=passo, colunas=colunas, condicoes=condicoes)
+        return
+
+    logger.info("Descompactando arquivo DBC...")
+    with TemporaryDirectory() as diretorio_temporario:
+        arquivo_dbf_caminho = Path(
+            diretorio_temporario,
+            arquivo_dbc.name.replace(".dbc", ".dbf"),
+        )
+        dbc2dbf(str(arquivo_dbc), str(arquivo_dbf_caminho))
+        logger.info("Lendo arquivo DBF...")
+        if not kwargs:
+            yield from LeitorDBF(arquivo_dbf_caminho).lotes(
+                passo=passo,
+                colunas=colunas,
+                condicoes=condicoes,
+                processos=processos,
+            )
+            return
+        arquivo_dbf = DBF(
+            arquivo_dbf_caminho,
+            encoding="iso-8859-1",
+            load=False,
+            parserclass=LeitorCamposDBF,
+            **kwargs,
+        )
+        for fatia in ichunked(arquivo_dbf, passo_atual(passo)):
+            yield _selecionar_colunas(
+                _filtrar_registros(pd.DataFrame(fatia), condicoes),
+                colunas,
+            )
+
+
 def extrair_dbc_lotes(
     ftp: str,
     caminho_diretorio: str,
     arquivo_nome: str | re.Pattern,
-    passo: int = 10000,
+    passo: int | DimensionadorLotes = 10000,
+    cache: CacheArquivos | Literal[False] | None = None,
+    conexoes_max: int = FTP_CONEXOES_MAX,
+    colunas: Iterable[str] | None = None,
+    condicoes: str | None = None,
+    lago: LagoDados | None = None,
+    processos: int = DBF_PROCESSOS,
     **kwargs,
 ) -> Generator[pd.DataFrame, None, None]:
     """Extrai dados de um arquivo .dbc do FTP do DataSUS e retorna DataFrames.
 
     Dados o endereço de um FTP público do DataSUS e o caminho de um diretório
     e de um arquivo localizados nesse repositório, faz download do arquivo para
-    o disco, descompacta-o e itera sobre seus registros, gerando objetos
-    [`pandas.DataFrames`][] com lotes de linhas lidas.
+    o disco e itera sobre seus registros à medida que são descompactados,
+    gerando objetos [`pandas.DataFrames`][] com lotes de linhas lidas.
+
+    Quando mais de um arquivo é compatível com o nome ou padrão informado (por
+    exemplo, os arquivos divididos em partes `a`, `b`, `c` etc. dos estados
+    mais populosos), os downloads são feitos simultaneamente, por meio de até
+    `conexoes_max` conexões com o servidor FTP. Os lotes de registros,
+    entretanto, são sempre gerados na ordem alfabética dos nomes dos
+    arquivos. Se a iteração for interrompida antes do fim (por exemplo, ao
+    atingir o limite de registros do modo de teste), os downloads ainda em
+    andamento são abortados, sem que seja preciso aguardar sua conclusão.
 
     Argumentos:
         ftp: Endereço do repositório FTP público do DataSUS.
@@ -152,11 +622,55 @@ def extrair_dbc_lotes(
             extensão; ou expressão regular a ser comparada com os nomes de
             arquivos disponíveis no servidor FTP.
         passo: Número de registros que devem ser convertidos em DataFrame a
-            cada iteração.
+            cada iteração; ou instância de [`DimensionadorLotes`][], que
+            ajusta o tamanho de cada lote à memória ocupada pelos anteriores.
+        cache: Instância opcional de [`CacheArquivos`][] onde guardar os
+            arquivos baixados. Arquivos já presentes no cache com o mesmo
+            tamanho e data de modificação declarados pelo servidor não são
+            baixados novamente. Se for `None` (o padrão), usa o cache
+            configurado por meio da variável de ambiente
+            `IMPULSOETL_CACHE_CAMINHO`, se houver; se for `False`, nenhum
+            cache é usado.
+        conexoes_max: Número máximo de conexões simultâneas com o servidor
+            FTP para o download dos arquivos. Por padrão, usa o valor da
+            variável de ambiente `IMPULSOETL_FTP_CONEXOES_MAX` ou, se ela não
+            estiver definida, 4 conexões.
+        colunas: Nomes das colunas a serem lidas do arquivo. Os nomes são
+            comparados sem diferenciar maiúsculas de minúsculas e
+            desconsiderando espaços nas extremidades; nomes que não existam
+            no arquivo são ignorados. Os campos não listados não chegam a ser
+            decodificados, o que economiza tempo e memória. Por padrão, todas
+            as colunas são lidas.
+        condicoes: Expressão opcional, com a sintaxe utilizada pelo método
+            [`pandas.DataFrame.query()`][], que os registros devem satisfazer
+            para serem gerados. Com o leitor vetorizado, as condições são
+            avaliadas sobre os bytes de cada registro, antes da conversão em
+            DataFrame. Os nomes, tipos e valores devem ser considerados
+            exatamente como registrados no arquivo de disseminação.
+        lago: Instância opcional de [`LagoDados`][] onde guardar, em formato
+            Parquet, todos os registros e colunas de cada arquivo lido.
+            Arquivos já guardados no lago não são baixados nem decodificados
+            novamente, mas lidos diretamente do Parquet; e, se o servidor FTP
+            estiver indisponível, os arquivos compatíveis guardados no lago
+            são usados no lugar da listagem do servidor. Por padrão, usa o
+            lago configurado por meio da variável de ambiente
+            `IMPULSOETL_LAGO_DADOS_CAMINHO`, se houver.
+        processos: Número de processos que decodificam simultaneamente
+            intervalos diferentes de registros de cada arquivo, com o leitor
+            vetorizado. Se for `0`, usa um processo para cada núcleo de
+            processamento disponível. Os lotes são gerados na ordem dos
+            registros no arquivo, como na leitura em um único processo. Por
+            padrão, usa o valor da variável de ambiente
+            `IMPULSOETL_DBF_PROCESSOS` ou, se ela não estiver definida, um
+            único processo.
         \*\*kwargs: Argumentos adicionais a serem passados para o construtor
             da classe
             [`dbfread.DBF`](https://dbfread.readthedocs.io/en/latest/dbf_objects.html#dbf-objects)
-            ao instanciar a representação do arquivo DBF lido.
+            ao instanciar a representação do arquivo DBF lido. Se nenhum
+            argumento adicional for informado, o arquivo é lido com o leitor
+            vetorizado [`LeitorFluxoDBF`][], que produz os mesmos DataFrames
+            de maneira muito mais rápida e sem gravar o arquivo
+            descompactado em disco.
 
     Gera:
         A cada iteração, devolve um objeto [`pandas.DataFrames`][] com um
@@ -165,87 +679,138 @@ def extrair_dbc_lotes(
         DataFrame e a conexão com o servidor FTP é encerrada.
 
     [`pandas.DataFrame`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.html
+    [`CacheArquivos`]: impulsoetl.utilitarios.cache_arquivos.CacheArquivos
+    [`LagoDados`]: impulsoetl.utilitarios.lago_dados.LagoDados
+    [`LeitorFluxoDBF`]: impulsoetl.utilitarios.dbf.LeitorFluxoDBF
+    [`DimensionadorLotes`]: impulsoetl.utilitarios.lotes.DimensionadorLotes
+    [`pandas.DataFrame.query()`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.query.html
     """
 
-    logger.info("Conectando-se ao servidor FTP `{}`...", ftp)
-    cliente_ftp = FTP(ftp)
-    cliente_ftp.login()
-    logger.info("Conexão estabelecida com sucesso!")
+    if cache is None:
+        cache = CacheArquivos.do_ambiente()
+    elif cache is False:
+        cache = None
+    if colunas is not None:
+        colunas = list(colunas)
 
     if not caminho_diretorio.startswith("/"):
         caminho_diretorio = "/" + caminho_diretorio
-    logger.info("Buscando diretório `{}`...", caminho_diretorio)
-    cliente_ftp.cwd(caminho_diretorio)
-    logger.info("OK!")
+    if lago is None:
+        lago = LagoDados.do_ambiente()
+
+    try:
+        arquivos_compativeis = _listar_arquivos_servidor(
+            ftp=ftp,
+            caminho_diretorio=caminho_diretorio,
+            arquivo_nome_ou_padrao=arquivo_nome,
+        )
+    except all_errors:
+        arquivos_compativeis = (
+            lago.listar(caminho_diretorio, arquivo_nome) if lago else []
+        )
+        if not arquivos_compativeis:
+            raise
+        logger.warning(
+            "Falha ao listar os arquivos do servidor FTP `{}`; usando os "
+            + "{} arquivos compatíveis guardados no lago de dados.",
+            ftp,
+            len(arquivos_compativeis),
+        )
 
-    arquivos_compativeis = _listar_arquivos(
-        cliente_ftp=cliente_ftp,
-        arquivo_nome_ou_padrao=arquivo_nome,
-    )
+    arquivos_no_lago = {
+        arquivo_compativel_nome
+        for arquivo_compativel_nome in arquivos_compativeis
+        if lago and lago.contem(caminho_diretorio, arquivo_compativel_nome)
+    }
 
     logger.info("Preparando ambiente para o download...")
 
-    with TemporaryDirectory() as diretorio_temporario:
-        for arquivo_compativel_nome in arquivos_compativeis:
-            arquivo_dbf_nome = arquivo_compativel_nome.replace(".dbc", ".dbf")
-            arquivo_dbc = Path(diretorio_temporario, arquivo_compativel_nome)
-            logger.info("Tudo pronto para o download.")
-
-            # baixar do FTP usando urllib
-            # ver https://stackoverflow.com/a/11768443/7733563
-            url = "ftp://{}{}/{}".format(
-                ftp,
-                caminho_diretorio,
-                arquivo_compativel_nome,
-            )
-
-            logger.info(
-                "Iniciando download do arquivo `{}`...",
-                arquivo_compativel_nome,
-            )
-            with closing(urlopen(url)) as resposta:  # nosec: B310
-                with open(arquivo_dbc, "wb") as arquivo:
-                    shutil.copyfileobj(resposta, arquivo)
-            logger.info("Download concluído.")
-
-            # if _checar_arquivo_corrompido(
-            #     tamanho_arquivo_ftp=cast(
-            #         int,
-            #         cliente_ftp.size(arquivo_compativel_nome),
-            #     ),
-            #     tamanho_arquivo_local=arquivo_dbc.stat().st_size,
-            # ):
-            #     raise RuntimeError(
-            #         "A extração da fonte `{}{}` ".format(
-            #             ftp,
-            #             caminho_diretorio,
-            #         )
-            #         + "falhou porque o arquivo baixado está corrompido."
-            #     )
-
-            logger.info("Descompactando arquivo DBC...")
-            arquivo_dbf_caminho = Path(diretorio_temporario, arquivo_dbf_nome)
-            dbc2dbf(str(arquivo_dbc), str(arquivo_dbf_caminho))
-            logger.info("Lendo arquivo DBF...")
-            arquivo_dbf = DBF(
-                arquivo_dbf_caminho,
-                encoding="iso-8859-1",
-                load=False,
-                parserclass=LeitorCamposDBF,
-                **kwargs,
-            )
-            arquivo_dbf_fatias = ichunked(arquivo_dbf, passo)
-
-            contador = 0
-            for fatia in arquivo_dbf_fatias:
-                logger.info(
-                    "Lendo trecho do arquivo DBF disponibilizado pelo DataSUS "
-                    + "e convertendo em DataFrame (linhas {} a {})...",
-                    contador,
-                    contador + passo,
+    # os downloads ainda em andamento quando a iteração é interrompida são
+    # abortados no próximo bloco recebido, sem que seja preciso aguardá-los;
+    # por isso, podem restar arquivos no diretório temporário ao removê-lo
+    cancelar = threading.Event()
+    with TemporaryDirectory(
+        ignore_cleanup_errors=True,
+    ) as diretorio_temporario:
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, min(conexoes_max, len(arquivos_compativeis))),
+            thread_name_prefix="download_ftp",
+        )
+        try:
+            downloads: dict[str, Future[Path]] = {
+                arquivo_compativel_nome: executor.submit(
+                    _baixar_arquivo,
+                    ftp=ftp,
+                    caminho_diretorio=caminho_diretorio,
+                    arquivo_nome=arquivo_compativel_nome,
+                    diretorio_destino=diretorio_temporario,
+                    cache=cache,
+                    cancelar=cancelar,
                 )
-                yield pd.DataFrame(fatia)
-                contador += passo
+                for arquivo_compativel_nome in arquivos_compativeis
+                if arquivo_compativel_nome not in arquivos_no_lago
+            }
+            logger.info("Tudo pronto para o download.")
 
-    logger.debug("Encerrando a conexão com o servidor FTP `{}`...", ftp)
-    cliente_ftp.close()
+            # consome os downloads na ordem da listagem, para que os lotes
+            # sejam sempre gerados na mesma ordem
+            for arquivo_compativel_nome in arquivos_compativeis:
+                if arquivo_compativel_nome in arquivos_no_lago:
+                    yield from lago.ler(  # type: ignore[union-attr]
+                        caminho_diretorio=caminho_diretorio,
+                        arquivo_nome=arquivo_compativel_nome,
+                        passo=passo,
+                        colunas=colunas,
+                        condicoes=condicoes,
+                    )
+                    continue
+
+                arquivo_dbc = downloads[arquivo_compativel_nome].result()
+
+                if lago:
+                    # guarda todas as colunas e registros do arquivo, e só
+                    # depois aplica a seleção de colunas e as condições
+                    arquivo_dbf_fatias = (
+                        _selecionar_colunas(
+                            _filtrar_registros(fatia, condicoes),
+                            colunas,
+                        )
+                        for fatia in lago.guardar(
+                            caminho_diretorio=caminho_diretorio,
+                            arquivo_nome=arquivo_compativel_nome,
+                            lotes=_ler_arquivo_dbc(
+                                arquivo_dbc=arquivo_dbc,
+                                passo=passo,
+                                processos=processos,
+                                **kwargs,
+                            ),
+                        )
+                    )
+                else:
+                    arquivo_dbf_fatias = _ler_arquivo_dbc(
+                        arquivo_dbc=arquivo_dbc,
+                        passo=passo,
+                        colunas=colunas,
+                        condicoes=condicoes,
+                        processos=processos,
+                        **kwargs,
+                    )
+                contador = 0
+                for fatia in arquivo_dbf_fatias:
+                    if fatia.empty:
+                        continue
+                    logger.info(
+                        "Lendo trecho do arquivo DBF disponibilizado pelo "
+                        + "DataSUS e convertendo em DataFrame "
+                        + "(linhas {} a {})...",
+                        contador,
+                        contador + len(fatia),
+                    )
+                    yield fatia
+                    contador += len(fatia)
+                if arquivo_dbc.parent == Path(diretorio_temporario):
+                    # libera espaço em disco enquanto outros downloads ocorrem
+                    arquivo_dbc.unlink()
+        finally:
+            cancelar.set()
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,219 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Descompactação de arquivos no formato DBC.
+
+Os arquivos `.dbc` disponibilizados pelo DataSUS são arquivos DBF em que o
+cabeçalho é mantido sem compressão, seguido de quatro bytes de verificação
+(CRC32) e dos registros compactados com o algoritmo *implode* da PKWare
+(*Data Compression Library*). A descompactação é feita pela rotina `blast`,
+exposta pelo pacote [`pyreaddbc`][].
+
+Além da conversão de um arquivo `.dbc` em um arquivo `.dbf` no disco
+([`dbc2dbf()`][]), este módulo permite descompactar os registros à medida
+que são lidos ([`descompactar_dbc()`][]), sem que o arquivo descompactado
+precise ser gravado por inteiro.
+
+Atributos:
+    DBC_FATIA_ENTRADA: Número de bytes do arquivo compactado lidos de cada
+        vez durante a descompactação.
+    DBC_FATIA_SAIDA: Número mínimo de bytes descompactados em cada fatia
+        gerada por [`descompactar_dbc()`][].
+    DBC_FILA_MAX: Número máximo de fatias descompactadas mantidas em memória
+        enquanto aguardam para ser consumidas.
+
+[`pyreaddbc`]: https://github.com/AlertaDengue/pyreaddbc
+[`dbc2dbf()`]: impulsoetl.utilitarios.dbc.dbc2dbf
+[`descompactar_dbc()`]: impulsoetl.utilitarios.dbc.descompactar_dbc
+"""
+
+
+import os
+import queue
+import struct
+import threading
+from typing import Any, BinaryIO, Final, Generator
+
+from frozendict import frozendict
+from pyreaddbc import ffi, lib
+
+DBC_FATIA_ENTRADA: Final[int] = 2**16
+DBC_FATIA_SAIDA: Final[int] = 2**20
+DBC_FILA_MAX: Final[int] = 16
+
+_ERROS_BLAST: Final[frozendict] = frozendict(
+    {
+        1: "interrompida durante a escrita dos dados",
+        2: "dados compactados terminaram inesperadamente",
+        -1: "indicador de literais inválido",
+        -2: "tamanho de dicionário inválido",
+        -3: "distância maior que os dados já descompactados",
+    },
+)
+
+_FIM_FILA: Final[object] = object()
+
+
+def dbc2dbf(infile, outfile):
+    """
+    Converts a DATASUS dbc file to a DBF database saving it to `outfile`.
+    :param infile: .dbc file name
+    :param outfile: name of the .dbf file to be created.
+    """
+    if isinstance(infile, str):
+        infile = infile.encode()
+    if isinstance(outfile, str):
+        outfile = outfile.encode()
+    p = ffi.new("char[]", os.path.abspath(infile))
+    q = ffi.new("char[]", os.path.abspath(outfile))
+
+    lib.dbc2dbf([p], [q])
+
+
+def _ler_cabecalho_dbc(arquivo: BinaryIO) -> bytes:
+    """Lê o cabeçalho DBF de um arquivo DBC e salta os bytes de verificação.
+    """
+    inicio = arquivo.read(10)
+    if len(inicio) < 10:
+        raise ValueError("Arquivo DBC sem cabeçalho.")
+    (cabecalho_tamanho,) = struct.unpack_from("<H", inicio, 8)
+    cabecalho = inicio + arquivo.read(cabecalho_tamanho - len(inicio))
+    if len(cabecalho) < cabecalho_tamanho:
+        raise ValueError("Cabeçalho do arquivo DBC incompleto.")
+    # o CRC32 que segue o cabeçalho não é verificado, assim como na rotina
+    # original em C
+    arquivo.read(4)
+    return cabecalho
+
+
+def _descompactar_registros(
+    arquivo: BinaryIO,
+    fatia_saida: int,
+    fila_max: int,
+) -> Generator[bytes, None, None]:
+    """Descompacta os registros de um arquivo DBC em uma linha de execução.
+
+    A rotina `blast` é executada em uma linha de execução (*thread*) própria,
+    que libera a trava global do interpretador enquanto descompacta os
+    dados. As fatias descompactadas são passadas ao gerador por meio de uma
+    fila de tamanho limitado, de modo que a descompactação prossegue
+    enquanto as fatias anteriores são consumidas, mas nunca acumula mais do
+    que `fila_max` fatias em memória.
+    """
+    fila: queue.Queue = queue.Queue(maxsize=fila_max)
+    interromper = threading.Event()
+    # mantém referências aos dados lidos enquanto estão em uso pela rotina C
+    estado: dict[str, Any] = {"codigo": 0, "erro": None, "entrada": None}
+    pendente = bytearray()
+
+    def enfileirar(item: object) -> bool:
+        while not interromper.is_set():
+            try:
+                fila.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    @ffi.callback("blast_in", error=0)
+    def ler_entrada(_how, buf):
+        try:
+            dados = arquivo.read(DBC_FATIA_ENTRADA)
+        except Exception as erro:
+            estado["erro"] = erro
+            return 0
+        if not dados:
+            return 0
+        estado["entrada"] = ffi.from_buffer("unsigned char[]", dados)
+        buf[0] = estado["entrada"]
+        return len(dados)
+
+    @ffi.callback("blast_out", error=1)
+    def escrever_saida(_how, buf, tamanho):
+        pendente.extend(ffi.buffer(buf, tamanho))
+        if len(pendente) >= fatia_saida:
+            if not enfileirar(bytes(pendente)):
+                return 1
+            pendente.clear()
+        return 0
+
+    def descompactar() -> None:
+        try:
+            estado["codigo"] = lib.blast(
+                ler_entrada,
+                ffi.NULL,
+                escrever_saida,
+                ffi.NULL,
+            )
+            if pendente:
+                enfileirar(bytes(pendente))
+        except BaseException as erro:
+            estado["erro"] = erro
+        finally:
+            enfileirar(_FIM_FILA)
+
+    linha_execucao = threading.Thread(
+        target=descompactar,
+        name="descompactar_dbc",
+        daemon=True,
+    )
+    linha_execucao.start()
+    try:
+        while True:
+            fatia = fila.get()
+            if fatia is _FIM_FILA:
+                break
+            yield fatia
+    finally:
+        interromper.set()
+        linha_execucao.join()
+
+    if estado["erro"] is not None:
+        raise estado["erro"]
+    if estado["codigo"]:
+        raise ValueError(
+            "Falha ao descompactar arquivo DBC: {}.".format(
+                _ERROS_BLAST.get(estado["codigo"], "dados corrompidos"),
+            ),
+        )
+
+
+def descompactar_dbc(
+    arquivo: BinaryIO,
+    fatia_saida: int = DBC_FATIA_SAIDA,
+    fila_max: int = DBC_FILA_MAX,
+) -> Generator[bytes, None, None]:
+    """Descompacta um arquivo DBC em fatias, à medida que é lido.
+
+    Equivale à função [`dbc2dbf()`][], mas em vez de gravar o arquivo DBF
+    descompactado em disco, gera sucessivas fatias do seu conteúdo, que
+    podem ser interpretadas enquanto o restante do arquivo ainda está sendo
+    descompactado (por exemplo, com a classe [`LeitorFluxoDBF`][]).
+
+    Argumentos:
+        arquivo: Arquivo DBC aberto em modo binário, posicionado no início.
+        fatia_saida: Número mínimo de bytes descompactados em cada fatia
+            gerada (exceto na primeira, que contém apenas o cabeçalho, e na
+            última).
+        fila_max: Número máximo de fatias descompactadas mantidas em memória
+            enquanto aguardam para ser consumidas.
+
+    Gera:
+        Primeiro, o cabeçalho do arquivo DBF; em seguida, fatias com os
+        registros descompactados, na ordem em que aparecem no arquivo.
+
+    Exceções:
+        Levanta um erro `ValueError` se o arquivo não estiver no formato DBC
+        ou se os dados compactados estiverem corrompidos.
+
+    [`dbc2dbf()`]: impulsoetl.utilitarios.dbc.dbc2dbf
+    [`LeitorFluxoDBF`]: impulsoetl.utilitarios.dbf.LeitorFluxoDBF
+    """
+    yield _ler_cabecalho_dbc(arquivo)
+    yield from _descompactar_registros(
+        arquivo,
+        fatia_saida=fatia_saida,
+        fila_max=fila_max,
+    )
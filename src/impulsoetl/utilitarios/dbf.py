@@ -0,0 +1,1463 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Leitura e escrita vetorizadas de arquivos no formato DBF.
+
+Os arquivos disponibilizados pelo DataSUS são tabelas em formato DBF (dBase
+III), em que cada registro ocupa um número fixo de bytes e cada campo ocupa
+uma posição fixa dentro do registro. Em vez de interpretar os registros um a
+um, como faz o pacote [`dbfread`][], o leitor definido neste módulo mapeia o
+arquivo em memória e converte cada campo de um lote inteiro de registros de
+uma única vez, com operações vetorizadas do NumPy.
+
+A conversão dos valores segue as mesmas regras do `dbfread` com o analisador
+[`LeitorCamposDBF`][] - em particular, datas são lidas como strings -, de
+modo que os DataFrames gerados pelos dois métodos são idênticos.
+
+Os registros também podem ser lidos à medida que são recebidos, sem que o
+arquivo precise estar inteiramente gravado em disco, com a classe
+[`LeitorFluxoDBF`][]. Já os arquivos gravados em disco podem ser
+decodificados por vários processos simultaneamente, cada um responsável por
+um intervalo diferente de registros (veja o argumento `processos` do método
+[`LeitorDBF.lotes()`][]).
+
+[`dbfread`]: https://dbfread.readthedocs.io/en/latest/
+[`LeitorCamposDBF`]: impulsoetl.utilitarios.datasus_ftp.LeitorCamposDBF
+[`LeitorFluxoDBF`]: impulsoetl.utilitarios.dbf.LeitorFluxoDBF
+[`LeitorDBF.lotes()`]: impulsoetl.utilitarios.dbf.LeitorDBF.lotes
+"""
+
+
+import ast
+import atexit
+import codecs
+import io
+import multiprocessing
+import operator
+import os
+import re
+import struct
+import sys
+import threading
+import tokenize
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Final,
+    Generator,
+    Iterable,
+    NamedTuple,
+    Sequence,
+)
+
+import numpy as np
+import pandas as pd
+from frozendict import frozendict
+
+from impulsoetl.loggers import logger
+from impulsoetl.utilitarios.lotes import DimensionadorLotes, passo_atual
+
+TIPOS_SUPORTADOS: Final[frozenset[str]] = frozenset("CDFLN")
+
+_REGISTRO_VALIDO: Final[int] = 0x20  # b" "
+_FIM_REGISTROS: Final[int] = 0x1A
+_ESPACO: Final[int] = 0x20
+_PONTO: Final[int] = 0x2E
+_ZERO: Final[int] = 0x30
+_NOVE: Final[int] = 0x39
+
+# maior inteiro representável sem perda de precisão em um número de ponto
+# flutuante de 64 bits
+_MANTISSA_MAX: Final[int] = 2**53
+
+# número de registros lidos e filtrados de cada vez
+_BLOCO_REGISTROS: Final[int] = 100000
+
+
+class CampoDBF(NamedTuple):
+    """Descrição de um campo (coluna) de um arquivo DBF.
+
+    Atributos:
+        nome: Nome do campo.
+        tipo: Código de uma letra do tipo do campo (por exemplo, `"C"` para
+            texto, `"N"` para números e `"D"` para datas).
+        tamanho: Número de bytes ocupados pelo campo em cada registro.
+        decimais: Número de casas decimais, no caso de campos numéricos.
+        deslocamento: Posição do primeiro byte do campo em cada registro,
+            já contando o byte inicial que marca registros apagados.
+    """
+
+    nome: str
+    tipo: str
+    tamanho: int
+    decimais: int = 0
+    deslocamento: int = 0
+
+
+class CabecalhoDBF(NamedTuple):
+    """Informações do cabeçalho de um arquivo DBF.
+
+    Atributos:
+        registros_num: Número de registros declarado no cabeçalho.
+        cabecalho_tamanho: Número de bytes ocupados pelo cabeçalho, ou seja,
+            posição do primeiro registro no arquivo.
+        registro_tamanho: Número de bytes ocupados por cada registro.
+        campos: Sequência de descrições dos campos do arquivo.
+    """
+
+    registros_num: int
+    cabecalho_tamanho: int
+    registro_tamanho: int
+    campos: tuple[CampoDBF, ...]
+
+
+def ler_cabecalho_dbf(
+    arquivo: BinaryIO,
+    encoding: str = "iso-8859-1",
+) -> CabecalhoDBF:
+    """Lê o cabeçalho de um arquivo DBF.
+
+    Argumentos:
+        arquivo: Arquivo DBF aberto em modo binário, posicionado no início.
+        encoding: Codificação usada nos nomes dos campos.
+
+    Retorna:
+        Um objeto [`CabecalhoDBF`][] com as informações lidas.
+
+    [`CabecalhoDBF`]: impulsoetl.utilitarios.dbf.CabecalhoDBF
+    """
+    (
+        registros_num,
+        cabecalho_tamanho,
+        registro_tamanho,
+    ) = struct.unpack("<4xIHH20x", arquivo.read(32))
+
+    campos = []
+    deslocamento = 1
+    while True:
+        separador = arquivo.read(1)
+        if separador in {b"\r", b"\n", b""}:
+            break
+        descricao = separador + arquivo.read(31)
+        nome = descricao[:11].split(b"\0")[0].decode(encoding)
+        tipo = chr(descricao[11])
+        tamanho, decimais = descricao[16], descricao[17]
+        if tipo == "C":
+            # campos de texto com mais de 255 bytes guardam o byte mais
+            # significativo do tamanho no lugar do número de casas decimais
+            tamanho |= decimais << 8
+            decimais = 0
+        campos.append(
+            CampoDBF(
+                nome=nome,
+                tipo=tipo,
+                tamanho=tamanho,
+                decimais=decimais,
+                deslocamento=deslocamento,
+            ),
+        )
+        deslocamento += tamanho
+
+    return CabecalhoDBF(
+        registros_num=registros_num,
+        cabecalho_tamanho=cabecalho_tamanho,
+        registro_tamanho=registro_tamanho,
+        campos=tuple(campos),
+    )
+
+
+def _e_latin1(encoding: str) -> bool:
+    return codecs.lookup(encoding).name == "iso8859-1"
+
+
+def _decodificar_texto(bloco: np.ndarray, encoding: str) -> np.ndarray:
+    """Converte um bloco de bytes de largura fixa em strings.
+
+    Equivale a aplicar `bytes.rstrip(b"\\0 ")` seguido de `bytes.decode()` a
+    cada linha do bloco.
+    """
+    registros_num, tamanho = bloco.shape
+    if tamanho == 0:
+        return np.full(registros_num, "", dtype=object)
+
+    # apaga os espaços e caracteres nulos ao final de cada valor
+    significativo = (bloco != _ESPACO) & (bloco != 0)
+    fim = tamanho - np.argmax(significativo[:, ::-1], axis=1)
+    fim[~significativo.any(axis=1)] = 0
+    bloco = np.where(np.arange(tamanho) < fim[:, np.newaxis], bloco, 0)
+
+    if _e_latin1(encoding):
+        # em ISO-8859-1, cada byte corresponde exatamente ao código Unicode
+        # do caractere, de modo que basta reinterpretar os bytes como UTF-32
+        textos = (
+            bloco.astype("<u4").view("<U{}".format(tamanho)).reshape(-1)
+        )
+    else:
+        textos = np.char.decode(
+            bloco.astype(np.uint8).view("S{}".format(tamanho)).reshape(-1),
+            encoding,
+        )
+    return textos.astype(object)
+
+
+def _converter_numeros_texto(bloco: np.ndarray) -> np.ndarray:
+    """Converte números registrados como texto, um a um."""
+    valores = pd.Series(_decodificar_texto(bloco, "iso-8859-1"), dtype=object)
+    valores = valores.str.strip().str.strip("*")
+    valores = valores.mask(valores == "").str.replace(",", ".", regex=False)
+    return pd.to_numeric(valores).to_numpy()
+
+
+def _decodificar_numero(bloco: np.ndarray) -> np.ndarray:
+    """Converte um bloco de bytes de largura fixa em números.
+
+    Valores compostos apenas por dígitos (alinhados à direita e, opcionalmente,
+    com o ponto decimal em uma mesma posição em todos os registros) são
+    convertidos diretamente a partir dos bytes, sem criar objetos
+    intermediários. Nos demais casos, os valores são interpretados como texto.
+
+    Assim como ao construir um DataFrame a partir dos valores lidos pelo
+    `dbfread`, retorna um vetor de inteiros se todos os valores forem inteiros
+    e não houver valores vazios; um vetor de números de ponto flutuante, se
+    algum valor for fracionário ou vazio; ou um vetor de objetos `None`, se
+    todos os valores forem vazios.
+    """
+    registros_num, tamanho = bloco.shape
+    espaco = bloco == _ESPACO
+    digito = (bloco >= _ZERO) & (bloco <= _NOVE)
+    ponto = bloco == _PONTO
+    vazio = espaco.all(axis=1)
+
+    if vazio.all():
+        return np.full(registros_num, None, dtype=object)
+
+    # espaços só são admitidos à esquerda do valor
+    espacos_internos = (
+        espaco & np.logical_or.accumulate(~espaco, axis=1)
+    ).any()
+    pontos_por_registro = ponto.sum(axis=1)
+    posicoes_ponto = np.unique(np.argmax(ponto[~vazio], axis=1))
+    if (
+        espacos_internos
+        or not (digito | ponto | espaco).all()
+        or not (digito.any(axis=1) | vazio).all()
+    ):
+        return _converter_numeros_texto(bloco)
+    if not pontos_por_registro.any():
+        casas_decimais = None
+    elif (
+        (pontos_por_registro[~vazio] == 1).all()
+        and len(posicoes_ponto) == 1
+    ):
+        casas_decimais = tamanho - 1 - posicoes_ponto[0]
+    else:
+        return _converter_numeros_texto(bloco)
+    if digito.sum(axis=1).max() > 18:
+        return _converter_numeros_texto(bloco)
+
+    algarismos = np.where(digito, bloco - _ZERO, 0).astype(np.int64)
+    # peso de cada posição, desconsiderando a coluna do ponto decimal
+    expoentes = np.cumsum(digito[:, ::-1], axis=1)[:, ::-1] - 1
+    mantissas = (algarismos * 10 ** np.maximum(expoentes, 0)).sum(axis=1)
+
+    if casas_decimais is None:
+        if not vazio.any():
+            return mantissas
+        return np.where(vazio, np.nan, mantissas.astype(np.float64))
+
+    if mantissas.max() >= _MANTISSA_MAX:
+        return _converter_numeros_texto(bloco)
+    valores = mantissas.astype(np.float64) / 10.0**casas_decimais
+    valores[vazio] = np.nan
+    return valores
+
+
+def _decodificar_ponto_flutuante(bloco: np.ndarray) -> np.ndarray:
+    """Converte um bloco de bytes de largura fixa em números fracionários."""
+    valores = _decodificar_numero(bloco)
+    if valores.dtype == np.int64:
+        return valores.astype(np.float64)
+    return valores
+
+
+def _decodificar_logico(bloco: np.ndarray) -> np.ndarray:
+    """Converte um bloco de bytes de largura fixa em valores lógicos."""
+    letras = bloco[:, 0]
+    verdadeiro = np.isin(letras, np.frombuffer(b"TtYy", dtype=np.uint8))
+    falso = np.isin(letras, np.frombuffer(b"FfNn", dtype=np.uint8))
+    nulo = np.isin(letras, np.frombuffer(b"? ", dtype=np.uint8))
+    if not (verdadeiro | falso | nulo).all():
+        raise ValueError("Valor inválido para um campo do tipo lógico.")
+    if nulo.any():
+        valores = np.full(len(letras), None, dtype=object)
+        valores[verdadeiro] = True
+        valores[falso] = False
+        return valores
+    return verdadeiro
+
+
+def _recortar_campo(registros: np.ndarray, campo: CampoDBF) -> np.ndarray:
+    return registros[
+        :,
+        campo.deslocamento : campo.deslocamento + campo.tamanho,
+    ]
+
+
+def _decodificar_campo(
+    registros: np.ndarray,
+    campo: CampoDBF,
+    encoding: str,
+) -> np.ndarray:
+    """Converte um campo de uma matriz de registros em um vetor de valores."""
+    bloco = _recortar_campo(registros, campo)
+    if campo.tipo in {"C", "D"}:
+        # datas são lidas como texto, como em `LeitorCamposDBF`
+        return _decodificar_texto(bloco, encoding)
+    elif campo.tipo == "N":
+        return _decodificar_numero(bloco)
+    elif campo.tipo == "F":
+        return _decodificar_ponto_flutuante(bloco)
+    return _decodificar_logico(bloco)
+
+
+class _CondicaoNaoSuportada(Exception):
+    """Expressão que não pode ser avaliada diretamente sobre os bytes."""
+
+
+FiltroRegistros = Callable[[np.ndarray], np.ndarray]
+
+_OPERADORES_COMPARACAO: Final[frozendict] = frozendict(
+    {
+        ast.Eq: operator.eq,
+        ast.NotEq: operator.ne,
+        ast.Lt: operator.lt,
+        ast.LtE: operator.le,
+        ast.Gt: operator.gt,
+        ast.GtE: operator.ge,
+    },
+)
+
+# operadores equivalentes quando os lados da comparação são invertidos
+_OPERADORES_INVERTIDOS: Final[frozendict] = frozendict(
+    {
+        ast.Eq: ast.Eq,
+        ast.NotEq: ast.NotEq,
+        ast.Lt: ast.Gt,
+        ast.LtE: ast.GtE,
+        ast.Gt: ast.Lt,
+        ast.GtE: ast.LtE,
+        ast.In: ast.In,
+        ast.NotIn: ast.NotIn,
+    },
+)
+
+
+def _preparar_expressao(condicoes: str) -> str:
+    """Reproduz a precedência dos operadores `&` e `|` do `DataFrame.query()`.
+
+    Assim como o pandas, substitui os operadores `&` e `|` pelas palavras
+    `and` e `or`, que têm precedência menor que as comparações.
+    """
+    fichas = []
+    for ficha in tokenize.generate_tokens(io.StringIO(condicoes).readline):
+        if ficha.type == tokenize.OP and ficha.string in {"&", "|"}:
+            substituta = "and" if ficha.string == "&" else "or"
+            fichas.append((tokenize.NAME, substituta))
+        else:
+            fichas.append((ficha.type, ficha.string))
+    return tokenize.untokenize(fichas)
+
+
+def _valor_constante(no: ast.expr) -> Any:
+    """Obtém o valor de um literal (ou de uma lista de literais)."""
+    try:
+        valor = ast.literal_eval(no)
+    except ValueError as erro:
+        raise _CondicaoNaoSuportada() from erro
+    if isinstance(valor, (list, tuple, set)):
+        return list(valor)
+    return valor
+
+
+def _e_texto(valor: Any) -> bool:
+    if isinstance(valor, list):
+        return all(isinstance(item, str) for item in valor)
+    return isinstance(valor, str)
+
+
+def _e_numero(valor: Any) -> bool:
+    if isinstance(valor, list):
+        return all(_e_numero(item) for item in valor)
+    return isinstance(valor, (int, float)) and not isinstance(valor, bool)
+
+
+def _codificar(texto: str, encoding: str) -> bytes | None:
+    try:
+        return texto.encode(encoding)
+    except UnicodeEncodeError:
+        # nenhum valor do arquivo pode ser igual a um texto não codificável
+        return None
+
+
+def _texto_igual(bloco: np.ndarray, texto: str, encoding: str) -> np.ndarray:
+    """Compara um campo de texto com um valor, sem decodificá-lo."""
+    registros_num, tamanho = bloco.shape
+    valor = _codificar(texto, encoding)
+    if valor is None or valor != valor.rstrip(b"\0 ") or len(valor) > tamanho:
+        # valores decodificados nunca terminam com espaços ou nulos
+        return np.zeros(registros_num, dtype=bool)
+    prefixo = np.frombuffer(valor, dtype=np.uint8)
+    restante = bloco[:, len(valor) :]
+    return (bloco[:, : len(valor)] == prefixo).all(axis=1) & (
+        (restante == _ESPACO) | (restante == 0)
+    ).all(axis=1)
+
+
+def _texto_comeca_com(
+    bloco: np.ndarray,
+    texto: str,
+    encoding: str,
+) -> np.ndarray:
+    """Verifica se um campo de texto começa com um prefixo."""
+    registros_num, tamanho = bloco.shape
+    valor = _codificar(texto, encoding)
+    if valor is None or len(valor) > tamanho:
+        return np.zeros(registros_num, dtype=bool)
+    if valor != valor.rstrip(b"\0 "):
+        raise _CondicaoNaoSuportada()
+    prefixo = np.frombuffer(valor, dtype=np.uint8)
+    return (bloco[:, : len(valor)] == prefixo).all(axis=1)
+
+
+def _texto_termina_com(
+    bloco: np.ndarray,
+    texto: str,
+    encoding: str,
+) -> np.ndarray:
+    """Verifica se um campo de texto termina com um sufixo."""
+    registros_num, tamanho = bloco.shape
+    valor = _codificar(texto, encoding)
+    if valor is None or len(valor) > tamanho:
+        return np.zeros(registros_num, dtype=bool)
+    if valor != valor.rstrip(b"\0 "):
+        raise _CondicaoNaoSuportada()
+    if not valor:
+        return np.ones(registros_num, dtype=bool)
+    significativo = (bloco != _ESPACO) & (bloco != 0)
+    fim = tamanho - np.argmax(significativo[:, ::-1], axis=1)
+    fim[~significativo.any(axis=1)] = 0
+    posicoes = fim[:, np.newaxis] - len(valor) + np.arange(len(valor))
+    finais = np.take_along_axis(bloco, np.maximum(posicoes, 0), axis=1)
+    sufixo = np.frombuffer(valor, dtype=np.uint8)
+    return (fim >= len(valor)) & (finais == sufixo).all(axis=1)
+
+
+def _numeros(bloco: np.ndarray, campo: CampoDBF) -> np.ndarray:
+    if campo.tipo == "F":
+        valores = _decodificar_ponto_flutuante(bloco)
+    else:
+        valores = _decodificar_numero(bloco)
+    if valores.dtype == object:
+        # todos os valores estão vazios
+        return np.full(len(valores), np.nan)
+    return valores
+
+
+def _compilar_comparacao(
+    campo: CampoDBF,
+    operador: type[ast.cmpop],
+    valor: Any,
+    encoding: str,
+) -> FiltroRegistros:
+    """Compila a comparação entre um campo e um valor literal."""
+    if campo.tipo in {"C", "D"} and _e_texto(valor):
+        if isinstance(valor, list) or operador in {ast.In, ast.NotIn}:
+            if operador not in {ast.Eq, ast.NotEq, ast.In, ast.NotIn}:
+                raise _CondicaoNaoSuportada()
+            valores = valor if isinstance(valor, list) else [valor]
+            negar = operador in {ast.NotEq, ast.NotIn}
+
+            def filtro_lista(registros: np.ndarray) -> np.ndarray:
+                bloco = _recortar_campo(registros, campo)
+                mascara = np.zeros(len(bloco), dtype=bool)
+                for item in valores:
+                    mascara |= _texto_igual(bloco, item, encoding)
+                return ~mascara if negar else mascara
+
+            return filtro_lista
+
+        if operador not in {ast.Eq, ast.NotEq}:
+            raise _CondicaoNaoSuportada()
+
+        def filtro_texto(registros: np.ndarray) -> np.ndarray:
+            bloco = _recortar_campo(registros, campo)
+            mascara = _texto_igual(bloco, valor, encoding)
+            return ~mascara if operador is ast.NotEq else mascara
+
+        return filtro_texto
+
+    if campo.tipo in {"N", "F"} and _e_numero(valor):
+        if isinstance(valor, list) or operador in {ast.In, ast.NotIn}:
+            if operador not in {ast.Eq, ast.NotEq, ast.In, ast.NotIn}:
+                raise _CondicaoNaoSuportada()
+            valores = valor if isinstance(valor, list) else [valor]
+            negar = operador in {ast.NotEq, ast.NotIn}
+
+            def filtro_numeros(registros: np.ndarray) -> np.ndarray:
+                bloco = _recortar_campo(registros, campo)
+                mascara = np.isin(_numeros(bloco, campo), valores)
+                return ~mascara if negar else mascara
+
+            return filtro_numeros
+
+        funcao = _OPERADORES_COMPARACAO[operador]
+
+        def filtro_numero(registros: np.ndarray) -> np.ndarray:
+            bloco = _recortar_campo(registros, campo)
+            return funcao(_numeros(bloco, campo), valor)
+
+        return filtro_numero
+
+    raise _CondicaoNaoSuportada()
+
+
+def _compilar_no(
+    no: ast.expr,
+    campos: dict[str, CampoDBF],
+    encoding: str,
+) -> FiltroRegistros:
+    """Compila recursivamente um nó da árvore sintática de uma expressão."""
+    if isinstance(no, ast.BoolOp):
+        filtros = [
+            _compilar_no(valor, campos, encoding) for valor in no.values
+        ]
+        if isinstance(no.op, ast.And):
+            combinar = np.logical_and
+        else:
+            combinar = np.logical_or
+
+        def filtro_booleano(registros: np.ndarray) -> np.ndarray:
+            mascara = filtros[0](registros)
+            for filtro in filtros[1:]:
+                mascara = combinar(mascara, filtro(registros))
+            return mascara
+
+        return filtro_booleano
+
+    if isinstance(no, ast.UnaryOp) and isinstance(
+        no.op,
+        (ast.Not, ast.Invert),
+    ):
+        filtro_negado = _compilar_no(no.operand, campos, encoding)
+        return lambda registros: ~filtro_negado(registros)
+
+    if isinstance(no, ast.Compare):
+        filtros = []
+        esquerda = no.left
+        for operador, direita in zip(no.ops, no.comparators):
+            tipo_operador = type(operador)
+            if isinstance(esquerda, ast.Name) and esquerda.id in campos:
+                campo, valor = campos[esquerda.id], _valor_constante(direita)
+            elif isinstance(direita, ast.Name) and direita.id in campos:
+                if tipo_operador in {ast.In, ast.NotIn}:
+                    raise _CondicaoNaoSuportada()
+                campo, valor = campos[direita.id], _valor_constante(esquerda)
+                tipo_operador = _OPERADORES_INVERTIDOS[tipo_operador]
+            else:
+                raise _CondicaoNaoSuportada()
+            filtros.append(
+                _compilar_comparacao(campo, tipo_operador, valor, encoding),
+            )
+            esquerda = direita
+
+        def filtro_comparacoes(registros: np.ndarray) -> np.ndarray:
+            mascara = filtros[0](registros)
+            for filtro in filtros[1:]:
+                mascara = mascara & filtro(registros)
+            return mascara
+
+        return filtro_comparacoes
+
+    if (
+        isinstance(no, ast.Call)
+        and isinstance(no.func, ast.Attribute)
+        and not no.keywords
+        and len(no.args) == 1
+    ):
+        metodo = no.func.attr
+        objeto = no.func.value
+        if (
+            metodo == "isin"
+            and isinstance(objeto, ast.Name)
+            and objeto.id in campos
+        ):
+            return _compilar_comparacao(
+                campos[objeto.id],
+                ast.In,
+                _valor_constante(no.args[0]),
+                encoding,
+            )
+        if (
+            metodo in {"startswith", "endswith"}
+            and isinstance(objeto, ast.Attribute)
+            and objeto.attr == "str"
+            and isinstance(objeto.value, ast.Name)
+            and objeto.value.id in campos
+            and campos[objeto.value.id].tipo in {"C", "D"}
+        ):
+            campo = campos[objeto.value.id]
+            argumento = _valor_constante(no.args[0])
+            valores = argumento if isinstance(argumento, list) else [argumento]
+            if not _e_texto(valores):
+                raise _CondicaoNaoSuportada()
+            comparar = (
+                _texto_comeca_com
+                if metodo == "startswith"
+                else _texto_termina_com
+            )
+
+            def filtro_extremidade(registros: np.ndarray) -> np.ndarray:
+                bloco = _recortar_campo(registros, campo)
+                mascara = np.zeros(len(bloco), dtype=bool)
+                for valor in valores:
+                    mascara |= comparar(bloco, valor, encoding)
+                return mascara
+
+            # verifica antecipadamente se os valores são suportados
+            filtro_extremidade(
+                np.full(
+                    (1, campo.deslocamento + campo.tamanho),
+                    _ESPACO,
+                    dtype=np.uint8,
+                ),
+            )
+            return filtro_extremidade
+
+    raise _CondicaoNaoSuportada()
+
+
+def compilar_condicoes(
+    condicoes: str,
+    campos: Sequence[CampoDBF],
+    encoding: str = "iso-8859-1",
+) -> FiltroRegistros:
+    """Compila condições de filtragem em uma função aplicável aos registros.
+
+    As condições devem ser escritas com a sintaxe do método
+    [`pandas.DataFrame.query()`][], usando os nomes e valores dos campos
+    exatamente como registrados no arquivo. Comparações simples (`==`, `!=`,
+    `<`, `<=`, `>`, `>=`, `in` e `not in`) entre um campo e valores literais,
+    chamadas aos métodos `.isin()`, `.str.startswith()` e `.str.endswith()`
+    e combinações dessas condições com `and`, `or`, `not`, `&`, `|` e `~`
+    são avaliadas diretamente sobre os bytes dos registros, sem que os
+    campos de texto precisem ser decodificados.
+
+    Expressões com qualquer outra construção são avaliadas pelo próprio
+    pandas, sobre um DataFrame que contém apenas os campos referenciados
+    na expressão.
+
+    Argumentos:
+        condicoes: Expressão com as condições de filtragem.
+        campos: Descrições dos campos do arquivo DBF.
+        encoding: Codificação dos campos de texto do arquivo.
+
+    Retorna:
+        Uma função que recebe uma matriz de bytes - em que cada linha é um
+        registro do arquivo - e retorna um vetor booleano indicando quais
+        registros satisfazem as condições.
+
+    [`pandas.DataFrame.query()`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.query.html
+    """
+    campos_por_nome = {campo.nome: campo for campo in campos}
+    try:
+        arvore = ast.parse(_preparar_expressao(condicoes).strip(), mode="eval")
+        return _compilar_no(arvore.body, campos_por_nome, encoding)
+    except (_CondicaoNaoSuportada, SyntaxError, tokenize.TokenError):
+        logger.debug(
+            "Condições `{}` serão avaliadas com `DataFrame.query()`.",
+            condicoes,
+        )
+
+    nomes = set(re.findall(r"[A-Za-z_]\w*", condicoes))
+    campos_referenciados = [
+        campo for campo in campos if campo.nome in nomes
+    ]
+
+    def filtro_consulta(registros: np.ndarray) -> np.ndarray:
+        registros_num = len(registros)
+        df = pd.DataFrame(
+            {
+                campo.nome: _decodificar_campo(registros, campo, encoding)
+                for campo in campos_referenciados
+            },
+            index=pd.RangeIndex(registros_num),
+        )
+        mascara = np.zeros(registros_num, dtype=bool)
+        mascara[df.query(condicoes, engine="python").index] = True
+        return mascara
+
+    return filtro_consulta
+
+
+class LeitorDBF(object):
+    """Leitor colunar de arquivos DBF mapeados em memória.
+
+    Exemplo:
+        >>> leitor = LeitorDBF("PASE2108.dbf")
+        >>> for lote in leitor.lotes(passo=100000):
+        ...     print(lote.shape)
+    """
+
+    def __init__(
+        self,
+        caminho: str | Path,
+        encoding: str = "iso-8859-1",
+    ) -> None:
+        """Instancia um leitor de arquivos DBF.
+
+        Argumentos:
+            caminho: Caminho do arquivo DBF a ser lido.
+            encoding: Codificação dos campos de texto do arquivo.
+
+        Exceções:
+            Levanta um erro `NotImplementedError` se o arquivo contiver
+            algum campo de um tipo não suportado pelo leitor.
+        """
+        self.caminho = Path(caminho)
+        self.nome = str(caminho)
+        self.encoding = encoding
+        with open(self.caminho, "rb") as arquivo:
+            self.cabecalho = ler_cabecalho_dbf(arquivo, encoding=encoding)
+        self._verificar_tipos()
+
+    def _verificar_tipos(self) -> None:
+        tipos_nao_suportados = {
+            campo.tipo
+            for campo in self.cabecalho.campos
+            if campo.tipo not in TIPOS_SUPORTADOS
+        }
+        if tipos_nao_suportados:
+            raise NotImplementedError(
+                "Tipos de campo não suportados: {}".format(
+                    ", ".join(sorted(tipos_nao_suportados)),
+                ),
+            )
+
+    @property
+    def campos(self) -> tuple[CampoDBF, ...]:
+        """Descrições dos campos do arquivo."""
+        return self.cabecalho.campos
+
+    def selecionar_campos(
+        self,
+        colunas: Iterable[str] | None = None,
+    ) -> tuple[CampoDBF, ...]:
+        """Seleciona os campos do arquivo correspondentes a uma lista de nomes.
+
+        Os nomes são comparados sem diferenciar letras maiúsculas de
+        minúsculas e desconsiderando espaços nas extremidades. Nomes que não
+        correspondem a nenhum campo do arquivo são ignorados.
+
+        Argumentos:
+            colunas: Nomes das colunas desejadas. Se `None` (padrão), todos os
+                campos do arquivo são selecionados.
+
+        Retorna:
+            As descrições dos campos selecionados, na ordem em que aparecem no
+            arquivo.
+        """
+        if colunas is None:
+            return self.campos
+        nomes = {coluna.strip().upper() for coluna in colunas}
+        campos = tuple(
+            campo
+            for campo in self.campos
+            if campo.nome.strip().upper() in nomes
+        )
+        logger.debug(
+            "{} de {} campos selecionados para leitura.",
+            len(campos),
+            len(self.campos),
+        )
+        return campos
+
+    def _mapear_registros(self) -> np.ndarray:
+        """Mapeia os registros do arquivo em uma matriz de bytes.
+
+        Cada linha da matriz corresponde a um registro. Assim como o
+        `dbfread`, desconsidera o número de registros declarado no cabeçalho
+        e percorre o arquivo até encontrar o marcador de fim dos registros ou
+        o fim do arquivo.
+        """
+        registro_tamanho = self.cabecalho.registro_tamanho
+        registros_num = (
+            self.caminho.stat().st_size - self.cabecalho.cabecalho_tamanho
+        ) // max(registro_tamanho, 1)
+        if registros_num <= 0:
+            return np.empty((0, registro_tamanho), dtype=np.uint8)
+        registros = np.memmap(
+            self.caminho,
+            dtype=np.uint8,
+            mode="r",
+            offset=self.cabecalho.cabecalho_tamanho,
+            shape=(registros_num, registro_tamanho),
+        )
+        fim = np.flatnonzero(registros[:, 0] == _FIM_REGISTROS)
+        if len(fim):
+            registros = registros[: fim[0]]
+        return registros
+
+    def _blocos_registros(self) -> Generator[np.ndarray, None, None]:
+        """Gera blocos sucessivos de registros, como matrizes de bytes."""
+        registros = self._mapear_registros()
+        for inicio in range(0, len(registros), _BLOCO_REGISTROS):
+            yield registros[inicio : inicio + _BLOCO_REGISTROS]
+
+    def _decodificar_campo(
+        self,
+        registros: np.ndarray,
+        campo: CampoDBF,
+    ) -> np.ndarray:
+        return _decodificar_campo(registros, campo, self.encoding)
+
+    def _converter_registros(
+        self,
+        registros: np.ndarray,
+        campos: Iterable[CampoDBF],
+    ) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                campo.nome: self._decodificar_campo(registros, campo)
+                for campo in campos
+            },
+        )
+
+    def _compilar_filtro(
+        self,
+        condicoes: str | None,
+    ) -> FiltroRegistros | None:
+        if not condicoes:
+            return None
+        return compilar_condicoes(
+            condicoes,
+            self.campos,
+            encoding=self.encoding,
+        )
+
+    @staticmethod
+    def _filtrar_registros(
+        registros: np.ndarray,
+        filtro: FiltroRegistros | None = None,
+    ) -> np.ndarray:
+        """Seleciona os registros válidos que satisfazem um filtro."""
+        registros = np.asarray(registros)
+        validos = registros[:, 0] == _REGISTRO_VALIDO
+        if filtro is not None and validos.any():
+            validos[validos] = filtro(registros[validos])
+        if validos.all():
+            return registros
+        return registros[validos]
+
+    def ler_intervalo(
+        self,
+        inicio: int,
+        fim: int,
+        colunas: Iterable[str] | None = None,
+        condicoes: str | None = None,
+    ) -> pd.DataFrame:
+        """Lê os registros válidos contidos em um intervalo do arquivo.
+
+        O intervalo deve estar contido entre o início dos registros e o
+        marcador de fim dos registros, que não é procurado.
+
+        Argumentos:
+            inicio: Posição do primeiro registro do intervalo, contando a
+                partir de zero e incluindo os registros apagados.
+            fim: Posição seguinte à do último registro do intervalo.
+            colunas: Nomes das colunas a serem lidas, conforme o método
+                [`selecionar_campos()`][].
+            condicoes: Expressão opcional que os registros devem satisfazer
+                para serem lidos, conforme o método [`lotes()`][].
+
+        Retorna:
+            Um objeto [`pandas.DataFrame`][] com os registros selecionados
+            no intervalo.
+
+        [`selecionar_campos()`]: impulsoetl.utilitarios.dbf.LeitorDBF.selecionar_campos
+        [`lotes()`]: impulsoetl.utilitarios.dbf.LeitorDBF.lotes
+        [`pandas.DataFrame`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.html
+        """
+        registro_tamanho = self.cabecalho.registro_tamanho
+        # mapeia apenas o intervalo, sem percorrer o restante do arquivo
+        registros = np.memmap(
+            self.caminho,  # type: ignore[arg-type]
+            dtype=np.uint8,
+            mode="r",
+            offset=self.cabecalho.cabecalho_tamanho
+            + inicio * registro_tamanho,
+            shape=(fim - inicio, registro_tamanho),
+        )
+        registros = self._filtrar_registros(
+            registros,
+            self._compilar_filtro(condicoes),
+        )
+        return self._converter_registros(
+            registros,
+            self.selecionar_campos(colunas),
+        )
+
+    def _lotes_paralelos(
+        self,
+        registros_num: int,
+        passo: int | DimensionadorLotes,
+        colunas: Iterable[str] | None,
+        condicoes: str | None,
+        processos: int,
+    ) -> Generator[pd.DataFrame, None, None]:
+        """Decodifica intervalos de registros em processos paralelos."""
+
+        def gerar_intervalos() -> Generator[tuple[int, int], None, None]:
+            inicio = 0
+            while inicio < registros_num:
+                # o tamanho é consultado a cada intervalo, já que pode mudar
+                # conforme os lotes anteriores são medidos
+                fim = min(inicio + passo_atual(passo), registros_num)
+                yield inicio, fim
+                inicio = fim
+
+        intervalos = gerar_intervalos()
+        colunas = list(colunas) if colunas is not None else None
+        executor = _obter_executor(processos)
+        pendentes: deque[Future[pd.DataFrame]] = deque()
+
+        def submeter() -> None:
+            intervalo = next(intervalos, None)
+            if intervalo is not None:
+                pendentes.append(
+                    executor.submit(
+                        _ler_intervalo,
+                        self.caminho,
+                        self.encoding,
+                        *intervalo,
+                        colunas,
+                        condicoes,
+                    ),
+                )
+
+        try:
+            # mantém até dois intervalos por processo em andamento, para que
+            # nenhum processo fique ocioso enquanto os lotes são consumidos
+            for _ in range(2 * processos):
+                submeter()
+            while pendentes:
+                lote = pendentes.popleft().result()
+                submeter()
+                yield lote
+        finally:
+            for pendente in pendentes:
+                pendente.cancel()
+
+    def lotes(
+        self,
+        passo: int | DimensionadorLotes = 10000,
+        colunas: Iterable[str] | None = None,
+        condicoes: str | None = None,
+        processos: int = 1,
+    ) -> Generator[pd.DataFrame, None, None]:
+        """Lê o arquivo em lotes de registros.
+
+        Argumentos:
+            passo: Número de registros válidos (isto é, não apagados) em cada
+                lote, ou instância de [`DimensionadorLotes`][] que calcula o
+                tamanho de cada lote a partir da memória ocupada pelos
+                anteriores. Nesse caso, o tamanho dos lotes decodificados em
+                processos paralelos se refere aos registros lidos, inclusive
+                os apagados ou não selecionados por `condicoes`.
+            colunas: Nomes das colunas a serem lidas, conforme o método
+                [`selecionar_campos()`][]. Os demais campos não chegam a ser
+                decodificados. Por padrão, todos os campos são lidos.
+            condicoes: Expressão opcional, com a sintaxe do método
+                [`pandas.DataFrame.query()`][], que os registros devem
+                satisfazer para serem lidos. A expressão é avaliada sobre os
+                bytes de cada registro, antes da conversão dos valores (ver
+                [`compilar_condicoes()`][]), e pode se referir a quaisquer
+                campos do arquivo, mesmo que não estejam em `colunas`.
+            processos: Número de processos que decodificam simultaneamente
+                intervalos diferentes de registros do arquivo. Se for `0`,
+                usa um processo para cada núcleo de processamento
+                disponível. Por padrão, os registros são decodificados no
+                próprio processo que chama o método. Os lotes gerados são
+                idênticos em qualquer caso.
+
+        Gera:
+            A cada iteração, um objeto [`pandas.DataFrame`][] com até `passo`
+            registros e uma coluna para cada campo selecionado, na ordem em
+            que aparecem no cabeçalho.
+
+        [`pandas.DataFrame`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.html
+        [`selecionar_campos()`]: impulsoetl.utilitarios.dbf.LeitorDBF.selecionar_campos
+        [`pandas.DataFrame.query()`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.query.html
+        [`compilar_condicoes()`]: impulsoetl.utilitarios.dbf.compilar_condicoes
+        [`DimensionadorLotes`]: impulsoetl.utilitarios.lotes.DimensionadorLotes
+        """
+        campos = self.selecionar_campos(colunas)
+        dimensionador = None
+        if isinstance(passo, DimensionadorLotes):
+            dimensionador = passo
+            dimensionador.estimar_pelo_cabecalho(campos)
+        if processos == 0:
+            processos = os.cpu_count() or 1
+        registros_total = 0
+        if processos > 1 and self.caminho is not None:
+            registros_total = len(self._mapear_registros())
+            # não vale a pena iniciar novos processos para um único intervalo
+            processos = min(
+                processos,
+                -(-registros_total // passo_atual(passo)),
+            )
+        registros_num = 0
+        if processos > 1 and self.caminho is not None:
+            logger.debug(
+                "Decodificando o arquivo `{}` em {} processos.",
+                self.nome,
+                processos,
+            )
+            lotes_paralelos = self._lotes_paralelos(
+                registros_num=registros_total,
+                passo=passo,
+                colunas=colunas,
+                condicoes=condicoes,
+                processos=processos,
+            )
+            if dimensionador is None:
+                lotes_paralelos = _agrupar_lotes(
+                    lotes_paralelos,
+                    passo,  # type: ignore[arg-type]
+                )
+            for lote in lotes_paralelos:
+                registros_num += len(lote)
+                if dimensionador is not None:
+                    dimensionador.observar(lote, etapa="extracao")
+                yield lote
+        else:
+            filtro = self._compilar_filtro(condicoes)
+            selecionados = (
+                self._filtrar_registros(bloco, filtro)
+                for bloco in self._blocos_registros()
+            )
+            for registros in _agrupar_registros(selecionados, passo):
+                registros_num += len(registros)
+                lote = self._converter_registros(registros, campos)
+                if dimensionador is not None:
+                    dimensionador.observar(lote, etapa="extracao")
+                yield lote
+        logger.debug(
+            "{:n} registros selecionados no arquivo `{}`.",
+            registros_num,
+            self.nome,
+        )
+
+    def ler(self) -> pd.DataFrame:
+        """Lê todos os registros do arquivo de uma só vez.
+
+        Retorna:
+            Um objeto [`pandas.DataFrame`][] com todos os registros válidos
+            do arquivo.
+
+        [`pandas.DataFrame`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.html
+        """
+        for lote in self.lotes(passo=sys.maxsize):
+            return lote
+        return pd.DataFrame(columns=[campo.nome for campo in self.campos])
+
+
+class LeitorFluxoDBF(LeitorDBF):
+    """Leitor colunar de arquivos DBF recebidos em fatias sucessivas de bytes.
+
+    Permite interpretar os registros de um arquivo DBF à medida que são
+    recebidos - por exemplo, enquanto um arquivo DBC ainda está sendo
+    descompactado com a função [`descompactar_dbc()`][] -, sem que o arquivo
+    precise ser gravado em disco. Ao contrário de [`LeitorDBF`][], os
+    registros só podem ser percorridos uma vez.
+
+    Exemplo:
+        >>> with open("PASE2108.dbc", "rb") as arquivo:
+        ...     leitor = LeitorFluxoDBF(descompactar_dbc(arquivo))
+        ...     for lote in leitor.lotes(passo=100000):
+        ...         print(lote.shape)
+
+    [`descompactar_dbc()`]: impulsoetl.utilitarios.dbc.descompactar_dbc
+    [`LeitorDBF`]: impulsoetl.utilitarios.dbf.LeitorDBF
+    """
+
+    def __init__(
+        self,
+        fluxo: Iterable[bytes],
+        encoding: str = "iso-8859-1",
+        nome: str = "<fluxo>",
+    ) -> None:
+        """Instancia um leitor de arquivos DBF a partir de um fluxo de bytes.
+
+        O cabeçalho é lido imediatamente; os registros, somente quando
+        requisitados.
+
+        Argumentos:
+            fluxo: Iterável que gera fatias sucessivas do conteúdo do arquivo
+                DBF, de qualquer tamanho.
+            encoding: Codificação dos campos de texto do arquivo.
+            nome: Nome do arquivo, usado apenas para exibição nos registros
+                de execução.
+
+        Exceções:
+            Levanta um erro `ValueError` se o fluxo terminar antes do fim do
+            cabeçalho, e um erro `NotImplementedError` se o arquivo contiver
+            algum campo de um tipo não suportado pelo leitor.
+        """
+        self.caminho = None
+        self.nome = nome
+        self.encoding = encoding
+        self._fluxo = iter(fluxo)
+        inicio = self._ler_fluxo(b"", 32)
+        if len(inicio) < 32:
+            raise ValueError("Fluxo terminou antes do fim do cabeçalho.")
+        (cabecalho_tamanho,) = struct.unpack_from("<H", inicio, 8)
+        inicio = self._ler_fluxo(inicio, cabecalho_tamanho)
+        if len(inicio) < cabecalho_tamanho:
+            raise ValueError("Fluxo terminou antes do fim do cabeçalho.")
+        self.cabecalho = ler_cabecalho_dbf(
+            io.BytesIO(inicio[:cabecalho_tamanho]),
+            encoding=encoding,
+        )
+        self._restante = inicio[cabecalho_tamanho:]
+        self._verificar_tipos()
+
+    def _ler_fluxo(self, inicio: bytes, tamanho: int) -> bytes:
+        """Acumula fatias do fluxo até atingir um número mínimo de bytes."""
+        fatias = [inicio]
+        recebidos = len(inicio)
+        while recebidos < tamanho:
+            fatia = next(self._fluxo, None)
+            if fatia is None:
+                break
+            fatias.append(fatia)
+            recebidos += len(fatia)
+        return b"".join(fatias)
+
+    def _blocos_registros(self) -> Generator[np.ndarray, None, None]:
+        """Gera blocos de registros à medida que são recebidos do fluxo."""
+        registro_tamanho = max(self.cabecalho.registro_tamanho, 1)
+        bloco_tamanho = _BLOCO_REGISTROS * registro_tamanho
+        restante, self._restante = self._restante, b""
+        try:
+            while True:
+                dados = self._ler_fluxo(restante, bloco_tamanho)
+                registros_num = len(dados) // registro_tamanho
+                restante = dados[registros_num * registro_tamanho :]
+                registros = np.frombuffer(
+                    dados,
+                    dtype=np.uint8,
+                    count=registros_num * registro_tamanho,
+                ).reshape(registros_num, registro_tamanho)
+                fim = np.flatnonzero(registros[:, 0] == _FIM_REGISTROS)
+                if len(fim):
+                    yield registros[: fim[0]]
+                    return
+                if len(dados) < bloco_tamanho:
+                    # fluxo encerrado sem o marcador de fim dos registros
+                    yield registros
+                    return
+                yield registros
+        finally:
+            fechar = getattr(self._fluxo, "close", None)
+            if fechar is not None:
+                fechar()
+
+
+def _agrupar_registros(
+    blocos: Iterable[np.ndarray],
+    passo: int | DimensionadorLotes,
+) -> Generator[np.ndarray, None, None]:
+    """Reagrupa blocos de registros em lotes do tamanho indicado."""
+    pendentes: list[np.ndarray] = []
+    pendentes_num = 0
+    tamanho = 0
+    for bloco in blocos:
+        while len(bloco):
+            if not pendentes_num:
+                tamanho = passo_atual(passo)
+            faltantes = tamanho - pendentes_num
+            parte, bloco = bloco[:faltantes], bloco[faltantes:]
+            pendentes.append(parte)
+            pendentes_num += len(parte)
+            if pendentes_num == tamanho:
+                yield _concatenar(pendentes)
+                pendentes, pendentes_num = [], 0
+    if pendentes_num:
+        yield _concatenar(pendentes)
+
+
+def _concatenar(registros: list[np.ndarray]) -> np.ndarray:
+    if len(registros) == 1:
+        return registros[0]
+    return np.concatenate(registros)
+
+
+_executores: dict[int, ProcessPoolExecutor] = {}
+_executores_trava = threading.Lock()
+
+
+def _obter_executor(processos: int) -> ProcessPoolExecutor:
+    """Obtém um conjunto de processos, reaproveitado entre leituras.
+
+    Iniciar um processo e importar os módulos necessários leva alguns
+    segundos; por isso, os processos são mantidos até o fim da execução e
+    compartilhados entre as leituras de arquivos sucessivos.
+    """
+    with _executores_trava:
+        if processos not in _executores:
+            _executores[processos] = ProcessPoolExecutor(
+                max_workers=processos,
+                # processos criados do zero não herdam travas de outras linhas
+                # de execução (como as de download e da esteira) em estado
+                # inválido
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executores[processos]
+
+
+@atexit.register
+def _encerrar_executores() -> None:
+    with _executores_trava:
+        executores = list(_executores.values())
+        _executores.clear()
+    for executor in executores:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _ler_intervalo(
+    caminho: Path,
+    encoding: str,
+    inicio: int,
+    fim: int,
+    colunas: list[str] | None,
+    condicoes: str | None,
+) -> pd.DataFrame:
+    """Lê um intervalo de registros de um arquivo DBF em outro processo."""
+    return LeitorDBF(caminho, encoding=encoding).ler_intervalo(
+        inicio=inicio,
+        fim=fim,
+        colunas=colunas,
+        condicoes=condicoes,
+    )
+
+
+def _agrupar_lotes(
+    lotes: Iterable[pd.DataFrame],
+    passo: int,
+) -> Generator[pd.DataFrame, None, None]:
+    """Reagrupa DataFrames em lotes de tamanho fixo, na mesma ordem."""
+    pendentes: list[pd.DataFrame] = []
+    pendentes_num = 0
+    for lote in lotes:
+        if not pendentes_num and len(lote) == passo:
+            # caso mais comum, sem registros apagados ou filtrados
+            yield lote
+            continue
+        while len(lote):
+            faltantes = passo - pendentes_num
+            parte, lote = lote.iloc[:faltantes], lote.iloc[faltantes:]
+            pendentes.append(parte)
+            pendentes_num += len(parte)
+            if pendentes_num == passo:
+                yield pd.concat(pendentes, ignore_index=True)
+                pendentes, pendentes_num = [], 0
+    if pendentes_num:
+        yield pd.concat(pendentes, ignore_index=True)
+
+
+def _inferir_campo(nome: str, valores: pd.Series, encoding: str) -> CampoDBF:
+    """Escolhe o tipo e o tamanho de um campo DBF a partir dos valores."""
+    preenchidos = valores.dropna()
+    if pd.api.types.is_bool_dtype(valores):
+        return CampoDBF(nome=nome, tipo="L", tamanho=1)
+    if pd.api.types.is_integer_dtype(valores):
+        tamanho = preenchidos.astype(str).str.len().max()
+        return CampoDBF(nome=nome, tipo="N", tamanho=max(int(tamanho or 1), 1))
+    if pd.api.types.is_float_dtype(valores):
+        decimais = next(
+            (
+                casas
+                for casas in range(7)
+                if (preenchidos.round(casas) == preenchidos).all()
+            ),
+            6,
+        )
+        tamanho = (
+            preenchidos.map(("{:.%df}" % decimais).format).str.len().max()
+        )
+        return CampoDBF(
+            nome=nome,
+            tipo="N",
+            tamanho=max(int(tamanho) if tamanho == tamanho else 1, 1),
+            decimais=decimais,
+        )
+    if preenchidos.map(lambda valor: isinstance(valor, date)).any():
+        return CampoDBF(nome=nome, tipo="D", tamanho=8)
+    tamanho = preenchidos.astype(str).str.encode(encoding).str.len().max()
+    return CampoDBF(
+        nome=nome,
+        tipo="C",
+        tamanho=max(int(tamanho) if tamanho == tamanho else 1, 1),
+    )
+
+
+def _formatar_campo(
+    valores: pd.Series,
+    campo: CampoDBF,
+    encoding: str,
+) -> np.ndarray:
+    """Converte os valores de um campo em uma matriz de bytes."""
+    nulos = valores.isna().to_numpy()
+    if campo.tipo == "L":
+        textos = pd.Series(
+            np.where(valores.fillna(False).astype(bool), "T", "F"),
+        )
+        textos[nulos] = "?"
+    elif campo.tipo == "N" or campo.tipo == "F":
+        formato = "{:.%df}" % campo.decimais
+        textos = (
+            valores.map(
+                lambda valor: (
+                    str(valor)
+                    if isinstance(valor, (int, np.integer))
+                    else formato.format(valor)
+                ),
+                na_action="ignore",
+            )
+            .fillna("")
+            .str.rjust(campo.tamanho)
+        )
+    elif campo.tipo == "D":
+        textos = valores.map(
+            lambda valor: (
+                valor.strftime("%Y%m%d")
+                if isinstance(valor, date)
+                else str(valor)
+            ),
+            na_action="ignore",
+        ).fillna("")
+    else:
+        textos = valores.astype(object).where(~nulos, "").astype(str)
+
+    codificados = textos.str.encode(encoding)
+    if (codificados.str.len() > campo.tamanho).any():
+        raise ValueError(
+            "Valores do campo `{}` excedem o tamanho de {} bytes.".format(
+                campo.nome,
+                campo.tamanho,
+            ),
+        )
+    bloco = (
+        np.array(codificados.tolist(), dtype="S{}".format(campo.tamanho))
+        .view(np.uint8)
+        .reshape(len(valores), campo.tamanho)
+        .copy()
+    )
+    # o preenchimento com caracteres nulos vira preenchimento com espaços
+    bloco[bloco == 0] = _ESPACO
+    return bloco
+
+
+def escrever_dbf(
+    caminho: str | Path,
+    dados: pd.DataFrame,
+    campos: Sequence[CampoDBF] | None = None,
+    encoding: str = "iso-8859-1",
+) -> CabecalhoDBF:
+    """Escreve um DataFrame em um arquivo no formato DBF (dBase III).
+
+    Argumentos:
+        caminho: Caminho do arquivo a ser criado.
+        dados: Objeto [`pandas.DataFrame`][] com os registros a serem
+            escritos.
+        campos: Descrições dos campos a serem escritos, na ordem desejada.
+            Os nomes devem corresponder a colunas de `dados`, e os
+            deslocamentos são ignorados. Se não forem informadas, os tipos e
+            tamanhos dos campos são inferidos a partir dos valores de cada
+            coluna.
+        encoding: Codificação dos campos de texto.
+
+    Retorna:
+        Um objeto [`CabecalhoDBF`][] com as informações do arquivo escrito.
+
+    [`pandas.DataFrame`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.html
+    [`CabecalhoDBF`]: impulsoetl.utilitarios.dbf.CabecalhoDBF
+    """
+    if campos is None:
+        campos = [
+            _inferir_campo(nome, dados[nome], encoding)
+            for nome in dados.columns
+        ]
+
+    campos_posicionados = []
+    deslocamento = 1
+    for campo in campos:
+        campos_posicionados.append(campo._replace(deslocamento=deslocamento))
+        deslocamento += campo.tamanho
+    registro_tamanho = deslocamento
+    cabecalho_tamanho = 32 + 32 * len(campos_posicionados) + 1
+    registros_num = len(dados)
+
+    hoje = date.today()
+    cabecalho = struct.pack(
+        "<BBBBIHH20x",
+        0x03,
+        hoje.year % 100,
+        hoje.month,
+        hoje.day,
+        registros_num,
+        cabecalho_tamanho,
+        registro_tamanho,
+    )
+    for campo in campos_posicionados:
+        tamanho, decimais = campo.tamanho, campo.decimais
+        if campo.tipo == "C":
+            tamanho, decimais = campo.tamanho & 0xFF, campo.tamanho >> 8
+        cabecalho += struct.pack(
+            "<11sc4xBB14x",
+            campo.nome.encode(encoding),
+            campo.tipo.encode(encoding),
+            tamanho,
+            decimais,
+        )
+    cabecalho += b"\r"
+
+    registros = np.full(
+        (registros_num, registro_tamanho),
+        _ESPACO,
+        dtype=np.uint8,
+    )
+    for campo in campos_posicionados:
+        registros[
+            :,
+            campo.deslocamento : campo.deslocamento + campo.tamanho,
+        ] = _formatar_campo(dados[campo.nome], campo, encoding)
+
+    with open(caminho, "wb") as arquivo:
+        arquivo.write(cabecalho)
+        arquivo.write(registros.tobytes())
+        arquivo.write(bytes([_FIM_REGISTROS]))
+
+    return CabecalhoDBF(
+        registros_num=registros_num,
+        cabecalho_tamanho=cabecalho_tamanho,
+        registro_tamanho=registro_tamanho,
+        campos=tuple(campos_posicionados),
+    )
@@ -0,0 +1,258 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Sobrepõe a extração, a transformação e o carregamento de lotes de dados.
+
+Nas capturas de dados do DataSUS, cada lote de registros passa por três
+etapas: a extração (download e decodificação), a transformação e o
+carregamento no banco de dados. Executadas em sequência, cada etapa
+aguarda a anterior, e o processador fica ocioso enquanto o banco de dados
+recebe os registros - e vice-versa.
+
+A função [`processar_em_esteira()`][] executa a extração e a transformação
+em linhas de execução (*threads*) próprias, ligadas por filas de tamanho
+limitado. Enquanto o lote N-1 é carregado pela linha de execução principal,
+o lote N é transformado e o lote N+1 é extraído. O carregamento continua a
+cargo de quem chama a função, na mesma sessão e transação de antes, de
+modo que o controle de erros, a reversão de alterações e o limite de
+registros no modo de teste permanecem inalterados.
+
+Atributos:
+    ESTEIRA_FILA_MAX: Número máximo de lotes que aguardam em cada fila entre
+        uma etapa e a seguinte, lido da variável de ambiente
+        `IMPULSOETL_ESTEIRA_FILA_MAX` (por padrão, 2 lotes).
+    ESTEIRA_LOTES_SIMULTANEOS: Número de lotes que coexistem em memória em
+        uma esteira: os que aguardam nas duas filas, mais os que estão sendo
+        extraídos, transformados e carregados. Deve ser informado ao
+        [`DimensionadorLotes`][] usado na extração.
+
+[`processar_em_esteira()`]: impulsoetl.utilitarios.esteira.processar_em_esteira
+[`DimensionadorLotes`]: impulsoetl.utilitarios.lotes.DimensionadorLotes
+"""
+
+
+import contextvars
+import os
+import queue
+import threading
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Final,
+    Generator,
+    Iterable,
+    NamedTuple,
+)
+
+import pandas as pd
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import UnboundExecutionError
+from sqlalchemy.orm import Session
+
+from impulsoetl.loggers import logger
+
+if TYPE_CHECKING:
+    from impulsoetl.utilitarios.lotes import DimensionadorLotes
+
+ESTEIRA_FILA_MAX: Final[int] = int(os.getenv("IMPULSOETL_ESTEIRA_FILA_MAX", 2))
+ESTEIRA_LOTES_SIMULTANEOS: Final[int] = 2 * ESTEIRA_FILA_MAX + 3
+
+_FIM: Final[object] = object()
+
+
+class _Falha(NamedTuple):
+    """Erro ocorrido em uma etapa, repassado às etapas seguintes."""
+
+    erro: BaseException
+
+
+def _enfileirar(
+    fila: queue.Queue,
+    item: Any,
+    interromper: threading.Event,
+) -> bool:
+    """Coloca um item na fila, a menos que a esteira seja interrompida."""
+    while not interromper.is_set():
+        try:
+            fila.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _desenfileirar(fila: queue.Queue, interromper: threading.Event) -> Any:
+    """Retira um item da fila, a menos que a esteira seja interrompida."""
+    while not interromper.is_set():
+        try:
+            return fila.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _FIM
+
+
+def _extrair(
+    lotes: Iterable[pd.DataFrame],
+    saida: queue.Queue,
+    interromper: threading.Event,
+) -> None:
+    iterador = iter(lotes)
+    try:
+        for lote in iterador:
+            if not _enfileirar(saida, lote, interromper):
+                return
+    except BaseException as erro:
+        _enfileirar(saida, _Falha(erro), interromper)
+        return
+    finally:
+        # encerra o gerador na mesma linha de execução que o percorria
+        fechar = getattr(iterador, "close", None)
+        if fechar is not None:
+            fechar()
+    _enfileirar(saida, _FIM, interromper)
+
+
+def _transformar(
+    sessao: Session,
+    transformar: Callable[[Session, pd.DataFrame], pd.DataFrame],
+    entrada: queue.Queue,
+    saida: queue.Queue,
+    interromper: threading.Event,
+) -> None:
+    while True:
+        lote = _desenfileirar(entrada, interromper)
+        if lote is _FIM or isinstance(lote, _Falha):
+            _enfileirar(saida, lote, interromper)
+            return
+        try:
+            lote_transformado = transformar(sessao, lote)
+        except BaseException as erro:
+            _enfileirar(saida, _Falha(erro), interromper)
+            return
+        if not _enfileirar(saida, (lote, lote_transformado), interromper):
+            return
+
+
+def processar_em_esteira(
+    sessao: Session,
+    lotes: Iterable[pd.DataFrame],
+    transformar: Callable[[Session, pd.DataFrame], pd.DataFrame],
+    fila_max: int = ESTEIRA_FILA_MAX,
+    dimensionador: "DimensionadorLotes | None" = None,
+) -> Generator[tuple[pd.DataFrame, pd.DataFrame], None, None]:
+    """Extrai e transforma lotes em paralelo ao processamento de quem chama.
+
+    Os lotes são consumidos de `lotes` em uma linha de execução e
+    transformados em outra, sempre na ordem original. Se a sessão estiver
+    vinculada diretamente a um motor de conexão (como as sessões criadas por
+    [`impulsoetl.bd.Sessao`][]), a transformação usa uma sessão auxiliar,
+    vinculada ao mesmo motor, para as consultas de apoio (por exemplo, de
+    identificadores de períodos e municípios), já que objetos
+    [`Session`][] não podem ser compartilhados entre linhas de execução. Caso
+    contrário, apenas a extração é feita em paralelo, e os lotes são
+    transformados na linha de execução principal, com a própria sessão
+    informada.
+
+    As linhas de execução auxiliares herdam as variáveis de contexto de quem
+    chama a função. Assim, `transformar` pode ser uma tarefa do Prefect,
+    chamada durante a execução de um fluxo.
+
+    Se a iteração for interrompida (por exemplo, ao atingir o limite de
+    registros do modo de teste) ou se alguma etapa levantar um erro, as
+    linhas de execução auxiliares são encerradas e os lotes pendentes,
+    descartados. Erros ocorridos na extração ou na transformação são
+    levantados novamente na linha de execução principal, no momento em que o
+    lote correspondente seria gerado.
+
+    Argumentos:
+        sessao: objeto [`sqlalchemy.orm.session.Session`][] que permite
+            acessar a base de dados da ImpulsoGov.
+        lotes: Iterável de lotes extraídos, como os gerados por
+            [`extrair_dbc_lotes()`][].
+        transformar: Função que recebe uma sessão e um lote extraído e
+            retorna o lote transformado.
+        fila_max: Número máximo de lotes que aguardam em cada fila entre uma
+            etapa e a seguinte.
+        dimensionador: Instância opcional de [`DimensionadorLotes`][] usada
+            na extração dos lotes, que passa a considerar também a memória
+            ocupada pelos lotes transformados.
+
+    Gera:
+        A cada iteração, uma tupla com o lote extraído e o lote transformado
+        correspondente, prontos para serem validados e carregados.
+
+    [`impulsoetl.bd.Sessao`]: impulsoetl.bd.Sessao
+    [`Session`]: https://docs.sqlalchemy.org/en/14/orm/session_api.html#sqlalchemy.orm.Session
+    [`sqlalchemy.orm.session.Session`]: https://docs.sqlalchemy.org/en/14/orm/session_api.html#sqlalchemy.orm.Session
+    [`extrair_dbc_lotes()`]: impulsoetl.utilitarios.datasus_ftp.extrair_dbc_lotes
+    [`DimensionadorLotes`]: impulsoetl.utilitarios.lotes.DimensionadorLotes
+    """
+    interromper = threading.Event()
+    lotes_extraidos: queue.Queue = queue.Queue(maxsize=fila_max)
+    # as linhas de execução auxiliares recebem uma cópia das variáveis de
+    # contexto de quem chama - entre elas, o contexto do fluxo do Prefect,
+    # sem o qual as funções decoradas com `@task` não podem ser chamadas
+    linhas_execucao = [
+        threading.Thread(
+            target=contextvars.copy_context().run,
+            args=(_extrair, lotes, lotes_extraidos, interromper),
+            name="esteira_extracao",
+            daemon=True,
+        ),
+    ]
+
+    try:
+        motor = sessao.get_bind()
+    except UnboundExecutionError:
+        motor = None
+    sessao_transformacao = None
+    if isinstance(motor, Engine):
+        sessao_transformacao = Session(bind=motor)
+        lotes_transformados: queue.Queue = queue.Queue(maxsize=fila_max)
+        linhas_execucao.append(
+            threading.Thread(
+                target=contextvars.copy_context().run,
+                args=(
+                    _transformar,
+                    sessao_transformacao,
+                    transformar,
+                    lotes_extraidos,
+                    lotes_transformados,
+                    interromper,
+                ),
+                name="esteira_transformacao",
+                daemon=True,
+            ),
+        )
+    else:
+        logger.debug(
+            "Sessão não vinculada a um motor de conexão; os lotes serão "
+            + "transformados na linha de execução principal.",
+        )
+
+    for linha_execucao in linhas_execucao:
+        linha_execucao.start()
+    try:
+        while True:
+            if sessao_transformacao is not None:
+                item = lotes_transformados.get()
+            else:
+                item = lotes_extraidos.get()
+                if item is not _FIM and not isinstance(item, _Falha):
+                    item = (item, transformar(sessao, item))
+            if item is _FIM:
+                break
+            if isinstance(item, _Falha):
+                raise item.erro
+            if dimensionador is not None:
+                dimensionador.observar(item[1], etapa="transformacao")
+            yield item
+    finally:
+        interromper.set()
+        for linha_execucao in linhas_execucao:
+            linha_execucao.join()
+        if sessao_transformacao is not None:
+            sessao_transformacao.close()
@@ -0,0 +1,112 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Gera identificadores únicos ordenados no tempo (UUID versão 7) em lote.
+
+Os identificadores seguem o formato UUID versão 7 descrito na [RFC 9562][]:
+os 48 primeiros bits contêm o instante de geração, em milissegundos desde
+1º de janeiro de 1970 (UTC), seguidos da versão, de um contador de 42 bits
+(o "método 1" da seção 6.2 da RFC) e de 32 bits aleatórios.
+
+Todos os identificadores de um mesmo lote compartilham o mesmo instante, e
+o contador é iniciado em um valor aleatório e incrementado a cada
+identificador. Assim, os identificadores são estritamente crescentes dentro
+de cada lote e entre lotes sucessivos gerados pelo mesmo processo.
+
+[RFC 9562]: https://www.rfc-editor.org/rfc/rfc9562#name-uuid-version-7
+"""
+
+
+import secrets
+import threading
+import time
+from typing import Final
+
+import numpy as np
+
+_CONTADOR_BITS: Final[int] = 42
+_CONTADOR_MAX: Final[int] = 2**_CONTADOR_BITS - 1
+
+# caracteres hexadecimais, como códigos ASCII
+_HEXADECIMAIS: Final[np.ndarray] = np.frombuffer(
+    b"0123456789abcdef",
+    dtype=np.uint8,
+)
+
+_trava = threading.Lock()
+_ultimo_instante: int = 0
+_ultimo_contador: int = 0
+
+
+def _reservar(quantidade: int) -> tuple[int, int]:
+    """Reserva um instante e um intervalo do contador para um lote."""
+    global _ultimo_instante, _ultimo_contador
+    with _trava:
+        instante = time.time_ns() // 10**6
+        if instante > _ultimo_instante:
+            # o bit mais significativo do contador inicial é zerado, para
+            # que sobre espaço para incrementá-lo (RFC 9562, seção 6.2)
+            contador = secrets.randbits(_CONTADOR_BITS - 1)
+        else:
+            # relógio parado ou atrasado: continua a partir do último
+            # identificador gerado
+            instante = _ultimo_instante
+            contador = _ultimo_contador + 1
+        if contador + quantidade - 1 > _CONTADOR_MAX:
+            instante += 1
+            contador = secrets.randbits(_CONTADOR_BITS - 1)
+        _ultimo_instante = instante
+        _ultimo_contador = contador + max(quantidade, 1) - 1
+    return instante, contador
+
+
+def gerar_uuid7(quantidade: int) -> np.ndarray:
+    """Gera um lote de identificadores UUID versão 7, em formato hexadecimal.
+
+    Equivale a chamar `uuid6.uuid7().hex` `quantidade` vezes, mas gera todos
+    os identificadores de uma só vez, com operações vetorizadas.
+
+    Argumentos:
+        quantidade: Número de identificadores a serem gerados.
+
+    Retorna:
+        Um vetor `numpy` de objetos com `quantidade` textos de 32 caracteres
+        hexadecimais, em ordem estritamente crescente.
+
+    Exemplo:
+        ```py
+        >>> pa.assign(id=lambda df: gerar_uuid7(len(df)))
+        ```
+    """
+    instante, contador_inicial = _reservar(quantidade)
+    contadores = np.arange(quantidade, dtype=np.uint64) + np.uint64(
+        contador_inicial,
+    )
+
+    octetos = np.empty((quantidade, 16), dtype=np.uint8)
+    octetos[:, :6] = np.frombuffer(instante.to_bytes(6, "big"), np.uint8)
+    # versão (0111) e os 12 bits mais significativos do contador
+    octetos[:, 6] = 0x70 | ((contadores >> np.uint64(38)) & np.uint64(0x0F))
+    octetos[:, 7] = (contadores >> np.uint64(30)) & np.uint64(0xFF)
+    # variante (10) e os 30 bits restantes do contador
+    octetos[:, 8] = 0x80 | ((contadores >> np.uint64(24)) & np.uint64(0x3F))
+    octetos[:, 9] = (contadores >> np.uint64(16)) & np.uint64(0xFF)
+    octetos[:, 10] = (contadores >> np.uint64(8)) & np.uint64(0xFF)
+    octetos[:, 11] = contadores & np.uint64(0xFF)
+    octetos[:, 12:] = np.frombuffer(
+        secrets.token_bytes(4 * quantidade),
+        dtype=np.uint8,
+    ).reshape(quantidade, 4)
+
+    # cada octeto corresponde a dois caracteres hexadecimais
+    caracteres = np.empty((quantidade, 32), dtype=np.uint8)
+    caracteres[:, 0::2] = _HEXADECIMAIS[octetos >> 4]
+    caracteres[:, 1::2] = _HEXADECIMAIS[octetos & 0x0F]
+    return (
+        caracteres.view("S32")
+        .ravel()
+        .astype("U32")
+        .astype(object)
+    )
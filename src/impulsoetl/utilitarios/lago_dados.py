@@ -0,0 +1,417 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Guarda em Parquet os arquivos extraídos do DataSUS, para reprocessamento.
+
+Cada arquivo de disseminação lido do FTP do DataSUS pode ser gravado, já
+decodificado, em um diretório local (o "lago de dados"), organizado em
+partições no estilo do Hive:
+
+```
+<raiz>/sistema=SIASUS/grupo=PA/uf=SE/competencia=2108/PASE2108/
+    _metadados.json
+    parte-00000.parquet
+    parte-00001.parquet
+    ...
+```
+
+Cada parte corresponde a um lote de registros gerado durante a extração
+original, com todas as colunas do arquivo e sem nenhuma condição de
+filtragem aplicada. Assim, transformações posteriores, reprocessamentos e
+cargas retroativas podem ler apenas as colunas necessárias do Parquet, sem
+precisar baixar e decodificar novamente o arquivo `.dbc` - inclusive quando
+o servidor FTP estiver indisponível.
+
+A leitura e a escrita dos arquivos Parquet são feitas com o `pyarrow`,
+declarado entre as dependências do pacote.
+
+Atributos:
+    LAGO_DADOS_CAMINHO: Caminho do diretório raiz do lago de dados, lido da
+        variável de ambiente `IMPULSOETL_LAGO_DADOS_CAMINHO`. Se a variável
+        não estiver definida, o lago fica desabilitado por padrão.
+"""
+
+
+import json
+import os
+import re
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from tempfile import mkdtemp
+from typing import Final, Generator, Iterable, NamedTuple
+
+import pandas as pd
+
+from impulsoetl.loggers import logger
+from impulsoetl.utilitarios.lotes import DimensionadorLotes, passo_atual
+
+LAGO_DADOS_CAMINHO: Final[str | None] = os.getenv(
+    "IMPULSOETL_LAGO_DADOS_CAMINHO",
+)
+
+# nomes como `PASE2108a.dbc`, `DOAC2020.dbc` ou `VIOLBR19.dbc`
+_ARQUIVO_PADRAO: Final[re.Pattern] = re.compile(
+    r"^(?P<grupo>[A-Z]+?)(?P<uf>[A-Z]{2})(?P<competencia>\d{2,4})"
+    + r"(?P<parte>[a-z]?)\.(?i:dbc)$",
+)
+
+_METADADOS_NOME: Final[str] = "_metadados.json"
+
+
+class ParticaoLago(NamedTuple):
+    """Localização de um arquivo de disseminação no lago de dados.
+
+    Atributos:
+        sistema: Sistema de informação de origem (por exemplo, `SIASUS`).
+        grupo: Prefixo que identifica o tipo de arquivo dentro do sistema
+            (por exemplo, `PA` para procedimentos ambulatoriais).
+        uf: Sigla da unidade federativa, ou `BR` para arquivos nacionais.
+        competencia: Período de referência, como indicado no nome do arquivo
+            (`AAMM` para arquivos mensais; `AAAA` ou `AA` para anuais).
+        arquivo: Nome do arquivo, sem a extensão.
+    """
+
+    sistema: str
+    grupo: str
+    uf: str
+    competencia: str
+    arquivo: str
+
+
+def _obter_sistema(caminho_diretorio: str) -> str:
+    segmentos = [
+        segmento.upper()
+        for segmento in caminho_diretorio.strip("/").split("/")
+        if segmento
+    ]
+    if "PUBLICOS" in segmentos[:-1]:
+        return segmentos[segmentos.index("PUBLICOS") + 1]
+    return segmentos[0] if segmentos else "DESCONHECIDO"
+
+
+def _resolver_colunas(
+    disponiveis: Iterable[str],
+    colunas: Iterable[str] | None,
+) -> list[str]:
+    disponiveis = list(disponiveis)
+    if colunas is None:
+        return disponiveis
+    nomes = {coluna.strip().upper() for coluna in colunas}
+    return [
+        coluna for coluna in disponiveis if coluna.strip().upper() in nomes
+    ]
+
+
+class LagoDados(object):
+    """Lago de dados local com os arquivos extraídos do DataSUS em Parquet.
+
+    Exemplo:
+        >>> lago = LagoDados("/dados/lago")
+        >>> lotes = lago.ler(
+        ...     caminho_diretorio="/dissemin/publicos/SIASUS/200801_/Dados",
+        ...     arquivo_nome="PASE2108.dbc",
+        ...     colunas=["PA_CODUNI", "PA_QTDAPR"],
+        ... )
+    """
+
+    def __init__(self, diretorio: str | Path) -> None:
+        """Instancia um lago de dados local.
+
+        Argumentos:
+            diretorio: Caminho do diretório raiz do lago. É criado, se ainda
+                não existir.
+        """
+        self.diretorio = Path(diretorio)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def do_ambiente(cls) -> "LagoDados | None":
+        """Instancia o lago configurado nas variáveis de ambiente, se houver.
+
+        Retorna:
+            Uma instância de `LagoDados` no diretório indicado pela variável
+            `IMPULSOETL_LAGO_DADOS_CAMINHO`, ou `None` caso ela não esteja
+            definida.
+        """
+        if not LAGO_DADOS_CAMINHO:
+            return None
+        return cls(diretorio=LAGO_DADOS_CAMINHO)
+
+    @staticmethod
+    def identificar_particao(
+        caminho_diretorio: str,
+        arquivo_nome: str,
+    ) -> ParticaoLago | None:
+        """Identifica a partição de um arquivo a partir da sua origem.
+
+        Argumentos:
+            caminho_diretorio: Caminho do diretório do arquivo no FTP do
+                DataSUS (por exemplo,
+                `/dissemin/publicos/SIASUS/200801_/Dados`).
+            arquivo_nome: Nome do arquivo, incluindo a extensão.
+
+        Retorna:
+            Um objeto [`ParticaoLago`][], ou `None` se o nome do arquivo não
+            seguir o padrão dos arquivos de disseminação do DataSUS.
+
+        [`ParticaoLago`]: impulsoetl.utilitarios.lago_dados.ParticaoLago
+        """
+        correspondencia = _ARQUIVO_PADRAO.match(arquivo_nome)
+        if not correspondencia:
+            return None
+        return ParticaoLago(
+            sistema=_obter_sistema(caminho_diretorio),
+            grupo=correspondencia["grupo"],
+            uf=correspondencia["uf"],
+            competencia=correspondencia["competencia"],
+            arquivo=arquivo_nome.rsplit(".", 1)[0],
+        )
+
+    def _caminho(self, particao: ParticaoLago) -> Path:
+        return Path(
+            self.diretorio,
+            "sistema=" + particao.sistema,
+            "grupo=" + particao.grupo,
+            "uf=" + particao.uf,
+            "competencia=" + particao.competencia,
+            particao.arquivo,
+        )
+
+    def _ler_metadados(
+        self,
+        caminho_diretorio: str,
+        arquivo_nome: str,
+    ) -> tuple[Path, dict] | None:
+        particao = self.identificar_particao(caminho_diretorio, arquivo_nome)
+        if particao is None:
+            return None
+        caminho = self._caminho(particao)
+        try:
+            with open(caminho / _METADADOS_NOME, encoding="utf-8") as arquivo:
+                return caminho, json.load(arquivo)
+        except FileNotFoundError:
+            return None
+
+    def contem(self, caminho_diretorio: str, arquivo_nome: str) -> bool:
+        """Informa se um arquivo já está guardado no lago de dados.
+
+        Argumentos:
+            caminho_diretorio: Caminho do diretório do arquivo no FTP do
+                DataSUS.
+            arquivo_nome: Nome do arquivo, incluindo a extensão.
+
+        Retorna:
+            `True` se o arquivo tiver sido guardado por completo a partir do
+            mesmo diretório de origem; caso contrário, `False`.
+        """
+        encontrado = self._ler_metadados(caminho_diretorio, arquivo_nome)
+        return (
+            encontrado is not None
+            and encontrado[1]["diretorio"] == caminho_diretorio
+        )
+
+    def listar(
+        self,
+        caminho_diretorio: str,
+        arquivo_nome_ou_padrao: str | re.Pattern,
+    ) -> list[str]:
+        """Lista os arquivos guardados compatíveis com um nome ou padrão.
+
+        Argumentos:
+            caminho_diretorio: Caminho do diretório de origem dos arquivos no
+                FTP do DataSUS.
+            arquivo_nome_ou_padrao: Nome do arquivo desejado, incluindo a
+                extensão; ou expressão regular a ser comparada com os nomes
+                dos arquivos guardados.
+
+        Retorna:
+            Uma lista ordenada com os nomes originais dos arquivos guardados
+            que são compatíveis com o nome ou padrão informado.
+        """
+        diretorio_sistema = Path(
+            self.diretorio,
+            "sistema=" + _obter_sistema(caminho_diretorio),
+        )
+        arquivos = []
+        for caminho in diretorio_sistema.glob("*/*/*/*/" + _METADADOS_NOME):
+            with open(caminho, encoding="utf-8") as arquivo:
+                metadados = json.load(arquivo)
+            if metadados["diretorio"] != caminho_diretorio:
+                continue
+            if isinstance(arquivo_nome_ou_padrao, re.Pattern):
+                compativel = arquivo_nome_ou_padrao.match(metadados["arquivo"])
+            else:
+                compativel = metadados["arquivo"] == arquivo_nome_ou_padrao
+            if compativel:
+                arquivos.append(metadados["arquivo"])
+        return sorted(arquivos)
+
+    def guardar(
+        self,
+        caminho_diretorio: str,
+        arquivo_nome: str,
+        lotes: Iterable[pd.DataFrame],
+    ) -> Generator[pd.DataFrame, None, None]:
+        """Guarda no lago os lotes de um arquivo, à medida que são gerados.
+
+        Os lotes são gravados em um diretório temporário, que só substitui
+        uma eventual cópia anterior do arquivo depois que todos os lotes
+        tiverem sido gerados. Se a iteração for interrompida antes do fim, a
+        cópia incompleta é descartada.
+
+        Argumentos:
+            caminho_diretorio: Caminho do diretório do arquivo no FTP do
+                DataSUS.
+            arquivo_nome: Nome do arquivo, incluindo a extensão.
+            lotes: Iterável de objetos [`pandas.DataFrame`][] com todas as
+                colunas de todos os registros do arquivo.
+
+        Gera:
+            Os mesmos lotes recebidos, sem modificações. Se o nome do arquivo
+            não seguir o padrão dos arquivos de disseminação do DataSUS, os
+            lotes são repassados sem serem guardados.
+
+        [`pandas.DataFrame`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.html
+        """
+        particao = self.identificar_particao(caminho_diretorio, arquivo_nome)
+        if particao is None:
+            logger.warning(
+                "Não foi possível identificar a partição do arquivo `{}`; "
+                + "o arquivo não será guardado no lago de dados.",
+                arquivo_nome,
+            )
+            yield from lotes
+            return
+
+        destino = self._caminho(particao)
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        temporario = Path(
+            mkdtemp(dir=destino.parent, prefix="." + destino.name + "-"),
+        )
+        colunas: list[str] = []
+        partes_num = 0
+        registros_num = 0
+        try:
+            for lote in lotes:
+                lote.to_parquet(
+                    temporario / "parte-{:05d}.parquet".format(partes_num),
+                    engine="pyarrow",
+                    index=False,
+                )
+                colunas = colunas or list(lote.columns)
+                partes_num += 1
+                registros_num += len(lote)
+                yield lote
+            with open(
+                temporario / _METADADOS_NOME,
+                "w",
+                encoding="utf-8",
+            ) as arquivo:
+                json.dump(
+                    {
+                        "diretorio": caminho_diretorio,
+                        "arquivo": arquivo_nome,
+                        "colunas": colunas,
+                        "partes": partes_num,
+                        "registros": registros_num,
+                        "gravado_em": datetime.now(timezone.utc).isoformat(),
+                    },
+                    arquivo,
+                    ensure_ascii=False,
+                )
+            if destino.exists():
+                shutil.rmtree(destino)
+            os.replace(temporario, destino)
+        except BaseException:
+            shutil.rmtree(temporario, ignore_errors=True)
+            raise
+        logger.info(
+            "Arquivo `{}` guardado no lago de dados ({:n} registros).",
+            arquivo_nome,
+            registros_num,
+        )
+
+    def ler(
+        self,
+        caminho_diretorio: str,
+        arquivo_nome: str,
+        passo: int | DimensionadorLotes = 10000,
+        colunas: Iterable[str] | None = None,
+        condicoes: str | None = None,
+    ) -> Generator[pd.DataFrame, None, None]:
+        """Lê de volta os registros de um arquivo guardado no lago de dados.
+
+        Argumentos:
+            caminho_diretorio: Caminho do diretório do arquivo no FTP do
+                DataSUS.
+            arquivo_nome: Nome do arquivo, incluindo a extensão.
+            passo: Número máximo de registros em cada lote gerado, ou
+                instância de [`DimensionadorLotes`][] que calcula o tamanho
+                de cada lote a partir da memória ocupada pelos anteriores.
+            colunas: Nomes das colunas a serem lidas. Os nomes são
+                comparados sem diferenciar maiúsculas de minúsculas e
+                desconsiderando espaços nas extremidades; nomes inexistentes
+                são ignorados. As demais colunas não chegam a ser lidas do
+                disco. Por padrão, todas as colunas são lidas.
+            condicoes: Expressão opcional, com a sintaxe utilizada pelo método
+                [`pandas.DataFrame.query()`][], que os registros devem
+                satisfazer para serem gerados.
+
+        Gera:
+            A cada iteração, um objeto [`pandas.DataFrame`][] com até `passo`
+            registros.
+
+        Exceções:
+            Levanta um erro `FileNotFoundError` se o arquivo não estiver
+            guardado no lago.
+
+        [`pandas.DataFrame`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.html
+        [`pandas.DataFrame.query()`]: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.query.html
+        [`DimensionadorLotes`]: impulsoetl.utilitarios.lotes.DimensionadorLotes
+        """
+        encontrado = self._ler_metadados(caminho_diretorio, arquivo_nome)
+        if encontrado is None:
+            raise FileNotFoundError(
+                "Arquivo `{}` não encontrado no lago de dados.".format(
+                    arquivo_nome,
+                ),
+            )
+        caminho, metadados = encontrado
+        logger.info(
+            "Lendo arquivo `{}` do lago de dados ({:n} registros)...",
+            arquivo_nome,
+            metadados["registros"],
+        )
+
+        colunas_selecionadas = _resolver_colunas(metadados["colunas"], colunas)
+        colunas_lidas = colunas_selecionadas
+        if condicoes:
+            nomes = set(re.findall(r"[A-Za-z_]\w*", condicoes))
+            colunas_lidas = [
+                coluna
+                for coluna in metadados["colunas"]
+                if coluna in nomes or coluna in colunas_selecionadas
+            ]
+
+        for indice in range(metadados["partes"]):
+            parte = pd.read_parquet(
+                caminho / "parte-{:05d}.parquet".format(indice),
+                engine="pyarrow",
+                columns=colunas_lidas,
+            )
+            if condicoes:
+                parte = parte.query(condicoes, engine="python").loc[
+                    :,
+                    colunas_selecionadas,
+                ]
+            inicio = 0
+            while inicio < len(parte):
+                fim = inicio + passo_atual(passo)
+                lote = parte.iloc[inicio:fim].reset_index(drop=True)
+                if isinstance(passo, DimensionadorLotes):
+                    passo.observar(lote, etapa="extracao")
+                yield lote
+                inicio = fim
@@ -0,0 +1,276 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Lista diretórios de servidores FTP e guarda as listagens obtidas.
+
+Alguns diretórios do FTP do DataSUS (como
+`/dissemin/publicos/SIASUS/200801_/Dados`) contêm dezenas de milhares de
+arquivos, e listá-los a cada captura - para cada unidade federativa e
+competência - é tão demorado quanto baixar os próprios arquivos. A classe
+[`CacheListagensFTP`][] guarda as listagens em memória e, opcionalmente, em
+disco, por um prazo de validade configurável; dentro desse prazo, a busca
+de arquivos por nome ou padrão é feita localmente.
+
+Sempre que o servidor suporta o comando `MLSD`, as listagens incluem o
+tamanho e a data de modificação de cada arquivo (veja
+[`listar_diretorio()`][]), o que dispensa consultas individuais com os
+comandos `SIZE` e `MDTM` antes de cada download.
+
+Atributos:
+    LISTAGENS_CAMINHO: Caminho do diretório onde as listagens são guardadas
+        em disco, lido da variável de ambiente
+        `IMPULSOETL_FTP_LISTAGENS_CAMINHO`. Se a variável não estiver
+        definida, as listagens são guardadas apenas em memória.
+    LISTAGENS_VALIDADE: Prazo, em segundos, durante o qual uma listagem
+        guardada é considerada válida, lido da variável de ambiente
+        `IMPULSOETL_FTP_LISTAGENS_VALIDADE` (por padrão, 3.600 segundos).
+
+[`CacheListagensFTP`]: impulsoetl.utilitarios.listagens_ftp.CacheListagensFTP
+[`listar_diretorio()`]: impulsoetl.utilitarios.listagens_ftp.listar_diretorio
+"""
+
+
+import hashlib
+import json
+import os
+import threading
+import time
+from ftplib import FTP, error_perm  # noqa: B402  # nosec: B402
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Final, NamedTuple
+
+from impulsoetl.loggers import logger
+
+LISTAGENS_CAMINHO: Final[str | None] = os.getenv(
+    "IMPULSOETL_FTP_LISTAGENS_CAMINHO",
+)
+LISTAGENS_VALIDADE: Final[float] = float(
+    os.getenv("IMPULSOETL_FTP_LISTAGENS_VALIDADE", 3600),
+)
+
+
+class ArquivoFTP(NamedTuple):
+    """Nome e metadados de um arquivo listado em um diretório FTP.
+
+    Atributos:
+        nome: Nome do arquivo, incluindo a extensão.
+        tamanho: Tamanho do arquivo em bytes, ou `None` se o servidor não o
+            tiver informado.
+        modificacao: Data de modificação do arquivo, no formato
+            `AAAAMMDDhhmmss` usado pelo comando `MDTM`, ou uma string vazia
+            se o servidor não a tiver informado.
+    """
+
+    nome: str
+    tamanho: int | None = None
+    modificacao: str = ""
+
+    @property
+    def completo(self) -> bool:
+        """Informa se o tamanho e a data de modificação são conhecidos."""
+        return self.tamanho is not None and bool(self.modificacao)
+
+
+def listar_diretorio(cliente_ftp: FTP) -> list[ArquivoFTP]:
+    """Lista os arquivos do diretório atual de uma conexão FTP.
+
+    Usa o comando `MLSD`, que informa o tamanho e a data de modificação de
+    todos os arquivos de uma só vez. Se o servidor não suportar o comando,
+    usa o comando `NLST`, que informa apenas os nomes.
+
+    Argumentos:
+        cliente_ftp: Instância de conexão com o servidor FTP, já no diretório
+            a ser listado.
+
+    Retorna:
+        Uma lista de instâncias de [`ArquivoFTP`][], em ordem alfabética dos
+        nomes dos arquivos - já que a ordem informada pelo servidor pode
+        variar de um comando para outro.
+
+    [`ArquivoFTP`]: impulsoetl.utilitarios.listagens_ftp.ArquivoFTP
+    """
+    try:
+        entradas = list(cliente_ftp.mlsd(facts=["type", "size", "modify"]))
+    except error_perm:
+        logger.debug(
+            "Servidor FTP não suporta o comando MLSD; listando apenas os "
+            + "nomes dos arquivos.",
+        )
+        return [ArquivoFTP(nome=nome) for nome in sorted(cliente_ftp.nlst())]
+
+    arquivos = []
+    for nome, fatos in entradas:
+        if fatos.get("type", "file").lower() != "file":
+            # diretórios, inclusive o atual (`cdir`) e o superior (`pdir`)
+            continue
+        tamanho = fatos.get("size", "")
+        arquivos.append(
+            ArquivoFTP(
+                nome=nome,
+                tamanho=int(tamanho) if tamanho.isdigit() else None,
+                # descarta as frações de segundo, ausentes na resposta `MDTM`
+                modificacao=fatos.get("modify", "")[:14],
+            ),
+        )
+    return sorted(arquivos)
+
+
+class CacheListagensFTP(object):
+    """Guarda listagens de diretórios FTP por um prazo de validade.
+
+    As listagens ficam sempre em memória e, se for informado um diretório,
+    também em disco, em arquivos JSON que podem ser compartilhados entre
+    execuções e processos diferentes. Listagens guardadas há mais tempo que
+    o prazo de validade são ignoradas.
+    """
+
+    def __init__(
+        self,
+        validade: float = LISTAGENS_VALIDADE,
+        diretorio: str | Path | None = None,
+    ) -> None:
+        """Instancia um cache de listagens de diretórios FTP.
+
+        Argumentos:
+            validade: Prazo, em segundos, durante o qual uma listagem
+                guardada é considerada válida.
+            diretorio: Caminho opcional do diretório onde guardar as
+                listagens em disco. É criado, se ainda não existir.
+        """
+        self.validade = validade
+        self.diretorio = Path(diretorio) if diretorio else None
+        if self.diretorio:
+            self.diretorio.mkdir(parents=True, exist_ok=True)
+        self._trava = threading.Lock()
+        self._memoria: dict[
+            tuple[str, str],
+            tuple[float, list[ArquivoFTP]],
+        ] = {}
+
+    @classmethod
+    def do_ambiente(cls) -> "CacheListagensFTP":
+        """Instancia o cache de listagens configurado no ambiente.
+
+        Retorna:
+            Uma instância de `CacheListagensFTP` com a validade indicada pela
+            variável `IMPULSOETL_FTP_LISTAGENS_VALIDADE`, que guarda as
+            listagens em disco no diretório indicado pela variável
+            `IMPULSOETL_FTP_LISTAGENS_CAMINHO`, se houver.
+        """
+        return cls(validade=LISTAGENS_VALIDADE, diretorio=LISTAGENS_CAMINHO)
+
+    def _caminho(self, endereco: str, caminho_diretorio: str) -> Path:
+        identificador = "ftp://{}{}".format(endereco, caminho_diretorio)
+        chave = hashlib.sha256(identificador.encode("utf-8")).hexdigest()
+        return self.diretorio / (chave + ".json")  # type: ignore[operator]
+
+    def _valida(self, obtida_em: float) -> bool:
+        return time.time() - obtida_em < self.validade
+
+    def obter(
+        self,
+        endereco: str,
+        caminho_diretorio: str,
+    ) -> list[ArquivoFTP] | None:
+        """Busca a listagem válida de um diretório, se houver.
+
+        Argumentos:
+            endereco: Endereço do servidor FTP.
+            caminho_diretorio: Caminho absoluto do diretório no servidor.
+
+        Retorna:
+            A lista de arquivos do diretório, ou `None` se não houver uma
+            listagem guardada dentro do prazo de validade.
+        """
+        with self._trava:
+            obtida_em, arquivos = self._memoria.get(
+                (endereco, caminho_diretorio),
+                (0.0, []),
+            )
+        if self._valida(obtida_em):
+            return list(arquivos)
+        if not self.diretorio:
+            return None
+
+        try:
+            with open(self._caminho(endereco, caminho_diretorio)) as arquivo:
+                conteudo = json.load(arquivo)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            logger.warning(
+                "Listagem guardada do diretório `{}` ilegível; ignorando.",
+                caminho_diretorio,
+            )
+            return None
+        if not self._valida(conteudo["obtida_em"]):
+            return None
+        arquivos = [ArquivoFTP(*arquivo) for arquivo in conteudo["arquivos"]]
+        with self._trava:
+            self._memoria[(endereco, caminho_diretorio)] = (
+                conteudo["obtida_em"],
+                arquivos,
+            )
+        logger.debug(
+            "Usando listagem do diretório `{}` guardada em disco.",
+            caminho_diretorio,
+        )
+        return list(arquivos)
+
+    def guardar(
+        self,
+        endereco: str,
+        caminho_diretorio: str,
+        arquivos: list[ArquivoFTP],
+    ) -> None:
+        """Guarda a listagem de um diretório recém-obtida do servidor.
+
+        Argumentos:
+            endereco: Endereço do servidor FTP.
+            caminho_diretorio: Caminho absoluto do diretório no servidor.
+            arquivos: Lista de arquivos do diretório, conforme obtida por
+                [`listar_diretorio()`][].
+
+        [`listar_diretorio()`]: impulsoetl.utilitarios.listagens_ftp.listar_diretorio
+        """
+        obtida_em = time.time()
+        with self._trava:
+            self._memoria[(endereco, caminho_diretorio)] = (
+                obtida_em,
+                list(arquivos),
+            )
+        if not self.diretorio:
+            return
+
+        # grava em um arquivo temporário e depois o renomeia, para que outros
+        # processos nunca encontrem uma listagem incompleta
+        with NamedTemporaryFile(
+            "w",
+            dir=self.diretorio,
+            prefix=".",
+            delete=False,
+        ) as arquivo_temporario:
+            json.dump(
+                {
+                    "endereco": endereco,
+                    "caminho_diretorio": caminho_diretorio,
+                    "obtida_em": obtida_em,
+                    "arquivos": [list(arquivo) for arquivo in arquivos],
+                },
+                arquivo_temporario,
+            )
+        os.replace(
+            arquivo_temporario.name,
+            self._caminho(endereco, caminho_diretorio),
+        )
+
+    def esquecer(self) -> None:
+        """Descarta todas as listagens guardadas, em memória e em disco."""
+        with self._trava:
+            self._memoria.clear()
+        if self.diretorio:
+            for caminho in self.diretorio.glob("*.json"):
+                caminho.unlink(missing_ok=True)
@@ -0,0 +1,235 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Dimensiona os lotes de registros conforme a memória disponível.
+
+Um lote de 100 mil registros de um arquivo estreito, como os de
+procedimentos ambulatoriais do SIASUS, ocupa uma fração da memória ocupada
+pelo mesmo número de registros de um arquivo com mais de cem colunas, como
+os de declarações de óbito do SIM ou de notificações de violência do SINAN.
+Em vez de um número fixo de registros por lote, a classe
+[`DimensionadorLotes`][] calcula o tamanho de cada lote a partir de um
+limite de memória, de modo que os lotes de arquivos estreitos sejam maiores
+(e processados mais rapidamente) e os de arquivos largos, menores.
+
+A ocupação de memória de cada registro é estimada inicialmente a partir do
+cabeçalho do arquivo DBF e, em seguida, medida nos próprios lotes extraídos
+e transformados. O tamanho dos lotes seguintes é ajustado a cada nova
+medida.
+
+Atributos:
+    LOTE_MEMORIA_MAX: Memória máxima, em megabytes, ocupada pelo conjunto de
+        lotes processados simultaneamente em uma captura, lida da variável
+        de ambiente `IMPULSOETL_LOTE_MEMORIA_MAX` (por padrão, 1.024 MB).
+
+[`DimensionadorLotes`]: impulsoetl.utilitarios.lotes.DimensionadorLotes
+"""
+
+
+import os
+import sys
+import threading
+from typing import TYPE_CHECKING, Final, Iterable
+
+import pandas as pd
+
+from impulsoetl.loggers import logger
+
+if TYPE_CHECKING:
+    from impulsoetl.utilitarios.dbf import CampoDBF
+
+LOTE_MEMORIA_MAX: Final[int] = int(
+    os.getenv("IMPULSOETL_LOTE_MEMORIA_MAX", 1024),
+)
+
+# registros usados para medir a memória ocupada por um lote
+_AMOSTRA_TAMANHO: Final[int] = 1000
+
+# memória ocupada por uma string vazia, mais o ponteiro para ela
+_TEXTO_TAMANHO_MIN: Final[int] = sys.getsizeof("") + 8
+
+# peso da medida mais recente na média da memória ocupada por registro
+_PESO_MEDIDA: Final[float] = 0.5
+
+
+class DimensionadorLotes(object):
+    """Calcula o tamanho dos lotes a partir de um limite de memória.
+
+    Instâncias desta classe podem ser passadas no lugar de um número fixo
+    de registros para o argumento `passo` das funções e métodos que leem
+    arquivos em lotes (como [`extrair_dbc_lotes()`][]). O tamanho de cada
+    lote é consultado no momento em que o lote começa a ser formado (veja
+    [`passo_atual()`][]).
+
+    [`extrair_dbc_lotes()`]: impulsoetl.utilitarios.datasus_ftp.extrair_dbc_lotes
+    [`passo_atual()`]: impulsoetl.utilitarios.lotes.passo_atual
+    """
+
+    def __init__(
+        self,
+        memoria_max: int = LOTE_MEMORIA_MAX * 10**6,
+        lotes_simultaneos: int = 1,
+        passo_min: int = 1000,
+        passo_max: int = 1000000,
+        passo_inicial: int = 10000,
+    ) -> None:
+        """Instancia um dimensionador de lotes.
+
+        Argumentos:
+            memoria_max: Memória máxima, em bytes, ocupada pelo conjunto de
+                lotes mantidos simultaneamente em memória.
+            lotes_simultaneos: Número de lotes mantidos simultaneamente em
+                memória, informado por quem processa os lotes (por exemplo,
+                o número de lotes que coexistem em uma esteira, em
+                [`ESTEIRA_LOTES_SIMULTANEOS`][]). A memória máxima é dividida
+                igualmente entre eles.
+            passo_min: Número mínimo de registros em cada lote.
+            passo_max: Número máximo de registros em cada lote.
+            passo_inicial: Número de registros do primeiro lote, se não
+                houver nenhuma estimativa da memória ocupada por registro.
+
+        [`ESTEIRA_LOTES_SIMULTANEOS`]: impulsoetl.utilitarios.esteira.ESTEIRA_LOTES_SIMULTANEOS
+        """
+        self.memoria_max = memoria_max
+        self.lotes_simultaneos = max(1, lotes_simultaneos)
+        self.passo_min = passo_min
+        self.passo_max = max(passo_min, passo_max)
+        self.passo_inicial = passo_inicial
+        self._trava = threading.Lock()
+        self._bytes_por_registro: dict[str, float] = {}
+        self._estimativa_cabecalho: float | None = None
+
+    def __repr__(self) -> str:
+        return "{}(memoria_max={}, passo={})".format(
+            self.__class__.__name__,
+            self.memoria_max,
+            self.passo,
+        )
+
+    @classmethod
+    def fixo(cls, passo: int) -> "DimensionadorLotes":
+        """Instancia um dimensionador que gera lotes de tamanho fixo.
+
+        Argumentos:
+            passo: Número de registros em cada lote.
+        """
+        return cls(passo_min=passo, passo_max=passo, passo_inicial=passo)
+
+    @classmethod
+    def do_ambiente(cls, lotes_simultaneos: int = 1) -> "DimensionadorLotes":
+        """Instancia o dimensionador configurado nas variáveis de ambiente.
+
+        Argumentos:
+            lotes_simultaneos: Número de lotes mantidos simultaneamente em
+                memória (veja [`DimensionadorLotes`][]).
+
+        Retorna:
+            Um dimensionador de lotes de tamanho fixo, se a variável
+            `IMPULSOETL_LOTE_TAMANHO` estiver definida; ou, caso contrário,
+            um dimensionador com o limite de memória indicado pela variável
+            `IMPULSOETL_LOTE_MEMORIA_MAX`.
+
+        [`DimensionadorLotes`]: impulsoetl.utilitarios.lotes.DimensionadorLotes
+        """
+        # lida a cada chamada, para que possa ser alterada durante a execução
+        lote_tamanho = os.getenv("IMPULSOETL_LOTE_TAMANHO")
+        if lote_tamanho:
+            return cls.fixo(int(lote_tamanho))
+        return cls(
+            memoria_max=int(
+                os.getenv("IMPULSOETL_LOTE_MEMORIA_MAX", LOTE_MEMORIA_MAX),
+            )
+            * 10**6,
+            lotes_simultaneos=lotes_simultaneos,
+        )
+
+    def estimar_pelo_cabecalho(self, campos: Iterable["CampoDBF"]) -> None:
+        """Estima a memória ocupada por registro a partir dos campos do DBF.
+
+        A estimativa só é usada enquanto não houver medidas dos próprios
+        lotes. Campos numéricos ocupam 8 bytes; os demais são lidos como
+        strings, que ocupam, além dos caracteres, um tamanho mínimo fixo.
+
+        Argumentos:
+            campos: Descrições dos campos lidos do arquivo.
+        """
+        estimativa = float(
+            sum(
+                8 if campo.tipo in "FN" else _TEXTO_TAMANHO_MIN + campo.tamanho
+                for campo in campos
+            ),
+        )
+        self._estimativa_cabecalho = estimativa
+
+    def observar(self, lote: pd.DataFrame, etapa: str = "extracao") -> None:
+        """Mede a memória ocupada por registro em um lote processado.
+
+        A medida é feita sobre uma amostra dos registros do lote e combinada
+        com as medidas anteriores da mesma etapa em uma média móvel.
+
+        Argumentos:
+            lote: Lote de registros, na forma em que é mantido em memória.
+            etapa: Etapa do processamento a que o lote corresponde:
+                `"extracao"` ou `"transformacao"`. A memória ocupada por
+                registro é a soma das medidas das duas etapas.
+        """
+        if lote.empty:
+            return
+        amostra = lote.iloc[:_AMOSTRA_TAMANHO]
+        medida = amostra.memory_usage(index=False, deep=True).sum() / len(
+            amostra,
+        )
+        with self._trava:
+            anterior = self._bytes_por_registro.get(etapa)
+            if anterior is not None:
+                medida = _PESO_MEDIDA * medida + (1 - _PESO_MEDIDA) * anterior
+            self._bytes_por_registro[etapa] = medida
+
+    @property
+    def bytes_por_registro(self) -> float | None:
+        """Memória estimada ocupada por registro, somadas todas as etapas."""
+        with self._trava:
+            medidas = dict(self._bytes_por_registro)
+        extracao = medidas.pop("extracao", self._estimativa_cabecalho)
+        if extracao is None:
+            return None
+        # enquanto não houver medida dos lotes transformados, supõe que
+        # ocupem tanta memória quanto os extraídos
+        transformacao = medidas.get("transformacao", extracao)
+        return extracao + transformacao
+
+    @property
+    def passo(self) -> int:
+        """Número de registros do próximo lote."""
+        bytes_por_registro = self.bytes_por_registro
+        if not bytes_por_registro:
+            passo = self.passo_inicial
+        else:
+            passo = int(
+                self.memoria_max
+                / self.lotes_simultaneos
+                / bytes_por_registro,
+            )
+        return min(max(passo, self.passo_min), self.passo_max)
+
+
+def passo_atual(passo: "int | DimensionadorLotes") -> int:
+    """Obtém o número de registros do próximo lote.
+
+    Argumentos:
+        passo: Número fixo de registros em cada lote, ou instância de
+            [`DimensionadorLotes`][].
+
+    Retorna:
+        O próprio número de registros, se for um número fixo; ou o tamanho
+        calculado pelo dimensionador para o próximo lote.
+
+    [`DimensionadorLotes`]: impulsoetl.utilitarios.lotes.DimensionadorLotes
+    """
+    if isinstance(passo, DimensionadorLotes):
+        tamanho = passo.passo
+        logger.debug("Tamanho do próximo lote: {:n} registros.", tamanho)
+        return tamanho
+    return passo
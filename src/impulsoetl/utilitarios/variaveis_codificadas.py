@@ -3,28 +3,128 @@
 # SPDX-License-Identifier: MIT
 
 
+"""Verifica a ocorrência de códigos em colunas com variáveis codificadas."""
+
+
+import re
+from functools import lru_cache
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+# marca, na árvore de prefixos, o fim de um dos códigos
+_FIM: bool = True
+
+
+def _montar_arvore(codigos: Iterable[str]) -> dict:
+    """Organiza os códigos em uma árvore de prefixos (*trie*)."""
+    arvore: dict = {}
+    # os códigos mais curtos são inseridos primeiro; como basta que um texto
+    # comece com um deles, os códigos mais longos que o contêm são ignorados
+    for codigo in sorted(set(codigos), key=len):
+        no = arvore
+        for caractere in codigo[:-1]:
+            no = no.setdefault(caractere, {})
+            if no is _FIM:
+                break
+        else:
+            no[codigo[-1]] = _FIM
+    return arvore
+
+
+def _arvore_para_regex(no: dict) -> str:
+    """Converte uma árvore de prefixos em uma expressão regular."""
+    ramos = []
+    folhas = []
+    for caractere, filho in sorted(no.items()):
+        if filho is _FIM:
+            folhas.append(re.escape(caractere))
+        else:
+            ramos.append(re.escape(caractere) + _arvore_para_regex(filho))
+    if len(folhas) == 1:
+        ramos.append(folhas[0])
+    elif folhas:
+        ramos.append("[{}]".format("".join(folhas)))
+    if len(ramos) == 1:
+        return ramos[0]
+    return "(?:{})".format("|".join(ramos))
+
+
+@lru_cache(maxsize=64)
+def _compilar_codigos(
+    codigos_alvo: tuple[str, ...],
+    varios_codigos_por_celula: bool,
+) -> re.Pattern:
+    """Compila uma única expressão regular para uma lista de códigos."""
+    if "" in codigos_alvo:
+        # qualquer texto começa com um código vazio
+        expressao = ""
+    elif codigos_alvo:
+        expressao = _arvore_para_regex(_montar_arvore(codigos_alvo))
+    else:
+        # nenhum código: a expressão nunca é satisfeita
+        expressao = "(?!)"
+    if varios_codigos_por_celula:
+        # os códigos podem estar no início do texto ou após qualquer
+        # caractere não alfanumérico que os separe dos demais
+        expressao = r"(?:^|(?<=\W))(?:{})".format(expressao)
+    return re.compile(expressao, re.ASCII)
+
+
 def checar_codigos(
     serie: pd.Series,
-    codigos_alvo: List[str],
+    codigos_alvo: Iterable[str],
     varios_codigos_por_celula: bool = False,
 ) -> pd.Series:
-    """Verifica se há elementos de uma lista de códigos em uma `pd.Series`."""
+    """Verifica se há elementos de uma lista de códigos em uma `pd.Series`.
+
+    Os códigos são reunidos em uma única expressão regular, organizada como
+    uma árvore de prefixos, de modo que cada texto é examinado uma única
+    vez, independentemente do número de códigos. A expressão é compilada
+    apenas uma vez para cada lista de códigos, e cada valor distinto da série
+    é verificado uma única vez.
+
+    Argumentos:
+        serie: Objeto [`pandas.Series`][] com os textos a serem verificados.
+        codigos_alvo: Códigos a serem procurados. Um texto corresponde a um
+            código se começar por ele - por exemplo, `"F"` corresponde a
+            todos os códigos do capítulo F da CID-10.
+        varios_codigos_por_celula: Se verdadeiro, considera que cada texto
+            pode conter vários códigos, separados por caracteres não
+            alfanuméricos, e verifica se algum deles começa com um dos
+            códigos-alvo. Por padrão, verifica apenas o início de cada
+            texto.
+
+    Retorna:
+        Um objeto [`pandas.Series`][] de valores lógicos, com o mesmo índice
+        de `serie`. Valores ausentes resultam em falso.
+
+    Exemplo:
+        ```py
+        >>> checar_codigos(
+        ...     pd.Series(["F322", "A419/X700", "X800"]),
+        ...     codigos_alvo=CID10_SAUDE_MENTAL,
+        ...     varios_codigos_por_celula=True,
+        ... )
+        0     True
+        1     True
+        2     True
+        dtype: bool
+        ```
 
+    [`pandas.Series`]: https://pandas.pydata.org/docs/reference/api/pandas.Series.html
+    """
+    padrao = _compilar_codigos(tuple(codigos_alvo), varios_codigos_por_celula)
+    # valores ausentes recebem o código -1
+    codigos, distintos = pd.factorize(serie)
+    distintos = pd.Series(distintos, dtype=object).astype(str)
     if varios_codigos_por_celula:
-        return serie.apply(
-            lambda elemento: any(
-                [elemento.startswith(cod) for cod in codigos_alvo],
-            ),
-        )
-
-    # se a série contiver vários códigos em uma mesma célula, concatenados
-    # por algum caractere alfanumérico, utilizar o módulo `re` para
-    # verificar se algum se aplica (mais lento)
-    return serie.apply(
-        lambda elemento: any(
-            [
-                re.search(r"\W{}".format(cod), elemento, re.ASCII)
-                for cod in codigos_alvo
-            ],
-        ),
+        encontrados = distintos.str.contains(padrao)
+    else:
+        encontrados = distintos.str.match(padrao)
+    return pd.Series(
+        np.append(encontrados.to_numpy(dtype=bool), False)[codigos],
+        index=serie.index,
+        name=serie.name,
     )
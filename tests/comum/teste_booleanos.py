@@ -0,0 +1,69 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Testes da conversão de códigos do DataSUS em valores lógicos."""
+
+
+import pandas as pd
+import pytest
+
+from impulsoetl.comum.booleanos import decodificar_booleanos
+
+VALORES = ["1", "0", "2", "", None, "1"]
+
+
+@pytest.mark.parametrize(
+    "argumentos,resultado_esperado",
+    [
+        (
+            {"verdadeiros": ["1"]},
+            [True, False, False, False, False, True],
+        ),
+        (
+            {"verdadeiros": ["1"], "falsos": ["0"]},
+            [True, False, pd.NA, pd.NA, pd.NA, True],
+        ),
+        (
+            {"verdadeiros": ["1"], "falsos": ["2"]},
+            [True, pd.NA, False, pd.NA, pd.NA, True],
+        ),
+        (
+            {"verdadeiros": ["1"], "falsos": ["0"], "indefinidos": True},
+            [True, False, True, True, True, True],
+        ),
+    ],
+)
+def teste_decodificar_booleanos(argumentos, resultado_esperado):
+    """Testa converter códigos em valores lógicos que admitem nulos."""
+    dados = pd.DataFrame({"a": VALORES, "b": VALORES, "c": VALORES})
+    resultado = decodificar_booleanos(dados, colunas=["a", "b"], **argumentos)
+    esperado = pd.Series(resultado_esperado, dtype="boolean")
+    for coluna in ("a", "b"):
+        pd.testing.assert_series_equal(
+            resultado[coluna],
+            esperado,
+            check_names=False,
+        )
+    # colunas não indicadas não são alteradas
+    pd.testing.assert_series_equal(resultado["c"], dados["c"])
+
+
+def teste_decodificar_booleanos_contem():
+    """Testa converter em verdadeiros os valores que contêm um código."""
+    dados = pd.DataFrame({"substancias": ["AC", "C", "", "O", "ACO", None]})
+    resultado = decodificar_booleanos(
+        dados,
+        colunas=["substancias"],
+        verdadeiros=["C"],
+        contem=True,
+    )
+    assert resultado["substancias"].tolist() == [
+        True,
+        True,
+        False,
+        False,
+        True,
+        False,
+    ]
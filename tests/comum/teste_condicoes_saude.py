@@ -6,9 +6,14 @@
 """Testes de categorias de datas utilizadas em vários processos de ETL."""
 
 
+import pandas as pd
 import pytest
 
-from impulsoetl.comum.condicoes_saude import e_cid10, remover_ponto_cid10
+from impulsoetl.comum.condicoes_saude import (
+    e_cid10,
+    listar_cids10,
+    remover_ponto_cid10,
+)
 
 
 @pytest.mark.parametrize(
@@ -42,3 +47,46 @@ def teste_e_cid10_nao(texto):
 def teste_remover_ponto_cid10(texto, resultado_esperado):
     """Testa identificar que um texto é um CID10 válido."""
     assert remover_ponto_cid10(texto) == resultado_esperado
+
+
+@pytest.mark.parametrize(
+    "texto,resultado_esperado",
+    [
+        ("*A419/J12.9*", "{A419,J129}"),
+        ("J969/ / /B342 U071", "{J969,B342,U071}"),
+        ("/ / /", "{}"),
+        ("", "{}"),
+        ("K09.2 foo N189I500 M45.X3", "{K092,M45X3}"),
+    ],
+)
+def teste_listar_cids10(texto, resultado_esperado):
+    """Testa converter textos com vários CIDs em listas do PostgreSQL."""
+    textos = pd.Series([texto, None, texto], index=[7, 8, 9])
+    listas = listar_cids10(textos)
+    assert listas.index.tolist() == [7, 8, 9]
+    assert listas[7] == listas[9] == resultado_esperado
+    assert pd.isna(listas[8])
+
+
+@pytest.mark.parametrize(
+    "coluna_origem,coluna_destino",
+    [
+        ("LINHAA", "condicoes_terminais_ids_cid10"),
+        ("LINHAB", "condicoes_antecedentes_consequenciais_1_ids_cid10"),
+        ("LINHAC", "condicoes_antecedentes_consequenciais_2_ids_cid10"),
+        ("LINHAD", "condicoes_basicas_ids_cid10"),
+        ("LINHAII", "condicoes_contribuintes_ids_cid10"),
+    ],
+)
+def teste_listar_cids10_do(coluna_origem, coluna_destino):
+    """Testa obter as listas de CIDs de uma Declaração de Óbito."""
+    do = pd.read_parquet(
+        "tests/sim/SIM_DORR2020_.parquet",
+        columns=[coluna_origem],
+    )
+    do_transformada = pd.read_parquet(
+        "tests/sim/do_transformada.parquet",
+        columns=[coluna_destino],
+    )
+    listas = listar_cids10(do[coluna_origem])
+    assert listas.tolist() == do_transformada[coluna_destino].tolist()
@@ -10,7 +10,10 @@ import pandas as pd
 import pytest
 
 from impulsoetl.comum.datas import (
+    converter_datas,
     de_aaaammdd_para_timestamp,
+    de_ano_mes_para_datas,
+    de_texto_para_datas,
     obter_proximo_periodo,
     periodo_por_data,
 )
@@ -47,6 +50,109 @@ def teste_de_aaaammdd_para_timestamp_incorreto(comportamento):
             assert pd.isna(data)
 
 
+@pytest.mark.parametrize(
+    "textos,formato,datas_esperadas",
+    [
+        (
+            ["20201005", "2020 1 7", "20202 13", "20200230", "", None],
+            "%Y%m%d",
+            ["2020-10-05", "2020-01-07", "2020-02-13", None, None, None],
+        ),
+        (
+            ["05102020", "111996", "31022020", "", None],
+            "%d%m%Y",
+            ["2020-10-05", "1996-01-01", None, None, None],
+        ),
+        (
+            ["202108", "999999", "", None],
+            "%Y%m",
+            ["2021-08-01", None, None, None],
+        ),
+        (
+            ["26/07/2004", "", None],
+            "%d/%m/%Y",
+            ["2004-07-26", None, None],
+        ),
+    ],
+)
+def teste_de_texto_para_datas(textos, formato, datas_esperadas):
+    """Testa converter uma coluna de textos em datas, de uma só vez."""
+    textos = pd.Series(textos, index=range(10, 10 + len(textos)))
+    datas = de_texto_para_datas(textos, formato=formato, erros="coerce")
+    pd.testing.assert_series_equal(
+        datas,
+        pd.Series(
+            pd.to_datetime(datas_esperadas),
+            index=textos.index,
+        ),
+    )
+    # equivale a aplicar o conversor antigo a cada um dos textos
+    if formato == "%Y%m%d":
+        assert datas.tolist()[:-1] == [
+            de_aaaammdd_para_timestamp(texto, erros="coerce")
+            for texto in textos[:-1]
+        ]
+
+
+@pytest.mark.parametrize(
+    "comportamento",
+    ["raise", "ignore", "coerce"],
+)
+def teste_de_texto_para_datas_incorreto(comportamento):
+    """Testa converter uma coluna com textos que não representam datas."""
+    textos = pd.Series(["20201005", "blablabla", None])
+    if comportamento == "raise":
+        with pytest.raises(ValueError):
+            de_texto_para_datas(textos, erros=comportamento)
+    else:
+        datas = de_texto_para_datas(textos, erros=comportamento)
+        assert datas[0] == pd.Timestamp(2020, 10, 5)
+        assert pd.isna(datas[2])
+        if comportamento == "ignore":
+            assert datas[1] == "blablabla"
+        if comportamento == "coerce":
+            assert pd.isna(datas[1])
+
+
+def teste_converter_datas():
+    """Testa converter textos em datas, em várias colunas."""
+    dados = pd.DataFrame(
+        {
+            "inicio": ["20210801", "20210815"],
+            "fim": ["20210831", ""],
+            "codigo": ["1", "2"],
+        },
+    )
+    resultado = converter_datas(
+        dados,
+        colunas=["inicio", "fim"],
+        erros="coerce",
+    )
+    assert resultado.columns.tolist() == ["inicio", "fim", "codigo"]
+    assert resultado["inicio"].tolist() == [
+        pd.Timestamp(2021, 8, 1),
+        pd.Timestamp(2021, 8, 15),
+    ]
+    assert resultado["fim"][0] == pd.Timestamp(2021, 8, 31)
+    assert pd.isna(resultado["fim"][1])
+    pd.testing.assert_series_equal(resultado["codigo"], dados["codigo"])
+
+
+def teste_de_ano_mes_para_datas():
+    """Testa montar as datas do primeiro dia de cada mês."""
+    datas = de_ano_mes_para_datas(
+        anos=pd.Series(["2021", "2020", 2019]),
+        meses=pd.Series(["8", "12", 1]),
+    )
+    assert datas.tolist() == [
+        pd.Timestamp(2021, 8, 1),
+        pd.Timestamp(2020, 12, 1),
+        pd.Timestamp(2019, 1, 1),
+    ]
+    with pytest.raises(ValueError):
+        de_ano_mes_para_datas(anos=pd.Series(["2021"]), meses=pd.Series([""]))
+
+
 @pytest.mark.parametrize(
     "data,tipo_periodo,id_esperado",
     [
@@ -0,0 +1,214 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Testes da associação de períodos e unidades geográficas em lote."""
+
+
+import pandas as pd
+import pytest
+from sqlalchemy.exc import MultipleResultsFound, NoResultFound
+
+from impulsoetl.comum import dimensoes
+from impulsoetl.comum.dimensoes import (
+    adicionar_periodo_id,
+    adicionar_unidade_geografica_id,
+)
+
+PERIODOS = pd.DataFrame(
+    {
+        "id": ["2021-07", "2021-08", "2021-q2"],
+        "tipo": ["Mensal", "Mensal", "Quadrimestral"],
+        "data_inicio": pd.to_datetime(
+            ["2021-07-01", "2021-08-01", "2021-05-01"],
+        ),
+        "data_fim": pd.to_datetime(
+            ["2021-07-31", "2021-08-31", "2021-08-31"],
+        ),
+    },
+)
+
+UNIDADES_GEOGRAFICAS = pd.DataFrame(
+    {
+        "id": ["aracaju", "planaltina"],
+        "id_sus": ["280030", "530020"],
+        "id_sim": ["280030", "539914"],
+    },
+)
+
+
+@pytest.fixture
+def dimensoes_em_memoria(monkeypatch):
+    """Substitui as tabelas de dimensão por versões reduzidas."""
+    tabelas = {
+        "periodos": PERIODOS,
+        "unidades_geograficas": UNIDADES_GEOGRAFICAS,
+    }
+    monkeypatch.setattr(
+        dimensoes,
+        "obter_dimensao",
+        lambda sessao, nome: tabelas[nome],
+    )
+
+
+@pytest.mark.parametrize(
+    "tipo_periodo,esperados",
+    [
+        ("mensal", ["2021-08", "2021-07", "2021-08"]),
+        ("quadrimestral", ["2021-q2", "2021-q2", "2021-q2"]),
+    ],
+)
+def teste_adicionar_periodo_id(dimensoes_em_memoria, tipo_periodo, esperados):
+    """Testa associar cada data ao período que a contém."""
+    dados = pd.DataFrame(
+        {
+            "data": pd.to_datetime(["2021-08-31", "2021-07-01", "2021-08-01"]),
+        },
+    )
+    resultado = adicionar_periodo_id(
+        dados,
+        sessao=None,
+        coluna_data="data",
+        tipo_periodo=tipo_periodo,
+    )
+    assert resultado["periodo_id"].tolist() == esperados
+    assert "periodo_id" not in dados.columns
+
+
+def teste_adicionar_periodo_id_inexistente(dimensoes_em_memoria):
+    """Testa associar uma data não contida em nenhum período."""
+    dados = pd.DataFrame(
+        {"data": pd.to_datetime(["2021-08-01", "2021-09-01"])},
+    )
+    with pytest.raises(NoResultFound):
+        adicionar_periodo_id(dados, sessao=None, coluna_data="data")
+
+
+def teste_adicionar_periodo_id_data_nula(dimensoes_em_memoria):
+    """Testa se uma data nula é rejeitada, como nas consultas individuais."""
+    dados = pd.DataFrame({"data": pd.to_datetime(["2021-08-01", None])})
+    with pytest.raises(NoResultFound, match="NaT"):
+        adicionar_periodo_id(dados, sessao=None, coluna_data="data")
+
+
+@pytest.mark.parametrize(
+    "sistema,municipios,esperados",
+    [
+        (
+            "sus",
+            ["280030", "530020", "280030"],
+            ["aracaju", "planaltina", "aracaju"],
+        ),
+        (
+            "sim",
+            ["539914", "280030", "539914"],
+            ["planaltina", "aracaju", "planaltina"],
+        ),
+    ],
+)
+def teste_adicionar_unidade_geografica_id(
+    dimensoes_em_memoria,
+    sistema,
+    municipios,
+    esperados,
+):
+    """Testa associar códigos de municípios às unidades geográficas."""
+    dados = pd.DataFrame({"municipio": municipios}, index=[10, 20, 30])
+    resultado = adicionar_unidade_geografica_id(
+        dados,
+        sessao=None,
+        coluna_municipio="municipio",
+        sistema=sistema,
+    )
+    assert resultado["unidade_geografica_id"].tolist() == esperados
+    assert resultado.index.tolist() == [10, 20, 30]
+
+
+def teste_adicionar_unidade_geografica_id_inexistente(dimensoes_em_memoria):
+    """Testa associar um código que não corresponde a nenhum município."""
+    dados = pd.DataFrame({"municipio": ["280030", "999999"]})
+    with pytest.raises(NoResultFound):
+        adicionar_unidade_geografica_id(
+            dados,
+            sessao=None,
+            coluna_municipio="municipio",
+        )
+
+
+@pytest.mark.parametrize("nulo", [None, float("nan")])
+def teste_adicionar_unidade_geografica_id_nulo(dimensoes_em_memoria, nulo):
+    """Testa se um código nulo é rejeitado, como nas consultas individuais."""
+    dados = pd.DataFrame({"municipio": ["280030", nulo]})
+    with pytest.raises(NoResultFound):
+        adicionar_unidade_geografica_id(
+            dados,
+            sessao=None,
+            coluna_municipio="municipio",
+        )
+
+
+def teste_adicionar_unidade_geografica_id_ambiguo(monkeypatch):
+    """Testa se um código associado a mais de um município é rejeitado."""
+    unidades_geograficas = pd.concat(
+        [
+            UNIDADES_GEOGRAFICAS,
+            pd.DataFrame(
+                {
+                    "id": ["brasilia"],
+                    "id_sus": ["530010"],
+                    "id_sim": ["539914"],
+                },
+            ),
+        ],
+        ignore_index=True,
+    )
+    monkeypatch.setattr(
+        dimensoes,
+        "obter_dimensao",
+        lambda sessao, nome: unidades_geograficas,
+    )
+    dados = pd.DataFrame({"municipio": ["280030", "539914"]})
+    with pytest.raises(MultipleResultsFound, match="539914"):
+        adicionar_unidade_geografica_id(
+            dados,
+            sessao=None,
+            coluna_municipio="municipio",
+            sistema="sim",
+        )
+
+    # códigos repetidos que não constam nos registros não impedem a associação
+    resultado = adicionar_unidade_geografica_id(
+        dados.iloc[:1],
+        sessao=None,
+        coluna_municipio="municipio",
+        sistema="sim",
+    )
+    assert resultado["unidade_geografica_id"].tolist() == ["aracaju"]
+
+
+@pytest.mark.integracao
+def teste_dimensoes_equivalem_consultas_individuais(sessao):
+    """Testa se as associações em lote coincidem com consultas no banco."""
+    # importado aqui porque o módulo consulta o banco de dados ao ser lido
+    from impulsoetl.comum.datas import periodo_por_data
+
+    dados = pd.DataFrame(
+        {
+            "data": pd.to_datetime(["2021-08-15", "2020-02-01"]),
+            "municipio": ["280030", "280030"],
+        },
+    )
+    resultado = adicionar_periodo_id(dados, sessao=sessao, coluna_data="data")
+    resultado = adicionar_unidade_geografica_id(
+        resultado,
+        sessao=sessao,
+        coluna_municipio="municipio",
+    )
+    assert resultado["periodo_id"].tolist() == [
+        periodo_por_data(sessao=sessao, data=data).id
+        for data in dados["data"]
+    ]
+    assert resultado["unidade_geografica_id"].tolist() == [
+        "e8cb5dcc-46d4-45af-a237-4ab683b8ce8e",
+    ] * 2
@@ -0,0 +1,62 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Testes do tratamento de códigos que representam valores ausentes."""
+
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from impulsoetl.comum.nulos import substituir_nulos_codificados
+
+
+@pytest.mark.parametrize(
+    "digito,valores,resultado_esperado",
+    [
+        (
+            "0",
+            ["0", "0000", "", "0102", "10", None, "00000000000000"],
+            [np.nan, np.nan, np.nan, "0102", "10", None, np.nan],
+        ),
+        (
+            "9",
+            ["9", "999", "0000", "99A", None],
+            [np.nan, np.nan, "0000", "99A", None],
+        ),
+    ],
+)
+def teste_substituir_nulos_codificados(digito, valores, resultado_esperado):
+    """Testa substituir códigos compostos por um só dígito por nulos."""
+    dados = pd.DataFrame({"codigo": valores, "outra": valores})
+    resultado = substituir_nulos_codificados(
+        dados,
+        colunas=["codigo"],
+        digito=digito,
+    )
+    pd.testing.assert_series_equal(
+        resultado["codigo"],
+        pd.Series(resultado_esperado, name="codigo", dtype=object),
+    )
+    # colunas não indicadas não são alteradas
+    pd.testing.assert_series_equal(resultado["outra"], dados["outra"])
+
+
+def teste_substituir_nulos_codificados_equivale_original():
+    """Testa se o resultado equivale à verificação valor a valor."""
+    valores = pd.Series(["0", "000", "", "090", None, "1", "00", np.nan] * 50)
+    resultado = substituir_nulos_codificados(
+        pd.DataFrame({"codigo": valores}),
+        colunas=["codigo"],
+    )
+    esperado = valores.map(
+        lambda elemento: (
+            np.nan
+            if pd.notna(elemento)
+            and all(digito == "0" for digito in elemento)
+            else elemento
+        ),
+    )
+    assert resultado["codigo"].isna().tolist() == esperado.isna().tolist()
@@ -0,0 +1,300 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Testes da aplicação de especificações de transformação."""
+
+
+import numpy as np
+import pandas as pd
+import pytest
+from frozendict import frozendict
+
+from impulsoetl.comum import dimensoes
+from impulsoetl.comum.transformacoes import (
+    DecodificacaoBooleanos,
+    EspecificacaoTransformacao,
+    _compactar,
+    _substituir_vazios,
+    aplicar_especificacao,
+    por_valor_distinto,
+)
+
+PERIODOS = pd.DataFrame(
+    {
+        "id": ["2021-07", "2021-08"],
+        "tipo": ["Mensal", "Mensal"],
+        "data_inicio": pd.to_datetime(["2021-07-01", "2021-08-01"]),
+        "data_fim": pd.to_datetime(["2021-07-31", "2021-08-31"]),
+    },
+)
+
+UNIDADES_GEOGRAFICAS = pd.DataFrame(
+    {
+        "id": ["aracaju", "planaltina"],
+        "id_sus": ["280030", "530020"],
+        "id_sim": ["280030", "539914"],
+    },
+)
+
+ESPECIFICACAO = EspecificacaoTransformacao(
+    de_para=frozendict(
+        {
+            "MUNIC": "unidade_geografica_id_sus",
+            "COMPET": "realizacao_periodo_data_inicio",
+            "IDADE": "usuario_idade",
+            "QTD": "quantidade",
+            "GESTANTE": "usuario_gestante",
+            "ANTIGA": "coluna_antiga",
+        },
+    ),
+    tipos=frozendict(
+        {
+            "unidade_geografica_id_sus": "object",
+            "realizacao_periodo_data_inicio": "datetime64[ns]",
+            "usuario_idade": "Int64",
+            "quantidade": "Int64",
+            "usuario_gestante": "boolean",
+            "usuario_idade_texto": "object",
+            "periodo_id": "object",
+            "unidade_geografica_id": "object",
+        },
+    ),
+    colunas_adicionais=("GESTANTE",),
+    tratamentos=frozendict(
+        {"usuario_idade": por_valor_distinto(lambda idade: idade.strip())},
+    ),
+    datas=frozendict({"%Y%m": ("realizacao_periodo_data_inicio",)}),
+    nulos_codificados=frozendict({"9": ("usuario_idade",)}),
+    derivadas=frozendict(
+        {
+            "usuario_idade_texto": lambda colunas: (
+                colunas["usuario_idade"].fillna("desconhecida")
+            ),
+        },
+    ),
+    booleanos=(
+        DecodificacaoBooleanos(
+            colunas=("usuario_gestante",),
+            verdadeiros=("S",),
+            falsos=("N",),
+        ),
+    ),
+    descartar=("coluna_antiga",),
+    coluna_periodo="realizacao_periodo_data_inicio",
+    colunas_numericas=("usuario_idade", "quantidade"),
+)
+
+
+@pytest.fixture
+def dimensoes_em_memoria(monkeypatch):
+    """Substitui as tabelas de dimensão por versões reduzidas."""
+    tabelas = {
+        "periodos": PERIODOS,
+        "unidades_geograficas": UNIDADES_GEOGRAFICAS,
+    }
+    monkeypatch.setattr(
+        dimensoes,
+        "obter_dimensao",
+        lambda sessao, nome: tabelas[nome],
+    )
+
+
+def teste_por_valor_distinto():
+    """Testa tratar uma coluna chamando a função por valor distinto."""
+    chamadas = []
+
+    def completar(texto):
+        chamadas.append(texto)
+        return texto.zfill(4) if isinstance(texto, str) else "0000"
+
+    serie = pd.Series(["12", "3", None, "12", "3"], index=range(5, 10))
+    resultado = por_valor_distinto(completar)(serie.rename("codigo"))
+    pd.testing.assert_series_equal(
+        resultado,
+        pd.Series(
+            ["0012", "0003", "0000", "0012", "0003"],
+            index=serie.index,
+            name="codigo",
+        ),
+    )
+    assert len(chamadas) == 3
+
+
+@pytest.mark.parametrize("nulo", [None, np.nan])
+def teste_por_valor_distinto_nulos(nulo):
+    """Testa se os valores nulos também são tratados pela função."""
+    chamadas = []
+
+    def descrever(valor):
+        chamadas.append(valor)
+        return "nulo" if pd.isna(valor) else "valor"
+
+    serie = pd.Series([nulo, 1.5, nulo, 2.0, 1.5], dtype=object)
+    resultado = por_valor_distinto(descrever)(serie)
+    assert len(chamadas) == 3
+    pd.testing.assert_series_equal(resultado, serie.apply(descrever))
+    assert resultado.tolist() == ["nulo", "valor", "nulo", "valor", "valor"]
+
+    numeros = pd.Series([np.nan, 1.0, np.nan])
+    assert por_valor_distinto(descrever)(numeros).tolist() == [
+        "nulo",
+        "valor",
+        "nulo",
+    ]
+
+
+@pytest.mark.parametrize(
+    "valores,tipo_esperado",
+    [
+        (["a", "", "b"], "object"),
+        (["", "", ""], "float64"),
+        ([1, "", 2], "float64"),
+    ],
+)
+def teste_substituir_vazios(valores, tipo_esperado):
+    """Testa se os textos vazios são tratados como em `Series.replace()`."""
+    serie = pd.Series(valores, dtype=object)
+    resultado = _substituir_vazios(serie)
+    esperado = serie.replace("", np.nan)
+    pd.testing.assert_series_equal(resultado, esperado)
+    assert resultado.dtype == tipo_esperado
+
+
+def teste_substituir_vazios_sem_vazios():
+    """Testa se a coluna sem textos vazios é mantida sem cópias."""
+    serie = pd.Series(["a", "b"])
+    assert _substituir_vazios(serie) is serie
+
+
+def teste_aplicar_especificacao(dimensoes_em_memoria):
+    """Testa transformar um `DataFrame` conforme uma especificação."""
+    dados = pd.DataFrame(
+        {
+            "MUNIC ": ["280030", "530020", "280030"],
+            "COMPET": ["202108", "202107", "202107"],
+            "IDADE": [" 034", "999", ""],
+            "QTD": ["1", "2", ""],
+            "ANTIGA": ["x", "y", "z"],
+        },
+        index=[3, 4, 5],
+    )
+    resultado = aplicar_especificacao(dados, ESPECIFICACAO, sessao=None)
+
+    assert list(resultado.columns) == [
+        "unidade_geografica_id_sus",
+        "realizacao_periodo_data_inicio",
+        "usuario_idade",
+        "quantidade",
+        "usuario_gestante",
+        "usuario_idade_texto",
+        "id",
+        "periodo_id",
+        "unidade_geografica_id",
+        "criacao_data",
+        "atualizacao_data",
+    ]
+    assert resultado.index.tolist() == [3, 4, 5]
+    assert resultado["realizacao_periodo_data_inicio"].tolist() == [
+        pd.Timestamp("2021-08-01"),
+        pd.Timestamp("2021-07-01"),
+        pd.Timestamp("2021-07-01"),
+    ]
+    assert resultado["usuario_idade"].tolist() == [34, pd.NA, pd.NA]
+    assert resultado["quantidade"].tolist() == [1, 2, pd.NA]
+    assert resultado["usuario_idade_texto"].tolist() == [
+        "034",
+        "desconhecida",
+        "desconhecida",
+    ]
+    assert resultado["usuario_gestante"].isna().all()
+    assert resultado["periodo_id"].tolist() == [
+        "2021-08",
+        "2021-07",
+        "2021-07",
+    ]
+    assert resultado["unidade_geografica_id"].tolist() == [
+        "aracaju",
+        "planaltina",
+        "aracaju",
+    ]
+    assert resultado["id"].is_unique
+    assert (resultado["criacao_data"] == resultado["atualizacao_data"]).all()
+
+
+def teste_aplicar_especificacao_periodo_informado(dimensoes_em_memoria):
+    """Testa usar um mesmo período, informado, para todos os registros."""
+    especificacao = ESPECIFICACAO._replace(coluna_periodo=None)
+    dados = pd.DataFrame(
+        {
+            "MUNIC": ["280030"],
+            "COMPET": ["202108"],
+            "IDADE": ["034"],
+            "QTD": ["1"],
+            "GESTANTE": ["S"],
+            "ANTIGA": ["x"],
+        },
+    )
+    resultado = aplicar_especificacao(
+        dados,
+        especificacao,
+        sessao=None,
+        periodo_id="2021-07",
+    )
+    assert resultado["periodo_id"].tolist() == ["2021-07"]
+    assert resultado["usuario_gestante"].tolist() == [True]
+
+
+def teste_compactar():
+    """Testa manter como categorias apenas as colunas de textos repetidos."""
+    codigos = pd.Series(["0301", None, "0301", "0214"], name="codigo")
+    compactados = _compactar(codigos)
+    assert compactados.dtype == "category"
+    pd.testing.assert_series_equal(compactados.astype(object), codigos)
+
+    nulos = pd.Series([None, np.nan, None, None], dtype=object)
+    assert _compactar(nulos).dtype == "category"
+
+    distintos = pd.Series(["a", "b", "c", "a"])
+    assert _compactar(distintos) is distintos
+    listas = pd.Series([["F32"], ["F32"], ["F32"], None])
+    assert _compactar(listas) is listas
+
+
+def teste_aplicar_especificacao_compacta(dimensoes_em_memoria):
+    """Testa se o modo compacto preserva os valores transformados."""
+    dados = pd.DataFrame(
+        {
+            "MUNIC": ["280030", "280030", "530020", "280030"],
+            "COMPET": ["202108", "202108", "202108", "202107"],
+            "IDADE": ["034", "012", "999", "034"],
+            "QTD": ["1", "2", "1", "1"],
+            "GESTANTE": ["S", "N", "N", ""],
+            "ANTIGA": ["x", "y", "z", "w"],
+        },
+    )
+    expandido = aplicar_especificacao(
+        dados,
+        ESPECIFICACAO,
+        sessao=None,
+        compacta=False,
+    )
+    compacto = aplicar_especificacao(
+        dados,
+        ESPECIFICACAO,
+        sessao=None,
+        compacta=True,
+    )
+    categoricas = compacto.columns[compacto.dtypes == "category"]
+    assert set(categoricas) == {
+        "unidade_geografica_id_sus",
+        "periodo_id",
+        "unidade_geografica_id",
+    }
+    pd.testing.assert_frame_equal(
+        compacto.astype({coluna: object for coluna in categoricas}).drop(
+            columns=["id", "criacao_data", "atualizacao_data"],
+        ),
+        expandido.drop(columns=["id", "criacao_data", "atualizacao_data"]),
+    )
@@ -112,10 +112,12 @@ def teste_extrair_pa(uf_sigla, periodo_data_inicio, passo):
     ["UFMUN == '280030'", None],
 )
 def teste_transformar_bpa_i(sessao, bpa_i, condicoes):
+    if condicoes:
+        # as condições são aplicadas durante a extração dos registros
+        bpa_i = bpa_i.query(condicoes, engine="python")
     bpa_i_transformada = transformar_bpa_i.fn(
         sessao=sessao,
         bpa_i=bpa_i,
-        condicoes=condicoes,
     )
 
     assert isinstance(bpa_i_transformada, pd.DataFrame)
@@ -126,10 +126,12 @@ def teste_extrair_pa(uf_sigla, periodo_data_inicio, passo):
     ["PA_UFMUN == '280030'", None],
 )
 def teste_transformar_pa(sessao, pa, condicoes):
+    if condicoes:
+        # as condições são aplicadas durante a extração dos registros
+        pa = pa.query(condicoes, engine="python")
     pa_transformada = transformar_pa.fn(
         sessao=sessao,
         pa=pa,
-        condicoes=condicoes,
     )
 
     assert isinstance(pa_transformada, pd.DataFrame)
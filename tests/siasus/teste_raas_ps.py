@@ -119,10 +119,12 @@ def teste_extrair_raas_ps(uf_sigla, periodo_data_inicio, passo):
     ["UFMUN == '280030'", None],
 )
 def teste_transformar_raas_ps(sessao, raas_ps, condicoes):
+    if condicoes:
+        # as condições são aplicadas durante a extração dos registros
+        raas_ps = raas_ps.query(condicoes, engine="python")
     raas_ps_transformada = transformar_raas_ps.fn(
         sessao=sessao,
         raas_ps=raas_ps,
-        condicoes=condicoes,
     )
 
     assert isinstance(raas_ps_transformada, pd.DataFrame)
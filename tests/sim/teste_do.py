@@ -150,11 +150,13 @@ def teste_transformar_do(sessao, do, condicoes, tabela_teste):
 
     do, periodo_id = do
 
+    if condicoes:
+        # as condições são aplicadas durante a extração dos registros
+        do = do.query(condicoes, engine="python")
     do_transformada = transformar_do.fn(
         sessao=sessao,
         do=do,
         periodo_id=periodo_id,
-        condicoes=condicoes,
     )
 
     assert isinstance(do_transformada, pd.DataFrame)
@@ -151,11 +151,13 @@ def teste_transformar_agravos_violencia(
 ):
     agravos_violencia, periodo_id = agravos_violencia
 
+    if condicoes:
+        # as condições são aplicadas durante a extração dos registros
+        agravos_violencia = agravos_violencia.query(condicoes, engine="python")
     agravos_violencia_transformada = transformar_agravos_violencia.fn(
         sessao=sessao,
         agravos_violencia=agravos_violencia,
         periodo_id=periodo_id,
-        condicoes=condicoes,
     )
 
     assert isinstance(agravos_violencia_transformada, pd.DataFrame)
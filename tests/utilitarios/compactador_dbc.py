@@ -0,0 +1,297 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Compacta arquivos DBF no formato DBC, para simular arquivos do DataSUS.
+
+Usado apenas nos testes e nos *benchmarks*, para gerar arquivos DBC a
+partir das tabelas de exemplo, já que a extração só precisa descompactar os
+arquivos disponibilizados pelo DataSUS (ver [`impulsoetl.utilitarios.dbc`][]).
+
+[`impulsoetl.utilitarios.dbc`]: impulsoetl.utilitarios.dbc
+"""
+
+
+import struct
+from pathlib import Path
+from typing import Final
+
+import numpy as np
+
+from impulsoetl.utilitarios.dbc import DBC_FATIA_SAIDA
+
+# tamanho do dicionário declarado nos arquivos gerados (4.096 bytes)
+_DICIONARIO_TAMANHO: Final[int] = 6
+
+# código de fim dos dados compactados: um bit indicando uma cópia, o código
+# de Huffman do comprimento 264 (sete bits, invertidos) e oito bits extras
+# com o valor 255, o que resulta no comprimento reservado 519
+_FIM_DADOS: Final[np.ndarray] = np.array(
+    [1] + [0] * 7 + [1] * 8,
+    dtype=np.uint8,
+)
+
+
+def _codigos_canonicos(comprimentos: tuple[int, ...]) -> tuple[int, ...]:
+    """Atribui os códigos de Huffman canônicos usados pelo *implode*."""
+    codigos = [0] * len(comprimentos)
+    codigo = 0
+    for comprimento in range(1, max(comprimentos) + 1):
+        for simbolo, simbolo_comprimento in enumerate(comprimentos):
+            if simbolo_comprimento == comprimento:
+                codigos[simbolo] = codigo
+                codigo += 1
+        codigo <<= 1
+    return tuple(codigos)
+
+
+def _bits_codigo(codigo: int, comprimento: int) -> int:
+    """Ordena os bits de um código na ordem em que são gravados.
+
+    Os códigos de Huffman são lidos do bit mais para o menos significativo, e
+    cada bit é gravado invertido.
+    """
+    valor = 0
+    for posicao in range(comprimento):
+        bit = (codigo >> (comprimento - 1 - posicao)) & 1
+        valor |= (bit ^ 1) << posicao
+    return valor
+
+
+# tabelas fixas do *implode* para os comprimentos e distâncias das cópias
+_COMPRIMENTOS_BASE: Final[tuple[int, ...]] = (
+    3, 2, 4, 5, 6, 7, 8, 9, 10, 12, 16, 24, 40, 72, 136, 264,
+)  # fmt: skip
+_COMPRIMENTOS_EXTRA: Final[tuple[int, ...]] = (
+    0, 0, 0, 0, 0, 0, 0, 0, 1, 2, 3, 4, 5, 6, 7, 8,
+)  # fmt: skip
+_COMPRIMENTOS_CODIGOS: Final[tuple[int, ...]] = (
+    2, 3, 3, 3, 4, 4, 4, 5, 5, 5, 5, 6, 6, 6, 7, 7,
+)  # fmt: skip
+_DISTANCIAS_CODIGOS: Final[tuple[int, ...]] = (
+    (2,) + (4,) * 2 + (5,) * 4 + (6,) * 15 + (7,) * 26 + (8,) * 16
+)
+
+# a maior cópia possível (o comprimento 519 indica o fim dos dados) e a
+# menor que vale a pena codificar, no lugar de literais
+_COPIA_MAX: Final[int] = 518
+_COPIA_MIN: Final[int] = 3
+
+
+def _tabela_comprimentos() -> tuple[np.ndarray, np.ndarray]:
+    """Calcula os bits que indicam uma cópia de cada comprimento possível.
+
+    Retorna:
+        Dois vetores indexados pelo comprimento da cópia: o primeiro com os
+        bits a serem gravados (o indicador de cópia, o código do comprimento
+        e os bits extras), na ordem de gravação; e o segundo com o número
+        desses bits.
+    """
+    codigos = _codigos_canonicos(_COMPRIMENTOS_CODIGOS)
+    valores = np.zeros(_COPIA_MAX + 1, dtype=np.uint32)
+    bits = np.zeros(_COPIA_MAX + 1, dtype=np.uint32)
+    for simbolo, base in enumerate(_COMPRIMENTOS_BASE):
+        extra = _COMPRIMENTOS_EXTRA[simbolo]
+        codigo_bits = _COMPRIMENTOS_CODIGOS[simbolo]
+        codigo = _bits_codigo(codigos[simbolo], codigo_bits)
+        for excedente in range(2**extra):
+            comprimento = base + excedente
+            if comprimento < _COPIA_MIN or comprimento > _COPIA_MAX:
+                continue
+            valores[comprimento] = (
+                1 | codigo << 1 | excedente << (1 + codigo_bits)
+            )
+            bits[comprimento] = 1 + codigo_bits + extra
+    return valores, bits
+
+
+_COPIA_VALORES, _COPIA_BITS = _tabela_comprimentos()
+
+
+class _CompactadorImplode(object):
+    """Compacta dados no formato *implode*, em fatias sucessivas.
+
+    Os bytes iguais aos de uma distância fixa atrás (em arquivos DBF, a do
+    registro anterior) são codificados como cópias, e os demais, como
+    literais não codificados. A compressão é bem menor que a obtida pelo
+    algoritmo original, mas considerável em arquivos com registros de
+    tamanho fixo e valores repetidos, e feita de forma vetorizada.
+    """
+
+    def __init__(self, distancia: int | None = None) -> None:
+        """Instancia um compactador.
+
+        Argumentos:
+            distancia: Distância, em bytes, das cópias a serem buscadas. Se
+                não for informada, ou se for maior que o dicionário, todos os
+                bytes são gravados como literais.
+        """
+        dicionario = 2 ** (_DICIONARIO_TAMANHO + 6)
+        if distancia is not None and not 0 < distancia <= dicionario:
+            distancia = None
+        self.distancia = distancia
+        self._anteriores = np.empty(0, dtype=np.uint8)
+        self._bits_pendentes = np.empty(0, dtype=np.uint8)
+        self._iniciado = False
+        self._distancia_valor = 0
+        self._distancia_bits = 0
+        if distancia is not None:
+            simbolo, baixos = divmod(distancia - 1, 2**_DICIONARIO_TAMANHO)
+            codigo_bits = _DISTANCIAS_CODIGOS[simbolo]
+            codigo = _codigos_canonicos(_DISTANCIAS_CODIGOS)[simbolo]
+            self._distancia_valor = (
+                _bits_codigo(codigo, codigo_bits) | baixos << codigo_bits
+            )
+            self._distancia_bits = codigo_bits + _DICIONARIO_TAMANHO
+
+    def _copias(self, dados: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Localiza as cópias e seus comprimentos em uma fatia de dados."""
+        if self.distancia is None or not len(dados):
+            vazio = np.empty(0, dtype=np.int64)
+            return vazio, vazio
+        # compara cada byte com o que está a uma distância fixa atrás,
+        # inclusive nas fatias anteriores
+        combinados = np.concatenate([self._anteriores, dados])
+        deslocamento = len(self._anteriores) - self.distancia
+        inicio = min(max(-deslocamento, 0), len(dados))
+        iguais = np.zeros(len(dados), dtype=bool)
+        iguais[inicio:] = (
+            dados[inicio:]
+            == combinados[inicio + deslocamento : len(dados) + deslocamento]
+        )
+        bordas = np.diff(np.concatenate([[0], iguais.view(np.int8), [0]]))
+        trechos_inicio = np.flatnonzero(bordas == 1)
+        trechos_tamanho = np.flatnonzero(bordas == -1) - trechos_inicio
+
+        # trechos mais longos que a maior cópia são divididos em várias
+        # cópias; sobras menores que a menor cópia são gravadas como literais
+        completas, sobras = np.divmod(trechos_tamanho, _COPIA_MAX)
+        copias_num = completas + (sobras >= _COPIA_MIN)
+        trecho = np.repeat(np.arange(len(trechos_inicio)), copias_num)
+        ordem = np.arange(len(trecho)) - np.repeat(
+            np.cumsum(copias_num) - copias_num,
+            copias_num,
+        )
+        copias_inicio = trechos_inicio[trecho] + ordem * _COPIA_MAX
+        copias_tamanho = np.minimum(
+            trechos_tamanho[trecho] - ordem * _COPIA_MAX,
+            _COPIA_MAX,
+        )
+        return copias_inicio, copias_tamanho
+
+    def _empacotar(self, bits: np.ndarray) -> bytes:
+        """Converte os bytes completos de uma sequência de bits."""
+        bits = np.concatenate([self._bits_pendentes, bits])
+        completos = len(bits) - len(bits) % 8
+        self._bits_pendentes = bits[completos:]
+        return np.packbits(bits[:completos], bitorder="little").tobytes()
+
+    def compactar(self, dados: bytes) -> bytes:
+        """Compacta uma fatia de dados.
+
+        Argumentos:
+            dados: Próxima fatia dos dados a serem compactados.
+
+        Retorna:
+            Os bytes compactados disponíveis até o momento. Alguns bits podem
+            ficar pendentes até a próxima fatia ou até o encerramento.
+        """
+        inicio = b""
+        if not self._iniciado:
+            # literais não codificados e tamanho do dicionário
+            inicio = bytes([0, _DICIONARIO_TAMANHO])
+            self._iniciado = True
+        atuais = np.frombuffer(dados, dtype=np.uint8)
+        copias_inicio, copias_tamanho = self._copias(atuais)
+
+        # cada posição recebe o símbolo que começa nela: um literal, uma
+        # cópia, ou nenhum, se estiver coberta por uma cópia anterior
+        cobertura = np.zeros(len(atuais) + 1, dtype=np.int32)
+        np.add.at(cobertura, copias_inicio, 1)
+        np.add.at(cobertura, copias_inicio + copias_tamanho, -1)
+        literais = np.cumsum(cobertura[:-1]) == 0
+        valores = np.zeros(len(atuais), dtype=np.uint32)
+        bits_num = np.zeros(len(atuais), dtype=np.uint32)
+        valores[literais] = atuais[literais].astype(np.uint32) << 1
+        bits_num[literais] = 9
+        comprimento_bits = _COPIA_BITS[copias_tamanho]
+        valores[copias_inicio] = _COPIA_VALORES[copias_tamanho] | (
+            np.uint32(self._distancia_valor) << comprimento_bits
+        )
+        bits_num[copias_inicio] = comprimento_bits + self._distancia_bits
+        simbolos = bits_num > 0
+        valores, bits_num = valores[simbolos], bits_num[simbolos]
+
+        # os bits de cada símbolo são gravados do menos para o mais
+        # significativo, um símbolo após o outro
+        bits = np.unpackbits(
+            valores.astype("<u4").view(np.uint8).reshape(-1, 4),
+            axis=1,
+            bitorder="little",
+        )
+        bits = bits[np.arange(32) < bits_num[:, np.newaxis]]
+
+        if self.distancia is not None:
+            self._anteriores = np.concatenate(
+                [self._anteriores, atuais],
+            )[-self.distancia :]
+        return inicio + self._empacotar(bits)
+
+    def encerrar(self) -> bytes:
+        """Grava o código de fim dos dados e os bits pendentes.
+
+        Retorna:
+            Os últimos bytes dos dados compactados.
+        """
+        inicio = b"" if self._iniciado else bytes([0, _DICIONARIO_TAMANHO])
+        self._iniciado = True
+        bits = np.concatenate([self._bits_pendentes, _FIM_DADOS])
+        self._bits_pendentes = np.empty(0, dtype=np.uint8)
+        return inicio + np.packbits(bits, bitorder="little").tobytes()
+
+
+def dbf2dbc(
+    arquivo_dbf: str | Path,
+    arquivo_dbc: str | Path,
+    comprimir: bool = True,
+) -> None:
+    """Converte um arquivo DBF para o formato DBC usado pelo DataSUS.
+
+    O arquivo é lido e compactado em fatias, de modo que arquivos de
+    qualquer tamanho podem ser convertidos com pouca memória. Os arquivos
+    gerados têm a mesma estrutura dos disponibilizados pelo DataSUS e são
+    lidos corretamente por [`dbc2dbf()`][] e [`descompactar_dbc()`][], o que
+    permite simular a extração de arquivos arbitrários.
+
+    Argumentos:
+        arquivo_dbf: Caminho do arquivo DBF a ser convertido.
+        arquivo_dbc: Caminho do arquivo DBC a ser criado.
+        comprimir: Se verdadeiro (padrão), os trechos de cada registro
+            iguais aos do registro anterior são codificados como cópias, o
+            que costuma reduzir o arquivo a uma fração do DBF. Caso
+            contrário, todos os bytes são gravados como literais, e o
+            arquivo gerado fica cerca de 12% maior que o DBF.
+
+    [`dbc2dbf()`]: impulsoetl.utilitarios.dbc.dbc2dbf
+    [`descompactar_dbc()`]: impulsoetl.utilitarios.dbc.descompactar_dbc
+    """
+    with open(arquivo_dbf, "rb") as origem, open(arquivo_dbc, "wb") as destino:
+        inicio = origem.read(12)
+        cabecalho_tamanho, registro_tamanho = struct.unpack_from(
+            "<HH",
+            inicio,
+            8,
+        )
+        destino.write(inicio + origem.read(cabecalho_tamanho - len(inicio)))
+        # bytes de verificação, ignorados na descompactação
+        destino.write(bytes(4))
+        compactador = _CompactadorImplode(
+            distancia=registro_tamanho if comprimir else None,
+        )
+        while True:
+            fatia = origem.read(DBC_FATIA_SAIDA)
+            if not fatia:
+                break
+            destino.write(compactador.compactar(fatia))
+        destino.write(compactador.encerrar())
@@ -6,18 +6,32 @@
 """Casos de teste para funções utilitárias relacionadas ao banco de dados."""
 
 
+import csv
+import re
+from io import StringIO
+from pathlib import Path
+
 import pandas as pd
 import pytest
+import sqlalchemy as sa
+from pandas.io.sql import SQLDatabase, SQLTable
 from psycopg2 import errorcodes
 from sqlalchemy.engine import Engine
 from sqlalchemy.schema import MetaData, Table
 
+from impulsoetl.utilitarios import bd
 from impulsoetl.utilitarios.bd import (
     TabelasRefletidasDicionario,
+    _FluxoCSV,
+    _gerar_csv,
+    _tentar_converter_para_arrow,
     carregar_dataframe,
+    converter_para_arrow,
     postgresql_copiar_dados,
 )
 
+DIRETORIO_TESTES = Path(__file__).parent.parent
+
 
 class TesteTabelasRefletidasDicionario(object):
     @pytest.fixture(scope="function")
@@ -223,3 +237,122 @@ def teste_carregar_dataframe_com_erro(
 
     assert errorcodes.lookup(carregamento_status) == erro_esperado
     assert "Erro ao inserir registros na tabela" in capfd.readouterr().err
+
+
+@pytest.mark.parametrize(
+    "dados_faltantes,status_esperado",
+    [
+        (False, 0),
+        (True, "23502"),  # Erro "not null violation"
+    ],
+)
+def teste_carregar_dataframe_arrow(
+    sessao,
+    dataframe_exemplo,
+    tabela_teste,
+    dados_faltantes,
+    status_esperado,
+):
+    if dados_faltantes:
+        dataframe_exemplo = dataframe_exemplo.assign(col_3=[True, False, None])
+    carregamento_status = carregar_dataframe.fn(
+        sessao=sessao,
+        df=dataframe_exemplo,
+        tabela_destino=tabela_teste,
+        passo=2,
+        teste=True,
+        arrow=True,
+    )
+    assert carregamento_status == status_esperado
+    sessao.commit()
+    schema, tabela = tabela_teste.split(".", maxsplit=1)
+    tabela_inserida = Table(
+        tabela,
+        MetaData(schema=schema),
+        autoload_with=sessao.get_bind(),
+    )
+    registros_inseridos = sessao.query(tabela_inserida).all()
+    if dados_faltantes:
+        assert len(registros_inseridos) == 0
+    else:
+        assert len(registros_inseridos) == len(dataframe_exemplo)
+
+
+def _csv_padrao(df: pd.DataFrame) -> str:
+    """Formata os registros como no carregamento sem o Arrow."""
+    df = df.copy()
+    colunas_data = df.select_dtypes(include="datetime").columns
+    df[colunas_data] = df[colunas_data].applymap(
+        lambda dt: dt.isoformat() if pd.notna(dt) else None
+    )
+    with sa.create_engine("sqlite://").connect() as conexao:
+        tabela = SQLTable("t", SQLDatabase(conexao), frame=df, index=False)
+        _, dados = tabela.insert_data()
+    buffer = StringIO()
+    csv.writer(buffer).writerows(zip(*dados))
+    return buffer.getvalue()
+
+
+def _interpretar(valor: str):
+    """Interpreta um valor em CSV de forma semelhante ao PostgreSQL."""
+    if valor in {"True", "true"}:
+        return True
+    if valor in {"False", "false"}:
+        return False
+    try:
+        return float(valor)
+    except ValueError:
+        pass
+    if re.match(r"\d{4}-\d{2}-\d{2}", valor):
+        return pd.Timestamp(valor)
+    return valor
+
+
+@pytest.mark.parametrize(
+    "arquivo",
+    sorted(
+        str(caminho.relative_to(DIRETORIO_TESTES))
+        for caminho in DIRETORIO_TESTES.glob("*/*_transformad[ao].parquet")
+    ),
+)
+def teste_converter_para_arrow_equivale_csv(arquivo):
+    """Testa se o CSV gerado pelo Arrow equivale ao gerado sem ele."""
+    df = pd.read_parquet(DIRETORIO_TESTES / arquivo)
+    # acrescenta textos vazios, que o carregamento padrão grava como nulos
+    df.iloc[::7, df.columns.get_loc(df.select_dtypes(object).columns[0])] = ""
+    esperado = list(csv.reader(StringIO(_csv_padrao(df))))
+
+    conteudo = _FluxoCSV(_gerar_csv(converter_para_arrow(df), passo=1000))
+    obtido = list(csv.reader(StringIO(conteudo.read().decode("utf-8"))))
+
+    assert len(obtido) == len(esperado) == len(df)
+    for linha_obtida, linha_esperada in zip(obtido, esperado):
+        assert [_interpretar(valor) for valor in linha_obtida] == [
+            _interpretar(valor) for valor in linha_esperada
+        ]
+
+
+def teste_converter_para_arrow_categorias():
+    """Testa converter colunas categóricas, como as do modo compacto."""
+    df = pd.DataFrame(
+        {"codigo": pd.Categorical(["0301", None, "0301", ""])},
+    )
+    conteudo = _FluxoCSV(_gerar_csv(converter_para_arrow(df), passo=None))
+    assert conteudo.read() == b'"0301"\n\n"0301"\n\n'
+
+
+def teste_tentar_converter_para_arrow_tipos_incompativeis():
+    """Testa desistir do Arrow quando uma coluna mistura tipos."""
+    df = pd.DataFrame({"valor": ["a", 1, 2.5]})
+    assert _tentar_converter_para_arrow(df) is None
+
+
+def teste_tentar_converter_para_arrow_sem_pyarrow(monkeypatch):
+    """Testa desistir do Arrow quando o `pyarrow` não está instalado."""
+
+    def converter_sem_pyarrow(df):
+        raise ImportError("No module named 'pyarrow'")
+
+    monkeypatch.setattr(bd, "converter_para_arrow", converter_sem_pyarrow)
+    df = pd.DataFrame({"valor": ["a", "b"]})
+    assert _tentar_converter_para_arrow(df) is None
@@ -0,0 +1,113 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Casos de teste para o cache local de arquivos baixados."""
+
+
+import os
+
+import pytest
+
+from impulsoetl.utilitarios.cache_arquivos import CacheArquivos
+
+
+@pytest.fixture(scope="function")
+def cache(tmp_path):
+    return CacheArquivos(diretorio=tmp_path / "cache", tamanho_maximo=250)
+
+
+def _criar_arquivo(diretorio, nome, tamanho):
+    caminho = diretorio / nome
+    caminho.write_bytes(b"x" * tamanho)
+    return caminho
+
+
+def teste_gerar_chave_muda_com_metadados():
+    """Testa se versões diferentes de um arquivo geram chaves diferentes."""
+    endereco = "ftp://ftp.datasus.gov.br/dissemin/PAAC2201.dbc"
+    chave = CacheArquivos.gerar_chave(endereco, 100, "20220301120000")
+    assert chave == CacheArquivos.gerar_chave(
+        endereco,
+        100,
+        "20220301120000",
+    )
+    assert chave != CacheArquivos.gerar_chave(endereco, 101, "20220301120000")
+    assert chave != CacheArquivos.gerar_chave(endereco, 100, "20220401120000")
+    assert chave != CacheArquivos.gerar_chave(
+        endereco.replace("AC", "AM"),
+        100,
+        "20220301120000",
+    )
+
+
+def teste_obter_e_adicionar(cache, tmp_path):
+    """Testa se um arquivo adicionado ao cache é encontrado depois."""
+    chave = CacheArquivos.gerar_chave("ftp://exemplo/A.dbc", 100, "")
+    assert cache.obter(chave) is None
+
+    arquivo = _criar_arquivo(tmp_path, "A.dbc", 100)
+    caminho_cache = cache.adicionar(chave=chave, arquivo=arquivo)
+    arquivo.unlink()
+
+    assert cache.obter(chave) == caminho_cache
+    assert caminho_cache.read_bytes() == b"x" * 100
+
+
+@pytest.mark.parametrize("vinculo_falha", [False, True])
+def teste_obter_com_destino_resiste_a_remocao(
+    cache,
+    tmp_path,
+    monkeypatch,
+    vinculo_falha,
+):
+    """Testa se a cópia obtida continua legível após sair do cache."""
+    chave = CacheArquivos.gerar_chave("ftp://exemplo/A.dbc", 100, "")
+    destino = tmp_path / "destino" / "A.dbc"
+    destino.parent.mkdir()
+    assert cache.obter(chave, destino=destino) is None
+
+    arquivo = _criar_arquivo(tmp_path, "A.dbc", 100)
+    caminho_cache = cache.adicionar(chave=chave, arquivo=arquivo)
+    if vinculo_falha:
+        # simula um destino em outro dispositivo, que não aceita vínculos
+        def vincular(origem, destino):
+            raise OSError("Vínculo entre dispositivos diferentes.")
+
+        monkeypatch.setattr(os, "link", vincular)
+
+    assert cache.obter(chave, destino=destino) == destino
+    # outro processo remove o arquivo do cache durante a leitura
+    caminho_cache.unlink()
+    assert destino.read_bytes() == b"x" * 100
+
+
+def teste_liberar_espaco_remove_menos_usados(cache, tmp_path):
+    """Testa se os arquivos acessados há mais tempo são removidos primeiro."""
+    chaves = [
+        CacheArquivos.gerar_chave("ftp://exemplo/{}.dbc".format(nome), 100, "")
+        for nome in "ABC"
+    ]
+    for i, chave in enumerate(chaves[:2]):
+        arquivo = _criar_arquivo(tmp_path, str(i), 100)
+        caminho = cache.adicionar(chave=chave, arquivo=arquivo)
+        os.utime(caminho, (1000 + i, 1000 + i))
+
+    # acessar o arquivo mais antigo o torna o mais recentemente usado
+    assert cache.obter(chaves[0]) is not None
+
+    arquivo = _criar_arquivo(tmp_path, "2", 100)
+    cache.adicionar(chave=chaves[2], arquivo=arquivo)
+
+    assert cache.obter(chaves[0]) is not None
+    assert cache.obter(chaves[1]) is None
+    assert cache.obter(chaves[2]) is not None
+
+
+def teste_liberar_espaco_preserva_arquivo_protegido(cache, tmp_path):
+    """Testa se um arquivo maior que o limite é mantido ao ser incluído."""
+    chave = CacheArquivos.gerar_chave("ftp://exemplo/GRANDE.dbc", 500, "")
+    arquivo = _criar_arquivo(tmp_path, "GRANDE.dbc", 500)
+    caminho_cache = cache.adicionar(chave=chave, arquivo=arquivo)
+    assert caminho_cache.exists()
@@ -0,0 +1,147 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Casos de teste para o pool de conexões com servidores FTP."""
+
+
+import time
+from ftplib import error_temp
+
+import pytest
+
+from impulsoetl.utilitarios import conexoes_ftp
+from impulsoetl.utilitarios.conexoes_ftp import PoolConexoesFTP
+from impulsoetl.utilitarios.listagens_ftp import ArquivoFTP, CacheListagensFTP
+
+
+class ClienteFTPFalso(object):
+    """Simula um cliente FTP, registrando os comandos recebidos."""
+
+    instancias: list["ClienteFTPFalso"] = []
+
+    def __init__(self, endereco=None, timeout=None):
+        self.endereco = endereco
+        self.comandos: list[str] = []
+        self.responde = True
+        self.encerrado = False
+        self.instancias.append(self)
+
+    def connect(self, servidor, porta):
+        self.endereco = "{}:{}".format(servidor, porta)
+
+    def login(self):
+        self.comandos.append("USER")
+
+    def cwd(self, caminho):
+        self.comandos.append("CWD " + caminho)
+
+    def mlsd(self, facts=()):
+        self.comandos.append("MLSD")
+        yield "PASP2201b.dbc", {"type": "file", "size": "20", "modify": "1"}
+        yield "PASP2201a.dbc", {"type": "file", "size": "10", "modify": "2"}
+
+    def voidcmd(self, comando):
+        if not self.responde:
+            raise error_temp("421 Conexão encerrada por inatividade.")
+        self.comandos.append(comando)
+
+    def quit(self):
+        self.encerrado = True
+
+    def close(self):
+        self.encerrado = True
+
+
+@pytest.fixture(scope="function")
+def clientes(monkeypatch):
+    ClienteFTPFalso.instancias = []
+    monkeypatch.setattr(conexoes_ftp, "FTP", ClienteFTPFalso)
+    return ClienteFTPFalso.instancias
+
+
+def teste_reutilizar_conexao(clientes):
+    """Testa se uma conexão devolvida é reutilizada sem nova autenticação."""
+    pool = PoolConexoesFTP("ftp.exemplo.gov.br", manter_ativa_intervalo=0)
+    for _ in range(3):
+        with pool.conexao("/dados") as cliente_ftp:
+            assert cliente_ftp is clientes[0]
+    pool.fechar()
+
+    assert len(clientes) == 1
+    assert clientes[0].comandos.count("USER") == 1
+    assert clientes[0].comandos.count("CWD /dados") == 1
+    assert clientes[0].encerrado
+
+
+def teste_conectar_porta_personalizada(clientes):
+    """Testa se o endereço pode indicar uma porta diferente da padrão."""
+    pool = PoolConexoesFTP("127.0.0.1:2121", manter_ativa_intervalo=0)
+    with pool.conexao("/dados"):
+        pass
+    pool.fechar()
+
+    assert clientes[0].endereco == "127.0.0.1:2121"
+
+
+def teste_listar_guarda_listagem(clientes):
+    """Testa se a listagem de um diretório é obtida uma única vez."""
+    pool = PoolConexoesFTP(
+        "ftp.exemplo.gov.br",
+        manter_ativa_intervalo=0,
+        listagens=CacheListagensFTP(validade=60),
+    )
+    listagem_1 = pool.listar("/dados")
+    listagem_2 = pool.listar("/dados")
+    assert listagem_1 == listagem_2 == ["PASP2201a.dbc", "PASP2201b.dbc"]
+    assert pool.obter_metadados("/dados", "PASP2201b.dbc") == ArquivoFTP(
+        nome="PASP2201b.dbc",
+        tamanho=20,
+        modificacao="1",
+    )
+    assert clientes[0].comandos.count("MLSD") == 1
+
+    pool.esquecer_listagens()
+    pool.listar("/dados")
+    assert clientes[0].comandos.count("MLSD") == 2
+    pool.fechar()
+
+
+def teste_substituir_conexao_inativa(clientes):
+    """Testa se uma conexão ociosa que não responde é substituída."""
+    pool = PoolConexoesFTP("ftp.exemplo.gov.br", manter_ativa_intervalo=0)
+    with pool.conexao("/dados"):
+        pass
+    clientes[0].responde = False
+    with pool.conexao("/dados") as cliente_ftp:
+        assert cliente_ftp is clientes[1]
+    pool.fechar()
+
+    assert len(clientes) == 2
+    assert clientes[0].encerrado
+    assert clientes[1].comandos.count("CWD /dados") == 1
+
+
+def teste_descartar_conexao_com_erro(clientes):
+    """Testa se uma conexão é descartada após um erro de comunicação."""
+    pool = PoolConexoesFTP("ftp.exemplo.gov.br", manter_ativa_intervalo=0)
+    with pytest.raises(error_temp):
+        with pool.conexao("/dados"):
+            raise error_temp("426 Transferência interrompida.")
+    assert clientes[0].encerrado
+
+    with pool.conexao("/dados") as cliente_ftp:
+        assert cliente_ftp is clientes[1]
+    pool.fechar()
+
+
+def teste_manter_conexoes_ociosas_ativas(clientes):
+    """Testa se as conexões ociosas recebem periodicamente o comando NOOP."""
+    pool = PoolConexoesFTP("ftp.exemplo.gov.br", manter_ativa_intervalo=0.1)
+    with pool.conexao():
+        pass
+    time.sleep(0.5)
+    pool.fechar()
+
+    assert clientes[0].comandos.count("NOOP") >= 2
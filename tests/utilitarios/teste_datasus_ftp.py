@@ -7,15 +7,73 @@
 
 
 import re
-from ftplib import FTP, error_perm
+import threading
+import time
+from contextlib import contextmanager
+from ftplib import FTP, error_perm, error_temp
+from pathlib import Path
 
 import pandas as pd
 import pytest
 
+from impulsoetl.utilitarios import datasus_ftp
+from impulsoetl.utilitarios.cache_arquivos import CacheArquivos
 from impulsoetl.utilitarios.datasus_ftp import (
+    _ler_arquivo_dbc,
     _listar_arquivos,
+    _TransferenciaCancelada,
+    _transferir_arquivo,
     extrair_dbc_lotes,
 )
+from impulsoetl.utilitarios.dbf import escrever_dbf
+from tests.utilitarios.compactador_dbc import dbf2dbc
+
+DIRETORIO_TESTES = Path(__file__).parent.parent
+
+
+class ClienteFTPInstavel(object):
+    """Simula um servidor cuja conexão cai a cada `bytes_por_conexao`."""
+
+    def __init__(self, dados, quedas, bytes_por_conexao, aceita_rest=True):
+        self.dados = dados
+        self.quedas = quedas
+        self.bytes_por_conexao = bytes_por_conexao
+        self.aceita_rest = aceita_rest
+        self.inicios: list[int] = []
+
+    def voidcmd(self, comando):
+        pass
+
+    def size(self, arquivo_nome):
+        return len(self.dados)
+
+    def sendcmd(self, comando):
+        return "213 20220315103000"
+
+    def retrbinary(self, comando, callback, rest=None):
+        if rest and not self.aceita_rest:
+            raise error_perm("502 Comando REST não implementado.")
+        inicio = rest or 0
+        self.inicios.append(inicio)
+        fim = len(self.dados)
+        if self.quedas:
+            fim = min(fim, inicio + self.bytes_por_conexao)
+        for posicao in range(inicio, fim, 100):
+            callback(self.dados[posicao:min(posicao + 100, fim)])
+        if self.quedas:
+            self.quedas -= 1
+            raise error_temp("426 Conexão encerrada; transferência abortada.")
+
+
+class PoolFalso(object):
+    endereco = "ftp.exemplo.gov.br"
+
+    def __init__(self, cliente_ftp):
+        self.cliente_ftp = cliente_ftp
+
+    @contextmanager
+    def conexao(self, caminho_diretorio=None):
+        yield self.cliente_ftp
 
 
 @pytest.fixture(scope="function")
@@ -86,3 +144,243 @@ def teste_extrair_dbc_lotes(ftp, caminho_diretorio, arquivo_nome, passo):
     lote_2 = next(lotes)
     assert isinstance(lote_2, pd.DataFrame)
     assert len(lote_2) > 0, "Apenas um DataFrame gerado."
+
+
+@pytest.mark.parametrize(
+    "aceita_rest,inicios_esperados",
+    # sem o comando REST, cada queda obriga a recomeçar do início
+    [(True, [0, 1000, 2000]), (False, [0, 0, 0])],
+)
+def teste_transferir_arquivo_retomado(
+    tmp_path,
+    aceita_rest,
+    inicios_esperados,
+):
+    """Testa se transferências interrompidas são retomadas ou refeitas."""
+    dados = bytes(range(256)) * 20
+    cliente_ftp = ClienteFTPInstavel(
+        dados=dados,
+        quedas=2,
+        bytes_por_conexao=1000,
+        aceita_rest=aceita_rest,
+    )
+    arquivo_destino = tmp_path / "PASP2201.dbc"
+    metadados = _transferir_arquivo(
+        pool=PoolFalso(cliente_ftp),
+        caminho_diretorio="/dados",
+        arquivo_nome="PASP2201.dbc",
+        arquivo_destino=arquivo_destino,
+        tentativas_max=5,
+        espera=0,
+    )
+    assert metadados == (len(dados), "20220315103000")
+    assert arquivo_destino.read_bytes() == dados
+    assert cliente_ftp.inicios == inicios_esperados
+
+
+def teste_transferir_arquivo_rest_recusado_ultima_tentativa(tmp_path):
+    """Testa se a recusa do comando REST não consome uma tentativa."""
+    dados = bytes(range(256)) * 20
+    cliente_ftp = ClienteFTPInstavel(
+        dados=dados,
+        quedas=1,
+        bytes_por_conexao=1000,
+        aceita_rest=False,
+    )
+    arquivo_destino = tmp_path / "PASP2201.dbc"
+    _transferir_arquivo(
+        pool=PoolFalso(cliente_ftp),
+        caminho_diretorio="/dados",
+        arquivo_nome="PASP2201.dbc",
+        arquivo_destino=arquivo_destino,
+        tentativas_max=2,
+        espera=0,
+    )
+    assert arquivo_destino.read_bytes() == dados
+    assert cliente_ftp.inicios == [0, 0]
+
+
+def teste_transferir_arquivo_tentativas_esgotadas(tmp_path):
+    """Testa se o erro é levantado quando as tentativas se esgotam."""
+    cliente_ftp = ClienteFTPInstavel(
+        dados=bytes(5000),
+        quedas=10,
+        bytes_por_conexao=1000,
+    )
+    with pytest.raises(error_temp):
+        _transferir_arquivo(
+            pool=PoolFalso(cliente_ftp),
+            caminho_diretorio="/dados",
+            arquivo_nome="PASP2201.dbc",
+            arquivo_destino=tmp_path / "PASP2201.dbc",
+            tentativas_max=3,
+            espera=0,
+        )
+    assert cliente_ftp.inicios == [0, 1000, 2000]
+
+
+def teste_transferir_arquivo_cancelado(tmp_path):
+    """Testa se a transferência é abortada assim que for cancelada."""
+    cancelar = threading.Event()
+    blocos = []
+
+    class ClienteFTPCancelavel(ClienteFTPInstavel):
+        def retrbinary(self, comando, callback, rest=None):
+            def receber(dados):
+                blocos.append(dados)
+                cancelar.set()
+                callback(dados)
+
+            super().retrbinary(comando, receber, rest=rest)
+
+    cliente_ftp = ClienteFTPCancelavel(
+        dados=bytes(5000),
+        quedas=0,
+        bytes_por_conexao=1000,
+    )
+    arquivo_destino = tmp_path / "PASP2201.dbc"
+    with pytest.raises(_TransferenciaCancelada):
+        _transferir_arquivo(
+            pool=PoolFalso(cliente_ftp),
+            caminho_diretorio="/dados",
+            arquivo_nome="PASP2201.dbc",
+            arquivo_destino=arquivo_destino,
+            tentativas_max=3,
+            espera=0,
+            cancelar=cancelar,
+        )
+    assert len(blocos) == 1
+    assert cliente_ftp.inicios == [0]
+    assert arquivo_destino.stat().st_size == 0
+
+
+def teste_extrair_dbc_lotes_interrompida_cancela_downloads(monkeypatch):
+    """Testa se interromper a leitura não aguarda os downloads pendentes."""
+    transferindo = threading.Event()
+    cancelamentos = []
+
+    def baixar_arquivo(arquivo_nome, diretorio_destino, cancelar, **kwargs):
+        if arquivo_nome == "PASP2201b.dbc":
+            # simula uma transferência longa, que só termina se cancelada
+            transferindo.set()
+            cancelamentos.append(cancelar.wait(timeout=30))
+        return Path(diretorio_destino, arquivo_nome)
+
+    def ler_arquivo_dbc(arquivo_dbc, **kwargs):
+        yield pd.DataFrame({"arquivo": [arquivo_dbc.name] * 3})
+
+    monkeypatch.setattr(
+        datasus_ftp,
+        "_listar_arquivos_servidor",
+        lambda **kwargs: ["PASP2201a.dbc", "PASP2201b.dbc"],
+    )
+    monkeypatch.setattr(datasus_ftp, "_baixar_arquivo", baixar_arquivo)
+    monkeypatch.setattr(datasus_ftp, "_ler_arquivo_dbc", ler_arquivo_dbc)
+
+    lotes = extrair_dbc_lotes(
+        ftp="ftp.exemplo.gov.br",
+        caminho_diretorio="/dados",
+        arquivo_nome=re.compile(r"PASP2201[a-z]\.dbc"),
+        cache=None,
+        lago=None,
+    )
+    assert next(lotes)["arquivo"].iloc[0] == "PASP2201a.dbc"
+    assert transferindo.wait(timeout=5)
+    inicio = time.perf_counter()
+    lotes.close()
+    assert time.perf_counter() - inicio < 5
+
+    for _ in range(100):
+        if cancelamentos:
+            break
+        time.sleep(0.05)
+    assert cancelamentos == [True]
+
+
+@pytest.mark.parametrize("cache,usa_cache", [(None, True), (False, False)])
+def teste_extrair_dbc_lotes_desativa_cache(
+    monkeypatch,
+    tmp_path,
+    cache,
+    usa_cache,
+):
+    """Testa se `cache=False` desativa o cache configurado no ambiente."""
+    caches_usados = []
+
+    def baixar_arquivo(arquivo_nome, diretorio_destino, cache, **kwargs):
+        caches_usados.append(cache)
+        arquivo_destino = Path(diretorio_destino, arquivo_nome)
+        arquivo_destino.touch()
+        return arquivo_destino
+
+    def ler_arquivo_dbc(arquivo_dbc, **kwargs):
+        yield pd.DataFrame({"arquivo": [arquivo_dbc.name] * 3})
+
+    cache_ambiente = CacheArquivos(diretorio=tmp_path, tamanho_maximo=1000)
+    monkeypatch.setattr(
+        CacheArquivos,
+        "do_ambiente",
+        classmethod(lambda cls: cache_ambiente),
+    )
+    monkeypatch.setattr(
+        datasus_ftp,
+        "_listar_arquivos_servidor",
+        lambda **kwargs: ["PASP2201.dbc"],
+    )
+    monkeypatch.setattr(datasus_ftp, "_baixar_arquivo", baixar_arquivo)
+    monkeypatch.setattr(datasus_ftp, "_ler_arquivo_dbc", ler_arquivo_dbc)
+
+    lotes = list(
+        extrair_dbc_lotes(
+            ftp="ftp.exemplo.gov.br",
+            caminho_diretorio="/dados",
+            arquivo_nome="PASP2201.dbc",
+            cache=cache,
+            lago=None,
+        ),
+    )
+    assert len(lotes) == 1
+    assert caches_usados == [cache_ambiente if usa_cache else None]
+
+
+@pytest.mark.parametrize(
+    "arquivo_nome,condicoes",
+    [
+        ("siasus/SIA_PASE2108_.parquet", "PA_UFMUN == '280030'"),
+        (
+            "siasus/SIA_PASE2108_.parquet",
+            "PA_PROC_ID.str.startswith('0301') & PA_QTDAPR > 1",
+        ),
+        ("siasus/SIA_PSSE2108_.parquet", "UFMUN == '280030'"),
+        ("sim/SIM_DOAC2002_.parquet", "IDADE > '420'"),
+        ("sinan/SINAN_VIOLBR19_.parquet", "SG_UF == '35'"),
+    ],
+)
+def teste_ler_arquivo_dbc_condicoes_equivalem_query(
+    tmp_path,
+    arquivo_nome,
+    condicoes,
+):
+    """Testa se filtrar na leitura equivale a filtrar o DataFrame lido."""
+    dados = pd.read_parquet(DIRETORIO_TESTES / arquivo_nome)
+    arquivo_dbf = tmp_path / "teste.dbf"
+    arquivo_dbc = tmp_path / "teste.dbc"
+    escrever_dbf(arquivo_dbf, dados)
+    dbf2dbc(arquivo_dbf, arquivo_dbc)
+
+    esperado = (
+        pd.concat(_ler_arquivo_dbc(arquivo_dbc, passo=300))
+        .query(condicoes, engine="python")
+        .reset_index(drop=True)
+    )
+    lotes = list(_ler_arquivo_dbc(arquivo_dbc, passo=300, condicoes=condicoes))
+
+    assert len(esperado) > 0
+    # colunas numéricas com valores nulos em algum lote são lidas como
+    # `float`; como os nulos dependem dos registros de cada lote, apenas os
+    # valores são comparados
+    pd.testing.assert_frame_equal(
+        pd.concat(lotes, ignore_index=True),
+        esperado,
+        check_dtype=False,
+    )
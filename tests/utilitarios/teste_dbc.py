@@ -0,0 +1,103 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Casos de teste para a compactação e descompactação de arquivos DBC."""
+
+
+import threading
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from impulsoetl.utilitarios.dbc import dbc2dbf, descompactar_dbc
+from impulsoetl.utilitarios.dbf import LeitorDBF, LeitorFluxoDBF, escrever_dbf
+from tests.utilitarios.compactador_dbc import dbf2dbc
+
+DIRETORIO_TESTES = Path(__file__).parent.parent
+
+
+@pytest.fixture(scope="module")
+def arquivos_exemplo(tmp_path_factory):
+    diretorio = tmp_path_factory.mktemp("dbc")
+    dados = pd.read_parquet(DIRETORIO_TESTES / "siasus/SIA_PASE2108_.parquet")
+    arquivo_dbf = diretorio / "PASE2108.dbf"
+    arquivo_dbc = diretorio / "PASE2108.dbc"
+    escrever_dbf(arquivo_dbf, dados)
+    dbf2dbc(arquivo_dbf, arquivo_dbc)
+    return arquivo_dbf, arquivo_dbc
+
+
+def teste_dbf2dbc_compativel_com_dbc2dbf(tmp_path, arquivos_exemplo):
+    """Testa se arquivos gerados são descompactados pela rotina original."""
+    arquivo_dbf, arquivo_dbc = arquivos_exemplo
+    arquivo_descompactado = tmp_path / "descompactado.dbf"
+    dbc2dbf(str(arquivo_dbc), str(arquivo_descompactado))
+    assert arquivo_descompactado.read_bytes() == arquivo_dbf.read_bytes()
+
+
+@pytest.mark.parametrize("comprimir", [True, False])
+def teste_dbf2dbc_comprime(tmp_path, arquivos_exemplo, comprimir):
+    """Testa se os registros repetidos são comprimidos sem perdas."""
+    arquivo_dbf, _ = arquivos_exemplo
+    arquivo_dbc = tmp_path / "comprimido.dbc"
+    dbf2dbc(arquivo_dbf, arquivo_dbc, comprimir=comprimir)
+    if comprimir:
+        assert arquivo_dbc.stat().st_size < arquivo_dbf.stat().st_size / 2
+    with open(arquivo_dbc, "rb") as arquivo:
+        fatias = list(descompactar_dbc(arquivo))
+    assert b"".join(fatias) == arquivo_dbf.read_bytes()
+
+
+def teste_descompactar_dbc_equivale_dbc2dbf(arquivos_exemplo):
+    """Testa se a descompactação em fatias reproduz o arquivo DBF."""
+    arquivo_dbf, arquivo_dbc = arquivos_exemplo
+    with open(arquivo_dbc, "rb") as arquivo:
+        fatias = list(descompactar_dbc(arquivo, fatia_saida=10000))
+    assert len(fatias) > 2
+    assert b"".join(fatias) == arquivo_dbf.read_bytes()
+
+
+def teste_descompactar_dbc_interrompido(arquivos_exemplo):
+    """Testa se a descompactação é encerrada ao se descartar o gerador."""
+    _, arquivo_dbc = arquivos_exemplo
+    with open(arquivo_dbc, "rb") as arquivo:
+        fatias = descompactar_dbc(arquivo, fatia_saida=4096, fila_max=1)
+        next(fatias)
+        next(fatias)
+        fatias.close()
+    assert not any(
+        linha_execucao.name == "descompactar_dbc"
+        for linha_execucao in threading.enumerate()
+    )
+
+
+def teste_descompactar_dbc_corrompido(tmp_path, arquivos_exemplo):
+    """Testa se dados compactados incompletos levantam um erro."""
+    _, arquivo_dbc = arquivos_exemplo
+    arquivo_truncado = tmp_path / "truncado.dbc"
+    arquivo_truncado.write_bytes(arquivo_dbc.read_bytes()[:-1000])
+    with open(arquivo_truncado, "rb") as arquivo:
+        with pytest.raises(ValueError):
+            list(descompactar_dbc(arquivo))
+
+
+@pytest.mark.parametrize("condicoes", [None, "PA_QTDAPR > 1"])
+def teste_leitor_fluxo_dbf_equivale_leitor_dbf(
+    arquivos_exemplo,
+    condicoes,
+):
+    """Testa se a leitura em fluxo gera os mesmos lotes que a do arquivo."""
+    arquivo_dbf, arquivo_dbc = arquivos_exemplo
+    lotes_esperados = list(
+        LeitorDBF(arquivo_dbf).lotes(passo=300, condicoes=condicoes),
+    )
+    with open(arquivo_dbc, "rb") as arquivo:
+        leitor = LeitorFluxoDBF(descompactar_dbc(arquivo, fatia_saida=7777))
+        lotes = list(leitor.lotes(passo=300, condicoes=condicoes))
+
+    assert len(lotes) == len(lotes_esperados)
+    for lote, lote_esperado in zip(lotes, lotes_esperados):
+        pd.testing.assert_frame_equal(lote, lote_esperado)
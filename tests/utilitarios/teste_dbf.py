@@ -0,0 +1,181 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Casos de teste para a leitura e escrita vetorizadas de arquivos DBF."""
+
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from dbfread import DBF
+
+from impulsoetl.utilitarios.datasus_ftp import LeitorCamposDBF
+from impulsoetl.utilitarios.dbf import CampoDBF, LeitorDBF, escrever_dbf
+
+DIRETORIO_TESTES = Path(__file__).parent.parent
+
+
+def _ler_com_dbfread(caminho: Path, passo: int) -> list[pd.DataFrame]:
+    registros = list(
+        DBF(
+            caminho,
+            encoding="iso-8859-1",
+            load=False,
+            parserclass=LeitorCamposDBF,
+        ),
+    )
+    return [
+        pd.DataFrame(registros[inicio : inicio + passo])
+        for inicio in range(0, len(registros), passo)
+    ]
+
+
+@pytest.mark.parametrize(
+    "arquivo_nome",
+    [
+        "siasus/SIA_PASE2108_.parquet",
+        "sihsus/SIH_RDSE2108_.parquet",
+        "sim/SIM_DOAC2002_.parquet",
+        "sinan/SINAN_VIOLBR19_.parquet",
+    ],
+)
+def teste_leitor_dbf_equivale_dbfread(tmp_path, arquivo_nome, passo):
+    """Testa se o leitor vetorizado gera os mesmos lotes que o `dbfread`."""
+    dados = pd.read_parquet(DIRETORIO_TESTES / arquivo_nome)
+    arquivo_dbf = tmp_path / "teste.dbf"
+    escrever_dbf(arquivo_dbf, dados)
+
+    lotes_esperados = _ler_com_dbfread(arquivo_dbf, passo)
+    lotes = list(LeitorDBF(arquivo_dbf).lotes(passo=passo))
+
+    assert len(lotes) == len(lotes_esperados)
+    for lote, lote_esperado in zip(lotes, lotes_esperados):
+        pd.testing.assert_frame_equal(lote, lote_esperado)
+
+
+def teste_leitor_dbf_casos_especiais(tmp_path):
+    """Testa a leitura de valores atípicos e de registros apagados."""
+    dados = pd.DataFrame(
+        {
+            "TEXTO": ["ação", "", "  a b  ", "x" * 300, "fim"],
+            "INTEIRO": ["1", "", "007", "-3", "***5"],
+            "DECIMAL": ["1,50", "", " 2.25", "3", "-0.5"],
+            "VAZIO": [""] * 5,
+            "LOGICO": ["T", "f", "?", "Y", "n"],
+            "DATA": ["20210101", "", "2021 1 1", "00000000", "20210131"],
+        },
+    )
+    campos = [
+        CampoDBF("TEXTO", "C", 300),
+        CampoDBF("INTEIRO", "C", 5),
+        CampoDBF("DECIMAL", "C", 5),
+        CampoDBF("VAZIO", "C", 3),
+        CampoDBF("LOGICO", "C", 1),
+        CampoDBF("DATA", "C", 8),
+    ]
+    arquivo_dbf = tmp_path / "teste.dbf"
+    escrever_dbf(arquivo_dbf, dados, campos=campos)
+
+    # altera os tipos declarados no cabeçalho para forçar valores atípicos
+    conteudo = bytearray(arquivo_dbf.read_bytes())
+    for indice, tipo in enumerate("CNNNLD"):
+        conteudo[32 + 32 * indice + 11] = ord(tipo)
+    cabecalho_tamanho = 32 + 32 * len(campos) + 1
+    registro_tamanho = 1 + sum(campo.tamanho for campo in campos)
+    # apaga o segundo registro e encerra os registros antes do último
+    conteudo[cabecalho_tamanho + registro_tamanho] = ord("*")
+    conteudo[cabecalho_tamanho + 4 * registro_tamanho] = 0x1A
+    arquivo_dbf.write_bytes(bytes(conteudo))
+
+    lotes_esperados = _ler_com_dbfread(arquivo_dbf, 2)
+    lotes = list(LeitorDBF(arquivo_dbf).lotes(passo=2))
+
+    assert len(lotes) == len(lotes_esperados) == 2
+    for lote, lote_esperado in zip(lotes, lotes_esperados):
+        pd.testing.assert_frame_equal(lote, lote_esperado)
+
+
+def teste_leitor_dbf_tipo_nao_suportado(tmp_path):
+    """Testa se campos de tipos não suportados levantam um erro."""
+    arquivo_dbf = tmp_path / "teste.dbf"
+    escrever_dbf(
+        arquivo_dbf,
+        pd.DataFrame({"MEMO": ["1"]}),
+        campos=[CampoDBF("MEMO", "M", 10)],
+    )
+    with pytest.raises(NotImplementedError):
+        LeitorDBF(arquivo_dbf)
+
+
+def teste_leitor_dbf_seleciona_colunas(tmp_path):
+    """Testa se apenas as colunas solicitadas são lidas do arquivo."""
+    dados = pd.read_parquet(DIRETORIO_TESTES / "siasus/SIA_PASE2108_.parquet")
+    arquivo_dbf = tmp_path / "teste.dbf"
+    escrever_dbf(arquivo_dbf, dados)
+
+    lote = next(
+        LeitorDBF(arquivo_dbf).lotes(
+            passo=len(dados),
+            colunas=[" pa_qtdapr", "PA_CODUNI", "INEXISTENTE"],
+        ),
+    )
+
+    assert list(lote.columns) == ["PA_CODUNI", "PA_QTDAPR"]
+    pd.testing.assert_frame_equal(lote, dados[["PA_CODUNI", "PA_QTDAPR"]])
+
+
+@pytest.mark.parametrize(
+    "condicoes",
+    [
+        "PA_UFMUN == '280030'",
+        "PA_PROC_ID.str.startswith('0301')",
+        "PA_CIDPRI.str.endswith('4')",
+        "PA_CIDPRI in ['Z34', 'F200'] | PA_QTDAPR > 1",
+        "PA_SEXO != 'F' and not (PA_VALAPR == 0)",
+        "~PA_INE.isin(['0000177105']) & (1 < PA_QTDAPR <= 5)",
+        "PA_ETNIA == ''",
+        # avaliadas pelo pandas, sem compilação para bytes
+        "PA_IDADE.str.len() > 2",
+        "PA_CMP == 202108",
+    ],
+)
+def teste_leitor_dbf_aplica_condicoes(tmp_path, condicoes):
+    """Testa se as condições filtram os mesmos registros que o pandas."""
+    dados = pd.read_parquet(DIRETORIO_TESTES / "siasus/SIA_PASE2108_.parquet")
+    arquivo_dbf = tmp_path / "teste.dbf"
+    escrever_dbf(arquivo_dbf, dados)
+    esperado = (
+        pd.concat(_ler_com_dbfread(arquivo_dbf, len(dados)))
+        .query(condicoes, engine="python")
+        .reset_index(drop=True)
+    )
+
+    lotes = list(LeitorDBF(arquivo_dbf).lotes(passo=500, condicoes=condicoes))
+
+    assert all(len(lote) <= 500 for lote in lotes)
+    if esperado.empty:
+        assert not lotes
+    else:
+        pd.testing.assert_frame_equal(
+            pd.concat(lotes, ignore_index=True),
+            esperado,
+        )
+
+
+@pytest.mark.parametrize("condicoes", [None, "PA_QTDAPR > 1"])
+def teste_leitor_dbf_processos_paralelos(tmp_path, condicoes):
+    """Testa se a leitura em vários processos gera os mesmos lotes."""
+    dados = pd.read_parquet(DIRETORIO_TESTES / "siasus/SIA_PASE2108_.parquet")
+    arquivo_dbf = tmp_path / "teste.dbf"
+    escrever_dbf(arquivo_dbf, dados)
+    leitor = LeitorDBF(arquivo_dbf)
+
+    lotes_esperados = list(leitor.lotes(passo=70, condicoes=condicoes))
+    lotes = list(leitor.lotes(passo=70, condicoes=condicoes, processos=2))
+
+    assert len(lotes) == len(lotes_esperados) > 2
+    for lote, lote_esperado in zip(lotes, lotes_esperados):
+        pd.testing.assert_frame_equal(lote, lote_esperado)
@@ -0,0 +1,151 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Casos de teste para a execução de capturas em esteira."""
+
+
+import threading
+
+import pandas as pd
+import pytest
+import sqlalchemy as sa
+from prefect import flow, task
+from sqlalchemy.orm import Session
+
+from impulsoetl.utilitarios.esteira import processar_em_esteira
+
+
+@pytest.fixture(scope="function", params=["motor", "sem_motor"])
+def sessao(request):
+    if request.param == "motor":
+        sessao = Session(bind=sa.create_engine("sqlite://"))
+    else:
+        sessao = Session()
+    yield sessao
+    sessao.close()
+
+
+def _gerar_lotes(lotes_num, extraidos=None):
+    for indice in range(lotes_num):
+        if extraidos is not None:
+            extraidos.append(indice)
+        yield pd.DataFrame({"indice": [indice] * 3})
+
+
+def _transformar(sessao, lote):
+    return lote.assign(
+        dobro=lote["indice"] * 2,
+        linha_execucao=threading.current_thread().name,
+    )
+
+
+def _linhas_execucao_esteira():
+    return [
+        linha_execucao
+        for linha_execucao in threading.enumerate()
+        if linha_execucao.name.startswith("esteira_")
+    ]
+
+
+def teste_processar_em_esteira_preserva_ordem(sessao):
+    """Testa se os lotes são transformados e gerados na ordem original."""
+    resultados = list(
+        processar_em_esteira(
+            sessao=sessao,
+            lotes=_gerar_lotes(20),
+            transformar=_transformar,
+        ),
+    )
+
+    assert [lote["indice"].iloc[0] for lote, _ in resultados] == list(
+        range(20),
+    )
+    for lote, lote_transformado in resultados:
+        assert (lote_transformado["dobro"] == lote["indice"] * 2).all()
+    linhas_execucao = {
+        lote_transformado["linha_execucao"].iloc[0]
+        for _, lote_transformado in resultados
+    }
+    if sessao.bind is not None:
+        assert linhas_execucao == {"esteira_transformacao"}
+    else:
+        assert linhas_execucao == {threading.current_thread().name}
+    assert not _linhas_execucao_esteira()
+
+
+def teste_processar_em_esteira_interrompida(sessao):
+    """Testa se interromper a iteração encerra a extração antecipada."""
+    extraidos = []
+    for indice, _ in enumerate(
+        processar_em_esteira(
+            sessao=sessao,
+            lotes=_gerar_lotes(1000, extraidos),
+            transformar=_transformar,
+            fila_max=1,
+        ),
+    ):
+        if indice == 2:
+            break
+
+    assert not _linhas_execucao_esteira()
+    assert len(extraidos) < 10
+
+
+@pytest.mark.parametrize("etapa", ["extracao", "transformacao"])
+def teste_processar_em_esteira_repassa_erros(sessao, etapa):
+    """Testa se erros nas etapas auxiliares chegam a quem consome a esteira.
+    """
+
+    def gerar_lotes_com_erro():
+        yield from _gerar_lotes(2)
+        if etapa == "extracao":
+            raise ValueError("Falha na extração")
+        yield from _gerar_lotes(2)
+
+    def transformar_com_erro(sessao, lote):
+        if etapa == "transformacao" and len(lote) and lote["indice"][0] == 1:
+            raise ValueError("Falha na transformação")
+        return _transformar(sessao, lote)
+
+    gerados = []
+    with pytest.raises(ValueError):
+        for lote, _ in processar_em_esteira(
+            sessao=sessao,
+            lotes=gerar_lotes_com_erro(),
+            transformar=transformar_com_erro,
+        ):
+            gerados.append(lote)
+
+    assert len(gerados) == (2 if etapa == "extracao" else 1)
+    assert not _linhas_execucao_esteira()
+
+
+def teste_processar_em_esteira_tarefa_prefect():
+    """Testa transformar os lotes com uma tarefa do Prefect, em um fluxo."""
+
+    @task
+    def transformar_tarefa(sessao, lote):
+        return _transformar(sessao, lote)
+
+    @flow
+    def fluxo():
+        sessao = Session(bind=sa.create_engine("sqlite://"))
+        try:
+            return list(
+                processar_em_esteira(
+                    sessao=sessao,
+                    lotes=_gerar_lotes(3),
+                    transformar=transformar_tarefa,
+                ),
+            )
+        finally:
+            sessao.close()
+
+    resultados = fluxo()
+    assert [
+        lote_transformado["dobro"].iloc[0]
+        for _, lote_transformado in resultados
+    ] == [0, 2, 4]
+    assert not _linhas_execucao_esteira()
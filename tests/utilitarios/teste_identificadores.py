@@ -0,0 +1,39 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Casos de teste para a geração de identificadores UUID versão 7 em lote."""
+
+
+import time
+from uuid import RFC_4122, UUID
+
+import pytest
+
+from impulsoetl.utilitarios.identificadores import gerar_uuid7
+
+
+@pytest.mark.parametrize("quantidade", [0, 1, 10000])
+def teste_gerar_uuid7(quantidade):
+    """Testa se os identificadores gerados são UUIDs versão 7 válidos."""
+    inicio = time.time_ns() // 10**6
+    identificadores = gerar_uuid7(quantidade)
+    assert len(identificadores) == quantidade
+    for identificador in identificadores:
+        assert isinstance(identificador, str)
+        uuid = UUID(identificador)
+        assert uuid.hex == identificador
+        assert uuid.version == 7
+        assert uuid.variant == RFC_4122
+        assert int(identificador[:12], 16) >= inicio
+
+
+def teste_gerar_uuid7_ordenados():
+    """Testa se os identificadores crescem dentro e entre lotes."""
+    lotes = [gerar_uuid7(quantidade) for quantidade in (1000, 1, 0, 5000)]
+    identificadores = [
+        identificador for lote in lotes for identificador in lote
+    ]
+    assert identificadores == sorted(identificadores)
+    assert len(set(identificadores)) == len(identificadores)
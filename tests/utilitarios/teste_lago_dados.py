@@ -0,0 +1,116 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Casos de teste para o lago de dados com arquivos extraídos do DataSUS."""
+
+
+import re
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from impulsoetl.utilitarios.lago_dados import LagoDados, ParticaoLago
+
+DIRETORIO_TESTES = Path(__file__).parent.parent
+DIRETORIO_SIASUS = "/dissemin/publicos/SIASUS/200801_/Dados"
+
+
+@pytest.fixture(scope="function")
+def lago(tmp_path):
+    return LagoDados(diretorio=tmp_path / "lago")
+
+
+@pytest.fixture(scope="module")
+def procedimentos():
+    return pd.read_parquet(DIRETORIO_TESTES / "siasus/SIA_PASE2108_.parquet")
+
+
+def _lotes(dados, passo):
+    for inicio in range(0, len(dados), passo):
+        yield dados.iloc[inicio : inicio + passo].reset_index(drop=True)
+
+
+@pytest.mark.parametrize(
+    "caminho_diretorio,arquivo_nome,particao_esperada",
+    [
+        (
+            DIRETORIO_SIASUS,
+            "PASP2201b.dbc",
+            ParticaoLago("SIASUS", "PA", "SP", "2201", "PASP2201b"),
+        ),
+        (
+            "/dissemin/publicos/SIM/CID10/DORES/",
+            "DOAC2020.dbc",
+            ParticaoLago("SIM", "DO", "AC", "2020", "DOAC2020"),
+        ),
+        (
+            "/dissemin/publicos/SINAN/DADOS/FINAIS/",
+            "VIOLBR19.dbc",
+            ParticaoLago("SINAN", "VIOL", "BR", "19", "VIOLBR19"),
+        ),
+        (DIRETORIO_SIASUS, "LEIAME.txt", None),
+    ],
+)
+def teste_identificar_particao(
+    caminho_diretorio,
+    arquivo_nome,
+    particao_esperada,
+):
+    """Testa a identificação da partição a partir da origem do arquivo."""
+    particao = LagoDados.identificar_particao(caminho_diretorio, arquivo_nome)
+    assert particao == particao_esperada
+
+
+def teste_guardar_e_ler(lago, procedimentos):
+    """Testa se os registros guardados são lidos de volta com seleção."""
+    lotes = list(
+        lago.guardar(
+            caminho_diretorio=DIRETORIO_SIASUS,
+            arquivo_nome="PASE2108.dbc",
+            lotes=_lotes(procedimentos, 500),
+        ),
+    )
+    assert len(lotes) == -(-len(procedimentos) // 500)
+    assert lago.contem(DIRETORIO_SIASUS, "PASE2108.dbc")
+    assert not lago.contem(DIRETORIO_SIASUS, "PASE2109.dbc")
+    assert lago.listar(
+        DIRETORIO_SIASUS,
+        re.compile(r"PASE2108[a-z]?\.dbc"),
+    ) == ["PASE2108.dbc"]
+
+    lidos = pd.concat(
+        lago.ler(
+            caminho_diretorio=DIRETORIO_SIASUS,
+            arquivo_nome="PASE2108.dbc",
+            passo=300,
+            colunas=["pa_coduni", "PA_QTDAPR"],
+            condicoes="PA_QTDAPR > 1 & PA_SEXO == 'F'",
+        ),
+        ignore_index=True,
+    )
+    esperados = procedimentos.query(
+        "PA_QTDAPR > 1 & PA_SEXO == 'F'",
+        engine="python",
+    ).loc[:, ["PA_CODUNI", "PA_QTDAPR"]]
+    pd.testing.assert_frame_equal(lidos, esperados.reset_index(drop=True))
+
+
+def teste_guardar_interrompido(lago, procedimentos):
+    """Testa se uma gravação interrompida não deixa cópias incompletas."""
+    lotes = lago.guardar(
+        caminho_diretorio=DIRETORIO_SIASUS,
+        arquivo_nome="PASE2108.dbc",
+        lotes=_lotes(procedimentos, 500),
+    )
+    next(lotes)
+    lotes.close()
+
+    assert not lago.contem(DIRETORIO_SIASUS, "PASE2108.dbc")
+    assert not [
+        caminho for caminho in lago.diretorio.rglob("*") if caminho.is_file()
+    ]
+    with pytest.raises(FileNotFoundError):
+        next(lago.ler(DIRETORIO_SIASUS, "PASE2108.dbc"))
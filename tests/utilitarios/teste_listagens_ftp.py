@@ -0,0 +1,96 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Casos de teste para a listagem de diretórios de servidores FTP."""
+
+
+from ftplib import error_perm
+
+from impulsoetl.utilitarios.listagens_ftp import (
+    ArquivoFTP,
+    CacheListagensFTP,
+    listar_diretorio,
+)
+
+ARQUIVOS = [
+    ArquivoFTP(
+        nome="PASP2201a.dbc",
+        tamanho=1024,
+        modificacao="20220315103000",
+    ),
+    ArquivoFTP(nome="PASP2201b.dbc"),
+]
+
+
+class ClienteMLSD(object):
+    def mlsd(self, facts=()):
+        yield ".", {"type": "cdir"}
+        yield "PASP2201b.dbc", {
+            "type": "file",
+            "size": "2048",
+            "modify": "20220315103100.123",
+        }
+        yield "antigos", {"type": "dir"}
+        yield "PASP2201a.dbc", {
+            "type": "file",
+            "size": "1024",
+            "modify": "20220315103000",
+        }
+
+
+class ClienteNLST(object):
+    def mlsd(self, facts=()):
+        raise error_perm("500 Comando desconhecido.")
+        yield
+
+    def nlst(self):
+        return ["PASP2201b.dbc", "PASP2201a.dbc"]
+
+
+def teste_listar_diretorio_mlsd():
+    """Testa se a listagem com MLSD inclui tamanhos e datas."""
+    arquivos = listar_diretorio(ClienteMLSD())
+    assert arquivos == [
+        ArquivoFTP("PASP2201a.dbc", 1024, "20220315103000"),
+        ArquivoFTP("PASP2201b.dbc", 2048, "20220315103100"),
+    ]
+    assert all(arquivo.completo for arquivo in arquivos)
+
+
+def teste_listar_diretorio_nlst():
+    """Testa se a listagem recorre ao NLST se não houver suporte ao MLSD."""
+    arquivos = listar_diretorio(ClienteNLST())
+    assert arquivos == [
+        ArquivoFTP("PASP2201a.dbc"),
+        ArquivoFTP("PASP2201b.dbc"),
+    ]
+    assert not any(arquivo.completo for arquivo in arquivos)
+
+
+def teste_cache_listagens_validade():
+    """Testa se listagens são ignoradas após o prazo de validade."""
+    listagens = CacheListagensFTP(validade=60)
+    assert listagens.obter("ftp.exemplo.gov.br", "/dados") is None
+    listagens.guardar("ftp.exemplo.gov.br", "/dados", ARQUIVOS)
+    assert listagens.obter("ftp.exemplo.gov.br", "/dados") == ARQUIVOS
+    assert listagens.obter("ftp.exemplo.gov.br", "/outros") is None
+
+    listagens.validade = 0
+    assert listagens.obter("ftp.exemplo.gov.br", "/dados") is None
+
+
+def teste_cache_listagens_em_disco(tmp_path):
+    """Testa se listagens guardadas em disco são lidas por outra instância."""
+    CacheListagensFTP(validade=60, diretorio=tmp_path).guardar(
+        "ftp.exemplo.gov.br",
+        "/dados",
+        ARQUIVOS,
+    )
+    listagens = CacheListagensFTP(validade=60, diretorio=tmp_path)
+    assert listagens.obter("ftp.exemplo.gov.br", "/dados") == ARQUIVOS
+
+    listagens.esquecer()
+    assert not list(tmp_path.glob("*.json"))
+    assert listagens.obter("ftp.exemplo.gov.br", "/dados") is None
@@ -0,0 +1,112 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Casos de teste para o dimensionamento de lotes conforme a memória."""
+
+
+import pandas as pd
+import pytest
+
+from impulsoetl.utilitarios.dbf import CampoDBF, LeitorDBF, escrever_dbf
+from impulsoetl.utilitarios.lotes import DimensionadorLotes, passo_atual
+
+
+def _lote(colunas_num: int, registros_num: int = 100) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "COLUNA{}".format(indice): ["X" * 20] * registros_num
+            for indice in range(colunas_num)
+        },
+    )
+
+
+def teste_dimensionador_fixo():
+    """Testa se um dimensionador fixo ignora a memória ocupada pelos lotes."""
+    dimensionador = DimensionadorLotes.fixo(100)
+    dimensionador.observar(_lote(colunas_num=50), etapa="extracao")
+    assert dimensionador.passo == 100
+    assert passo_atual(dimensionador) == passo_atual(100) == 100
+
+
+def teste_dimensionador_proporcional_a_memoria():
+    """Testa se lotes de registros mais largos geram lotes menores."""
+    estreito = DimensionadorLotes(memoria_max=10**8, passo_max=10**9)
+    estreito.observar(_lote(colunas_num=2), etapa="extracao")
+    largo = DimensionadorLotes(memoria_max=10**8, passo_max=10**9)
+    largo.observar(_lote(colunas_num=20), etapa="extracao")
+    assert estreito.passo > 5 * largo.passo
+
+    # a memória dos lotes transformados se soma à dos extraídos
+    passo_antes = largo.passo
+    largo.observar(_lote(colunas_num=80), etapa="transformacao")
+    assert largo.passo < passo_antes / 2
+
+    # o tamanho respeita os limites, mesmo com muito pouca memória
+    limitado = DimensionadorLotes(memoria_max=1, passo_min=10)
+    limitado.observar(_lote(colunas_num=2), etapa="extracao")
+    assert limitado.passo == 10
+
+
+def teste_dimensionador_do_ambiente(monkeypatch):
+    """Testa se um tamanho fixo configurado prevalece sobre a memória."""
+    monkeypatch.setenv("IMPULSOETL_LOTE_TAMANHO", "250")
+    assert DimensionadorLotes.do_ambiente().passo == 250
+
+    monkeypatch.setenv("IMPULSOETL_LOTE_TAMANHO", "")
+    monkeypatch.setenv("IMPULSOETL_LOTE_MEMORIA_MAX", "16")
+    dimensionador = DimensionadorLotes.do_ambiente()
+    assert dimensionador.memoria_max == 16 * 10**6
+
+
+def teste_dimensionador_lotes_simultaneos(monkeypatch):
+    """Testa se a memória é dividida entre os lotes informados pelo fluxo."""
+    monkeypatch.delenv("IMPULSOETL_LOTE_TAMANHO", raising=False)
+    monkeypatch.setenv("IMPULSOETL_LOTE_MEMORIA_MAX", "16")
+    isolado = DimensionadorLotes.do_ambiente()
+    simultaneos = DimensionadorLotes.do_ambiente(lotes_simultaneos=4)
+    assert simultaneos.lotes_simultaneos == 4
+
+    lote = _lote(colunas_num=2)
+    for dimensionador in (isolado, simultaneos):
+        dimensionador.observar(lote, etapa="extracao")
+    assert simultaneos.passo == pytest.approx(isolado.passo / 4, abs=1)
+
+
+def teste_leitor_dbf_lotes_dimensionados(tmp_path):
+    """Testa se o leitor ajusta o tamanho dos lotes à memória medida."""
+    dados = pd.DataFrame(
+        {
+            "NOME": ["REGISTRO {}".format(indice) for indice in range(5000)],
+            "VALOR": range(5000),
+        },
+    )
+    arquivo_dbf = tmp_path / "teste.dbf"
+    escrever_dbf(
+        arquivo_dbf,
+        dados,
+        campos=[
+            CampoDBF(nome="NOME", tipo="C", tamanho=200),
+            CampoDBF(nome="VALOR", tipo="N", tamanho=5),
+        ],
+    )
+
+    dimensionador = DimensionadorLotes(
+        memoria_max=10**6,
+        lotes_simultaneos=1,
+        passo_min=1,
+    )
+    lotes = list(LeitorDBF(arquivo_dbf).lotes(passo=dimensionador))
+
+    # o primeiro lote é estimado pelo cabeçalho, que supõe campos de texto
+    # preenchidos; os seguintes, pela memória efetivamente ocupada
+    assert len(lotes[1]) > len(lotes[0])
+    assert all(
+        lote.memory_usage(index=False, deep=True).sum() < 10**6
+        for lote in lotes
+    )
+    pd.testing.assert_frame_equal(
+        pd.concat(lotes, ignore_index=True),
+        LeitorDBF(arquivo_dbf).ler(),
+    )
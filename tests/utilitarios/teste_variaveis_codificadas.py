@@ -0,0 +1,80 @@
+# SPDX-FileCopyrightText: 2023 ImpulsoGov <contato@impulsogov.org>
+#
+# SPDX-License-Identifier: MIT
+
+
+"""Testes da verificação de códigos em variáveis codificadas."""
+
+
+import pandas as pd
+import pytest
+
+from impulsoetl.utilitarios.variaveis_codificadas import (
+    _compilar_codigos,
+    checar_codigos,
+)
+
+CODIGOS_ALVO = ["F", "X6", "X80", "X81", "Z004", "Z0041"]
+
+
+@pytest.mark.parametrize(
+    "varios_codigos_por_celula,resultado_esperado",
+    [
+        (False, [True, True, True, False, False, False, False, False]),
+        (True, [True, True, True, True, False, True, False, False]),
+    ],
+)
+def teste_checar_codigos(varios_codigos_por_celula, resultado_esperado):
+    """Testa verificar se os textos contêm algum dos códigos-alvo."""
+    serie = pd.Series(
+        [
+            "F322",
+            "X800",
+            "Z0049",
+            "A419/X609",
+            "AX60",
+            "A41 Z004*B342",
+            "X8",
+            None,
+        ],
+        index=range(10, 18),
+    )
+    resultado = checar_codigos(
+        serie,
+        codigos_alvo=CODIGOS_ALVO,
+        varios_codigos_por_celula=varios_codigos_por_celula,
+    )
+    pd.testing.assert_series_equal(
+        resultado,
+        pd.Series(resultado_esperado, index=serie.index),
+    )
+
+
+@pytest.mark.parametrize("varios_codigos_por_celula", [False, True])
+def teste_checar_codigos_equivale_startswith(varios_codigos_por_celula):
+    """Testa se o resultado equivale a comparar os códigos um a um."""
+    serie = pd.Series(["F", "X6", "X7", "Z00", "Z0042", "", "x600"])
+    resultado = checar_codigos(
+        serie,
+        codigos_alvo=CODIGOS_ALVO,
+        varios_codigos_por_celula=varios_codigos_por_celula,
+    )
+    assert resultado.tolist() == [
+        any(elemento.startswith(codigo) for codigo in CODIGOS_ALVO)
+        for elemento in serie
+    ]
+
+
+def teste_checar_codigos_sem_codigos():
+    """Testa verificar uma lista vazia de códigos-alvo."""
+    serie = pd.Series(["F322", ""])
+    assert not checar_codigos(serie, codigos_alvo=[]).any()
+    assert checar_codigos(serie, codigos_alvo=[""]).all()
+
+
+def teste_compilar_codigos_uma_vez():
+    """Testa se a expressão de cada lista de códigos é compilada uma vez."""
+    padrao = _compilar_codigos(tuple(CODIGOS_ALVO), False)
+    assert _compilar_codigos(tuple(CODIGOS_ALVO), False) is padrao
+    # códigos mais longos que começam com outro código são redundantes
+    assert padrao.pattern == "(?:X(?:8[01]|6)|Z004|F)"